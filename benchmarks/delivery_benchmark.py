@@ -0,0 +1,240 @@
+"""
+End-to-end delivery throughput benchmark.
+
+Drives VesselDocumentsAlert against a local SMTPSink with synthetic
+fleets and reports messages/sec, bytes/message and p50/p99 send latency.
+
+Usage:
+    python -m benchmarks.delivery_benchmark
+    python -m benchmarks.delivery_benchmark --fleets 10 100 1000 --latency-ms 5
+    python -m benchmarks.delivery_benchmark --error-rate 0.01
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# AlertConfig.from_env() requires SMTP settings; the benchmark never connects
+for _var, _value in {
+    'SMTP_HOST': '127.0.0.1', 'SMTP_USER': 'alerts@benchmark.test', 'SMTP_PASS': 'benchmark',
+}.items():
+    os.environ.setdefault(_var, _value)
+
+import pandas as pd
+
+from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+from src.core.config import AlertConfig
+from src.core.tracking import EventTracker
+from src.formatters.html_formatter import HTMLFormatter
+from src.formatters.text_formatter import TextFormatter
+from src.notifications.email_sender import EmailSender
+from src.utils.smtp_sink import SMTPSink
+
+REPO_MEDIA_DIR = Path(__file__).resolve().parent.parent / 'media'
+
+DEPARTMENTS = ['Technical', 'Operations', 'HSSQE', 'Marine']
+CATEGORIES = ['Safety', 'Technical', 'Class', 'Flag', 'Insurance']
+
+
+def build_fleet(n_vessels: int, docs_per_vessel: int = 3) -> pd.DataFrame:
+    """
+    Build a synthetic vessel_documents result set.
+
+    Args:
+        n_vessels: Number of distinct vessels
+        docs_per_vessel: Updated documents per vessel
+
+    Returns:
+        DataFrame shaped like NewVesselCertificates.sql output
+    """
+    now = datetime.now()
+    rows = []
+    for v in range(n_vessels):
+        domain = 'prominencemaritime.com' if v % 2 == 0 else 'seatraders.com'
+        for d in range(docs_per_vessel):
+            dept = DEPARTMENTS[(v + d) % len(DEPARTMENTS)]
+            rows.append({
+                'vessel_id': v,
+                'vessel': f'BENCH VESSEL {v:04d}',
+                'vsl_email': f'vessel{v:04d}@vsl.{domain}',
+                'department_id': DEPARTMENTS.index(dept),
+                'department_name': dept,
+                'document_id': v * 1000 + d,
+                'document_name': f'Certificate {v}-{d}',
+                'document_category': CATEGORIES[d % len(CATEGORIES)],
+                'updated_at': now - timedelta(minutes=d + 1),
+                'expiration_date': now + timedelta(days=30 * (d + 1)),
+                'comments': f'Renewed after survey #{d}',
+            })
+    return pd.DataFrame(rows)
+
+
+class SyntheticFleetAlert(VesselDocumentsAlert):
+    """VesselDocumentsAlert that reads a prebuilt frame instead of the database."""
+
+    def __init__(self, config: AlertConfig, fleet: pd.DataFrame):
+        super().__init__(config)
+        self.fleet = fleet
+
+    def fetch_data(self) -> pd.DataFrame:
+        return self.fleet.copy()
+
+
+class TimedEmailSender(EmailSender):
+    """EmailSender that records wall-clock latency of every send() call."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies: List[float] = []
+
+    def send(self, *args, **kwargs) -> None:
+        start = time.perf_counter()
+        try:
+            super().send(*args, **kwargs)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+@dataclass
+class BenchmarkResult:
+    """Delivery metrics for a single fleet size."""
+    vessels: int
+    messages: int
+    seconds: float
+    bytes_per_message: float
+    p50_ms: float
+    p99_ms: float
+    errors: int
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def build_config(project_root: Path, sink: SMTPSink) -> AlertConfig:
+    """
+    Build an AlertConfig wired to the sink with fresh tracking state.
+
+    Args:
+        project_root: Scratch directory for data/logs
+        sink: Running SMTPSink
+
+    Returns:
+        AlertConfig with runtime components injected
+    """
+    config = AlertConfig.from_env(project_root=project_root)
+    # Use the real logos so bytes/message reflects production payloads
+    config.company_logos = {
+        name: REPO_MEDIA_DIR / path.name for name, path in config.company_logos.items()
+    }
+    config.smtp_host = sink.host
+    config.smtp_port = sink.port
+    config.smtp_use_tls = False
+    config.enable_email_alerts = True
+    config.dry_run = False
+    config.email_routing = {
+        'prominencemaritime.com': {'cc': ['technical@prominencemaritime.com', 'operations@prominencemaritime.com']},
+        'seatraders.com': {'cc': ['technical@seatraders.com', 'operations@seatraders.com']},
+    }
+    config.tracker = EventTracker(
+        tracking_file=project_root / 'data' / 'benchmark_tracking.json',
+        reminder_frequency_days=None,
+        timezone=config.timezone
+    )
+    config.email_sender = TimedEmailSender(
+        smtp_host=sink.host,
+        smtp_port=sink.port,
+        smtp_user=config.smtp_user,
+        smtp_pass=config.smtp_pass,
+        company_logos=config.company_logos,
+        use_tls=False
+    )
+    config.html_formatter = HTMLFormatter()
+    config.text_formatter = TextFormatter()
+    return config
+
+
+def run_benchmark(n_vessels: int, sink: SMTPSink, docs_per_vessel: int = 3) -> BenchmarkResult:
+    """
+    Run one end-to-end alert cycle for a synthetic fleet.
+
+    Args:
+        n_vessels: Fleet size
+        sink: Running SMTPSink (counters are reset)
+        docs_per_vessel: Updated documents per vessel
+
+    Returns:
+        BenchmarkResult for this fleet
+    """
+    sink.reset()
+    fleet = build_fleet(n_vessels, docs_per_vessel)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_root = Path(tmpdir)
+        for sub in ('queries', 'media', 'logs', 'data'):
+            (project_root / sub).mkdir()
+
+        config = build_config(project_root, sink)
+        alert = SyntheticFleetAlert(config, fleet)
+
+        start = time.perf_counter()
+        alert.run()
+        elapsed = time.perf_counter() - start
+
+    latencies = config.email_sender.latencies
+    messages = sink.message_count
+    return BenchmarkResult(
+        vessels=n_vessels,
+        messages=messages,
+        seconds=elapsed,
+        bytes_per_message=sink.bytes_received / messages if messages else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        errors=sink.errors_injected,
+    )
+
+
+def main() -> None:
+    """Run the benchmark from the command line and print a results table."""
+    parser = argparse.ArgumentParser(description='End-to-end delivery throughput benchmark')
+    parser.add_argument('--fleets', type=int, nargs='+', default=[10, 100, 1000], help='Fleet sizes to run')
+    parser.add_argument('--docs-per-vessel', type=int, default=3, help='Updated documents per vessel')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Injected sink latency per message')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of DATA commands to fail')
+    parser.add_argument('--error-code', type=int, default=451, help='SMTP code for injected failures')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with SMTPSink(
+        store_messages=False,
+        latency_seconds=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        seed=0
+    ) as sink:
+        print(f"{'vessels':>8} {'msgs':>6} {'secs':>8} {'msg/s':>8} {'bytes/msg':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6}")
+        for n_vessels in args.fleets:
+            r = run_benchmark(n_vessels, sink, args.docs_per_vessel)
+            print(
+                f"{r.vessels:>8} {r.messages:>6} {r.seconds:>8.2f} {r.messages_per_second:>8.1f} "
+                f"{r.bytes_per_message:>10.0f} {r.p50_ms:>8.2f} {r.p99_ms:>8.2f} {r.errors:>6}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""
+Email body rendering benchmark.
+
+Renders the HTML and plain-text bodies of large single-message tables
+(e.g. a vessel with thousands of documents or a fleet-wide digest) three
+ways and checks that all produce byte-identical output:
+- legacy:   the original row-by-row formatters (iterrows() plus string +=)
+- separate: current formatters, each normalising the data on its own
+- shared:   current formatters sharing one DisplayFrame (as BaseAlert does)
+
+With --jobs, it instead renders a fleet of many small jobs through the
+render stage serially and on process pools of each --workers size.
+With --text-layouts, it compares plain-text body sizes per text layout,
+and with --html-modes, HTML body sizes per HTML mode.
+
+Usage:
+    python -m benchmarks.render_benchmark
+    python -m benchmarks.render_benchmark --rows 1000 10000 50000 --repeat 3
+    python -m benchmarks.render_benchmark --jobs 2000 --rows-per-job 25 --workers 1 2 4
+    python -m benchmarks.render_benchmark --text-layouts --rows 1000 10000
+    python -m benchmarks.render_benchmark --html-modes --rows 10 100 1000
+"""
+import argparse
+from html import escape
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, Tuple
+from zoneinfo import ZoneInfo
+
+# AlertConfig.from_env() requires SMTP settings; the benchmark never connects
+for _var, _value in {
+    'SMTP_HOST': '127.0.0.1', 'SMTP_USER': 'alerts@benchmark.test', 'SMTP_PASS': 'benchmark',
+}.items():
+    os.environ.setdefault(_var, _value)
+
+import pandas as pd
+
+from src.core.rendering import RenderContext, RenderTask, render_all
+from src.formatters.display_frame import DisplayFrame
+from src.formatters.html_formatter import HTMLFormatter
+from src.formatters.text_formatter import TextFormatter
+
+DEPARTMENTS = ['Technical', 'Operations', 'HSSQE', 'Marine']
+CATEGORIES = ['Safety', 'Technical', 'Class', 'Flag', 'P&I Insurance']
+DISPLAY_COLUMNS = ['vessel', 'department_name', 'document_name', 'document_category', 'updated_at', 'expiration_date', 'comments']
+
+
+class LegacyHTMLFormatter(HTMLFormatter):
+    """HTMLFormatter with the original iterrows()/+= table body (plus per-cell html.escape), kept as a reference."""
+
+    def _iter_rows(self, frame: DisplayFrame, chunk_rows: int) -> Iterator[str]:
+        html = ""
+        for idx, row in frame.source.iterrows():
+            html += "                <tr>\n"
+            for col in frame.columns:
+                value = row[col]
+                # Format None/NaN as empty string
+                if pd.isna(value):
+                    display_value = ""
+                else:
+                    display_value = escape(str(value))
+
+                html += f"                    <td>{display_value}</td>\n"
+            html += "                </tr>\n"
+        yield html
+
+
+class LegacyTextFormatter(TextFormatter):
+    """TextFormatter with the original iterrows()/+= records, kept as a reference."""
+
+    def _iter_records(self, frame: DisplayFrame, chunk_rows: int) -> Iterator[str]:
+        text = ""
+        for idx, row in frame.source.iterrows():
+            text += f"Record {idx + 1}:\n"
+            text += "-" * 70 + "\n"
+
+            for col in frame.columns:
+                value = row[col]
+                # Format None/NaN as empty string
+                if pd.isna(value):
+                    display_value = "(empty)"
+                else:
+                    display_value = str(value)
+
+                # Format column name
+                col_display = col.replace('_', ' ').title()
+                text += f"  {col_display}: {display_value}\n"
+
+            text += "\n"
+        yield text
+
+
+class _RenderConfig:
+    """Just the settings HTMLFormatter reads."""
+    schedule_frequency_hours = 1.0
+    company_logos = {}
+
+
+@dataclass
+class RenderResult:
+    """Timings (HTML + text body) for one table size."""
+    rows: int
+    legacy_seconds: float
+    separate_seconds: float
+    shared_seconds: float
+    output_bytes: int
+    identical: bool
+
+    @property
+    def speedup(self) -> float:
+        return self.legacy_seconds / self.shared_seconds if self.shared_seconds else float('inf')
+
+
+def build_documents(n_rows: int) -> pd.DataFrame:
+    """
+    Build a synthetic document table as it reaches the formatter.
+
+    Args:
+        n_rows: Number of document rows
+
+    Returns:
+        DataFrame with the vessel documents display columns (some empty cells)
+    """
+    now = datetime(2025, 1, 1, 12, 0)
+    return pd.DataFrame({
+        'vessel_id': [i // 25 for i in range(n_rows)],
+        'vessel': [f"BENCH VESSEL {i // 25:04d}" for i in range(n_rows)],
+        'department_name': [DEPARTMENTS[i % len(DEPARTMENTS)] for i in range(n_rows)],
+        'document_id': list(range(n_rows)),
+        'document_name': [f"Certificate {i}" for i in range(n_rows)],
+        'document_category': [CATEGORIES[i % len(CATEGORIES)] for i in range(n_rows)],
+        'updated_at': [(now - timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S') for i in range(n_rows)],
+        'expiration_date': [None if i % 7 == 0 else (now + timedelta(days=i % 365)).strftime('%Y-%m-%d') for i in range(n_rows)],
+        'comments': [
+            float('nan') if i % 3 == 0 else f"Survey <{i}> & follow-up" if i % 10 == 1 else f"Comment {i}"
+            for i in range(n_rows)
+        ],
+    })
+
+
+def run_benchmark(n_rows: int, repeat: int = 1) -> RenderResult:
+    """
+    Render both bodies of one n_rows table with each implementation.
+
+    Args:
+        n_rows: Number of table rows
+        repeat: Runs per implementation (best time is reported)
+
+    Returns:
+        RenderResult with best-of-repeat timings
+    """
+    df = build_documents(n_rows)
+    run_time = datetime.now(tz=ZoneInfo('Europe/Athens'))
+    metadata = {'alert_title': 'Vessel Document Updates Digest', 'display_columns': DISPLAY_COLUMNS}
+    config = _RenderConfig()
+    html_formatter, text_formatter = HTMLFormatter(), TextFormatter()
+
+    def legacy():
+        return (
+            LegacyHTMLFormatter().format(df, run_time, config, metadata),
+            LegacyTextFormatter().format(df, run_time, config, metadata),
+        )
+
+    def separate():
+        return (
+            html_formatter.format(df, run_time, config, metadata),
+            text_formatter.format(df, run_time, config, metadata),
+        )
+
+    def shared():
+        frame = DisplayFrame.from_dataframe(df, metadata)
+        return (
+            html_formatter.format(df, run_time, config, metadata, frame=frame),
+            text_formatter.format(df, run_time, config, metadata, frame=frame),
+        )
+
+    def best(render):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            bodies = render()
+            timings.append(time.perf_counter() - start)
+        return min(timings), bodies
+
+    legacy_seconds, legacy_bodies = best(legacy)
+    separate_seconds, separate_bodies = best(separate)
+    shared_seconds, shared_bodies = best(shared)
+
+    return RenderResult(
+        rows=n_rows,
+        legacy_seconds=legacy_seconds,
+        separate_seconds=separate_seconds,
+        shared_seconds=shared_seconds,
+        output_bytes=sum(len(body.encode('utf-8')) for body in shared_bodies),
+        identical=legacy_bodies == separate_bodies == shared_bodies,
+    )
+
+
+def run_fleet_benchmark(n_jobs: int, rows_per_job: int, workers: int) -> float:
+    """
+    Render n_jobs jobs through the render stage.
+
+    Args:
+        n_jobs: Number of notification jobs (one per vessel)
+        rows_per_job: Document rows per job
+        workers: Render worker processes (1 = serial)
+
+    Returns:
+        Wall-clock seconds, including process pool start-up
+    """
+    df = build_documents(n_jobs * rows_per_job)
+    metadata = {'alert_title': 'Vessel Document Updates', 'display_columns': DISPLAY_COLUMNS}
+    tasks = [
+        RenderTask(subject=f"Job {i}", data=df.iloc[i * rows_per_job:(i + 1) * rows_per_job], metadata=metadata)
+        for i in range(n_jobs)
+    ]
+    context = RenderContext(
+        schedule_frequency_hours=1.0, company_logos={},
+        html_formatter=HTMLFormatter(), text_formatter=TextFormatter()
+    )
+
+    start = time.perf_counter()
+    render_all(tasks, datetime.now(tz=ZoneInfo('Europe/Athens')), context, workers=workers, min_batch=1)
+    return time.perf_counter() - start
+
+
+def compare_text_layouts(n_rows: int) -> Tuple[int, int, float]:
+    """
+    Size of the plain-text body of one n_rows table in each text layout.
+
+    Args:
+        n_rows: Number of table rows
+
+    Returns:
+        (records layout bytes, table layout bytes, table layout seconds)
+    """
+    df = build_documents(n_rows)
+    run_time = datetime.now(tz=ZoneInfo('Europe/Athens'))
+    metadata = {'alert_title': 'Vessel Document Updates Digest', 'display_columns': DISPLAY_COLUMNS}
+    config = _RenderConfig()
+
+    records = TextFormatter(layout='records').format(df, run_time, config, metadata)
+    start = time.perf_counter()
+    table = TextFormatter(layout='table').format(df, run_time, config, metadata)
+    seconds = time.perf_counter() - start
+    return len(records.encode('utf-8')), len(table.encode('utf-8')), seconds
+
+
+def compare_html_modes(n_rows: int) -> Tuple[int, int, float]:
+    """
+    Size of the HTML body of one n_rows table in each HTML mode.
+
+    Args:
+        n_rows: Number of table rows
+
+    Returns:
+        (standard mode bytes, compact mode bytes, compact mode seconds)
+    """
+    df = build_documents(n_rows)
+    run_time = datetime.now(tz=ZoneInfo('Europe/Athens'))
+    metadata = {'alert_title': 'Vessel Document Updates Digest', 'display_columns': DISPLAY_COLUMNS}
+    config = _RenderConfig()
+
+    standard = HTMLFormatter(mode='standard').format(df, run_time, config, metadata)
+    start = time.perf_counter()
+    compact = HTMLFormatter(mode='compact').format(df, run_time, config, metadata)
+    seconds = time.perf_counter() - start
+    return len(standard.encode('utf-8')), len(compact.encode('utf-8')), seconds
+
+
+def main() -> None:
+    """Run the benchmark from the command line and print a results table."""
+    parser = argparse.ArgumentParser(description='Email body rendering benchmark')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000], help='Table sizes to render')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation (best time reported)')
+    parser.add_argument('--jobs', type=int, default=0, help='Render this many jobs through the render stage instead')
+    parser.add_argument('--rows-per-job', type=int, default=25, help='Rows per job with --jobs')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts with --jobs')
+    parser.add_argument('--text-layouts', action='store_true', help='Compare plain-text body sizes per text layout')
+    parser.add_argument('--html-modes', action='store_true', help='Compare HTML body sizes per HTML mode')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.jobs:
+        print(f"{'jobs':>8} {'rows/job':>8} {'workers':>8} {'secs':>8} {'jobs/s':>8}")
+        for workers in args.workers:
+            seconds = run_fleet_benchmark(args.jobs, args.rows_per_job, workers)
+            print(f"{args.jobs:>8} {args.rows_per_job:>8} {workers:>8} {seconds:>8.2f} {args.jobs / seconds:>8.0f}")
+        return
+
+    if args.text_layouts:
+        print(f"{'rows':>8} {'records KB':>10} {'table KB':>10} {'ratio':>8} {'table s':>8}")
+        for n_rows in args.rows:
+            records_bytes, table_bytes, seconds = compare_text_layouts(n_rows)
+            print(
+                f"{n_rows:>8} {records_bytes / 1024:>10.0f} {table_bytes / 1024:>10.0f} "
+                f"{records_bytes / table_bytes:>7.1f}x {seconds:>8.3f}"
+            )
+        return
+
+    if args.html_modes:
+        print(f"{'rows':>8} {'standard KB':>11} {'compact KB':>10} {'ratio':>8} {'compact s':>9}")
+        for n_rows in args.rows:
+            standard_bytes, compact_bytes, seconds = compare_html_modes(n_rows)
+            print(
+                f"{n_rows:>8} {standard_bytes / 1024:>11.1f} {compact_bytes / 1024:>10.1f} "
+                f"{standard_bytes / compact_bytes:>7.1f}x {seconds:>9.3f}"
+            )
+        return
+
+    print(f"{'rows':>8} {'legacy s':>10} {'separate s':>10} {'shared s':>10} {'speedup':>8} {'KB':>8} {'identical':>9}")
+    for n_rows in args.rows:
+        r = run_benchmark(n_rows, args.repeat)
+        print(
+            f"{r.rows:>8} {r.legacy_seconds:>10.3f} {r.separate_seconds:>10.3f} {r.shared_seconds:>10.3f} {r.speedup:>7.1f}x "
+            f"{r.output_bytes / 1024:>8.0f} {'yes' if r.identical else 'NO':>9}"
+        )
+
+
+if __name__ == '__main__':
+    main()
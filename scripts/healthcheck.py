@@ -3,8 +3,9 @@
 Healthcheck script for Docker containers with flexible scheduling.
 Supports both SCHEDULE_FREQUENCY_HOURS and SCHEDULE_TIMES modes.
 
-This script checks if /app/logs/health_status.txt exists, contains "OK",
-and has been updated recently enough based on the schedule configuration.
+This script checks the health file of every alert in /app/logs/health/
+(one <AlertClass>.txt per alert type): each must contain OK or WARN and
+have been updated recently enough based on the schedule configuration.
 
 Environment Variables:
     SCHEDULE_FREQUENCY_HOURS: Run every N hours (e.g., "2" for every 2 hours)
@@ -20,94 +21,106 @@ import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Tuple
 from zoneinfo import ZoneInfo
 
+HEALTH_DIR = Path("/app/logs/health")
+
 
 def main():
     """
     Main healthcheck logic.
 
-    Validates the health_status.txt file by checking:
-    1. File exists
-    2. File contains valid structured data
-    3. Status is OK or ERROR is recent
-    4. Timestamp is recent enough based on schedule
+    Validates every alert's health file by checking:
+    1. At least one health file exists
+    2. Each file contains valid structured data
+    3. Each status is OK/WARN (an ERROR from any alert is unhealthy)
+    4. Each timestamp is recent enough based on schedule
 
     Exit codes:
         0: Healthy
         1: Unhealthy
     """
-    health_file = Path("/app/logs/health_status.txt")
+    health_files = sorted(HEALTH_DIR.glob('*.txt'))
+    if not health_files:
+        print(f"No health files found in {HEALTH_DIR}", file=sys.stderr)
+        sys.exit(1)
+
+    # Get the timezone to use for time calculations
+    tz_name = get_effective_timezone()
+
+    # Calculate maximum age based on schedule mode
+    max_age_minutes = calculate_max_age()
+
+    healthy = True
+    for health_file in health_files:
+        ok, message = check_health_file(health_file, tz_name, max_age_minutes)
+        print(f"{health_file.stem}: {message}", file=sys.stdout if ok else sys.stderr)
+        healthy = healthy and ok
+
+    sys.exit(0 if healthy else 1)
+
+
+def check_health_file(health_file: Path, tz_name: str, max_age_minutes: float) -> Tuple[bool, str]:
+    """
+    Check one alert's health file.
+
+    Args:
+        health_file: Path to the alert's health file
+        tz_name: Timezone used for "now"
+        max_age_minutes: Maximum allowed age of the status
 
+    Returns:
+        (healthy, message) tuple
+    """
     # Validate file structure first
     try:
         validate_health_file_structure(health_file)
     except Exception as e:
-        print(f"Health file validation failed: {e}", file=sys.stderr)
-        sys.exit(1)
+        return False, f"Health file validation failed: {e}"
 
     # Read and parse health status
     try:
         health_data = parse_health_file(health_file)
     except Exception as e:
-        print(f"Cannot parse health status: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    # Get the timezone to use for time calculations
-    tz_name = get_effective_timezone()
-
-    # Calculate maximum age based on schedule mode
-    max_age_minutes = calculate_max_age()
+        return False, f"Cannot parse health status: {e}"
 
     # Calculate file age using the parsed timestamp (timezone-aware)
     try:
         now = datetime.now(tz=ZoneInfo(tz_name))
-        file_age_seconds = (now - health_data['timestamp']).total_seconds()
-        file_age_minutes = file_age_seconds / 60
+        file_age_minutes = (now - health_data['timestamp']).total_seconds() / 60
     except Exception as e:
-        print(f"Cannot calculate file age: {e}", file=sys.stderr)
-        sys.exit(1)
+        return False, f"Cannot calculate file age: {e}"
 
     # Check status and age
     if health_data['status'] == "ERROR":
-        # For ERROR status, check if it's a recent error
+        error_msg = health_data.get('error_msg', 'No error message')
         if file_age_minutes > max_age_minutes:
-            print(
+            return False, (
                 f"Health status is ERROR and stale: {file_age_minutes:.1f} minutes old "
-                f"(max: {max_age_minutes:.1f} minutes). "
-                f"Error: {health_data.get('error_msg', 'No error message')}",
-                file=sys.stderr
+                f"(max: {max_age_minutes:.1f} minutes). Error: {error_msg}"
             )
-            sys.exit(1)
-        else:
-            # Recent error - still fail but with different message
-            print(
-                f"Health status is ERROR (recent): {health_data.get('error_msg', 'No error message')}",
-                file=sys.stderr
-            )
-            sys.exit(1)
+        # Recent error - still fail but with different message
+        return False, f"Health status is ERROR (recent): {error_msg}"
 
-    elif health_data['status'] == "OK":
-        # Check if OK status is recent enough
-        if file_age_minutes > max_age_minutes:
-            print(
-                f"Health status file is too old: {file_age_minutes:.1f} minutes "
-                f"(max: {max_age_minutes:.1f} minutes)",
-                file=sys.stderr
-            )
-            sys.exit(1)
+    if health_data['status'] not in ("OK", "WARN"):
+        return False, f"Unknown health status: {health_data['status']}"
 
-    else:
-        print(f"Unknown health status: {health_data['status']}", file=sys.stderr)
-        sys.exit(1)
+    # Check if OK status is recent enough (WARN: some channels failed, others delivered)
+    if file_age_minutes > max_age_minutes:
+        return False, (
+            f"Health status file is too old: {file_age_minutes:.1f} minutes "
+            f"(max: {max_age_minutes:.1f} minutes)"
+        )
 
-    # All checks passed
-    print(
+    message = (
         f"Healthy (status: {health_data['status']}, "
         f"alert: {health_data.get('alert_type', 'unknown')}, "
         f"age: {file_age_minutes:.1f}/{max_age_minutes:.1f} minutes)"
     )
-    sys.exit(0)
+    if health_data['status'] == "WARN":
+        message += f" Warning: {health_data.get('error_msg', 'No error message')}"
+    return True, message
 
 
 def parse_health_file(health_file: Path) -> dict:
@@ -118,18 +131,19 @@ def parse_health_file(health_file: Path) -> dict:
         Line 1: STATUS YYYY-MM-DDTHH:MM:SS.ffffff+HH:MM
         Line 2: ALERT_TYPE: ClassName
         Line 3: TIMEZONE: timezone_name
-        Line 4: ERROR_MSG: message (optional, only if ERROR)
+        Lines 4+: NAME: value run metrics (optional)
+        Last line: ERROR_MSG: message (optional, only if WARN or ERROR)
 
     Args:
-        health_file: Path to health_status.txt
+        health_file: Path to an alert's health file
 
     Returns:
         Dictionary with parsed health data:
-            - status: "OK" or "ERROR"
+            - status: "OK", "WARN" or "ERROR"
             - timestamp: timezone-aware datetime object
             - alert_type: Alert class name
             - timezone: Timezone name from file
-            - error_msg: Error message (only if status is ERROR)
+            - error_msg: Error message (only if status is WARN or ERROR)
 
     Raises:
         ValueError: If file format is invalid
@@ -151,8 +165,8 @@ def parse_health_file(health_file: Path) -> dict:
     status = parts[0]
     timestamp_str = parts[1]
 
-    if status not in ["OK", "ERROR"]:
-        raise ValueError(f"Invalid status: '{status}' (expected OK or ERROR)")
+    if status not in ["OK", "WARN", "ERROR"]:
+        raise ValueError(f"Invalid status: '{status}' (expected OK, WARN or ERROR)")
 
     # Parse timestamp (ISO format with timezone)
     try:
@@ -181,10 +195,10 @@ def parse_health_file(health_file: Path) -> dict:
         'timezone': timezone
     }
 
-    # Parse line 4 (optional): ERROR_MSG
-    if len(lines) >= 4 and lines[3].startswith("ERROR_MSG: "):
-        error_msg = lines[3].replace("ERROR_MSG: ", "").strip()
-        result['error_msg'] = error_msg
+    # Parse ERROR_MSG (optional, after any run metric lines)
+    for line in lines[3:]:
+        if line.startswith("ERROR_MSG: "):
+            result['error_msg'] = line.replace("ERROR_MSG: ", "").strip()
 
     return result
 
@@ -233,7 +247,7 @@ def validate_health_file_structure(health_file: Path) -> None:
 
 def calculate_max_age() -> float:
     """
-    Calculate maximum allowed age for health_status.txt based on schedule mode.
+    Calculate maximum allowed age of a health file based on schedule mode.
 
     Returns:
         Maximum age in minutes
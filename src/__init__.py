@@ -1,14 +1,10 @@
-#src/__init__.py
 """
 Modular Alert System Package.
 
 This package provides a flexible, reusable framework for implementing
 various types of alerts that query databases and send notifications.
 """
-from src.core.base_alert import BaseAlert
-from src.core.config import AlertConfig
-from src.core.tracking import EventTracker
-from src.core.scheduler import AlertScheduler
+from src.utils.lazy import lazy_exports
 
 __version__ = '2.0.0'
 __all__ = [
@@ -17,3 +13,11 @@ __all__ = [
     'EventTracker',
     'AlertScheduler',
 ]
+
+# Imported on first use (see src.utils.lazy)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BaseAlert': 'src.core.base_alert',
+    'AlertConfig': 'src.core.config',
+    'EventTracker': 'src.core.tracking',
+    'AlertScheduler': 'src.core.scheduler',
+})
@@ -1,5 +1,39 @@
-#src/alerts/__init__.py
-"""Alert implementations."""
-from .vessel_documents_alert import VesselDocumentsAlert
+"""
+Alert implementations.
 
-__all__ = ['VesselDocumentsAlert']
+Alerts are registered by class name in ALERT_REGISTRY and their modules
+(with pandas, SQLAlchemy, ...) are imported only when an alert is loaded,
+by load_alert() or attribute access (src.alerts.VesselDocumentsAlert).
+"""
+import importlib
+from typing import Dict, Type
+
+from src.utils.lazy import lazy_exports
+
+# Alert class name -> module defining it; src.main registers every entry
+ALERT_REGISTRY: Dict[str, str] = {
+    'VesselDocumentsAlert': 'src.alerts.vessel_documents_alert',
+}
+
+
+def load_alert(name: str) -> Type['BaseAlert']:
+    """
+    Import a registered alert class.
+
+    Args:
+        name: Alert class name (key of ALERT_REGISTRY)
+
+    Returns:
+        The alert class
+
+    Raises:
+        ValueError: If no alert is registered under that name
+    """
+    if name not in ALERT_REGISTRY:
+        raise ValueError(f"Unknown alert '{name}'. Registered: {', '.join(ALERT_REGISTRY)}")
+    return getattr(importlib.import_module(ALERT_REGISTRY[name]), name)
+
+
+__all__ = ['ALERT_REGISTRY', 'load_alert', *ALERT_REGISTRY]
+
+__getattr__, __dir__ = lazy_exports(__name__, ALERT_REGISTRY)
@@ -7,19 +7,21 @@ to vessel-specific email addresses with company-specific CC lists.
 """
 from typing import Dict, List
 import pandas as pd
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
 from sqlalchemy import text
 import logging
 
-from src.core.base_alert import BaseAlert
+from src.core.base_alert import BaseAlert, SpecAlert
 from src.core.config import AlertConfig
+from src.core.engines import Group, StageSpec
+from src.core.jobs import JobMetadata, NotificationJob
+from src.core.records import RecordSet
+from src.core.routing import DepartmentCCMatrix
 from src.db_utils import get_db_connection, validate_query_file
 
 logger = logging.getLogger(__name__)
 
 
-class VesselDocumentsAlert(BaseAlert):
+class VesselDocumentsAlert(SpecAlert, BaseAlert):
     """
     Alert for vessel document updates.
     
@@ -27,6 +29,8 @@ class VesselDocumentsAlert(BaseAlert):
     with appropriate CC lists based on vessel email domain.
     """
 
+    digest_label_column = 'vessel'
+
     
     def __init__(self, config: AlertConfig):
         """
@@ -42,18 +46,26 @@ class VesselDocumentsAlert(BaseAlert):
         self.lookback_days = config.vessel_documents_lookback_days
         self.department_specific_cc_recipients_filter = config.department_specific_cc_recipients_filter
 
+        # Company CC lists indexed by department once; per-vessel lists are memoized unions
+        self.cc_matrix = DepartmentCCMatrix.from_config(config)
+
         # Log instantiation
         self.logger.info(f"[OK] VesselDocumentsAlert instance created")
 
     
     def fetch_data(self) -> pd.DataFrame:
         """
-        Fetch vessel documents from database.
+        Fetch vessel documents from database (shared within a scheduler cycle).
         
         Returns:
             DataFrame with columns: vessel_id, vessel, vsl_email, department_id, department_name, 
             document_id, document_name, document_category, updated_at, expiration_date, comments
         """
+        return self.cached_frame(self.sql_query_file, self._query_frame)
+
+
+    def _query_frame(self) -> pd.DataFrame:
+        """Run the documents query into a DataFrame."""
         # Load SQL query
         query_path = self.config.queries_dir / self.sql_query_file
         query_sql = validate_query_file(query_path)
@@ -67,118 +79,99 @@ class VesselDocumentsAlert(BaseAlert):
         return df
 
     
-    def filter_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def fetch_records(self) -> RecordSet:
         """
-        Filter for documents updated in the last lookback_days.
-        
-        Args:
-            df: Raw DataFrame from database
-            
+        Fetch vessel documents as plain rows (small-run and Polars paths;
+        shared within a scheduler cycle).
+
         Returns:
-            Filtered DataFrame with only recently updated documents
+            RecordSet with the same columns as fetch_data()
         """
-        if df.empty:
-            return df
-        
-        # Convert updated_at to timezone-aware datetime
-        df['updated_at'] = pd.to_datetime(df['updated_at'])
-        
-        # If the datetime is timezone-naive, localize it to UTC first, then convert to local timezone
-        if df['updated_at'].dt.tz is None:
-            df['updated_at'] = df['updated_at'].dt.tz_localize('UTC').dt.tz_convert(self.config.timezone)
-        else:
-            # If already timezone-aware, just convert to local timezone
-            df['updated_at'] = df['updated_at'].dt.tz_convert(self.config.timezone)
-        
-        # Calculate cutoff date (timezone-aware)
-        cutoff_date = datetime.now(tz=ZoneInfo(self.config.timezone)) - timedelta(days=self.lookback_days)
-        
-        # Filter for recent updates (now both are timezone-aware)
-        df_filtered = df[df['updated_at'] >= cutoff_date].copy()
-        
-        # Format dates for display
-        df_filtered['updated_at'] = df_filtered['updated_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Format expiration_date if present
-        if 'expiration_date' in df_filtered.columns:
-            df_filtered['expiration_date'] = pd.to_datetime(
-                df_filtered['expiration_date'], errors='coerce'
-            ).dt.strftime('%Y-%m-%d')
-            # Replace NaT with empty string
-            df_filtered['expiration_date'] = df_filtered['expiration_date'].fillna('')
-        
-        self.logger.info(
-            f"Filtered to {len(df_filtered)} document(s) updated in last {self.lookback_days} day(s)"
-        )
-        
-        return df_filtered
-    
+        return self.cached_records(self.sql_query_file, self._query_records)
+
+
+    def _query_records(self) -> RecordSet:
+        """Run the documents query into a RecordSet."""
+        query_path = self.config.queries_dir / self.sql_query_file
+        query = text(validate_query_file(query_path))
 
-    def route_notifications(self, df: pd.DataFrame) -> List[Dict]:
+        with get_db_connection() as conn:
+            records = RecordSet.from_result(conn.execute(query))
+
+        self.logger.info(f"Fetched {len(records)} total vessel document record(s)")
+        return records
+
+
+    def stage_spec(self) -> StageSpec:
         """
-        Route documents to vessel-specific emails with company CC lists.
+        Documents updated in the last lookback_days, one notification per vessel.
+
+        Returns:
+            StageSpec shared by every data engine (filter_data(), small runs, Polars)
+        """
+        return StageSpec(
+            group_by=('vessel', 'vsl_email'),
+            tracking_key='vessel_{vessel_id}_doc_{document_id}',
+            timestamp_column='updated_at',
+            lookback_days=self.lookback_days,
+            date_formats={'expiration_date': '%Y-%m-%d'},
+            collect=('department_name',)
+        )
 
-        Each vessel gets a separate email with only their documents.
-        CC recipients are determined by vessel email domain AND responsible departments.
+
+    def build_group_job(self, group: Group) -> NotificationJob:
+        """
+        Build one vessel's notification job.
 
         Args:
-            df: Filtered DataFrame with recent document updates
+            group: The vessel's (name, email) key, its document rows with
+                tracking columns, and their departments
 
         Returns:
-            List of notification job dictionaries
+            NotificationJob with the vessel's company CC list
         """
-        jobs = []
-
-        # Group by vessel only (not by department)
-        grouped = df.groupby(['vessel', 'vsl_email'])
-
-        for (vessel_name, vessel_email), vessel_df in grouped:
-            # Get base CC recipients for this company
-            base_cc_recipients = self._get_base_cc_recipients(vessel_email)
-
-            # Collect all unique departments for this vessel's documents
-            unique_departments = vessel_df['department_name'].dropna().unique().tolist()
-
-            # Filter CC list to only include departments with documents
-            cc_recipients = self._department_cc_filter(base_cc_recipients, unique_departments)
-
-            # Keep full data with tracking columns for the job
-            full_data = vessel_df.copy()
-
-            # Specify WHICH cols to DISPLAY IN EMAIL *and* in WHAT ORDER here:
-            display_columns = [
-                'department_name',
-                'document_name',
-                'document_category',
-                'updated_at',
-                'expiration_date',
-                'comments'
-            ]
-
-            # Create notification job
-            job = {
-                'recipients': [vessel_email],
-                'cc_recipients': cc_recipients,
-                'data': full_data,
-                'metadata': {
-                    'vessel_name': vessel_name,
-                    'alert_title': 'Vessel Document Updates',
-                    'company_name': self._get_company_name(vessel_email),
-                    'display_columns': display_columns,
-                    'departments': unique_departments
-                }
-            }
-
-            jobs.append(job)
-
-            self.logger.info(
-                f"Created notification job for vessel '{vessel_name}' "
-                f"({len(full_data)} document(s), {len(unique_departments)} department(s): {', '.join(unique_departments)}) "
-                f"-> {vessel_email} (CC: {len(cc_recipients)})"
-                f"{' [dept filtering: ON]' if self.department_specific_cc_recipients_filter else ' [dept filtering: OFF]'}"
-            )
+        vessel_name, vessel_email = group.key
+        unique_departments = group.collected['department_name']
+        data = group.data
+
+        # Get base CC recipients for this company
+        base_cc_recipients = self._get_base_cc_recipients(vessel_email)
+
+        # Filter CC list to only include departments with documents
+        cc_recipients = self._department_cc_filter(base_cc_recipients, unique_departments)
+
+        # Specify WHICH cols to DISPLAY IN EMAIL *and* in WHAT ORDER here:
+        display_columns = [
+            'department_name',
+            'document_name',
+            'document_category',
+            'updated_at',
+            'expiration_date',
+            'comments'
+        ]
+
+        # Create notification job
+        job = NotificationJob(
+            recipients=[vessel_email],
+            cc_recipients=cc_recipients,
+            data=data,
+            metadata=JobMetadata(
+                vessel_name=vessel_name,
+                alert_title='Vessel Document Updates',
+                company_name=self._get_company_name(vessel_email),
+                display_columns=display_columns,
+                departments=unique_departments
+            ),
+            tracking_keys=group.tracking_keys
+        )
 
-        return jobs
+        self.logger.info(
+            f"Created notification job for vessel '{vessel_name}' "
+            f"({len(data)} document(s), {len(unique_departments)} department(s): {', '.join(unique_departments)}) "
+            f"-> {vessel_email} (CC: {len(cc_recipients)})"
+            f"{' [dept filtering: ON]' if self.department_specific_cc_recipients_filter else ' [dept filtering: OFF]'}"
+        )
+        return job
 
 
     def _get_base_cc_recipients(self, vessel_email: str) -> List[str]:
@@ -191,18 +184,7 @@ class VesselDocumentsAlert(BaseAlert):
         Returns:
             List of all company CC email addresses (not yet filtered by department)
         """
-        vessel_email_lower = vessel_email.lower()
-
-        # Start with empty list
-        cc_list = []
-
-        # Check each configured domain
-        for domain, recipients_config in self.config.email_routing.items():
-            if domain.lower() in vessel_email_lower:
-                cc_list = recipients_config.get('cc', [])
-                break
-
-        return cc_list
+        return list(self.domains.resolve(vessel_email).cc)
 
 
     def _department_cc_filter(self, cc_list: List[str], department_names: List[str]) -> List[str]:
@@ -210,6 +192,9 @@ class VesselDocumentsAlert(BaseAlert):
         Filter CC list to only include emails for responsible departments.
         Always includes internal recipients.
 
+        Matching rules (DEPARTMENT_CC_PREFIX_LENGTH, DEPARTMENT_CC_ALIASES) are
+        applied once per company by the routing matrix; this is a lookup.
+
         Args:
             cc_list: Full company CC list from .env
             department_names: List of responsible department names for this vessel's documents
@@ -217,47 +202,18 @@ class VesselDocumentsAlert(BaseAlert):
         Returns:
             List of CC email addresses matching responsible departments + internal recipients
         """
-        if not self.department_specific_cc_recipients_filter:
-            # Filter is OFF: return full company CC list + internal recipients
-            all_recipients = list(set(cc_list + self.config.internal_recipients))
+        all_recipients = self.cc_matrix.resolve(cc_list, department_names)
+
+        if self.department_specific_cc_recipients_filter:
+            self.logger.debug(
+                f"Department filtering ON - {', '.join(department_names)}: "
+                f"{len(all_recipients)} CC recipient(s) including {len(self.config.internal_recipients)} internal"
+            )
+        else:
             self.logger.debug(
                 f"Department filtering OFF - including all {len(cc_list)} company CC recipients + "
                 f"{len(self.config.internal_recipients)} internal recipients"
             )
-            return all_recipients
-
-        # Filter is ON: only include emails matching responsible departments
-        self.logger.info(
-            f"Department filtering ON - filtering CC list for departments: {', '.join(department_names)}"
-        )
-
-        filtered_cc_list = []
-
-        for email in cc_list:
-            email_username = email.strip().split('@')[0].lower()
-
-            # Check if email matches any of the responsible departments
-            for dept_name in department_names:
-                dept_prefix = dept_name.lower()[:2]  # First 2 chars: "te", "op", "hs", "ma"
-
-                # Match by prefix OR special case for safety/HSSQE
-                if (email_username[:2] == dept_prefix or
-                    (email_username == 'safety' and dept_name.upper() == 'HSSQE')):
-                    filtered_cc_list.append(email)
-                    self.logger.debug(f"  ✓ Matched {email} to department '{dept_name}'")
-                    break  # Don't add same email twice
-            else:
-                # Email didn't match any department
-                self.logger.debug(f"  ✗ Excluded {email} (no matching department)")
-
-        # Always add internal recipients
-        all_recipients = list(set(filtered_cc_list + self.config.internal_recipients))
-
-        self.logger.info(
-            f"Department filtering result: {len(filtered_cc_list)} department-specific + "
-            f"{len(self.config.internal_recipients)} internal = {len(all_recipients)} total CC recipients"
-        )
-
         return all_recipients
 
 
@@ -269,37 +225,9 @@ class VesselDocumentsAlert(BaseAlert):
             vessel_email: Vessel's email address
             
         Returns:
-            Company name string
+            Company name string (DEFAULT_COMPANY_NAME outside the configured domains)
         """
-        vessel_email_lower = vessel_email.lower()
-        
-        if 'prominence' in vessel_email_lower:
-            return 'Prominence Maritime S.A.'
-        elif 'seatraders' in vessel_email_lower:
-            return 'Sea Traders S.A.'
-        else:
-            return 'Prominence Maritime S.A.'   # Default company name
-
-
-    def get_tracking_key(self, row: pd.Series) -> str:
-        """
-        Generate tracking key from vessel ID and document ID.
-
-        Args:
-            row: DataFrame row
-
-        Returns:
-            Tracking key string in format "vessel_{vessel_id}_doc_{document_id}"
-        """
-        try:
-            vessel_id = row['vessel_id']
-            document_id = row['document_id']
-
-            return f"vessel_{vessel_id}_doc_{document_id}"
-        except KeyError as e:
-            self.logger.error(f"Missing column in row for tracking key: {e}")
-            self.logger.error(f"Available columns: {list(row.index)}")
-            raise
+        return self.domains.resolve(vessel_email).company_name
 
 
     def get_subject_line(self, data: pd.DataFrame, metadata: Dict) -> str:
@@ -319,6 +247,22 @@ class VesselDocumentsAlert(BaseAlert):
         return f"AlertDev | {vessel_name.upper()} | Vessel Document Updates"
 
 
+    def get_digest_subject_line(self, data: pd.DataFrame, metadata: Dict) -> str:
+        """
+        Generate subject line for a multi-vessel CC digest.
+
+        Args:
+            data: Combined DataFrame for every vessel in the digest
+            metadata: Digest metadata including vessels
+
+        Returns:
+            Email subject string
+        """
+        vessel_count = len(metadata.get('vessels', []))
+
+        return f"AlertDev | {vessel_count} VESSELS | Vessel Document Updates Digest"
+
+
     def get_required_columns(self) -> List[str]:
         """
         Return required columns for this alert.
@@ -339,3 +283,4 @@ class VesselDocumentsAlert(BaseAlert):
             'expiration_date',
             'comments'
         ]
+
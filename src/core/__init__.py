@@ -1,8 +1,13 @@
-#src/core/__init__.py
 """Core alert system components."""
-from .base_alert import BaseAlert
-from .config import AlertConfig
-from .tracking import EventTracker
-from .scheduler import AlertScheduler
+from src.utils.lazy import lazy_exports
 
-__all__ = ['BaseAlert', 'AlertConfig', 'EventTracker', 'AlertScheduler']
+__all__ = ['BaseAlert', 'SpecAlert', 'AlertConfig', 'EventTracker', 'AlertScheduler']
+
+# Imported on first use (see src.utils.lazy)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BaseAlert': '.base_alert',
+    'SpecAlert': '.base_alert',
+    'AlertConfig': '.config',
+    'EventTracker': '.tracking',
+    'AlertScheduler': '.scheduler',
+})
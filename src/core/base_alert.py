@@ -3,18 +3,37 @@
 Abstract base class for all alert types.
 
 All alert implementations must inherit from BaseAlert and implement
-the abstract methods for data fetching, filtering, and routing.
+the abstract methods for data fetching, filtering, and routing. Alerts
+that describe those stages once with a StageSpec also inherit SpecAlert,
+which implements them (see src.core.engines).
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple
+from functools import partial
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Tuple
 import pandas as pd
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from datetime import datetime, timedelta
 from pathlib import Path
+import os
+import tempfile
 import logging
 
+from src.core import engines
+from src.core.consolidation import consolidate_jobs
+from src.core.fetch_cache import FetchCache, current_cache
+from src.core.engines import Group, StageSpec
+from src.core.jobs import NotificationJob
+from src.core.outbox import DigestOutbox
+from src.core.records import RecordSet
+from src.core.routing import DomainResolver
+from src.core.rendering import RenderContext, RenderTask, render_within_budget, stream_task
+from src.formatters.overflow import MessageBudget, csv_attachment
+from src.utils.datetimes import format_datetimes, get_zone
+
 logger = logging.getLogger(__name__)
 
+# One health file per alert type, all checked by scripts/healthcheck.py
+HEALTH_DIR = Path("/app/logs/health")
+
 
 class BaseAlert(ABC):
     """
@@ -24,6 +43,12 @@ class BaseAlert(ABC):
     from this class and implement the required abstract methods.
     """
 
+    # Column that labels each job's rows in consolidated CC digests (e.g. 'vessel')
+    digest_label_column: Optional[str] = None
+
+    # Registered email template (src.formatters.templates) used unless a job sets metadata['template']
+    template_name: Optional[str] = None
+
     def __init__(self, config: 'AlertConfig'):
         """
         Initialise alert with configuration.
@@ -33,6 +58,12 @@ class BaseAlert(ABC):
         """
         self.config = config
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        # Vessel email -> company (name, CC list), cached per email
+        self.domains = DomainResolver.from_config(config)
+        # Per-run counters (e.g. render cache hits), reported in the health status
+        self.run_metrics: Dict[str, float] = {}
+        # Per-run failure summary (one bounded line per channel) when other channels delivered
+        self.delivery_errors: List[str] = []
 
     @abstractmethod
     def fetch_data(self) -> pd.DataFrame:
@@ -44,6 +75,18 @@ class BaseAlert(ABC):
         """
         pass
 
+    def stage_spec(self) -> Optional[StageSpec]:
+        """
+        Declarative description of the alert's data stages.
+
+        Implemented by SpecAlert alerts; the base workflow uses it to
+        format datetimes per job and to run the Polars engine.
+
+        Returns:
+            StageSpec, or None for alerts implementing the stages themselves
+        """
+        return None
+
     @abstractmethod
     def filter_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -58,33 +101,34 @@ class BaseAlert(ABC):
         pass
 
     @abstractmethod
-    def route_notifications(self, df: pd.DataFrame) -> List[Dict]:
+    def route_notifications(self, df: pd.DataFrame) -> List[Mapping]:
         """
         Route data to appropriate recipients.
 
-        Returns list of notification jobs, where each job is a dict with:
+        Returns list of notification jobs, each a NotificationJob (or a dict
+        with the same keys, converted with NotificationJob.coerce()):
         - 'recipients': List[str] - primary email addresses
         - 'cc_recipients': List[str] - CC email addresses
         - 'data': pd.DataFrame - data for this specific notification
-        - 'metadata': Dict - any additional info (vessel name, etc.)
+        - 'metadata': JobMetadata/Dict - any additional info (vessel name, etc.)
 
         Args:
             df: Filtered DataFrame
 
         Returns:
-            List of notification job dictionaries
+            List of notification jobs
         """
         pass
 
     @abstractmethod
-    def get_tracking_key(self, row: pd.Series) -> str:
+    def get_tracking_key(self, row: Mapping) -> str:
         """
         Generate unique tracking key for a data row.
 
         This key is used to prevent duplicate notifications.
 
         Args:
-            row: Single row from DataFrame
+            row: Single row from DataFrame (or a row mapping)
 
         Returns:
             Unique string key (e.g., "vessel_123_doc_456")
@@ -105,6 +149,22 @@ class BaseAlert(ABC):
         """
         pass
 
+    def get_digest_subject_line(self, data: pd.DataFrame, metadata: Dict) -> str:
+        """
+        Generate subject line for a consolidated CC digest.
+
+        Default implementation - can be overridden by subclasses.
+
+        Args:
+            data: Combined DataFrame of every job in the digest
+            metadata: Digest metadata (alert_title, vessels, ...)
+
+        Returns:
+            Email subject string
+        """
+        count = len(metadata.get('vessels', []))
+        return f"{metadata.get('alert_title', 'Alert Digest')} | {count} item{'' if count == 1 else 's'}"
+
     def validate_required_columns(self, df: pd.DataFrame) -> None:
         """
         Validate that DataFrame has all required columns.
@@ -112,7 +172,7 @@ class BaseAlert(ABC):
         Default implementation - can be overridden by subclasses.
 
         Args:
-            df: DataFrame to validate
+            df: DataFrame (or RecordSet) to validate
 
         Raises:
             ValueError: If required columns are missing
@@ -139,6 +199,93 @@ class BaseAlert(ABC):
         """
         pass
 
+    def fetch_records(self) -> Optional[RecordSet]:
+        """
+        Fetch the alert's rows without building a DataFrame (small-run path).
+
+        Optional: alerts that implement it, together with filter_records(),
+        handle runs of up to SMALL_RUN_MAX_ROWS rows without DataFrames until
+        rendering. Larger results continue on the DataFrame path via
+        RecordSet.to_frame(), so the query runs once either way.
+
+        Returns:
+            RecordSet, or None if the alert only supports fetch_data()
+        """
+        return None
+
+    def filter_records(self, records: RecordSet) -> RecordSet:
+        """
+        Row-based filter_data() for small runs; must match its result.
+
+        Args:
+            records: Rows from fetch_records()
+
+        Returns:
+            Filtered rows, formatted as filter_data() formats them
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} implements fetch_records() but not filter_records()")
+
+    def route_records(self, records: RecordSet) -> List[Mapping]:
+        """
+        Row-based route_notifications() for small runs.
+
+        Default implementation routes records.to_frame() with
+        route_notifications(); override to avoid DataFrame grouping.
+
+        Args:
+            records: Filtered, unsent rows
+
+        Returns:
+            List of notification jobs
+        """
+        return self.route_notifications(records.to_frame())
+
+    def cached_frame(self, query_name: str, load: Callable[[], pd.DataFrame], **params: Hashable) -> pd.DataFrame:
+        """
+        Query result as a DataFrame, shared with other alerts in the same
+        scheduler cycle (see src.core.fetch_cache).
+
+        Args:
+            query_name: Query identifier (e.g. its SQL file name)
+            load: Runs the query; called only if no alert fetched it this cycle
+            **params: Bound query parameters (part of the cache key)
+
+        Returns:
+            DataFrame (read-only values when shared)
+        """
+        cache = current_cache()
+        if cache is None:
+            return load()
+        df, cached = cache.frame(FetchCache.key(query_name, params), load)
+        if cached:
+            self._log_cache_hit(query_name, len(df))
+        return df
+
+    def cached_records(self, query_name: str, load: Callable[[], RecordSet], **params: Hashable) -> RecordSet:
+        """
+        Query result as a RecordSet, shared like cached_frame().
+
+        Args:
+            query_name: Query identifier (e.g. its SQL file name)
+            load: Runs the query; called only if no alert fetched it this cycle
+            **params: Bound query parameters (part of the cache key)
+
+        Returns:
+            RecordSet
+        """
+        cache = current_cache()
+        if cache is None:
+            return load()
+        records, cached = cache.records(FetchCache.key(query_name, params), load)
+        if cached:
+            self._log_cache_hit(query_name, len(records))
+        return records
+
+    def _log_cache_hit(self, query_name: str, rows: int) -> None:
+        """Log and count a result reused from the cycle's fetch cache."""
+        self.run_metrics['fetch_cache_hits'] = self.run_metrics.get('fetch_cache_hits', 0) + 1
+        self.logger.info(f"[OK] Reused {rows} record{'' if rows == 1 else 's'} of {query_name} fetched earlier this cycle")
+
     def run(self) -> bool:
         """
         Execute the complete alert workflow.
@@ -146,15 +293,27 @@ class BaseAlert(ABC):
         Returns:
             True if notifications were sent successfully, False otherwise
         """
-        run_time = datetime.now(tz=ZoneInfo(self.config.timezone))
+        run_time = datetime.now(tz=get_zone(self.config.timezone))
+        self.run_metrics = {}
+        self.delivery_errors = []
         self.logger.info("=" * 60)
         self.logger.info(f"▶ {self.__class__.__name__} RUN STARTED")
         self.logger.info(f"Current time ({self.config.timezone}): {run_time.isoformat()}")
 
         try:
-            # Step 1: Fetch data
-            self.logger.info("--> Fetching data from database: df = self.fetch_data()")
-            df = self.fetch_data()
+            # Step 1: Fetch data (as plain rows first when small runs or Polars are enabled)
+            use_polars = self.config.data_engine == 'polars' and isinstance(self, SpecAlert)
+            records = self.fetch_records() if self.config.small_run_max_rows > 0 or use_polars else None
+            if records is not None and len(records) <= self.config.small_run_max_rows:
+                return self._run_small(records, run_time)
+            if use_polars:
+                return self._run_polars(records, run_time)
+
+            if records is not None:
+                df = records.to_frame()
+            else:
+                self.logger.info("--> Fetching data from database: df = self.fetch_data()")
+                df = self.fetch_data()
             self.logger.info(f"[OK] Fetched len(df)={len(df)} record{'' if len(df)==1 else 's'}")
 
             if df.empty:
@@ -179,7 +338,8 @@ class BaseAlert(ABC):
             self.logger.info("--> Checking for previously sent notifications...")
             df_unsent = self.config.tracker.filter_unsent_events(
                 df_filtered,
-                key_func=self.get_tracking_key
+                key_func=self.get_tracking_key,
+                namespaces=self._get_channel_registry().tracking_namespaces
             )
 
             if df_unsent.empty:
@@ -191,16 +351,10 @@ class BaseAlert(ABC):
 
             # Step 5: Route to recipients
             self.logger.info("--> Routing notifications to recipients...")
-            notification_jobs = self.route_notifications(df_unsent)
+            notification_jobs = [self._prepare_job(job) for job in self.route_notifications(df_unsent)]
             self.logger.info(f"[OK] Created len(notification_jobs)={len(notification_jobs)} notification job{'' if len(notification_jobs)==1 else 's'}")
 
-            # Step 6: Send notifications
-            success = self._send_notifications(notification_jobs, run_time)
-
-            # Step 7: Write health status
-            self._write_health_status("OK", run_time)
-
-            return success
+            return self._deliver(notification_jobs, run_time)
 
         except Exception as e:
             self.logger.exception(f"Error in {self.__class__.__name__}.run(): {e}")
@@ -211,9 +365,111 @@ class BaseAlert(ABC):
             self.logger.info("=" * 60)
 
 
-    def _send_notifications(self, jobs: List[Dict], run_time: datetime) -> bool:
+    def _run_small(self, records: RecordSet, run_time: datetime) -> bool:
         """
-        Send all notification jobs and track sent events.
+        Steps 2-7 of run() on plain rows (at most SMALL_RUN_MAX_ROWS of them).
+
+        Args:
+            records: Rows from fetch_records()
+            run_time: Run timestamp
+
+        Returns:
+            True if notifications were sent successfully, False otherwise
+        """
+        self.logger.info(
+            f"[OK] Fetched {len(records)} record{'' if len(records)==1 else 's'} "
+            f"(<= SMALL_RUN_MAX_ROWS={self.config.small_run_max_rows}: row-based run)"
+        )
+        self.run_metrics['small_run'] = 1
+
+        if records.empty:
+            self.logger.info("No records found matching query criteria")
+            self._write_health_status("OK", run_time)
+            return False
+
+        self.validate_required_columns(records)
+
+        filtered = self.filter_records(records)
+        self.logger.info(f"[OK] {len(filtered)} record{'' if len(filtered)==1 else 's'} after filtering")
+        if filtered.empty:
+            self.logger.info("No records after filtering")
+            self._write_health_status("OK", run_time)
+            return False
+
+        unsent = self.config.tracker.filter_unsent_records(
+            filtered,
+            key_func=self.get_tracking_key,
+            namespaces=self._get_channel_registry().tracking_namespaces
+        )
+        if unsent.empty:
+            self.logger.info("All records have been sent previously. No new notifications.")
+            self._write_health_status("OK", run_time)
+            return False
+
+        notification_jobs = [self._prepare_job(job) for job in self.route_records(unsent)]
+        self.logger.info(f"[OK] Created {len(notification_jobs)} notification job{'' if len(notification_jobs)==1 else 's'}")
+
+        return self._deliver(notification_jobs, run_time)
+
+    def _deliver(self, notification_jobs: List[NotificationJob], run_time: datetime) -> bool:
+        """
+        Steps 5b-7 of run(): digest/consolidation, sending, health status.
+
+        Args:
+            notification_jobs: Prepared jobs from routing
+            run_time: Run timestamp
+
+        Returns:
+            True if notifications were sent successfully, False otherwise
+        """
+        # Step 5b: Hold CC recipients for the scheduled digest, or merge shared
+        # CC lists into one digest per CC group now (both optional)
+        if self.config.digest_mode and self.config.outbox is not None:
+            notification_jobs = self._queue_digest_items(notification_jobs)
+        elif self.config.consolidate_cc_recipients:
+            notification_jobs = consolidate_jobs(notification_jobs, label_column=self.digest_label_column)
+
+        # Step 6: Send notifications
+        success = self._send_notifications(notification_jobs, run_time)
+
+        # Step 7: Write health status (WARN if some channel failed to deliver)
+        if self.delivery_errors:
+            self._write_health_status("WARN", run_time, '; '.join(self.delivery_errors))
+        else:
+            self._write_health_status("OK", run_time)
+
+        return success
+
+    def _prepare_job(self, job: Dict, track: bool = True) -> NotificationJob:
+        """
+        Convert a routed job into a NotificationJob with the alert's template,
+        display-formatted datetimes and (once) its tracking keys.
+
+        Args:
+            job: NotificationJob or job dictionary from route_notifications()
+            track: Compute tracking keys for the job's rows
+
+        Returns:
+            NotificationJob ready for consolidation, digests and rendering
+        """
+        job = NotificationJob.coerce(job)
+        spec = self.stage_spec()
+        if spec is not None:
+            # filter_data() keeps datetimes; only the rows being sent are formatted
+            data = format_datetimes(job.data, spec.display_formats)
+            if data is not job.data:
+                job = job.with_data(data)
+        if self.template_name and 'template' not in job.metadata:
+            job = job.with_metadata(template=self.template_name)
+        if track and job.tracking_keys is None:
+            job.tracking_keys = [self.get_tracking_key(row) for _, row in job.data.iterrows()]
+        return job
+
+
+    def _send_notifications(self, jobs: List[Mapping], run_time: datetime) -> bool:
+        """
+        Render all notification jobs, fan them out to every enabled channel
+        and track sent events per channel.
         
         Args:
             jobs: List of notification job dictionaries 
@@ -221,107 +477,541 @@ class BaseAlert(ABC):
             run_time: Timestamp of this run
             
         Returns:
-            True if any notifications sent successfully
+            True if any notifications sent successfully; failures on some
+            channels are recorded in self.delivery_errors
+
+        Raises:
+            RuntimeError: If every channel failed to deliver anything
         """
-        sent_keys = set()
+        notifications = self._render_notifications(jobs, run_time)
+
+        if not self.config.enable_email_alerts:
+            for idx, notification in enumerate(notifications, 1):
+                self.logger.info(f"[DRY-RUN] Notification {idx} prepared but NOT sent (emails disabled)")
+                self.logger.info(f"[DRY-RUN] Would send to: {', '.join(notification.recipients)}")
+                if notification.cc_recipients:
+                    self.logger.info(f"[DRY-RUN] Would CC: {', '.join(notification.cc_recipients)}")
+                self.logger.info(f"[DRY-RUN] Subject: {notification.subject}")
+                self.logger.info(f"[DRY-RUN] Records: {len(notification.data)}")
+
+        registry = self._get_channel_registry()
+        if len(registry) == 0:
+            all_keys = {k for n in notifications for k in n.tracking_keys}
+            if all_keys:
+                self.logger.info(f"[DRY-RUN] Would mark {len(all_keys)} event(s) as sent (tracking disabled in dry-run)")
+            return bool(notifications)
+
+        # Fan out: every channel runs concurrently with its own limits
+        results = registry.dispatch(notifications, is_sent=self.config.tracker.is_sent)
+
         any_sent = False
+        total_failed = 0
+        for result in results:
+            channel = registry.get(result.channel)
+            total_failed += result.failed
+            any_sent = any_sent or result.delivered > 0
+            if result.sent_keys:
+                self.config.tracker.mark_as_sent({channel.tracking_key(k) for k in result.sent_keys}, run_time)
+                self.logger.info(f"[OK] [{result.channel}] Marked {len(result.sent_keys)} event(s) as sent")
+
+        # One bounded summary per failing channel, not one line per notification
+        failures = [r.summary() for r in results if r.failed or r.errors]
+        if total_failed and not any_sent:
+            raise RuntimeError(f"All notification channels failed: {'; '.join(failures)}")
+
+        if total_failed:
+            self.run_metrics['failed_notifications'] = total_failed
+            self.delivery_errors = failures
+            self.logger.warning(f"{total_failed} notification(s) failed on some channels; see errors above")
         
-        for idx, job in enumerate(jobs, 1):
-            self.logger.info(f"--> Sending notification {idx}/{len(jobs)}...")
-            
-            try:
-                # Get notification components (args for format() method)
-                original_recipients = job['recipients']
-                original_cc_recipients = job.get('cc_recipients', [])
-                data = job['data']
-                self.logger.info(f"Trying to extract metadata")
-                metadata = job.get('metadata', {})
-                
-                # GENERATE FORMATTED EMAIL CONTENT
-                base_subject = self.get_subject_line(data, metadata)
-                plain_text = self.config.text_formatter.format(data, run_time, self.config, metadata)
-                html_content = self.config.html_formatter.format(data, run_time, self.config, metadata)
-                
-                # Handle dry-run email redirection
-                if self.config.dry_run and self.config.dry_run_email:
-                    # Redirect to dry-run email address
-                    recipients = [self.config.dry_run_email]
-                    cc_recipients = []
-                    
-                    # Modify subject to show original recipients
-                    subject = f"[DRY-RUN] {base_subject} (Original: {', '.join(original_recipients)})"
-                    
-                    self.logger.info(f"[DRY-RUN-EMAIL] Redirecting to: {self.config.dry_run_email}")
-                    self.logger.info(f"[DRY-RUN-EMAIL] Original recipients: {', '.join(original_recipients)}")
-                    if original_cc_recipients:
-                        self.logger.info(f"[DRY-RUN-EMAIL] Original CC: {', '.join(original_cc_recipients)}")
-                else:
-                    # Normal mode: use actual recipients
-                    recipients = original_recipients
-                    cc_recipients = original_cc_recipients
-                    subject = base_subject
-                
-                # Check if email alerts are enabled
-                if self.config.enable_email_alerts:
-                    # Send email
-                    self.config.email_sender.send(
-                        subject=subject,
-                        plain_text=plain_text,
-                        html_content=html_content,
-                        recipients=recipients,
-                        cc_recipients=cc_recipients
-                    )
-                    self.logger.info(f"[OK] Notification {idx} sent successfully")
-                else:
-                    self.logger.info(f"[DRY-RUN] Notification {idx} prepared but NOT sent (emails disabled)")
-                    self.logger.info(f"[DRY-RUN] Would send to: {', '.join(recipients)}")
-                    if cc_recipients:
-                        self.logger.info(f"[DRY-RUN] Would CC: {', '.join(cc_recipients)}")
-                    self.logger.info(f"[DRY-RUN] Subject: {subject}")
-                    self.logger.info(f"[DRY-RUN] Records: {len(data)}")
-                
-                # Track sent events (even in dry-run for testing tracking logic)
-                for _, row in data.iterrows():
-                    tracking_key = self.get_tracking_key(row)
-                    sent_keys.add(tracking_key)
-                
-                any_sent = True
-                
-            except Exception as e:
-                self.logger.error(f"Failed to send notification {idx}: {e}")
-                raise
-        
-        # Save tracking data (in dry-run mode, still track to test the logic)
-        if sent_keys:
-            if self.config.enable_email_alerts:
-                self.config.tracker.mark_as_sent(sent_keys, run_time)
-                self.logger.info(f"[OK] Marked {len(sent_keys)} event(s) as sent")
+        return any_sent
+
+
+    def _render_notifications(self, jobs: List[Mapping], run_time: datetime, track: bool = True) -> List['RenderedNotification']:
+        """
+        Render notification jobs (subject, text and HTML bodies), in order.
+
+        Subjects and tracking keys are computed here; the bodies go through
+        the render stage, which uses a process pool for large batches when
+        RENDER_WORKERS > 1. Jobs over MAX_ROWS_PER_MESSAGE / MAX_BODY_BYTES
+        show their first rows and get the full list as a gzipped CSV. Jobs
+        with at least STREAM_MIN_ROWS rows are streamed in full at send time
+        instead, without truncation or attachment.
+
+        Args:
+            jobs: Notification job dictionaries
+            run_time: Timestamp of this run
+            track: Compute tracking keys for the jobs' rows (False for digests,
+                whose delivery is recorded by the outbox instead)
+
+        Returns:
+            RenderedNotification per job, ready for channel dispatch
+        """
+        from src.notifications.channels import RenderedNotification
+
+        cache = self.config.render_cache
+
+        # Track every row of the job (even in dry-run for testing tracking logic)
+        jobs = [self._prepare_job(job, track) for job in jobs]
+        all_tracking_keys = [(job.tracking_keys or []) if track else [] for job in jobs]
+
+        tasks = []
+        for job in jobs:
+            data, metadata = job.data, job.metadata
+            if metadata.get('digest'):
+                subject = self.get_digest_subject_line(data, metadata)
             else:
-                self.logger.info(f"[DRY-RUN] Would mark {len(sent_keys)} event(s) as sent (tracking disabled in dry-run)")
-        
+                subject = self.get_subject_line(data, metadata)
+
+            tasks.append(RenderTask(
+                subject=subject,
+                data=data,
+                metadata=metadata,
+                content_hash=job.content_hash if cache is not None else ''
+            ))
+
+        context = RenderContext.from_config(self.config)
+        bodies, rendered_tasks, lookups = render_within_budget(
+            tasks,
+            run_time,
+            context,
+            MessageBudget(self.config.max_rows_per_message, self.config.max_body_bytes),
+            workers=self.config.render_workers,
+            min_batch=self.config.render_min_batch,
+            cache=cache,
+            stream_min_rows=self.config.stream_min_rows
+        )
+
+        if cache is not None:
+            # Counted per call: the cache is shared with alerts running concurrently
+            self._record_render_cache_metrics(lookups.hits, lookups.misses)
+
+        notifications = []
+        for job, task, rendered, tracking_keys, body in zip(jobs, tasks, rendered_tasks, all_tracking_keys, bodies):
+            # Rows cut from the body travel as a compressed CSV of the full list
+            attachments = []
+            if rendered is not task:
+                attachments.append(csv_attachment(task.data, task.metadata, rendered.metadata['attachment_name']))
+
+            # Large jobs are not rendered up front; channels stream their bodies
+            if body is None:
+                plain_text = html_content = ''
+                stream = partial(stream_task, rendered, run_time, context)
+            else:
+                _, plain_text, html_content = body
+                stream = None
+
+            notifications.append(RenderedNotification(
+                subject=task.subject,
+                plain_text=plain_text,
+                html_content=html_content,
+                recipients=job.recipients,
+                cc_recipients=job.cc_recipients,
+                data=task.data,
+                metadata=rendered.metadata,
+                tracking_keys=tracking_keys,
+                attachments=attachments,
+                stream=stream
+            ))
+        return notifications
+
+
+    def _record_render_cache_metrics(self, hits: int, misses: int) -> None:
+        """
+        Add render cache lookups to this run's metrics and log the hit rate.
+
+        Args:
+            hits: Lookups served from the cache
+            misses: Lookups that had to be rendered
+        """
+        hits += int(self.run_metrics.get('render_cache_hits', 0))
+        misses += int(self.run_metrics.get('render_cache_misses', 0))
+        hit_rate = hits / (hits + misses) if hits + misses else 0.0
+
+        self.run_metrics.update(
+            render_cache_hits=hits,
+            render_cache_misses=misses,
+            render_cache_hit_rate=round(hit_rate, 3)
+        )
+        self.logger.info(f"[OK] Render cache: {hits} hit(s), {misses} miss(es) ({hit_rate:.0%} hit rate)")
+
+
+    def _render_notification(self, job: Dict, run_time: datetime, track: bool = True) -> 'RenderedNotification':
+        """
+        Render a single notification job (see _render_notifications).
+
+        Args:
+            job: Notification job dictionary
+            run_time: Timestamp of this run
+            track: Compute tracking keys for the job's rows
+
+        Returns:
+            RenderedNotification ready for channel dispatch
+        """
+        return self._render_notifications([job], run_time, track)[0]
+
+
+    def _queue_digest_items(self, jobs: List[Mapping]) -> List[NotificationJob]:
+        """
+        Move each job's CC recipients into the digest outbox.
+
+        The rows are queued once per CC set and the job is returned with
+        its CC list removed, so the primary recipient is still notified now.
+        Rows an earlier digest already delivered are not queued again.
+
+        Args:
+            jobs: Notification jobs from route_notifications()
+
+        Returns:
+            Jobs with cc_recipients emptied
+        """
+        outbox = self.config.outbox
+        is_sent = self.config.tracker.is_sent
+        alert_name = self.__class__.__name__
+        queued = 0
+        remaining = []
+
+        for job in map(self._prepare_job, jobs):
+            if job.cc_recipients:
+                display = job.data[job.display_columns]
+                rows = display.astype(object).where(display.notna(), None).to_dict('records')
+                pending = [
+                    (row, key) for row, key in zip(rows, job.tracking_keys)
+                    if not is_sent(DigestOutbox.tracking_key(key))
+                ]
+
+                if pending:
+                    queued += outbox.add(
+                        alert_name,
+                        job.cc_recipients,
+                        [row for row, _ in pending],
+                        [key for _, key in pending],
+                        job.metadata
+                    )
+                job = job.with_cc([])
+
+            remaining.append(job)
+
+        self.logger.info(f"[OK] Queued {queued} row(s) for the next digest ({len(outbox)} item(s) in outbox)")
+        return remaining
+
+
+    def send_digest(self, run_time: Optional[datetime] = None) -> bool:
+        """
+        Send one summary per recipient set from everything queued in the outbox.
+
+        Rows are grouped by company, vessel and department. Items are removed
+        from the outbox only once every channel delivered their digest, and
+        their rows are then tracked as delivered (DigestOutbox.tracking_key()).
+
+        Args:
+            run_time: Timestamp of this digest run (default: now)
+
+        Returns:
+            True if any digest was sent
+        """
+        run_time = run_time or datetime.now(tz=get_zone(self.config.timezone))
+        alert_name = self.__class__.__name__
+        items = self.config.outbox.pending(alert_name) if self.config.outbox is not None else []
+
+        self.logger.info(f"▶ {alert_name} DIGEST: {len(items)} queued item(s)")
+        if not items:
+            return False
+
+        groups: Dict[tuple, List[Dict]] = {}
+        for item in items:
+            groups.setdefault(tuple(item['recipients']), []).append(item)
+
+        registry = self._get_channel_registry()
+        any_sent = False
+
+        for recipients, group in groups.items():
+            job = self._build_digest_job(list(recipients), group)
+            notification = self._render_notification(job, run_time, track=False)
+
+            if len(registry) == 0:
+                self.logger.info(f"[DRY-RUN] Digest prepared but NOT sent: {notification.subject} -> {', '.join(recipients)}")
+                continue
+
+            results = registry.dispatch([notification])
+            if any(r.failed for r in results):
+                self.logger.error(f"Digest to {', '.join(recipients)} failed; keeping {len(group)} item(s) queued")
+                continue
+
+            self.config.outbox.remove([item['id'] for item in group])
+            self.config.tracker.mark_as_sent(
+                {DigestOutbox.tracking_key(key) for item in group for key in item['tracking_keys']},
+                run_time
+            )
+            any_sent = True
+            self.logger.info(f"[OK] Digest sent to {len(recipients)} recipient(s) ({len(job['data'])} row(s))")
+
         return any_sent
 
 
+    def _build_digest_job(self, recipients: List[str], items: List[Dict]) -> NotificationJob:
+        """
+        Combine queued outbox items into one digest job.
+
+        Args:
+            recipients: Digest recipients
+            items: Outbox items queued for these recipients
+
+        Returns:
+            NotificationJob with digest metadata
+        """
+        records = [
+            {'company_name': item['company_name'], 'vessel_name': item['vessel_name'], **row}
+            for item in items
+            for row in item['rows']
+        ]
+        data = pd.DataFrame.from_records(records)
+
+        display_columns = ['company_name', 'vessel_name']
+        for item in items:
+            display_columns += [c for c in item['display_columns'] if c not in display_columns]
+
+        sort_columns = [c for c in ('company_name', 'vessel_name', 'department_name') if c in data.columns]
+        data = data.sort_values(sort_columns, kind='stable').reset_index(drop=True)
+
+        companies = {item['company_name'] for item in items}
+        metadata = {
+            'alert_title': f"{items[0]['alert_title']} Digest",
+            'vessel_name': '',
+            'display_columns': display_columns,
+            'digest': True,
+            'vessels': sorted({item['vessel_name'] for item in items}),
+        }
+        if len(companies) == 1:
+            metadata['company_name'] = companies.pop()
+
+        return NotificationJob(recipients=recipients, data=data, metadata=metadata)
+
+
+    def _get_channel_registry(self) -> 'ChannelRegistry':
+        """
+        Return the configured channel registry, building it from config once if absent.
+
+        Returns:
+            ChannelRegistry with every enabled channel
+        """
+        if self.config.channel_registry is None:
+            from src.notifications.channels import ChannelRegistry
+            self.config.channel_registry = ChannelRegistry.from_config(self.config)
+        return self.config.channel_registry
+
+
     def _write_health_status(self, status: str, run_time: datetime, error_msg: str = "") -> None:
         """
-        Write health status to file for healthcheck monitoring.
+        Write this alert's health status file for healthcheck monitoring.
+
+        Each alert type has its own file in HEALTH_DIR, so alerts running
+        concurrently (ALERT_CONCURRENCY) never overwrite each other's status.
 
         Args:
-            status: "OK" or "ERROR"
+            status: "OK", "WARN" (some channels failed) or "ERROR"
             run_time: Timestamp of this run
-            error_msg: Error message if status is ERROR
+            error_msg: Error message if status is WARN or ERROR
         """
         try:
-            health_file = Path("/app/logs/health_status.txt")
+            health_file = HEALTH_DIR / f"{self.__class__.__name__}.txt"
             health_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(health_file, 'w') as f:
-                f.write(f"{status} {run_time.isoformat()}\n")
-                f.write(f"ALERT_TYPE: {self.__class__.__name__}\n")
-                f.write(f"TIMEZONE: {self.config.timezone}\n")
-                if error_msg:
-                    f.write(f"ERROR_MSG: {error_msg}\n")
+            lines = [
+                f"{status} {run_time.isoformat()}",
+                f"ALERT_TYPE: {self.__class__.__name__}",
+                f"TIMEZONE: {self.config.timezone}",
+                *(f"{name.upper()}: {value}" for name, value in self.run_metrics.items()),
+            ]
+            if error_msg:
+                lines.append(f"ERROR_MSG: {error_msg}")
+
+            # Write a temp file and swap it in, so the healthcheck never reads a partial file
+            temp_fd, temp_path = tempfile.mkstemp(dir=health_file.parent, prefix='.health_', suffix='.tmp', text=True)
+            try:
+                with os.fdopen(temp_fd, 'w') as f:
+                    f.write('\n'.join(lines) + '\n')
+                os.replace(temp_path, health_file)
+            except Exception:
+                Path(temp_path).unlink(missing_ok=True)
+                raise
 
             self.logger.debug(f"Health status written: {status}")
         except Exception as e:
             self.logger.error(f"Failed to write health status: {e}")
+
+
+class SpecAlert(ABC):
+    """
+    Mixin for alerts that describe their data stages with a StageSpec.
+
+    Implements filter_data(), route_notifications(), get_tracking_key()
+    and their row-based counterparts from stage_spec(), and runs the
+    Polars engine (DATA_ENGINE=polars); each group of rows becomes a job
+    through build_group_job(). List it before BaseAlert:
+
+        class VesselDocumentsAlert(SpecAlert, BaseAlert): ...
+    """
+
+    @abstractmethod
+    def stage_spec(self) -> StageSpec:
+        """
+        Describe the alert's filter, tracking key and grouping once.
+
+        Returns:
+            StageSpec shared by every data engine
+        """
+        pass
+
+    @abstractmethod
+    def build_group_job(self, group: Group) -> Mapping:
+        """
+        Build the notification job for one group of rows.
+
+        Args:
+            group: Group key, its rows (pd.DataFrame), collected values and
+                tracking keys (None = computed from the rows)
+
+        Returns:
+            NotificationJob (or job dictionary) for the group
+        """
+        pass
+
+    def filter_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep rows within the spec's lookback window (see engines.filter_frame()).
+
+        Args:
+            df: Raw DataFrame from database
+
+        Returns:
+            Filtered copy, timestamp and date columns as datetimes
+        """
+        spec = self.stage_spec()
+        df_filtered = engines.filter_frame(df, spec, self.config.timezone, self._cutoff(spec))
+        self._log_filtered(spec, len(df_filtered))
+        return df_filtered
+
+    def route_notifications(self, df: pd.DataFrame) -> List[Mapping]:
+        """
+        Build one job per group of the spec's group_by columns.
+
+        Args:
+            df: Filtered DataFrame
+
+        Returns:
+            List of notification jobs
+        """
+        return [self.build_group_job(group) for group in engines.frame_groups(df, self.stage_spec())]
+
+    def get_tracking_key(self, row: Mapping) -> str:
+        """
+        Fill in the spec's tracking key template for a row.
+
+        Args:
+            row: Single row from DataFrame (or a row mapping)
+
+        Returns:
+            Unique string key (e.g., "vessel_123_doc_456")
+        """
+        try:
+            return engines.tracking_key(self.stage_spec(), row)
+        except KeyError as e:
+            self.logger.error(f"Missing column in row for tracking key: {e}")
+            self.logger.error(f"Available columns: {list(row.keys())}")
+            raise
+
+    def filter_records(self, records: RecordSet) -> RecordSet:
+        """
+        Row-based filter_data() for small runs (see engines.filter_records()).
+
+        Args:
+            records: Rows from fetch_records()
+
+        Returns:
+            Filtered rows with dates formatted as strings
+        """
+        spec = self.stage_spec()
+        filtered = engines.filter_records(records, spec, self.config.timezone, self._cutoff(spec))
+        self._log_filtered(spec, len(filtered))
+        return filtered
+
+    def route_records(self, records: RecordSet) -> List[Mapping]:
+        """
+        Row-based route_notifications() for small runs, without DataFrame grouping.
+
+        Args:
+            records: Filtered, unsent rows
+
+        Returns:
+            List of notification jobs
+        """
+        groups = engines.record_groups(records, self.stage_spec(), self.get_tracking_key)
+        return [self.build_group_job(group) for group in groups]
+
+    def _run_polars(self, records: Optional[RecordSet], run_time: datetime) -> bool:
+        """
+        Steps 2-7 of run() with the Polars engine (DATA_ENGINE=polars).
+
+        Filtering, tracking keys, tracker membership and grouping run as
+        Polars queries over every row; pandas frames are only built per
+        notification, for the formatters.
+
+        Args:
+            records: Rows from fetch_records(), or None to convert fetch_data()
+            run_time: Run timestamp
+
+        Returns:
+            True if notifications were sent successfully, False otherwise
+        """
+        if records is None:
+            self.logger.info("--> Fetching data from database: df = self.fetch_data()")
+            records = RecordSet.from_frame(self.fetch_data())
+        self.logger.info(f"[OK] Fetched {len(records)} record{'' if len(records)==1 else 's'} (DATA_ENGINE=polars)")
+
+        if records.empty:
+            self.logger.info("No records found matching query criteria")
+            self._write_health_status("OK", run_time)
+            return False
+
+        self.validate_required_columns(records)
+
+        spec = self.stage_spec()
+        tracker = self.config.tracker
+        filtered_count, unsent_count, groups = engines.polars_groups(
+            records,
+            spec,
+            self.config.timezone,
+            self._cutoff(spec),
+            tracker.sent_keys(self._get_channel_registry().tracking_namespaces)
+        )
+        self._log_filtered(spec, filtered_count)
+        if filtered_count == 0:
+            self.logger.info("No records after filtering")
+            self._write_health_status("OK", run_time)
+            return False
+        if unsent_count < filtered_count:
+            self.logger.info(
+                f"Filtered out {filtered_count - unsent_count} previously sent event(s). "
+                f"{unsent_count} new event(s) remain."
+            )
+        if not groups:
+            self.logger.info("All records have been sent previously. No new notifications.")
+            self._write_health_status("OK", run_time)
+            return False
+
+        notification_jobs = [self._prepare_job(self.build_group_job(group)) for group in groups]
+        self.logger.info(f"[OK] Created {len(notification_jobs)} notification job{'' if len(notification_jobs)==1 else 's'}")
+
+        return self._deliver(notification_jobs, run_time)
+
+    def _cutoff(self, spec: StageSpec) -> datetime:
+        """Oldest timestamp within the spec's lookback window (timezone-aware)."""
+        return datetime.now(tz=get_zone(self.config.timezone)) - timedelta(days=spec.lookback_days)
+
+    def _log_filtered(self, spec: StageSpec, count: int) -> None:
+        """Log how many rows fell within the spec's lookback window."""
+        if spec.timestamp_column is not None:
+            self.logger.info(
+                f"Filtered to {count} record(s) with {spec.timestamp_column} in last {spec.lookback_days} day(s)"
+            )
@@ -10,6 +10,8 @@ from typing import List, Dict, Optional, Union
 from pathlib import Path
 from decouple import config
 from zoneinfo import ZoneInfo
+from datetime import datetime
+import importlib.util
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,9 +43,13 @@ class AlertConfig:
     smtp_pass: str
     
     # Company-specific email routing
-    email_routing: Dict[str, Dict[str, List[str]]]  # domain -> {to: [...], cc: [...]}
+    email_routing: Dict[str, Dict]  # domain suffix -> {company_name: str, cc: [...]}
     internal_recipients: List[str]
     department_specific_cc_recipients_filter: bool
+    department_cc_prefix_length: int  # username/department characters compared (see DepartmentCCMatrix)
+    department_cc_aliases: Dict[str, List[str]]  # department -> extra usernames, e.g. {'HSSQE': ['safety']}
+    default_company_name: str  # for vessel emails outside every email_routing domain
+    consolidate_cc_recipients: bool
     
     # Feature flags
     enable_email_alerts: bool
@@ -51,12 +57,45 @@ class AlertConfig:
     enable_special_teams_email: bool
     special_teams_email: str
 
+    # Microsoft Teams
+    teams_webhook_url: str
+    teams_max_payload_bytes: int
+    teams_max_retry_wait_seconds: float
+
+    # Notification channels
+    email_max_concurrency: int
+    enable_webhook_alerts: bool
+    webhook_url: str
+    webhook_max_concurrency: int
+    enable_file_sink: bool
+    file_sink_dir: Path
+
+    # Rendering (process pool for large batches; 1 = serial)
+    render_workers: int
+    render_min_batch: int
+    render_cache_size: int  # 0 = no render cache
+    render_cache_dir: Optional[Path]  # None = memory only
+    max_rows_per_message: int  # 0 = unlimited; extra rows go to a CSV attachment
+    max_body_bytes: int  # 0 = unlimited
+    text_layout: str  # 'records' or 'table' (see TextFormatter)
+    html_mode: str  # 'standard' or 'compact' (see HTMLFormatter)
+    stream_min_rows: int  # jobs this large are streamed into SMTP at send time (0 = never)
+    small_run_max_rows: int  # runs fetching at most this many rows skip DataFrames until rendering (0 = never)
+    data_engine: str  # 'pandas' or 'polars' (optional dependency; see src.core.engines)
+
     # Logos
     company_logos: Dict[str, Path]  # company_name -> logo_path
 
     # Scheduling
     schedule_frequency_hours: float
     timezone: str
+    alert_concurrency: int  # alerts run at the same time per cycle (1 = one after the other)
+    alert_timeout_seconds: float  # stop waiting for an alert after this long (0 = no timeout)
+
+    # Digest mode (CC recipients get scheduled summaries instead of per-vessel CC)
+    digest_mode: bool
+    digest_times: List[str]
+    digest_outbox_file: Path
 
     # Alert-specific configurations
     vessel_documents_lookback_days: int
@@ -76,11 +115,18 @@ class AlertConfig:
     # Runtime objects (injected after initialization)
     tracker: Optional['EventTracker'] = None
     email_sender: Optional['EmailSender'] = None
+    teams_sender: Optional['TeamsSender'] = None
+    channel_registry: Optional['ChannelRegistry'] = None
+    outbox: Optional['DigestOutbox'] = None
+    render_cache: Optional['RenderCache'] = None
     html_formatter: Optional['HTMLFormatter'] = None
     text_formatter: Optional['TextFormatter'] = None
     dry_run: bool = False
     dry_run_email: str = ''  # Redirect all emails here in dry-run mode
 
+    # Email transport (False only for local relays / SMTP sinks)
+    smtp_use_tls: bool = True
+
     @classmethod
     def from_env(cls, project_root: Optional[Path] = None) -> 'AlertConfig':
         """
@@ -128,6 +174,7 @@ class AlertConfig:
             smtp_port=int(config('SMTP_PORT', default=465)),
             smtp_user=config('SMTP_USER'),
             smtp_pass=config('SMTP_PASS'),
+            smtp_use_tls=config('SMTP_USE_TLS', default=True, cast=bool),
 
             email_routing=email_routing,
             internal_recipients=cls._parse_email_list('INTERNAL_RECIPIENTS'),
@@ -137,13 +184,46 @@ class AlertConfig:
             enable_teams_alerts=config('ENABLE_TEAMS_ALERTS', default=False, cast=bool),
             enable_special_teams_email=config('ENABLE_SPECIAL_TEAMS_EMAIL_ALERT', default=False, cast=bool),
             special_teams_email=config('SPECIAL_TEAMS_EMAIL', default='').strip(),
+            teams_webhook_url=config('TEAMS_WEBHOOK_URL', default='').strip(),
+            teams_max_payload_bytes=int(config('TEAMS_MAX_PAYLOAD_BYTES', default=25_000)),
+            teams_max_retry_wait_seconds=float(config('TEAMS_MAX_RETRY_WAIT_SECONDS', default=60)),
+
+            # Notification channels
+            email_max_concurrency=int(config('EMAIL_MAX_CONCURRENCY', default=4)),
+            enable_webhook_alerts=config('ENABLE_WEBHOOK_ALERTS', default=False, cast=bool),
+            webhook_url=config('WEBHOOK_URL', default='').strip(),
+            webhook_max_concurrency=int(config('WEBHOOK_MAX_CONCURRENCY', default=4)),
+            enable_file_sink=config('ENABLE_FILE_SINK', default=False, cast=bool),
+            file_sink_dir=data_dir / config('FILE_SINK_DIR', default='outbox'),
+            render_workers=int(config('RENDER_WORKERS', default=1)),
+            render_min_batch=int(config('RENDER_MIN_BATCH', default=20)),
+            render_cache_size=int(config('RENDER_CACHE_SIZE', default=256)),
+            render_cache_dir=(data_dir / config('RENDER_CACHE_DIR')) if config('RENDER_CACHE_DIR', default='').strip() else None,
+            max_rows_per_message=int(config('MAX_ROWS_PER_MESSAGE', default=0)),
+            max_body_bytes=int(config('MAX_BODY_BYTES', default=0)),
+            text_layout=config('TEXT_LAYOUT', default='records').strip().lower(),
+            html_mode=config('HTML_MODE', default='standard').strip().lower(),
+            stream_min_rows=int(config('STREAM_MIN_ROWS', default=0)),
+            small_run_max_rows=int(config('SMALL_RUN_MAX_ROWS', default=0)),
+            data_engine=config('DATA_ENGINE', default='pandas').strip().lower(),
             department_specific_cc_recipients_filter=config('DEPARTMENT_SPECIFIC_CC_RECIPIENTS_FILTER', default=False, cast=bool),
+            department_cc_prefix_length=int(config('DEPARTMENT_CC_PREFIX_LENGTH', default=2)),
+            department_cc_aliases=cls._parse_department_aliases('DEPARTMENT_CC_ALIASES', default='HSSQE:safety'),
+            default_company_name=config('DEFAULT_COMPANY_NAME', default='Prominence Maritime S.A.').strip(),
+            consolidate_cc_recipients=config('CONSOLIDATE_CC_RECIPIENTS', default=False, cast=bool),
 
             company_logos=company_logos,
 
             # Scheduling
             schedule_frequency_hours=float(config('SCHEDULE_FREQUENCY_HOURS', default=1)),
             timezone=config('TIMEZONE', default='Europe/Athens'),
+            alert_concurrency=int(config('ALERT_CONCURRENCY', default=1)),
+            alert_timeout_seconds=float(config('ALERT_TIMEOUT_SECONDS', default=0)),
+
+            # Digest mode
+            digest_mode=config('DIGEST_MODE', default=False, cast=bool),
+            digest_times=[t.strip() for t in config('DIGEST_TIMES', default='18:00').split(',') if t.strip()],
+            digest_outbox_file=data_dir / config('DIGEST_OUTBOX_FILE', default='digest_outbox.json'),
 
             # Tracking - if None or empty, never resend (track "forever")
             reminder_frequency_days=config('REMINDER_FREQUENCY_DAYS', default=None, cast=lambda x: float(x) if x and x.strip() else None),
@@ -170,25 +250,40 @@ class AlertConfig:
         return [s.strip() for s in config(env_var, default='').split(',') if s.strip()]
 
     @staticmethod
-    def _load_email_routing() -> Dict[str, Dict[str, List[str]]]:
+    def _parse_department_aliases(env_var: str, default: str = '') -> Dict[str, List[str]]:
+        """Parse comma-separated DEPARTMENT:username pairs into department -> usernames."""
+        aliases: Dict[str, List[str]] = {}
+        for entry in config(env_var, default=default).split(','):
+            if not entry.strip():
+                continue
+            department, separator, username = entry.partition(':')
+            if not separator or not department.strip() or not username.strip():
+                raise ValueError(f"Invalid {env_var} entry '{entry.strip()}' (expected DEPARTMENT:username)")
+            aliases.setdefault(department.strip(), []).append(username.strip())
+        return aliases
+
+    @staticmethod
+    def _load_email_routing() -> Dict[str, Dict]:
         """
         Load company-specific email routing configuration.
 
-        Returns dict mapping domain suffix to recipient configuration:
+        Returns dict mapping domain suffix to company routing (name, CC
+        recipients):
         {
             'prominencemaritime.com': {
+                'company_name': 'Prominence Maritime S.A.',
                 'cc': ['user1@prominencemaritime.com', ...]
             },
-            'seatraders.com': {
-                'cc': ['user1@seatraders.com', ...]
-            }
+            ...
         }
         """
         return {
             'prominencemaritime.com': {
+                'company_name': 'Prominence Maritime S.A.',
                 'cc': AlertConfig._parse_email_list('PROMINENCE_EMAIL_CC_RECIPIENTS')
             },
             'seatraders.com': {
+                'company_name': 'Sea Traders S.A.',
                 'cc': AlertConfig._parse_email_list('SEATRADERS_EMAIL_CC_RECIPIENTS')
             }
         }
@@ -213,4 +308,23 @@ class AlertConfig:
                 f"Required configuration missing from .env: {', '.join(missing)}"
             )
 
+        if self.digest_mode:
+            if not self.digest_times:
+                raise ValueError("DIGEST_MODE=True requires at least one DIGEST_TIMES entry (e.g. 18:00)")
+            for value in self.digest_times:
+                try:
+                    datetime.strptime(value, '%H:%M')
+                except ValueError:
+                    raise ValueError(f"Invalid DIGEST_TIMES entry '{value}' (expected HH:MM)")
+
+        if self.alert_concurrency < 1:
+            raise ValueError(f"Invalid ALERT_CONCURRENCY {self.alert_concurrency} (expected 1 or more)")
+        if self.alert_timeout_seconds < 0:
+            raise ValueError(f"Invalid ALERT_TIMEOUT_SECONDS {self.alert_timeout_seconds:g} (expected 0 or more)")
+
+        if self.data_engine not in ('pandas', 'polars'):
+            raise ValueError(f"Invalid DATA_ENGINE '{self.data_engine}' (expected pandas or polars)")
+        if self.data_engine == 'polars' and importlib.util.find_spec('polars') is None:
+            raise ValueError("DATA_ENGINE=polars requires the polars package (pip install polars)")
+
         logger.info("[OK] Configuration validation passed")
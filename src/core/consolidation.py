@@ -0,0 +1,105 @@
+#src/core/consolidation.py
+"""
+Recipient-level consolidation of notification jobs.
+
+Sits between route_notifications() and sending. Jobs whose CC lists are
+identical are merged into one multi-item digest addressed to that CC
+group, while each primary recipient (e.g. the vessel) still gets its own
+message without the CC list. Office recipients get one email per run
+instead of one per vessel.
+
+A digest carries the same tracking keys as the jobs it merges, so a row
+is only marked as sent once both the vessel email and the digest were
+delivered; if either fails, both are sent again on the next run.
+"""
+from typing import Dict, List, Mapping, Optional
+import pandas as pd
+import logging
+
+from src.core.jobs import NotificationJob
+
+logger = logging.getLogger(__name__)
+
+
+def consolidate_jobs(jobs: List[Mapping], label_column: Optional[str] = None) -> List[Mapping]:
+    """
+    Merge jobs that share the same CC recipient set into digest jobs.
+
+    Jobs whose CC set is unique are returned unchanged. For every CC set
+    shared by two or more jobs:
+    - each original job is kept for its primary recipients with CC removed
+    - one digest job is added, addressed to the CC set, carrying all rows
+
+    Args:
+        jobs: Notification jobs from route_notifications() (NotificationJobs or dicts)
+        label_column: Column identifying each job's subject (e.g. 'vessel');
+            prepended to the digest's display columns so rows stay attributable
+
+    Returns:
+        The input list if no CC set is shared; otherwise NotificationJobs
+        (per-recipient jobs first, then digests)
+    """
+    groups: Dict[frozenset, List[Mapping]] = {}
+    for job in jobs:
+        cc_set = frozenset(job.get('cc_recipients', []))
+        if cc_set:
+            groups.setdefault(cc_set, []).append(job)
+
+    shared = {cc_set for cc_set, members in groups.items() if len(members) > 1}
+    if not shared:
+        return jobs
+
+    consolidated = []
+    for job in map(NotificationJob.coerce, jobs):
+        if frozenset(job.cc_recipients) in shared:
+            job = job.with_cc([])
+        consolidated.append(job)
+
+    for cc_set, members in groups.items():
+        if cc_set in shared:
+            consolidated.append(_build_digest_job(cc_set, members, label_column))
+
+    logger.info(
+        f"Consolidated {sum(len(groups[c]) for c in shared)} job(s) into {len(shared)} CC digest(s) "
+        f"({len(consolidated)} job(s) total)"
+    )
+    return consolidated
+
+
+def _build_digest_job(cc_set: frozenset, members: List[Mapping], label_column: Optional[str]) -> NotificationJob:
+    """
+    Build one digest job from jobs that share a CC set.
+
+    Args:
+        cc_set: Shared CC recipients (become the digest's recipients)
+        members: Jobs being merged
+        label_column: Optional column prepended to display columns
+
+    Returns:
+        Digest NotificationJob
+    """
+    first_metadata = members[0].get('metadata', {})
+    data = pd.concat([job['data'] for job in members])
+    if label_column and label_column in data.columns:
+        data = data.sort_values(label_column, kind='stable')
+
+    display_columns = list(first_metadata.get('display_columns', list(data.columns)))
+    if label_column and label_column in data.columns and label_column not in display_columns:
+        display_columns.insert(0, label_column)
+
+    labels = [job.get('metadata', {}).get('vessel_name', '') for job in members]
+    company_names = {job.get('metadata', {}).get('company_name') for job in members}
+
+    metadata = {
+        **first_metadata,
+        'alert_title': f"{first_metadata.get('alert_title', 'Alert Notification')} Digest",
+        'vessel_name': '',
+        'display_columns': display_columns,
+        'digest': True,
+        'vessels': labels,
+        'departments': sorted({d for job in members for d in job.get('metadata', {}).get('departments', [])}),
+    }
+    if len(company_names) == 1:
+        metadata['company_name'] = company_names.pop()
+
+    return NotificationJob(recipients=sorted(cc_set), data=data, metadata=metadata)
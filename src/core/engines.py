@@ -0,0 +1,365 @@
+#src/core/engines.py
+"""
+Data engines for the alert data stages.
+
+An alert describes its data stages once, as a StageSpec returned by
+BaseAlert.stage_spec(): the timestamp column that must fall within the
+lookback window, how dates are displayed, the tracking key template, the
+columns that split rows into notifications and the per-group values its
+jobs need. Each engine runs those stages on its own data structure:
+
+- frames (pandas): filter_frame() / frame_groups(), the default
+  filter_data() and route_notifications(); datetimes are formatted per
+  job by BaseAlert._prepare_job() (src.utils.datetimes)
+- rows (RecordSet): filter_records() / record_groups(), the small-run
+  path (SMALL_RUN_MAX_ROWS)
+- Polars (DATA_ENGINE=polars): polars_groups(), one lazy query for the
+  datetime conversion, window filter, date formatting, tracking keys and
+  tracker membership, multi-threaded across every core; a pandas frame is
+  built per notification only, for the formatters
+
+All three give each notification the same rows, labels and display
+strings, so the rendered emails are identical whichever engine runs.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone as dt_timezone
+from string import Formatter
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+import logging
+
+from src.core.records import RecordSet
+from src.utils import datetimes
+from src.utils.grouping import group_slices
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """
+    Declarative description of an alert's data stages.
+
+    Attributes:
+        group_by: Columns whose distinct values get one notification each
+        tracking_key: str.format template over row columns, e.g. 'doc_{document_id}'
+        timestamp_column: Rows are kept if this timestamp is within the
+            lookback window (naive timestamps are UTC); None = keep all
+        lookback_days: Window length in days
+        timestamp_format: Display format of the timestamp column
+        date_formats: Column -> display format ('' for missing/unparseable)
+        collect: Columns whose distinct non-null values per group are passed
+            to BaseAlert.build_group_job() (e.g. departments)
+    """
+    group_by: Tuple[str, ...]
+    tracking_key: str
+    timestamp_column: Optional[str] = None
+    lookback_days: float = 0
+    timestamp_format: str = '%Y-%m-%d %H:%M:%S'
+    date_formats: Mapping[str, str] = field(default_factory=dict)
+    collect: Tuple[str, ...] = ()
+
+    @property
+    def display_formats(self) -> Dict[str, str]:
+        """Column -> strftime format of every datetime column shown in emails."""
+        formats = dict(self.date_formats)
+        if self.timestamp_column is not None:
+            formats[self.timestamp_column] = self.timestamp_format
+        return formats
+
+
+class Group(NamedTuple):
+    """Rows of one notification, as every engine yields them."""
+    key: tuple
+    data: pd.DataFrame
+    collected: Dict[str, List[Any]]
+    tracking_keys: Optional[List[str]]  # None = computed later from data
+
+
+def tracking_key(spec: StageSpec, row: Mapping) -> str:
+    """Tracking key of one row (a pd.Series or a column -> value mapping)."""
+    return spec.tracking_key.format_map(row)
+
+
+# --- pandas -----------------------------------------------------------------
+
+def filter_frame(df: pd.DataFrame, spec: StageSpec, timezone: str, cutoff: datetime) -> pd.DataFrame:
+    """
+    Window filter on a DataFrame, without modifying it.
+
+    The timestamp column is compared as int64 UTC epochs and the kept rows
+    are converted to the local timezone; date columns are parsed. Both stay
+    datetimes until BaseAlert formats each job's rows for display
+    (spec.display_formats).
+
+    Args:
+        df: Fetched rows
+        spec: Stage description
+        timezone: Local timezone name
+        cutoff: Oldest timestamp kept (timezone-aware)
+
+    Returns:
+        Filtered copy with timestamp and date columns as datetimes
+    """
+    if df.empty:
+        return df
+
+    column = spec.timestamp_column
+    if column is not None:
+        epochs = datetimes.utc_epochs(df[column])
+        keep = epochs >= datetimes.epoch(cutoff)  # NaT never passes
+        df_filtered = df[keep].copy()
+        df_filtered[column] = datetimes.localize(epochs[keep], timezone, index=df_filtered.index)
+    else:
+        df_filtered = df.copy()
+
+    for name in spec.date_formats:
+        if name in df_filtered.columns and not is_datetime64_any_dtype(df_filtered[name].dtype):
+            df_filtered[name] = pd.to_datetime(df_filtered[name], errors='coerce')
+
+    return df_filtered
+
+
+def frame_groups(df: pd.DataFrame, spec: StageSpec) -> Iterator[Group]:
+    """
+    Split a filtered DataFrame into notification groups.
+
+    Args:
+        df: Filtered, unsent rows
+        spec: Stage description
+
+    Yields:
+        Group per distinct group_by key (rows are read-only slices)
+    """
+    for key, rows in group_slices(df, list(spec.group_by)):
+        collected = {
+            column: [value for value in pd.unique(rows[column].to_numpy()) if pd.notna(value)]
+            for column in spec.collect
+        }
+        yield Group(key, rows, collected, None)
+
+
+# --- rows (RecordSet) -------------------------------------------------------
+
+def filter_records(records: RecordSet, spec: StageSpec, timezone: str, cutoff: datetime) -> RecordSet:
+    """
+    Row-based filter_frame(): same window, same display strings.
+
+    Args:
+        records: Fetched rows
+        spec: Stage description
+        timezone: Local timezone name
+        cutoff: Oldest timestamp kept (timezone-aware)
+
+    Returns:
+        Filtered rows (original labels kept) with dates formatted as strings
+    """
+    tz = datetimes.get_zone(timezone)
+    stamp = records.position(spec.timestamp_column) if spec.timestamp_column is not None else None
+    dates = [
+        (records.position(name), date_format)
+        for name, date_format in spec.date_formats.items() if name in records.columns
+    ]
+
+    keep, rows = [], []
+    for row in records.rows:
+        if stamp is not None:
+            local = _local_timestamp(row[stamp], tz)
+            keep.append(local is not None and local >= cutoff)
+        else:
+            keep.append(True)
+        if keep[-1]:
+            row = list(row)
+            if stamp is not None:
+                row[stamp] = local.strftime(spec.timestamp_format)
+            for position, date_format in dates:
+                row[position] = _format_date(row[position], date_format)
+            rows.append(tuple(row))
+
+    return records.select(keep).with_rows(rows)
+
+
+def record_groups(records: RecordSet, spec: StageSpec, key_func: Callable[[Dict], str]) -> Iterator[Group]:
+    """
+    Split filtered rows into notification groups.
+
+    Args:
+        records: Filtered, unsent rows
+        spec: Stage description
+        key_func: Tracking key of a row mapping
+
+    Yields:
+        Group per distinct group_by key, with a DataFrame of its rows and
+        their tracking keys
+    """
+    for key, rows in records.group_by(spec.group_by).items():
+        collected = {
+            column: list(dict.fromkeys(value for value in rows.column(column) if value is not None))
+            for column in spec.collect
+        }
+        yield Group(key, rows.to_frame(), collected, [key_func(row) for row in rows.mappings()])
+
+
+def _local_timestamp(value: Any, tz: ZoneInfo) -> Optional[datetime]:
+    """
+    Parse a timestamp into tz as filter_frame() does (naive values are UTC).
+
+    Args:
+        value: datetime, ISO string or None
+        tz: Local timezone
+
+    Returns:
+        Timezone-aware datetime, or None if missing/unparseable
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value.astimezone(tz)
+
+
+def _format_date(value: Any, date_format: str) -> str:
+    """
+    Format a date as filter_frame() formats date columns.
+
+    Args:
+        value: date/datetime, ISO string or None
+        date_format: strftime format
+
+    Returns:
+        Formatted date, or '' if missing/unparseable
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return ''
+    if isinstance(value, date):
+        return value.strftime(date_format)
+    return ''
+
+
+# --- Polars -----------------------------------------------------------------
+
+def polars_groups(
+    records: RecordSet,
+    spec: StageSpec,
+    timezone: str,
+    cutoff: datetime,
+    sent_keys: Dict[str, Set[str]]
+) -> Tuple[int, int, List[Group]]:
+    """
+    Run filter, tracker membership and grouping as Polars queries.
+
+    Args:
+        records: Fetched rows
+        spec: Stage description
+        timezone: Local timezone name
+        cutoff: Oldest timestamp kept (timezone-aware)
+        sent_keys: Tracking namespace -> keys already sent in it; a row is
+            kept if it is unsent in at least one namespace
+
+    Returns:
+        (rows after filtering, unsent rows, groups); group frames are pandas,
+        with the original row labels as index
+
+    Raises:
+        ImportError: If polars is not installed
+    """
+    import polars as pl
+
+    columns = zip(*records.rows) if records.rows else [()] * len(records.columns)
+    frame = pl.DataFrame([_polars_series(pl, name, list(values)) for name, values in zip(records.columns, columns)])
+    query = frame.with_columns(pl.Series('__label', records.labels())).lazy()
+
+    column = spec.timestamp_column
+    if column is not None:
+        if frame.schema[column] == pl.String:
+            query = query.with_columns(pl.col(column).str.to_datetime(strict=False))
+        elif frame.schema[column] == pl.Null:
+            query = query.with_columns(pl.col(column).cast(pl.Datetime))
+        # If the datetime is timezone-naive, localize it to UTC first, then convert to local timezone
+        stamp = pl.col(column)
+        if query.collect_schema()[column].time_zone is None:
+            stamp = stamp.dt.replace_time_zone('UTC')
+        query = (
+            query.with_columns(stamp.dt.convert_time_zone(timezone))
+            .filter(pl.col(column) >= cutoff.astimezone(datetimes.get_zone(timezone)))
+            .with_columns(pl.col(column).dt.strftime(spec.timestamp_format))
+        )
+
+    formatted = []
+    for name, date_format in spec.date_formats.items():
+        if name in frame.schema:
+            value = pl.col(name)
+            if frame.schema[name] == pl.String:
+                value = value.str.to_datetime(strict=False)
+            elif frame.schema[name] == pl.Null:
+                value = value.cast(pl.Date)
+            formatted.append(value.dt.strftime(date_format).fill_null('').alias(name))
+    if formatted:
+        query = query.with_columns(formatted)
+
+    template, fields = _polars_template(spec.tracking_key)
+    filtered = query.with_columns(pl.format(template, *fields).alias('__key')).collect()
+
+    unsent_mask = pl.lit(False)
+    for keys in (sent_keys.values() or [set()]):
+        unsent_mask = unsent_mask | ~pl.col('__key').is_in(list(keys))
+    unsent = filtered.filter(unsent_mask).drop_nulls(list(spec.group_by))
+
+    groups = []
+    for key, part in unsent.partition_by(list(spec.group_by), maintain_order=True, as_dict=True).items():
+        collected = {
+            name: [value for value in part[name].unique(maintain_order=True).to_list() if value is not None]
+            for name in spec.collect
+        }
+        data = pd.DataFrame(
+            part.drop('__label', '__key').to_dict(as_series=False),
+            index=part['__label'].to_list()
+        )
+        groups.append(Group(tuple(key), data, collected, part['__key'].to_list()))
+
+    return filtered.height, unsent.height, groups
+
+
+def _polars_series(pl: Any, name: str, values: List[Any]) -> Any:
+    """
+    One Polars column; mixed-type columns (e.g. dates and ISO strings) become
+    strings, which the date stages parse as pd.to_datetime() would.
+    """
+    try:
+        return pl.Series(name, values)
+    except (TypeError, ValueError, pl.exceptions.PolarsError):
+        return pl.Series(name, [None if value is None else str(value) for value in values], dtype=pl.String)
+
+
+def _polars_template(template: str) -> Tuple[str, List[str]]:
+    """
+    Convert a str.format tracking key template to pl.format() arguments.
+
+    Args:
+        template: e.g. 'vessel_{vessel_id}_doc_{document_id}'
+
+    Returns:
+        ('vessel_{}_doc_{}', ['vessel_id', 'document_id'])
+
+    Raises:
+        ValueError: If a field uses a format spec or conversion
+    """
+    pieces, fields = [], []
+    for literal, name, format_spec, conversion in Formatter().parse(template):
+        pieces.append(literal.replace('{', '{{').replace('}', '}}'))
+        if name is not None:
+            if format_spec or conversion:
+                raise ValueError(f"Tracking key template '{template}': format specs are not supported with Polars")
+            pieces.append('{}')
+            fields.append(name)
+    return ''.join(pieces), fields
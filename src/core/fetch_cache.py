@@ -0,0 +1,139 @@
+#src/core/fetch_cache.py
+"""
+Cycle-scoped cache of query results shared by alerts.
+
+Alerts registered in the same scheduler cycle often read the same tables.
+While a cycle is open (fetch_cycle(), entered by AlertScheduler around
+each round of alerts), BaseAlert.cached_frame() / cached_records() key
+results by query name and bound parameters: the first alert to ask runs
+the query, later ones reuse the result, so database round-trips per cycle
+scale with distinct queries rather than alerts. A result fetched as rows
+is converted to a DataFrame at most once (and vice versa).
+
+Shared results are read-only: each caller gets a shallow copy (frames) or
+its own row list (RecordSets), so adding or replacing columns is private
+to the caller, but values must not be modified in place. Outside a cycle
+(tests, one-off scripts) every call queries the database.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterator, Mapping, Optional, Tuple
+import logging
+
+from src.core.records import RecordSet
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Cache of the cycle running in this context (None = no cycle open)
+_current: ContextVar[Optional['FetchCache']] = ContextVar('fetch_cache', default=None)
+
+
+@dataclass(slots=True)
+class _Entry:
+    """One query's result, in whichever forms have been requested."""
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    records: Optional[RecordSet] = None
+    frame: Optional['pd.DataFrame'] = None
+
+
+class FetchCache:
+    """
+    Query results of one scheduler cycle, keyed by query name and parameters.
+
+    Thread-safe: concurrent requests for the same key wait for the first
+    one's query instead of running it again.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple, _Entry] = {}
+        self._lock = threading.Lock()
+        self.queries = 0  # database round-trips
+        self.hits = 0  # requests served from the cache
+
+    @staticmethod
+    def key(query_name: str, params: Optional[Mapping[str, Hashable]] = None) -> Tuple:
+        """Cache key of a query and its bound parameters (order-independent)."""
+        return (query_name, tuple(sorted((params or {}).items())))
+
+    def _entry(self, key: Tuple) -> _Entry:
+        with self._lock:
+            return self._entries.setdefault(key, _Entry())
+
+    def frame(self, key: Tuple, load: Callable[[], 'pd.DataFrame']) -> Tuple['pd.DataFrame', bool]:
+        """
+        Result as a DataFrame, querying with load() on first use.
+
+        Args:
+            key: Key from FetchCache.key()
+            load: Runs the query and returns its DataFrame
+
+        Returns:
+            (shallow copy of the shared frame, True if no query was run)
+        """
+        entry = self._entry(key)
+        with entry.lock:
+            cached = entry.frame is not None or entry.records is not None
+            if entry.frame is None:
+                if entry.records is not None:
+                    entry.frame = entry.records.to_frame()
+                else:
+                    entry.frame = load()
+                    self.queries += 1
+            self.hits += cached
+            return entry.frame.copy(deep=False), cached
+
+    def records(self, key: Tuple, load: Callable[[], RecordSet]) -> Tuple[RecordSet, bool]:
+        """
+        Result as a RecordSet, querying with load() on first use.
+
+        Args:
+            key: Key from FetchCache.key()
+            load: Runs the query and returns its rows
+
+        Returns:
+            (RecordSet sharing the cached row tuples, True if no query was run)
+        """
+        entry = self._entry(key)
+        with entry.lock:
+            cached = entry.records is not None or entry.frame is not None
+            if entry.records is None:
+                if entry.frame is not None:
+                    entry.records = RecordSet.from_frame(entry.frame)
+                else:
+                    entry.records = load()
+                    self.queries += 1
+            self.hits += cached
+            records = entry.records
+            index = None if records.index is None else list(records.index)
+            return RecordSet(records.columns, list(records.rows), index), cached
+
+
+def current_cache() -> Optional[FetchCache]:
+    """The open cycle's cache, or None outside a cycle."""
+    return _current.get()
+
+
+@contextmanager
+def fetch_cycle() -> Iterator[FetchCache]:
+    """
+    Open a cycle: queries in this context share one FetchCache until exit.
+
+    Yields:
+        The cycle's FetchCache
+    """
+    cache = FetchCache()
+    token = _current.set(cache)
+    try:
+        yield cache
+    finally:
+        _current.reset(token)
+        if cache.hits:
+            logger.info(
+                f"[OK] Fetch cache: {cache.queries} quer{'y' if cache.queries == 1 else 'ies'} run, "
+                f"{cache.hits} result{'' if cache.hits == 1 else 's'} reused this cycle"
+            )
@@ -0,0 +1,164 @@
+#src/core/jobs.py
+"""
+Notification job model.
+
+A NotificationJob is what route_notifications() produces and what the
+consolidation, digest, tracking and render stages consume: recipients,
+the job's rows and typed metadata, plus values derived from them once
+(display columns, tracking keys, a content hash for the render cache).
+
+Both classes are slotted dataclasses that also implement the read-only
+Mapping protocol (job['data'], metadata.get('vessel_name')), so alerts
+may still return plain dicts from route_notifications() and formatters
+keep receiving metadata as a mapping. NotificationJob.coerce() converts
+a dict into a job.
+"""
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Dict, Iterator, List, Optional
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, eq=False)
+class JobMetadata(Mapping):
+    """
+    Metadata of one notification job.
+
+    Unset fields (None) are absent from the mapping view, so formatter
+    defaults still apply; keys without a field of their own live in extra.
+    """
+    alert_title: Optional[str] = None
+    vessel_name: Optional[str] = None
+    company_name: Optional[str] = None
+    display_columns: Optional[List[str]] = None
+    departments: Optional[List[str]] = None
+    template: Optional[str] = None
+    digest: Optional[bool] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, metadata: Optional[Mapping]) -> 'JobMetadata':
+        """
+        Build metadata from a mapping (a JobMetadata is returned as is).
+
+        Args:
+            metadata: Job metadata dictionary (or None)
+
+        Returns:
+            JobMetadata
+        """
+        if isinstance(metadata, JobMetadata):
+            return metadata
+        values = dict(metadata or {})
+        typed = {name: values.pop(name) for name in _METADATA_FIELDS if name in values}
+        return cls(**typed, extra=values)
+
+    def updated(self, **changes: Any) -> 'JobMetadata':
+        """Return a copy with some keys set (typed fields or extra keys)."""
+        return JobMetadata.from_dict({**self, **changes})
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _METADATA_FIELDS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        return self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in _METADATA_FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+_METADATA_FIELDS = tuple(f.name for f in fields(JobMetadata) if f.name != 'extra')
+
+# Keys of a job's mapping view (the historical job dictionary)
+_JOB_KEYS = ('recipients', 'cc_recipients', 'data', 'metadata')
+
+
+@dataclass(slots=True, eq=False)
+class NotificationJob(Mapping):
+    """
+    One notification: recipients, rows and metadata.
+
+    display_columns is derived on construction; tracking_keys is filled in
+    by BaseAlert (one key per row, in row order); content_hash is computed
+    on first use. Jobs compare by identity.
+    """
+    recipients: List[str]
+    data: pd.DataFrame
+    metadata: JobMetadata = field(default_factory=JobMetadata)
+    cc_recipients: List[str] = field(default_factory=list)
+    tracking_keys: Optional[List[str]] = None
+    display_columns: List[str] = field(init=False)
+    _content_hash: Optional[str] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.metadata = JobMetadata.from_dict(self.metadata)
+        requested = self.metadata.display_columns
+        columns = self.data.columns
+        self.display_columns = [c for c in (columns if requested is None else requested) if c in columns]
+
+    @classmethod
+    def coerce(cls, job: Mapping) -> 'NotificationJob':
+        """
+        Convert a job dictionary into a NotificationJob (a job is returned as is).
+
+        Args:
+            job: Dict with recipients, data and optionally cc_recipients, metadata
+
+        Returns:
+            NotificationJob
+        """
+        if isinstance(job, NotificationJob):
+            return job
+        return cls(
+            recipients=list(job['recipients']),
+            data=job['data'],
+            metadata=job.get('metadata'),
+            cc_recipients=list(job.get('cc_recipients') or [])
+        )
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the displayed rows and metadata (see render_cache.content_hash)."""
+        if self._content_hash is None:
+            from src.formatters.render_cache import content_hash
+            self._content_hash = content_hash(self.data, self.metadata)
+        return self._content_hash
+
+    def with_cc(self, cc_recipients: List[str]) -> 'NotificationJob':
+        """Return a copy addressed to different CC recipients (derived values are kept)."""
+        job = replace(self, cc_recipients=list(cc_recipients))
+        job._content_hash = self._content_hash
+        return job
+
+    def with_data(self, data: pd.DataFrame) -> 'NotificationJob':
+        """Return a copy with the same rows in a different form (tracking keys are kept)."""
+        return replace(self, data=data)
+
+    def with_metadata(self, **changes: Any) -> 'NotificationJob':
+        """Return a copy with some metadata keys set."""
+        return replace(self, metadata=self.metadata.updated(**changes))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _JOB_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_JOB_KEYS)
+
+    def __len__(self) -> int:
+        return len(_JOB_KEYS)
+
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
@@ -0,0 +1,169 @@
+#src/core/outbox.py
+"""
+Persistent outbox for scheduled digests.
+
+In digest mode, rows routed to CC recipients (internal recipients and
+company CC lists) are queued here instead of being CC'd on every vessel
+email. At each configured digest time the queued rows are rendered once
+into a single summary per recipient set and removed from the outbox.
+Delivered rows are recorded in the tracker under the 'digest:' namespace,
+so a row routed again later (e.g. after a failed vessel email) is not
+queued for another digest.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tracker namespace of rows delivered in a digest
+TRACKING_NAMESPACE = 'digest'
+
+
+class DigestOutbox:
+    """
+    JSON-backed queue of digest items.
+
+    Each item holds the display rows of one routed job for one recipient
+    set, with the tracking key of every row so the same row is never
+    queued twice for the same recipients.
+    """
+
+    def __init__(self, outbox_file: Path, timezone: str):
+        """
+        Initialize digest outbox.
+
+        Args:
+            outbox_file: Path to JSON file for persistent storage
+            timezone: Timezone for queued_at timestamps
+        """
+        self.outbox_file = outbox_file
+        self.timezone = ZoneInfo(timezone)
+        self.items: List[Dict] = []
+        self._lock = threading.Lock()
+
+        self._load()
+
+    @staticmethod
+    def tracking_key(key: str) -> str:
+        """Namespace a row tracking key for digest delivery."""
+        return f"{TRACKING_NAMESPACE}:{key}"
+
+    def _load(self) -> None:
+        """Load queued items from disk (starting empty if missing or corrupt)."""
+        if not self.outbox_file.exists():
+            self.items = []
+            return
+
+        try:
+            with open(self.outbox_file, 'r', encoding='utf-8') as f:
+                self.items = json.load(f).get('items', [])
+            logger.info(f"Loaded {len(self.items)} queued digest item(s) from {self.outbox_file}")
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Error loading digest outbox from {self.outbox_file}: {e}. Starting fresh.")
+            self.items = []
+
+    def _save(self) -> None:
+        """Save queued items using atomic write to prevent corruption."""
+        data = {
+            'items': self.items,
+            'last_updated': datetime.now(tz=self.timezone).isoformat()
+        }
+
+        temp_fd, temp_path = tempfile.mkstemp(dir=self.outbox_file.parent, suffix='.tmp', text=True)
+        try:
+            with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            shutil.move(temp_path, self.outbox_file)
+        except Exception:
+            if Path(temp_path).exists():
+                Path(temp_path).unlink()
+            raise
+
+    def add(
+        self,
+        alert_name: str,
+        recipients: List[str],
+        rows: List[Dict],
+        tracking_keys: List[str],
+        metadata: Dict
+    ) -> int:
+        """
+        Queue rows for a recipient set, skipping rows already queued for it.
+
+        Args:
+            alert_name: Alert class name that produced the rows
+            recipients: Digest recipients (order-insensitive)
+            rows: Display rows (JSON-serialisable dicts)
+            tracking_keys: Tracking key for each row, aligned with rows
+            metadata: Job metadata (vessel_name, company_name, alert_title, display_columns)
+
+        Returns:
+            Number of rows queued
+        """
+        recipients = sorted(set(recipients))
+
+        with self._lock:
+            queued_keys = {
+                key
+                for item in self.items
+                if item['alert'] == alert_name and item['recipients'] == recipients
+                for key in item['tracking_keys']
+            }
+            new = [(row, key) for row, key in zip(rows, tracking_keys) if key not in queued_keys]
+            if not new:
+                return 0
+
+            self.items.append({
+                'id': uuid.uuid4().hex,
+                'alert': alert_name,
+                'recipients': recipients,
+                'vessel_name': metadata.get('vessel_name', ''),
+                'company_name': metadata.get('company_name', ''),
+                'alert_title': metadata.get('alert_title', 'Alert Notification'),
+                'display_columns': list(metadata.get('display_columns', [])),
+                'rows': [row for row, _ in new],
+                'tracking_keys': [key for _, key in new],
+                'queued_at': datetime.now(tz=self.timezone).isoformat(),
+            })
+            self._save()
+
+        return len(new)
+
+    def pending(self, alert_name: Optional[str] = None) -> List[Dict]:
+        """
+        Return queued items, optionally only those of one alert.
+
+        Args:
+            alert_name: Alert class name filter (None = all)
+
+        Returns:
+            List of queued item dicts
+        """
+        with self._lock:
+            return [dict(item) for item in self.items if alert_name is None or item['alert'] == alert_name]
+
+    def remove(self, item_ids: List[str]) -> None:
+        """
+        Remove delivered items and persist.
+
+        Args:
+            item_ids: Ids of items to drop
+        """
+        ids = set(item_ids)
+        with self._lock:
+            before = len(self.items)
+            self.items = [item for item in self.items if item['id'] not in ids]
+            if len(self.items) != before:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self.items)
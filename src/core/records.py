@@ -0,0 +1,130 @@
+#src/core/records.py
+"""
+Row-based result sets for small runs.
+
+Most cycles find only a handful of updated rows. For those, BaseAlert can
+run fetch -> filter -> tracking -> routing on a RecordSet (column names and
+plain tuples straight from the database cursor) instead of DataFrames, and
+only build one small DataFrame per notification where the formatters need
+it (see SMALL_RUN_MAX_ROWS). Above the threshold the same rows are turned
+into the DataFrame pd.read_sql_query() would have returned.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class RecordSet:
+    """
+    Query result as column names plus one tuple per row.
+
+    Provides the few DataFrame attributes BaseAlert relies on (columns,
+    empty, len()), so validate_required_columns() accepts either. Rows
+    keep their position in the fetched result as a label (the DataFrame
+    index after to_frame()), since formatters number records by it.
+    """
+    columns: Tuple[str, ...]
+    rows: List[tuple]
+    index: Optional[List[int]] = None  # row labels; None = 0..len-1
+
+    @classmethod
+    def from_result(cls, result: Any) -> 'RecordSet':
+        """
+        Build a record set from an executed SQLAlchemy query.
+
+        Args:
+            result: sqlalchemy CursorResult
+
+        Returns:
+            RecordSet with every fetched row
+        """
+        return cls(tuple(result.keys()), [tuple(row) for row in result])
+
+    @classmethod
+    def from_frame(cls, df: 'pd.DataFrame') -> 'RecordSet':
+        """
+        Build a record set from a DataFrame (e.g. fetch_data()), keeping its
+        index as row labels and missing values as None.
+
+        Args:
+            df: DataFrame to convert
+
+        Returns:
+            RecordSet with one tuple per DataFrame row
+        """
+        values = df.astype(object).where(df.notna(), None)
+        return cls(tuple(df.columns), list(values.itertuples(index=False, name=None)), list(df.index))
+
+    @property
+    def empty(self) -> bool:
+        return not self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def position(self, column: str) -> int:
+        """Index of a column within each row tuple."""
+        return self.columns.index(column)
+
+    def column(self, column: str) -> List[Any]:
+        """Values of one column, in row order."""
+        i = self.position(column)
+        return [row[i] for row in self.rows]
+
+    def mappings(self) -> Iterator[Dict[str, Any]]:
+        """Rows as column -> value dicts (e.g. for get_tracking_key)."""
+        for row in self.rows:
+            yield dict(zip(self.columns, row))
+
+    def labels(self) -> List[int]:
+        """Row labels, in row order."""
+        return list(range(len(self.rows))) if self.index is None else self.index
+
+    def select(self, keep: Iterable[bool]) -> 'RecordSet':
+        """Rows whose flag is True, in order, with their labels."""
+        kept = [(label, row) for label, row, flag in zip(self.labels(), self.rows, keep) if flag]
+        return RecordSet(self.columns, [row for _, row in kept], [label for label, _ in kept])
+
+    def with_rows(self, rows: List[tuple]) -> 'RecordSet':
+        """Same columns and labels, rows replaced one for one (e.g. reformatted)."""
+        if len(rows) != len(self.rows):
+            raise ValueError(f"Expected {len(self.rows)} row(s), got {len(rows)}")
+        return RecordSet(self.columns, rows, self.index)
+
+    def group_by(self, by: Sequence[str]) -> Dict[tuple, 'RecordSet']:
+        """
+        Split rows by key columns.
+
+        Groups come in order of first appearance and rows with a missing
+        (None) key are left out, as in df.groupby(by, sort=False).
+
+        Args:
+            by: Key columns
+
+        Returns:
+            Key tuple -> rows of that group
+        """
+        positions = [self.position(column) for column in by]
+        groups: Dict[tuple, RecordSet] = {}
+        for label, row in zip(self.labels(), self.rows):
+            key = tuple(row[i] for i in positions)
+            if None not in key:
+                group = groups.setdefault(key, RecordSet(self.columns, [], []))
+                group.rows.append(row)
+                group.index.append(label)
+        return groups
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """
+        DataFrame of the rows, typed as pd.read_sql_query() would type them.
+
+        Returns:
+            DataFrame with one column per record column
+        """
+        import pandas as pd
+        return pd.DataFrame.from_records(
+            self.rows, columns=list(self.columns), coerce_float=True, index=self.index
+        )
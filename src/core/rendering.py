@@ -0,0 +1,445 @@
+#src/core/rendering.py
+"""
+Render stage for notification jobs.
+
+Turns render tasks into (subject, text, html) tuples, either serially or
+on a process pool when a run produces many jobs (e.g. fleet-wide
+certificate updates). Workers receive a compact RenderContext and only
+the display values of each job's frame, never the full AlertConfig
+(which holds SMTP credentials, trackers and open sessions).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+import pickle
+from pickle import PicklingError
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+import numpy as np
+import pandas as pd
+import logging
+
+from src.formatters.cells import display_values
+from src.formatters.display_frame import DisplayFrame
+from src.formatters.overflow import MessageBudget, attachment_filename
+from src.formatters.render_cache import RenderCache, render_key
+from src.formatters.templates import EmailTemplate, get_template, register_template, registered_templates
+
+logger = logging.getLogger(__name__)
+
+# Re-renders allowed to bring an oversized body under the byte budget
+_MAX_SHRINK_PASSES = 4
+
+# Never fork render workers: alerts run on scheduler threads (ALERT_CONCURRENCY)
+# and Polars runs its own thread pool, and forking while other threads hold
+# locks (logging, SMTP, tracker) can deadlock the children. Workers start from
+# a fork server (or fresh interpreters where that is unavailable) instead.
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class RenderError(RuntimeError):
+    """A notification failed to render in a worker process."""
+
+
+class CacheLookups(NamedTuple):
+    """Render cache lookups of one call, independent of other alerts sharing the cache."""
+    hits: int = 0
+    misses: int = 0
+
+    def __add__(self, other: 'CacheLookups') -> 'CacheLookups':
+        return CacheLookups(self.hits + other.hits, self.misses + other.misses)
+
+
+@dataclass(frozen=True)
+class RenderContext:
+    """
+    The settings formatters read, in a picklable form.
+
+    Formatters only use schedule_frequency_hours and company_logos from
+    the config, so a RenderContext can be passed wherever they expect one.
+    """
+    schedule_frequency_hours: float
+    company_logos: Dict[str, Path]
+    html_formatter: 'HTMLFormatter'
+    text_formatter: 'TextFormatter'
+    templates: Tuple[EmailTemplate, ...] = field(default=())
+
+    @classmethod
+    def from_config(cls, config: 'AlertConfig') -> 'RenderContext':
+        """
+        Build a render context from the alert configuration.
+
+        Args:
+            config: AlertConfig instance
+
+        Returns:
+            RenderContext carrying formatters and the registered templates
+        """
+        return cls(
+            schedule_frequency_hours=config.schedule_frequency_hours,
+            company_logos=dict(config.company_logos),
+            html_formatter=config.html_formatter,
+            text_formatter=config.text_formatter,
+            templates=tuple(get_template(name) for name in registered_templates()),
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies everything besides the job that shapes rendered bodies (for cache keys)."""
+        logos = sorted(f"{name}:{path.name}:{path.exists()}" for name, path in self.company_logos.items())
+        return '|'.join([
+            f"{type(self.html_formatter).__module__}.{type(self.html_formatter).__qualname__}",
+            f"{type(self.text_formatter).__module__}.{type(self.text_formatter).__qualname__}",
+            str(getattr(self.text_formatter, 'layout', '')),
+            str(getattr(self.html_formatter, 'mode', '')),
+            str(self.schedule_frequency_hours),
+            *logos,
+        ])
+
+
+@dataclass(frozen=True)
+class RenderTask:
+    """One notification job reduced to what rendering needs."""
+    subject: str
+    data: pd.DataFrame
+    metadata: Mapping
+    content_hash: str = ''  # NotificationJob.content_hash when known ('' = compute for the cache key)
+
+
+@dataclass(frozen=True)
+class CompactTask:
+    """
+    What a render worker receives for one job: the display columns' values
+    (as the full frame exposes them), their names and the row labels.
+    """
+    subject: str
+    columns: List[str]
+    index: List
+    values: np.ndarray
+    empty: bool
+    metadata: Dict
+
+
+def compact_task(task: RenderTask) -> CompactTask:
+    """
+    Reduce a render task to its display values for shipping to a worker.
+
+    Tracking and routing columns are dropped; values keep the full frame's
+    common dtype so cells render exactly as they do in-process.
+
+    Args:
+        task: RenderTask holding the full job DataFrame
+
+    Returns:
+        CompactTask
+    """
+    data = task.data
+    columns = [col for col in task.metadata.get('display_columns', list(data.columns)) if col in data.columns]
+    return CompactTask(
+        subject=task.subject,
+        columns=columns,
+        index=list(data.index),
+        values=display_values(data, columns),
+        empty=data.empty,
+        metadata=task.metadata
+    )
+
+
+def render_task(task: RenderTask, run_time: datetime, context: RenderContext) -> Tuple[str, str, str]:
+    """
+    Render one task's plain-text and HTML bodies from a shared DisplayFrame.
+
+    Args:
+        task: RenderTask to render
+        run_time: Timestamp of this run
+        context: RenderContext (or AlertConfig) passed to the formatters
+
+    Returns:
+        (subject, plain_text, html_content)
+    """
+    frame = DisplayFrame.from_dataframe(task.data, task.metadata)
+    return _render_frame(task.subject, frame, task.metadata, run_time, context)
+
+
+def _render_frame(
+    subject: str,
+    frame: DisplayFrame,
+    metadata: Dict,
+    run_time: datetime,
+    context: RenderContext
+) -> Tuple[str, str, str]:
+    plain_text = context.text_formatter.format(frame.source, run_time, context, metadata, frame=frame)
+    html_content = context.html_formatter.format(frame.source, run_time, context, metadata, frame=frame)
+    return subject, plain_text, html_content
+
+
+# Per-process context, installed once by the pool initializer
+_worker_context: Optional[RenderContext] = None
+
+
+def _init_worker(context: RenderContext) -> None:
+    """Install the render context and any alert-registered templates in a worker."""
+    global _worker_context
+    _worker_context = context
+
+    known = set(registered_templates())
+    for template in context.templates:
+        if template.name not in known:
+            register_template(template.name, base=template.name, **template.sources)
+
+
+def _render_chunk_in_worker(tasks: List[CompactTask], run_time: datetime) -> List[Tuple[str, str, str]]:
+    results = []
+    for task in tasks:
+        frame = DisplayFrame.from_values(task.values, task.columns, task.index, empty=task.empty)
+        results.append(_render_frame(task.subject, frame, task.metadata, run_time, _worker_context))
+    return results
+
+
+def render_all(
+    tasks: List[RenderTask],
+    run_time: datetime,
+    context: RenderContext,
+    workers: int = 1,
+    min_batch: int = 20,
+    cache: Optional[RenderCache] = None
+) -> Tuple[List[Tuple[str, str, str]], CacheLookups]:
+    """
+    Render every task, in order, serially or on a process pool.
+
+    With a cache, tasks whose content hash is already cached are not
+    rendered at all; only the misses go through rendering. The pool is
+    only used when workers > 1 and there are at least min_batch tasks to
+    render; starting processes costs more than rendering a few small jobs.
+    If the pool cannot be used (e.g. a formatter cannot be pickled)
+    rendering falls back to serial.
+
+    Args:
+        tasks: Render tasks
+        run_time: Timestamp of this run
+        context: RenderContext for the formatters
+        workers: Maximum worker processes (1 = always serial)
+        min_batch: Smallest batch rendered on the pool
+        cache: Optional RenderCache
+
+    Returns:
+        ((subject, plain_text, html_content) per task in task order, this
+        call's cache lookups)
+
+    Raises:
+        Exception: The first rendering error (re-raised after logging)
+    """
+    if cache is None:
+        return _render_uncached(tasks, run_time, context, workers, min_batch), CacheLookups()
+
+    fingerprint = context.fingerprint
+    keys = [render_key(task.data, task.metadata, run_time, fingerprint, task.content_hash) for task in tasks]
+
+    # Look each distinct payload up once; repeats within the batch reuse it
+    cached: Dict[str, Optional[Tuple[str, str]]] = {}
+    repeats = 0
+    for key in keys:
+        if key in cached:
+            repeats += 1
+        else:
+            cached[key] = cache.get(key)
+    cache.record_hits(repeats)
+
+    misses = [key for key, bodies in cached.items() if bodies is None]
+    if len(misses) < len(tasks):
+        logger.info(f"[OK] {len(tasks) - len(misses)}/{len(tasks)} notification(s) served from render cache")
+
+    first_task = {}
+    for task, key in zip(tasks, keys):
+        first_task.setdefault(key, task)
+
+    rendered = _render_uncached([first_task[key] for key in misses], run_time, context, workers, min_batch)
+    for key, (_, plain_text, html_content) in zip(misses, rendered):
+        cache.put(key, plain_text, html_content)
+        cached[key] = (plain_text, html_content)
+
+    lookups = CacheLookups(hits=len(tasks) - len(misses), misses=len(misses))
+    return [(task.subject, *cached[key]) for task, key in zip(tasks, keys)], lookups
+
+
+def render_within_budget(
+    tasks: List[RenderTask],
+    run_time: datetime,
+    context: RenderContext,
+    budget: MessageBudget,
+    workers: int = 1,
+    min_batch: int = 20,
+    cache: Optional[RenderCache] = None,
+    stream_min_rows: int = 0
+) -> Tuple[List[Optional[Tuple[str, str, str]]], List[RenderTask], CacheLookups]:
+    """
+    Render every task with each message kept within a row and byte budget.
+
+    Tasks over the row limit are rendered with their first rows only.
+    Bodies still over the byte limit are re-rendered with proportionally
+    fewer rows (a few passes at most). Truncated tasks carry
+    metadata['total_records'] and metadata['attachment_name'], which the
+    formatters turn into a "showing N of M" note; attaching the full list
+    is up to the caller.
+
+    Tasks with at least stream_min_rows rows (when > 0) are neither
+    truncated nor rendered here; their bodies are None and the caller
+    streams every row at send time with stream_task(). Streaming keeps
+    memory flat, so neither limit applies to them.
+
+    Args:
+        tasks: Render tasks
+        run_time: Timestamp of this run
+        context: RenderContext for the formatters
+        budget: Row and byte limits per message
+        workers: Maximum worker processes (see render_all)
+        min_batch: Smallest batch rendered on the pool
+        cache: Optional RenderCache
+        stream_min_rows: Smallest task streamed instead of rendered (0 = never)
+
+    Returns:
+        ((subject, plain_text, html_content) or None per task, the tasks as
+        rendered, both in task order; cache lookups of every pass)
+    """
+    streamed = {
+        idx for idx, task in enumerate(tasks)
+        if stream_min_rows > 0 and len(task.data) >= stream_min_rows
+    }
+    rendered_tasks = [
+        task if idx in streamed else _truncate(task, budget.row_limit(len(task.data)))
+        for idx, task in enumerate(tasks)
+    ]
+    bodies: List[Optional[Tuple[str, str, str]]] = [None] * len(tasks)
+    lookups = CacheLookups()
+
+    pending = [idx for idx in range(len(tasks)) if idx not in streamed]
+    if len(pending) < len(tasks):
+        logger.info(f"[OK] {len(tasks) - len(pending)} large notification(s) will be streamed at send time")
+
+    for _ in range(_MAX_SHRINK_PASSES + 1):
+        if not pending:
+            break
+        rendered, pass_lookups = render_all(
+            [rendered_tasks[idx] for idx in pending], run_time, context, workers, min_batch, cache
+        )
+        lookups += pass_lookups
+        for idx, result in zip(pending, rendered):
+            bodies[idx] = result
+
+        oversized = [
+            idx for idx in pending
+            if len(rendered_tasks[idx].data) > 1 and not budget.fits(*bodies[idx][1:])
+        ]
+        for idx in oversized:
+            shown = budget.shrink(len(rendered_tasks[idx].data), budget.body_size(*bodies[idx][1:]))
+            rendered_tasks[idx] = _truncate(tasks[idx], shown)
+        pending = oversized
+
+    for task, rendered in zip(tasks, rendered_tasks):
+        if rendered is not task:
+            logger.info(f"[OK] '{task.subject}': showing {len(rendered.data)} of {len(task.data)} rows (message budget)")
+
+    return bodies, rendered_tasks, lookups
+
+
+def stream_task(task: RenderTask, run_time: datetime, context: RenderContext) -> Tuple[Iterator[str], Iterator[str]]:
+    """
+    Body chunk iterators for a task, for writing it straight into a message.
+
+    Both iterators share one DisplayFrame; rows are rendered a chunk at a
+    time as each iterator is consumed.
+
+    Args:
+        task: RenderTask to stream
+        run_time: Timestamp of this run
+        context: RenderContext (or AlertConfig) passed to the formatters
+
+    Returns:
+        (plain text chunks, HTML chunks)
+    """
+    frame = DisplayFrame.from_dataframe(task.data, task.metadata)
+    return (
+        context.text_formatter.iter_format(frame.source, run_time, context, task.metadata, frame=frame),
+        context.html_formatter.iter_format(frame.source, run_time, context, task.metadata, frame=frame),
+    )
+
+
+def _truncate(task: RenderTask, rows: int) -> RenderTask:
+    """Keep a task's first rows, recording the full count for the overflow note."""
+    if rows >= len(task.data):
+        return task
+    return RenderTask(
+        subject=task.subject,
+        data=task.data.iloc[:rows],
+        metadata={
+            **task.metadata,
+            'total_records': len(task.data),
+            'attachment_name': attachment_filename(task.metadata),
+        }
+    )
+
+
+def _render_uncached(
+    tasks: List[RenderTask],
+    run_time: datetime,
+    context: RenderContext,
+    workers: int,
+    min_batch: int
+) -> List[Tuple[str, str, str]]:
+    """Render tasks serially, or on a process pool for large batches."""
+    if workers > 1 and len(tasks) >= min_batch:
+        try:
+            return _render_parallel(tasks, run_time, context, workers)
+        except (BrokenProcessPool, PicklingError, OSError, TypeError, AttributeError) as e:
+            logger.warning(f"Parallel rendering unavailable ({type(e).__name__}: {e}). Rendering serially.")
+
+    results = []
+    for idx, task in enumerate(tasks, 1):
+        logger.info(f"--> Rendering notification {idx}/{len(tasks)}...")
+        try:
+            results.append(render_task(task, run_time, context))
+        except Exception as e:
+            logger.error(f"Failed to render notification {idx}: {e}")
+            raise
+    return results
+
+
+def _render_parallel(
+    tasks: List[RenderTask],
+    run_time: datetime,
+    context: RenderContext,
+    workers: int
+) -> List[Tuple[str, str, str]]:
+    """Render tasks on a process pool, preserving order."""
+    # Fail before starting processes if the formatters cannot be shipped
+    pickle.dumps(context)
+
+    workers = min(workers, len(tasks))
+    logger.info(f"--> Rendering {len(tasks)} notifications on {workers} worker processes ({_START_METHOD})...")
+
+    # A few chunks per worker keeps IPC overhead low while balancing load;
+    # only the display values of each frame are shipped
+    compact = [compact_task(task) for task in tasks]
+    chunk_size = max(1, -(-len(compact) // (workers * 4)))
+    chunks = [compact[start:start + chunk_size] for start in range(0, len(compact), chunk_size)]
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD), initializer=_init_worker, initargs=(context,)
+    ) as pool:
+        futures = [pool.submit(_render_chunk_in_worker, chunk, run_time) for chunk in chunks]
+
+        results = []
+        for idx, future in enumerate(futures):
+            try:
+                results.extend(future.result())
+            except (BrokenProcessPool, PicklingError):
+                raise
+            except Exception as e:
+                first = idx * chunk_size + 1
+                logger.error(f"Failed to render notifications {first}-{first + len(chunks[idx]) - 1}: {e}")
+                for pending in futures[idx + 1:]:
+                    pending.cancel()
+                raise RenderError(str(e)) from e
+    return results
@@ -0,0 +1,237 @@
+#src/core/routing.py
+"""
+Recipient routing: company resolution by email domain, and the
+department-to-CC routing matrix.
+
+DomainResolver maps a vessel email to its company (name, CC list)
+by looking its domain and each parent domain up in a dict of configured
+domain suffixes, once per distinct email.
+
+DepartmentCCMatrix decides which of a company's CC addresses receive a
+vessel's email, based on the departments responsible for its documents.
+Every company CC list is indexed once (username prefix -> addresses,
+alias username -> addresses); a department's CC set and a vessel's final
+CC list are then unions of precomputed frozensets, memoized per
+department and per department set.
+
+Matching rules come from config:
+- an address matches a department when the first prefix_length characters
+  of its username equal those of the department name (case-insensitive),
+  e.g. technical@ -> Technical, ops@ -> Operations
+- aliases map a department to extra usernames matched exactly,
+  e.g. {'hssqe': {'safety'}} routes safety@ to HSSQE
+"""
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CompanyRoute:
+    """Where a vessel email's company is routed."""
+    domain: str  # configured domain suffix ('' = no configured domain matched)
+    company_name: str
+    cc: Tuple[str, ...]
+
+
+class DomainResolver:
+    """
+    Resolves vessel emails to companies by domain suffix, cached per email.
+    """
+
+    def __init__(self, routes: Dict[str, CompanyRoute], default: CompanyRoute):
+        """
+        Initialize resolver.
+
+        Args:
+            routes: Lowercase domain suffix -> CompanyRoute
+            default: Route for emails outside every configured domain
+        """
+        self.routes = routes
+        self.default = default
+        self._resolved: Dict[str, CompanyRoute] = {}
+
+    @classmethod
+    def from_config(cls, config: 'AlertConfig') -> 'DomainResolver':
+        """
+        Build the resolver from config.email_routing.
+
+        Each routing entry may set 'company_name'; entries without it use
+        config.default_company_name.
+
+        Args:
+            config: AlertConfig instance
+
+        Returns:
+            DomainResolver
+        """
+        routes = {
+            domain.strip().lower(): CompanyRoute(
+                domain=domain.strip().lower(),
+                company_name=routing.get('company_name') or config.default_company_name,
+                cc=tuple(routing.get('cc', []))
+            )
+            for domain, routing in config.email_routing.items()
+        }
+        return cls(routes, CompanyRoute(domain='', company_name=config.default_company_name, cc=()))
+
+    def resolve(self, email: str) -> CompanyRoute:
+        """
+        Company route for an email address.
+
+        The domain (e.g. vsl.prominencemaritime.com) and then each parent
+        domain (prominencemaritime.com, com) is looked up until one is
+        configured.
+
+        Args:
+            email: Vessel email address
+
+        Returns:
+            The most specific configured route, or the default route
+        """
+        route = self._resolved.get(email)
+        if route is None:
+            route = self.default
+            labels = email.rpartition('@')[2].strip().lower().split('.')
+            for start in range(len(labels)):
+                suffix = '.'.join(labels[start:])
+                if suffix in self.routes:
+                    route = self.routes[suffix]
+                    break
+            self._resolved[email] = route
+        return route
+
+
+@dataclass(frozen=True)
+class _CompanyIndex:
+    """One company CC list, indexed for department lookups."""
+    by_prefix: Dict[str, FrozenSet[str]]
+    by_username: Dict[str, FrozenSet[str]]
+    everyone: FrozenSet[str]
+
+
+class DepartmentCCMatrix:
+    """
+    Resolves per-vessel CC lists from precomputed department CC sets.
+    """
+
+    def __init__(
+        self,
+        company_cc_lists: Iterable[List[str]],
+        internal_recipients: List[str],
+        department_filter: bool = True,
+        prefix_length: int = 2,
+        aliases: Optional[Dict[str, Iterable[str]]] = None
+    ):
+        """
+        Initialize matrix and index the known company CC lists.
+
+        Args:
+            company_cc_lists: CC list of every configured company
+            internal_recipients: Addresses CC'd on every email
+            department_filter: False = every company CC address, regardless of department
+            prefix_length: Username/department-name characters compared
+            aliases: Department name -> usernames that also belong to it
+        """
+        self.internal_recipients = frozenset(internal_recipients)
+        self.department_filter = department_filter
+        self.prefix_length = prefix_length
+        self.aliases = {
+            department.lower(): frozenset(username.lower() for username in usernames)
+            for department, usernames in (aliases or {}).items()
+        }
+
+        self._companies: Dict[Tuple[str, ...], _CompanyIndex] = {}
+        self._departments: Dict[Tuple[Tuple[str, ...], str], FrozenSet[str]] = {}
+        self._resolved: Dict[Tuple[Tuple[str, ...], FrozenSet[str]], Tuple[str, ...]] = {}
+        for cc_list in company_cc_lists:
+            self._index(tuple(cc_list))
+
+    @classmethod
+    def from_config(cls, config: 'AlertConfig') -> 'DepartmentCCMatrix':
+        """
+        Build the matrix for the configured companies and matching rules.
+
+        Args:
+            config: AlertConfig instance
+
+        Returns:
+            DepartmentCCMatrix
+        """
+        return cls(
+            company_cc_lists=[routing.get('cc', []) for routing in config.email_routing.values()],
+            internal_recipients=config.internal_recipients,
+            department_filter=config.department_specific_cc_recipients_filter,
+            prefix_length=config.department_cc_prefix_length,
+            aliases=config.department_cc_aliases
+        )
+
+    def resolve(self, cc_list: List[str], department_names: Iterable[str]) -> List[str]:
+        """
+        CC list for one vessel's email.
+
+        Args:
+            cc_list: Company CC list the vessel belongs to
+            department_names: Departments responsible for the vessel's documents
+
+        Returns:
+            Sorted CC addresses: company addresses of those departments (or all,
+            with the filter off) plus the internal recipients
+        """
+        company_key = tuple(cc_list)
+        departments = frozenset(department_names) if self.department_filter else frozenset()
+        key = (company_key, departments)
+
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            company = self._index(company_key)
+            if self.department_filter:
+                matched = frozenset().union(*(self.department_cc(company_key, name) for name in departments))
+            else:
+                matched = company.everyone
+            resolved = tuple(sorted(matched | self.internal_recipients))
+            self._resolved[key] = resolved
+        return list(resolved)
+
+    def department_cc(self, cc_list: Tuple[str, ...], department_name: str) -> FrozenSet[str]:
+        """
+        Company CC addresses that belong to one department.
+
+        Args:
+            cc_list: Company CC list (as a tuple)
+            department_name: Department name as it appears in the data
+
+        Returns:
+            Matching addresses
+        """
+        key = (cc_list, department_name)
+        addresses = self._departments.get(key)
+        if addresses is None:
+            company = self._index(cc_list)
+            name = department_name.lower()
+            addresses = company.by_prefix.get(name[:self.prefix_length], frozenset()).union(
+                *(company.by_username.get(username, frozenset()) for username in self.aliases.get(name, ()))
+            )
+            self._departments[key] = addresses
+            logger.debug(f"Department '{department_name}' -> {len(addresses)} CC address(es)")
+        return addresses
+
+    def _index(self, cc_list: Tuple[str, ...]) -> _CompanyIndex:
+        """Index a company CC list by username prefix and username (once)."""
+        company = self._companies.get(cc_list)
+        if company is None:
+            by_prefix: Dict[str, set] = {}
+            by_username: Dict[str, set] = {}
+            for email in cc_list:
+                username = email.strip().split('@')[0].lower()
+                by_prefix.setdefault(username[:self.prefix_length], set()).add(email)
+                by_username.setdefault(username, set()).add(email)
+            company = _CompanyIndex(
+                by_prefix={prefix: frozenset(emails) for prefix, emails in by_prefix.items()},
+                by_username={username: frozenset(emails) for username, emails in by_username.items()},
+                everyone=frozenset(cc_list)
+            )
+            self._companies[cc_list] = company
+        return company
@@ -2,39 +2,70 @@
 """
 Scheduling system for running alerts at regular intervals.
 
-Handles graceful shutdown, error recovery, and interval-based execution.
+Handles graceful shutdown, error recovery, interval-based execution and
+digests sent at fixed times of day. Alerts of a cycle run one after the
+other, or concurrently on daemon threads (ALERT_CONCURRENCY) with an
+optional per-alert timeout (ALERT_TIMEOUT_SECONDS).
 """
+import contextvars
 import signal
 import threading
+import time
 import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from datetime import datetime, timedelta
+from src.core.fetch_cache import fetch_cycle
 from src.formatters.date_formatter import duration
 from zoneinfo import ZoneInfo
-from typing import Callable, List
-import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# How often a concurrent cycle checks for shutdown and timeouts while alerts run
+_POLL_SECONDS = 0.5
+
 
 class AlertScheduler:
     """
     Scheduler for running alerts at regular intervals.
     
-    Supports graceful shutdown, multiple alerts, and error recovery.
+    Supports graceful shutdown, multiple alerts, error recovery and
+    scheduled digests (e.g. end of day).
     """
     
-    def __init__(self, frequency_hours: float, timezone: str):
+    def __init__(
+        self,
+        frequency_hours: float,
+        timezone: str,
+        digest_times: Optional[List[str]] = None,
+        max_concurrency: int = 1,
+        alert_timeout: Optional[float] = None
+    ):
         """
         Initialize scheduler.
         
         Args:
             frequency_hours: Hours between alert runs
             timezone: Timezone for scheduling and logging
+            digest_times: Times of day ("HH:MM") at which registered digests are sent
+            max_concurrency: Alerts run at the same time (1 = one after the other)
+            alert_timeout: Seconds after which the cycle stops waiting for an alert
+                (None = wait until it finishes)
         """
         self.frequency_hours = frequency_hours
         self.timezone = ZoneInfo(timezone)
         self.shutdown_event = threading.Event()
         self._alerts: List[Callable] = []
+        self._digests: List[Callable] = []
+        self.digest_times = [datetime.strptime(t, '%H:%M').time() for t in (digest_times or [])]
+        self._last_digest_slot: Optional[datetime] = None
+        self.max_concurrency = max(1, max_concurrency)
+        self.alert_timeout = alert_timeout or None
+        # Alert index -> run abandoned after its timeout, not started again until it ends
+        self._in_flight: Dict[int, Future] = {}
+        # Outcome per registered alert in the last cycle: ok, error, timeout, skipped, not started
+        self.last_outcomes: List[str] = []
         
         # Register signal handlers for graceful shutdown
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -55,25 +86,206 @@ class AlertScheduler:
         self._alerts.append(alert_runner)
         logger.info(f"Registered alert: {alert_runner.__name__ if hasattr(alert_runner, '__name__') else 'anonymous'}")
     
+    def register_digest(self, digest_runner: Callable) -> None:
+        """
+        Register a digest sender to be run at each digest time.
+        
+        Args:
+            digest_runner: Callable that sends queued digests (typically alert.send_digest)
+        """
+        self._digests.append(digest_runner)
+        logger.info(f"Registered digest: {digest_runner.__name__ if hasattr(digest_runner, '__name__') else 'anonymous'}")
+    
     def _run_all_alerts(self) -> None:
-        """Execute all registered alerts."""
+        """Execute all registered alerts (sharing query results within the cycle)."""
         if not self._alerts:
             logger.warning("No alerts registered. Nothing to run.")
             return
         
         logger.info(f"Running {len(self._alerts)} alert(s)...")
+        self.last_outcomes = ['not started'] * len(self._alerts)
         
-        for idx, alert_runner in enumerate(self._alerts, 1):
-            if self.shutdown_event.is_set():
-                logger.info("Shutdown requested. Stopping alert execution.")
+        with fetch_cycle():
+            if self.max_concurrency > 1 or self.alert_timeout is not None:
+                self._run_concurrently()
+                return
+
+            for idx, alert_runner in enumerate(self._alerts, 1):
+                if self.shutdown_event.is_set():
+                    logger.info("Shutdown requested. Stopping alert execution.")
+                    break
+                
+                logger.info(f"Executing alert {idx}/{len(self._alerts)}...")
+                self.last_outcomes[idx - 1] = self._run_alert(idx, alert_runner)
+    
+    def _run_alert(self, idx: int, alert_runner: Callable) -> str:
+        """
+        Run one alert, containing its errors.
+        
+        Args:
+            idx: 1-based alert number
+            alert_runner: Registered callable
+            
+        Returns:
+            'ok' or 'error'
+        """
+        try:
+            alert_runner()
+            return 'ok'
+        except Exception as e:
+            logger.exception(f"Error executing alert {idx}: {e}")
+            # Continue with next alert despite error
+            return 'error'
+    
+    def _run_concurrently(self) -> None:
+        """
+        Run the cycle's alerts on threads, at most max_concurrency at once.
+        
+        Each alert runs on its own daemon thread in a copy of the cycle's
+        context (sharing its fetch cache) with its own errors contained. An
+        alert still running after
+        alert_timeout is abandoned: the cycle stops waiting for it, frees its
+        slot and does not start it again until that run has ended. On shutdown,
+        queued alerts are not started and running ones are allowed to finish
+        (within their timeout), so no run is cut off between sending and
+        tracking. Abandoned runs are daemon threads, so they never keep the
+        process (e.g. --run-once) alive once the scheduler returns.
+        """
+        queue = deque(enumerate(self._alerts, 1))
+        # Future -> (alert number, started at, deadline or None)
+        running: Dict[Future, Tuple[int, float, Optional[float]]] = {}
+        started = time.monotonic()
+        
+        while queue or running:
+            if self.shutdown_event.is_set() and queue:
+                logger.info(f"Shutdown requested. {len(queue)} queued alert(s) not started; "
+                            f"waiting for {len(running)} running alert(s)...")
+                queue.clear()
+            
+            while queue and len(running) < self.max_concurrency:
+                idx, alert_runner = queue.popleft()
+                previous = self._in_flight.get(idx)
+                if previous is not None and not previous.done():
+                    logger.warning(f"Alert {idx} is still running from an earlier cycle. Skipping it this cycle.")
+                    self.last_outcomes[idx - 1] = 'skipped'
+                    continue
+                self._in_flight.pop(idx, None)
+                
+                logger.info(f"Executing alert {idx}/{len(self._alerts)} (concurrent)...")
+                now = time.monotonic()
+                future = self._start_alert(idx, alert_runner)
+                running[future] = (idx, now, now + self.alert_timeout if self.alert_timeout else None)
+            
+            if not running:
                 break
             
+            done, _ = wait(running, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for future in done:
+                idx, alert_started, _ = running.pop(future)
+                self.last_outcomes[idx - 1] = future.result()
+                logger.info(f"[OK] Alert {idx} finished in {now - alert_started:.1f}s")
+            
+            for future, (idx, _, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    logger.error(
+                        f"Alert {idx} exceeded ALERT_TIMEOUT_SECONDS={self.alert_timeout:g}. "
+                        f"No longer waiting for it; it will not start again until it ends."
+                    )
+                    self._in_flight[idx] = future
+                    self.last_outcomes[idx - 1] = 'timeout'
+                    del running[future]
+        
+        logger.info(f"[OK] Alert cycle finished in {time.monotonic() - started:.1f}s")
+    
+    def _start_alert(self, idx: int, alert_runner: Callable) -> Future:
+        """
+        Run one alert on a daemon thread in a copy of the current context.
+        
+        Args:
+            idx: 1-based alert number
+            alert_runner: Registered callable
+            
+        Returns:
+            Future resolved with the outcome of _run_alert()
+        """
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        context = contextvars.copy_context()
+        
+        def target():
             try:
-                logger.info(f"Executing alert {idx}/{len(self._alerts)}...")
-                alert_runner()
+                future.set_result(context.run(self._run_alert, idx, alert_runner))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=target, name=f'alert-{idx}', daemon=True).start()
+        return future
+    
+    def run_digests(self) -> None:
+        """Send all registered digests now."""
+        if not self._digests:
+            logger.info("No digests registered. Nothing to send.")
+            return
+        
+        logger.info(f"Sending {len(self._digests)} digest(s)...")
+        
+        for idx, digest_runner in enumerate(self._digests, 1):
+            try:
+                digest_runner()
             except Exception as e:
-                logger.exception(f"Error executing alert {idx}: {e}")
-                # Continue with next alert despite error
+                logger.exception(f"Error sending digest {idx}: {e}")
+    
+    def _next_digest_time(self, after: datetime) -> Optional[datetime]:
+        """
+        Next configured digest slot strictly after `after` (and the last slot sent).
+        
+        Args:
+            after: Reference time (timezone-aware)
+            
+        Returns:
+            Timezone-aware datetime, or None if no digest times/digests configured
+        """
+        if not self.digest_times or not self._digests:
+            return None
+        
+        if self._last_digest_slot is not None and self._last_digest_slot > after:
+            after = self._last_digest_slot
+        
+        candidates = []
+        for slot in self.digest_times:
+            candidate = datetime.combine(after.date(), slot, tzinfo=self.timezone)
+            if candidate <= after:
+                candidate = datetime.combine(after.date() + timedelta(days=1), slot, tzinfo=self.timezone)
+            candidates.append(candidate)
+        return min(candidates)
+    
+    def _sleep_until(self, next_run: datetime) -> bool:
+        """
+        Sleep until next_run, sending digests whenever a digest time falls in between.
+        
+        Args:
+            next_run: When the next alert cycle is due
+            
+        Returns:
+            True if shutdown was requested while sleeping
+        """
+        while True:
+            now = datetime.now(tz=self.timezone)
+            next_digest = self._next_digest_time(now)
+            wake_at = min(next_run, next_digest) if next_digest else next_run
+            
+            # Use shutdown_event.wait() for interruptible sleep
+            if self.shutdown_event.wait(timeout=max(0.0, (wake_at - now).total_seconds())):
+                return True
+            
+            if next_digest is not None and wake_at == next_digest:
+                self._last_digest_slot = next_digest
+                logger.info(f"Digest time reached: {next_digest.strftime('%Y-%m-%d %H:%M %Z')}")
+                self.run_digests()
+            
+            if datetime.now(tz=self.timezone) >= next_run:
+                return False
     
     def run_once(self) -> None:
         """
@@ -103,6 +315,8 @@ class AlertScheduler:
         logger.info(f"Frequency: Every {duration(self.frequency_hours)}")
         logger.info(f"Timezone: {self.timezone}")
         logger.info(f"Registered alerts: {len(self._alerts)}")
+        if self._digests and self.digest_times:
+            logger.info(f"Digests: {len(self._digests)} at {', '.join(t.strftime('%H:%M') for t in self.digest_times)}")
         logger.info("=" * 60)
         
         while not self.shutdown_event.is_set():
@@ -115,14 +329,16 @@ class AlertScheduler:
                     break
                 
                 # Calculate next run time
-                sleep_seconds = self.frequency_hours * 3600
                 next_run = datetime.now(tz=self.timezone) + timedelta(hours=self.frequency_hours)
                 
                 logger.info(f"Sleeping for {duration(self.frequency_hours)}")
                 logger.info(f"Next run scheduled at: {next_run.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+                next_digest = self._next_digest_time(datetime.now(tz=self.timezone))
+                if next_digest is not None and next_digest < next_run:
+                    logger.info(f"Next digest scheduled at: {next_digest.strftime('%Y-%m-%d %H:%M:%S %Z')}")
                 
-                # Use shutdown_event.wait() for interruptible sleep
-                if self.shutdown_event.wait(timeout=sleep_seconds):
+                # Interruptible sleep (sends digests falling due in the meantime)
+                if self._sleep_until(next_run):
                     logger.info("Shutdown requested during sleep period")
                     break
             
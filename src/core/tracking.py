@@ -3,19 +3,25 @@
 Event tracking system for preventing duplicate notifications.
 
 Tracks which events have been sent and when, with automatic cleanup
-of old entries based on reminder frequency.
+of old entries based on reminder frequency. One tracker is shared by
+every alert the scheduler runs concurrently, so all access to the
+tracked events goes through a lock.
 """
 import json
+import threading
 import tempfile
 import shutil
 import os
 from pathlib import Path
-from typing import Dict, Set, Callable, Optional
+from typing import TYPE_CHECKING, Dict, List, Set, Callable, Optional
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-import pandas as pd
 import logging
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from src.core.records import RecordSet
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,6 +47,7 @@ class EventTracker:
         self.reminder_frequency_days = reminder_frequency_days
         self.timezone = ZoneInfo(timezone)
         self.sent_events: Dict[str, str] = {}  # key -> timestamp
+        self._lock = threading.Lock()
 
         # Load existing tracking data
         self._load()
@@ -131,6 +138,8 @@ class EventTracker:
     def _save(self) -> None:
         """
         Save sent events to JSON file using atomic write to prevent corruption.
+
+        Callers other than _load() must hold self._lock.
         """
         try:
             data = {
@@ -167,15 +176,18 @@ class EventTracker:
 
     def filter_unsent_events(
         self,
-        df: pd.DataFrame,
-        key_func: Callable[[pd.Series], str]
-    ) -> pd.DataFrame:
+        df: 'pd.DataFrame',
+        key_func: Callable[['pd.Series'], str],
+        namespaces: Optional[List[str]] = None
+    ) -> 'pd.DataFrame':
         """
         Filter DataFrame to only include events that haven't been sent.
 
         Args:
             df: DataFrame to filter
             key_func: Function that generates tracking key from a DataFrame row
+            namespaces: Channel tracking namespaces ('' = bare keys). A row is kept
+                if it is unsent in at least one of them. Default: bare keys only.
 
         Returns:
             Filtered DataFrame with only unsent events
@@ -183,11 +195,18 @@ class EventTracker:
         if df.empty:
             return df
 
+        import pandas as pd
+
         # Generate tracking keys for all rows
         tracking_keys = df.apply(key_func, axis=1)
 
-        # Filter out already-sent events
-        unsent_mask = ~tracking_keys.isin(self.sent_events.keys())
+        # Filter out events already sent on every channel
+        with self._lock:
+            sent = set(self.sent_events)
+        unsent_mask = pd.Series(False, index=df.index)
+        for namespace in (namespaces or ['']):
+            prefix = f"{namespace}:" if namespace else ''
+            unsent_mask |= ~(prefix + tracking_keys).isin(sent)
         unsent_df = df[unsent_mask].copy()
 
         filtered_count = len(df) - len(unsent_df)
@@ -199,6 +218,59 @@ class EventTracker:
 
         return unsent_df
 
+    def filter_unsent_records(
+        self,
+        records: 'RecordSet',
+        key_func: Callable[[Dict], str],
+        namespaces: Optional[List[str]] = None
+    ) -> 'RecordSet':
+        """
+        Row-based counterpart of filter_unsent_events() for small runs.
+
+        Args:
+            records: RecordSet to filter
+            key_func: Function that generates tracking key from a row mapping
+            namespaces: Channel tracking namespaces, as in filter_unsent_events()
+
+        Returns:
+            RecordSet with only unsent events
+        """
+        prefixes = [f"{namespace}:" if namespace else '' for namespace in (namespaces or [''])]
+        keys = [key_func(row) for row in records.mappings()]
+        with self._lock:
+            sent = set(self.sent_events)
+        unsent = records.select(
+            any(prefix + key not in sent for prefix in prefixes) for key in keys
+        )
+
+        filtered_count = len(records) - len(unsent)
+        if filtered_count > 0:
+            logger.info(
+                f"Filtered out {filtered_count} previously sent event(s). "
+                f"{len(unsent)} new event(s) remain."
+            )
+
+        return unsent
+
+    def sent_keys(self, namespaces: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        """
+        Sent keys per channel namespace, for membership checks outside pandas
+        (e.g. the Polars engine).
+
+        Args:
+            namespaces: Channel tracking namespaces, as in filter_unsent_events()
+
+        Returns:
+            Namespace -> keys sent in it (without the namespace prefix)
+        """
+        with self._lock:
+            sent = list(self.sent_events)
+        keys = {}
+        for namespace in (namespaces or ['']):
+            prefix = f"{namespace}:" if namespace else ''
+            keys[namespace] = {key[len(prefix):] for key in sent if key.startswith(prefix)}
+        return keys
+
     def mark_as_sent(self, event_keys: Set[str], timestamp: datetime) -> None:
         """
         Mark events as sent and persist to disk.
@@ -209,11 +281,11 @@ class EventTracker:
         """
         timestamp_str = timestamp.isoformat()
 
-        for key in event_keys:
-            self.sent_events[key] = timestamp_str
-
         logger.info(f"Marking {len(event_keys)} event(s) as sent at {timestamp_str}")
-        self._save()
+        with self._lock:
+            for key in event_keys:
+                self.sent_events[key] = timestamp_str
+            self._save()
 
     def is_sent(self, event_key: str) -> bool:
         """
@@ -225,7 +297,8 @@ class EventTracker:
         Returns:
             True if event was sent within reminder frequency window
         """
-        return event_key in self.sent_events
+        with self._lock:
+            return event_key in self.sent_events
 
     def get_sent_timestamp(self, event_key: str) -> Optional[datetime]:
         """
@@ -237,7 +310,8 @@ class EventTracker:
         Returns:
             Datetime when event was sent, or None if not sent
         """
-        timestamp_str = self.sent_events.get(event_key)
+        with self._lock:
+            timestamp_str = self.sent_events.get(event_key)
         if timestamp_str:
             try:
                 return datetime.fromisoformat(timestamp_str)
@@ -247,6 +321,7 @@ class EventTracker:
 
     def clear(self) -> None:
         """Clear all tracking data (useful for testing)."""
-        self.sent_events = {}
-        self._save()
+        with self._lock:
+            self.sent_events = {}
+            self._save()
         logger.info("Cleared all tracking data")
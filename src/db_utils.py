@@ -2,25 +2,98 @@
 import os
 from decouple import config
 from contextlib import contextmanager
-from sshtunnel import SSHTunnelForwarder
-from sqlalchemy import create_engine, text
-import pandas as pd
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
 from pathlib import Path
 import re
 
-# Load .env
-SSH_HOST = config('SSH_HOST', default=None)
-SSH_PORT = config('SSH_PORT', default=22, cast=int)
-SSH_USER = config('SSH_USER', default='prominence')
-SSH_KEY_PATH = os.path.expanduser(config('SSH_KEY_PATH', default=''))
+# pandas, SQLAlchemy and sshtunnel are imported on first use
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class DBSettings:
+    """Database and SSH tunnel settings."""
+    db_host: str
+    db_port: int
+    db_name: str
+    db_user: str
+    db_pass: str
+    use_ssh_tunnel: bool = False
+    ssh_host: Optional[str] = None
+    ssh_port: int = 22
+    ssh_user: str = 'prominence'
+    ssh_key_path: str = ''
+
+    @classmethod
+    def from_env(cls) -> 'DBSettings':
+        """
+        Load settings from environment variables / .env.
+
+        Raises
+        ------
+        decouple.UndefinedValueError
+            If DB_HOST, DB_PORT, DB_NAME, DB_USER or DB_PASS is not set.
+        """
+        return cls(
+            db_host=config('DB_HOST'),
+            db_port=config('DB_PORT', cast=int),
+            db_name=config('DB_NAME'),
+            db_user=config('DB_USER'),
+            db_pass=config('DB_PASS'),
+            use_ssh_tunnel=config('USE_SSH_TUNNEL', default=False, cast=bool),
+            ssh_host=config('SSH_HOST', default=None),
+            ssh_port=config('SSH_PORT', default=22, cast=int),
+            ssh_user=config('SSH_USER', default='prominence'),
+            ssh_key_path=os.path.expanduser(config('SSH_KEY_PATH', default='')),
+        )
+
+    def connection_string(self, host: str, port: int) -> str:
+        """PostgreSQL URL for the database reached at host:port."""
+        return f"postgresql://{self.db_user}:{self.db_pass}@{host}:{port}/{self.db_name}"
+
+    def tunnel(self):
+        """SSH tunnel forwarding a local port to the database."""
+        from sshtunnel import SSHTunnelForwarder
+        if not os.path.exists(self.ssh_key_path):
+            raise FileNotFoundError(f"SSH key not found: {self.ssh_key_path}")
+        return SSHTunnelForwarder(
+            (self.ssh_host, self.ssh_port),
+            ssh_username=self.ssh_user,
+            ssh_private_key=self.ssh_key_path,
+            remote_bind_address=(self.db_host, self.db_port)
+        )
 
-DB_HOST = config('DB_HOST')
-DB_PORT = config('DB_PORT', cast=int)
-DB_NAME = config('DB_NAME')
-DB_USER = config('DB_USER')
-DB_PASS = config('DB_PASS')
 
-USE_SSH_TUNNEL = config('USE_SSH_TUNNEL', default=False, cast=bool)
+_settings: Optional[DBSettings] = None
+
+
+def init_db(settings: Optional[DBSettings] = None) -> DBSettings:
+    """
+    Set the database settings used by this module.
+
+    Called once at startup (src.main); functions called before that load
+    the settings from the environment themselves.
+
+    Parameters
+    ----------
+    settings : DBSettings, optional
+        Settings to use. Default: DBSettings.from_env().
+
+    Returns
+    -------
+    DBSettings
+        The active settings.
+    """
+    global _settings
+    _settings = settings if settings is not None else DBSettings.from_env()
+    return _settings
+
+
+def get_db_settings() -> DBSettings:
+    """Active database settings (loaded from the environment on first use)."""
+    return _settings if _settings is not None else init_db()
 
 
 def validate_query_file(query_path: Path) -> str:
@@ -70,7 +143,7 @@ def validate_query_file(query_path: Path) -> str:
        return f.read()
 
 
-def query_to_df(query: str, display_all: bool=True, local: bool=False) -> pd.DataFrame:
+def query_to_df(query: str, display_all: bool=True, local: bool=False) -> 'pd.DataFrame':
     """
     Execute SQL query and return results as a pandas DataFrame.
 
@@ -121,6 +194,9 @@ def query_to_df(query: str, display_all: bool=True, local: bool=False) -> pd.Dat
     - SSH tunnel automatically closes after query execution via context manager
     - Display options affect the global pandas display settings for the session
     """
+    import pandas as pd
+    from sqlalchemy import create_engine
+
     if display_all:
         pd.set_option('display.max_rows', None)
         pd.set_option('display.max_columns', None)
@@ -135,27 +211,13 @@ def query_to_df(query: str, display_all: bool=True, local: bool=False) -> pd.Dat
         import duckdb
         df = duckdb.query(query).to_df()
         return df
-    if USE_SSH_TUNNEL and SSH_HOST and SSH_KEY_PATH:
-        if not os.path.exists(SSH_KEY_PATH):
-            raise FileNotFoundError(f'SSH key not found: {SSH_KEY_PATH}')
-        with SSHTunnelForwarder(
-                (SSH_HOST, SSH_PORT),
-                ssh_username=SSH_USER,
-                ssh_private_key=SSH_KEY_PATH,
-                remote_bind_address=(DB_HOST, DB_PORT)
-            ) as tunnel:
-            connection_string = (
-                    f"postgresql://{DB_USER}:{DB_PASS}@"
-                    f"localhost:{tunnel.local_bind_port}/{DB_NAME}"
-            )
-            engine = create_engine(connection_string)
+    settings = get_db_settings()
+    if settings.use_ssh_tunnel and settings.ssh_host and settings.ssh_key_path:
+        with settings.tunnel() as tunnel:
+            engine = create_engine(settings.connection_string('localhost', tunnel.local_bind_port))
             return pd.read_sql(query, engine)
     else:
-        connection_string = (
-                f"postgresql://{DB_USER}:{DB_PASS}@"
-                f"{DB_HOST}:{DB_PORT}/{DB_NAME}"
-        )
-        engine = create_engine(connection_string)
+        engine = create_engine(settings.connection_string(settings.db_host, settings.db_port))
         return pd.read_sql(query, engine)
 
 @contextmanager
@@ -202,31 +264,19 @@ def get_db_connection():
     - This is the preferred method for executing multiple queries or transactions
       that need to share a connection
     """
-    if USE_SSH_TUNNEL and SSH_HOST:
-        if not os.path.exists(SSH_KEY_PATH):
-            raise FileNotFoundError(f"SSH key not found: {SSH_KEY_PATH}")
-        with SSHTunnelForwarder(
-                (SSH_HOST, SSH_PORT),
-                ssh_username=SSH_USER,
-                ssh_private_key=SSH_KEY_PATH,
-                remote_bind_address=(DB_HOST, DB_PORT)
-        ) as tunnel:
-            connection_string = (
-                    f"postgresql://{DB_USER}:{DB_PASS}@"
-                    f"localhost:{tunnel.local_bind_port}/{DB_NAME}"
-            )
-            engine = create_engine(connection_string)
+    from sqlalchemy import create_engine
+
+    settings = get_db_settings()
+    if settings.use_ssh_tunnel and settings.ssh_host:
+        with settings.tunnel() as tunnel:
+            engine = create_engine(settings.connection_string('localhost', tunnel.local_bind_port))
             conn = engine.connect()
             try:
                 yield conn
             finally:
                 conn.close()
     else:
-        connection_string = (
-                f"postgresql://{DB_USER}:{DB_PASS}@"
-                f"{DB_HOST}:{DB_PORT}/{DB_NAME}"
-        )
-        engine = create_engine(connection_string)
+        engine = create_engine(settings.connection_string(settings.db_host, settings.db_port))
         conn = engine.connect()
         try:
             yield conn
@@ -270,28 +320,16 @@ def check_db_connection() -> bool:
     - Error messages are printed to stdout for debugging purposes
     """
     try:
-        if USE_SSH_TUNNEL and SSH_HOST and SSH_KEY_PATH:
-            if not os.path.exists(SSH_KEY_PATH):
-                raise FileNotFoundError(f"SSH key not found: {SSH_KEY_PATH}")
-            with SSHTunnelForwarder(
-                    (SSH_HOST, SSH_PORT),
-                    ssh_username=SSH_USER,
-                    ssh_private_key=SSH_KEY_PATH,
-                    remote_bind_address=(DB_HOST, DB_PORT)
-            ) as tunnel:
-                connection_string = (
-                        f"postgresql://{DB_USER}:{DB_PASS}@"
-                        f"localhost:{tunnel.local_bind_port}/{DB_NAME}"
-                )
-                engine = create_engine(connection_string)
+        from sqlalchemy import create_engine, text
+
+        settings = get_db_settings()
+        if settings.use_ssh_tunnel and settings.ssh_host and settings.ssh_key_path:
+            with settings.tunnel() as tunnel:
+                engine = create_engine(settings.connection_string('localhost', tunnel.local_bind_port))
                 with engine.connect() as conn:
                     conn.execute(text("SELECT 1"))
         else:
-            connection_string = (
-                    f"postgresql://{DB_USER}:{DB_PASS}@"
-                    f"{DB_HOST}:{DB_PORT}/{DB_NAME}"
-            )
-            engine = create_engine(connection_string)
+            engine = create_engine(settings.connection_string(settings.db_host, settings.db_port))
             with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
         return True
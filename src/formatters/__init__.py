@@ -1,6 +1,14 @@
-#src/formatters/__init__.py
 """Email content formatters."""
-from .html_formatter import HTMLFormatter
-from .text_formatter import TextFormatter
+from src.utils.lazy import lazy_exports
 
-__all__ = ['HTMLFormatter', 'TextFormatter']
+__all__ = ['HTMLFormatter', 'TextFormatter', 'DisplayFrame', 'EmailTemplate', 'get_template', 'register_template']
+
+# Imported on first use (see src.utils.lazy)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'HTMLFormatter': '.html_formatter',
+    'TextFormatter': '.text_formatter',
+    'DisplayFrame': '.display_frame',
+    'EmailTemplate': '.templates',
+    'get_template': '.templates',
+    'register_template': '.templates',
+})
@@ -0,0 +1,72 @@
+#src/formatters/cells.py
+"""
+Column-wise cell stringification shared by the formatters.
+
+Converts whole display columns to strings at once instead of creating a
+Series per row with iterrows(), so large tables render in linear time.
+"""
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+
+def display_values(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    Take display columns as DataFrame.iterrows() exposes them.
+
+    Values are read through the whole frame's common dtype (e.g. an int
+    column next to text columns stays int; in an all-numeric frame it is
+    upcast to float), which is what the original row-by-row rendering saw.
+
+    Args:
+        df: DataFrame with data to display
+        columns: Columns to take (must exist in df)
+
+    Returns:
+        2-D array, one row per DataFrame row and one column per display column
+    """
+    positions = {col: idx for idx, col in enumerate(df.columns)}
+    return df.to_numpy()[:, [positions[col] for col in columns]]
+
+
+def value_strings(values: np.ndarray, na_rep: Optional[str] = '') -> List[List[Optional[str]]]:
+    """
+    Convert a 2-D array of display values to lists of cell strings.
+
+    Args:
+        values: Array from display_values()
+        na_rep: String used for None/NaN/NaT cells (None keeps them as None)
+
+    Returns:
+        One list of cell strings per column, in row order
+    """
+    result = []
+    for idx in range(values.shape[1]):
+        column = values[:, idx]
+        missing = pd.isna(column)
+        if missing.any():
+            result.append([na_rep if is_na else str(v) for v, is_na in zip(column, missing)])
+        else:
+            result.append(list(map(str, column)))
+    return result
+
+
+def column_strings(df: pd.DataFrame, columns: List[str], na_rep: Optional[str] = '') -> List[List[Optional[str]]]:
+    """
+    Convert display columns to lists of cell strings.
+
+    Cells are read exactly as DataFrame.iterrows() exposes them (through the
+    frame's common dtype), so the result matches str(value) per row.
+
+    Args:
+        df: DataFrame with data to display
+        columns: Columns to convert (must exist in df)
+        na_rep: String used for None/NaN/NaT cells (None keeps them as None)
+
+    Returns:
+        One list of cell strings per column, in row order
+    """
+    if df.empty or not columns:
+        return [[] for _ in columns]
+
+    return value_strings(display_values(df, columns), na_rep)
@@ -1,19 +1,20 @@
 #src/date_formatter.py
-from datetime import datetime
-import pandas as pd
+from datetime import datetime, timedelta
 
 
 def duration(hours: float) -> str:
-    td = pd.Timedelta(hours=hours).components
+    td = timedelta(hours=hours)
+    td_hours, remainder = divmod(td.seconds, 3600)
+    td_minutes, td_seconds = divmod(remainder, 60)
 
     parts = []
     if td.days:
         parts.append(f"{td.days}d")
-    if td.hours:
-        parts.append(f"{td.hours}h")
-    if td.minutes:
-        parts.append(f"{td.minutes}m")
-    if td.seconds:
-        parts.append(f"{td.seconds}s")
+    if td_hours:
+        parts.append(f"{td_hours}h")
+    if td_minutes:
+        parts.append(f"{td_minutes}m")
+    if td_seconds:
+        parts.append(f"{td_seconds}s")
 
     return " ".join(parts)
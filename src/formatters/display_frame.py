@@ -0,0 +1,119 @@
+#src/formatters/display_frame.py
+"""
+Display-ready view of a notification job's data.
+
+Built once per job and shared by the HTML and text formatters, so column
+selection, NA handling, stringification and header title-casing happen
+in a single pass instead of once per output format. Cells are stringified
+on demand: the whole frame at most once (cached for both formatters), or
+a slice of rows at a time when a body is streamed, so streaming never
+holds more than one chunk of cell strings.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from src.formatters.cells import column_strings
+
+# Rows rendered per chunk when formatters stream a body (iter_format)
+STREAM_CHUNK_ROWS = 500
+
+
+@dataclass(frozen=True)
+class DisplayFrame:
+    """
+    Normalised display columns of a DataFrame.
+
+    Attributes:
+        columns: Display columns present in the data, in display order
+        headers: Title-cased header for each column
+        index: Row labels of the source DataFrame
+        source: The DataFrame the frame was built from
+        empty: Whether the source DataFrame was empty
+    """
+    columns: List[str]
+    headers: List[str]
+    index: Sequence
+    source: pd.DataFrame
+    empty: bool
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, metadata: Optional[Dict] = None) -> 'DisplayFrame':
+        """
+        Build the display frame for a job.
+
+        Args:
+            df: DataFrame with data to display
+            metadata: Optional metadata; display_columns selects and orders columns
+
+        Returns:
+            DisplayFrame ready for rendering
+        """
+        metadata = metadata or {}
+
+        # Determine which columns to display
+        display_columns = metadata.get('display_columns', list(df.columns))
+        # Filter to only columns that exist in the dataframe
+        display_columns = [col for col in display_columns if col in df.columns]
+
+        return cls(
+            columns=display_columns,
+            headers=[col.replace('_', ' ').title() for col in display_columns],
+            index=df.index,
+            source=df,
+            empty=df.empty
+        )
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, columns: List[str], index: List, empty: Optional[bool] = None) -> 'DisplayFrame':
+        """
+        Build the display frame from already-extracted display values.
+
+        Used where only display_values() of a job was shipped (render workers).
+
+        Args:
+            values: 2-D array from display_values()
+            columns: Display column names, in order
+            index: Row labels
+            empty: Whether the original DataFrame was empty (default: no rows)
+
+        Returns:
+            DisplayFrame ready for rendering
+        """
+        return cls(
+            columns=list(columns),
+            headers=[col.replace('_', ' ').title() for col in columns],
+            index=list(index),
+            source=pd.DataFrame(values, index=index, columns=columns),
+            empty=len(index) == 0 if empty is None else empty
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @cached_property
+    def cells(self) -> List[List[Optional[str]]]:
+        """One list per column of cell strings for every row (None = missing value)."""
+        return column_strings(self.source, self.columns, na_rep=None)
+
+    def column_values(self, na_rep: str, start: int = 0, stop: Optional[int] = None) -> List[List[str]]:
+        """
+        Cell strings per column with missing values replaced, for a range of rows.
+
+        The full range comes from the shared cells; a partial range is
+        stringified from the source rows alone (the source's dtypes, and so
+        the cell strings, are the same either way).
+
+        Args:
+            na_rep: Replacement for missing cells
+            start: First row
+            stop: Row after the last (None = to the end)
+
+        Returns:
+            One list of strings per column
+        """
+        if start <= 0 and (stop is None or stop >= len(self)):
+            return [[na_rep if value is None else value for value in values] for values in self.cells]
+        return column_strings(self.source.iloc[start:stop], self.columns, na_rep=na_rep)
@@ -3,28 +3,97 @@
 HTML email formatter with rich styling and company branding.
 
 Generates professional HTML emails with embedded logos, tables,
-and responsive design.
+and responsive design. The layout comes from the precompiled templates
+in src.formatters.templates (selectable via metadata['template']).
+
+Two output modes are available: 'standard' (indented markup, <style>
+block) and 'compact' (the template's minified variant with class styles
+inlined, and unindented rows), which is considerably smaller.
 """
-from typing import Dict, Optional
+from functools import lru_cache
+from html import escape
+from itertools import chain
+from typing import Dict, Iterator, List, NamedTuple, Optional
 import pandas as pd
 from datetime import datetime
 from src.formatters.date_formatter import duration
+from src.formatters.display_frame import STREAM_CHUNK_ROWS, DisplayFrame
+from src.formatters.overflow import overflow_note
+from src.formatters.templates import get_template
 import logging
 
 logger = logging.getLogger(__name__)
 
+HTML_MODES = ('standard', 'compact')
+
+
+class _Markup(NamedTuple):
+    """Markup the formatter wraps around per-message values, per output mode."""
+    row_open: str
+    row_close: str
+    cell_open: str
+    cell_close: str
+    header_open: str
+    header_close: str
+    logo_separator: str
+
+
+_MARKUP = {
+    'standard': _Markup(
+        row_open="                <tr>\n",
+        row_close="                </tr>\n",
+        cell_open="                    <td>",
+        cell_close="</td>\n",
+        header_open="                    <th>",
+        header_close="</th>\n",
+        logo_separator="\n            ",
+    ),
+    'compact': _Markup('<tr>', '</tr>', '<td>', '</td>', '<th>', '</th>', ''),
+}
+
+# Replacements applied by html.escape(quote=True), '&' first
+_HTML_ESCAPES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;')]
+
+# Joins a column for one-shot escaping (never produced or altered by html.escape)
+_CELL_SEPARATOR = '\x00'
+
+# Columns with at most this share of distinct values are escaped through the cache
+_CATEGORICAL_RATIO = 0.5
+
+
+@lru_cache(maxsize=8192)
+def _escape_cached(value: str) -> str:
+    """html.escape with a process-wide cache for repeated (categorical) values."""
+    return escape(value)
+
 
 class HTMLFormatter:
     """
     Generates HTML email content with company branding.
     """
+
+    def __init__(self, mode: str = 'standard'):
+        """
+        Initialize HTML formatter.
+
+        Args:
+            mode: 'standard' (indented, <style> block) or 'compact' (minified, styles inlined)
+
+        Raises:
+            ValueError: If mode is unknown
+        """
+        if mode not in HTML_MODES:
+            raise ValueError(f"Unknown HTML mode '{mode}'. Expected one of: {', '.join(HTML_MODES)}")
+        self.mode = mode
+        self._markup = _MARKUP[mode]
     
     def format(
         self,
         df: pd.DataFrame,
         run_time: datetime,
         config: 'AlertConfig',
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        frame: Optional[DisplayFrame] = None
     ) -> str:
         """
         Generate HTML email content from DataFrame.
@@ -33,11 +102,41 @@ class HTMLFormatter:
             df: DataFrame with data to display
             run_time: Timestamp of this alert run
             config: AlertConfig instance for accessing settings
-            metadata: Optional metadata (e.g., vessel_name, alert_title)
+            metadata: Optional metadata (e.g., vessel_name, alert_title, template)
+            frame: Prebuilt DisplayFrame of df (shared with the text formatter)
             
         Returns:
             HTML string for email body
         """
+        return ''.join(self.iter_format(df, run_time, config, metadata, frame, chunk_rows=0))
+
+    def iter_format(
+        self,
+        df: pd.DataFrame,
+        run_time: datetime,
+        config: 'AlertConfig',
+        metadata: Optional[Dict] = None,
+        frame: Optional[DisplayFrame] = None,
+        chunk_rows: int = STREAM_CHUNK_ROWS
+    ) -> Iterator[str]:
+        """
+        Generate the HTML body in chunks, for streaming it into a message.
+
+        Table rows are rendered chunk_rows at a time as the output is
+        consumed, so the whole body never exists as one string. Joined, the
+        chunks equal format().
+
+        Args:
+            df: DataFrame with data to display
+            run_time: Timestamp of this alert run
+            config: AlertConfig instance for accessing settings
+            metadata: Optional metadata (e.g., vessel_name, alert_title, template)
+            frame: Prebuilt DisplayFrame of df (shared with the text formatter)
+            chunk_rows: Table rows per chunk (0 = all rows in one chunk)
+
+        Yields:
+            Consecutive pieces of the HTML body
+        """
         if metadata is None:
             metadata = {}
         
@@ -46,249 +145,111 @@ class HTMLFormatter:
         vessel_name = metadata.get('vessel_name', '')
         company_name = metadata.get('company_name', 'Prominence Maritime S.A.')
         
-        # Determine which logos are available
-        logos_html = self._build_logos_html(config)
+        template = get_template(metadata.get('template'))
+        if self.mode == 'compact':
+            template = template.compact
+        markup = self._markup
         
-        # Build the HTML
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<style>
-    body {{
-        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial, sans-serif;
-        background-color: #f9fafc;
-        color: #333;
-        line-height: 1.6;
-        margin: 0;
-        padding: 0;
-    }}
-    .container {{
-        max-width: 900px;
-        margin: 30px auto;
-        background: #ffffff;
-        border-radius: 12px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-        overflow: hidden;
-    }}
-    .header {{
-        background-color: #0B4877;
-        color: white;
-        padding: 20px 30px;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        flex-wrap: wrap;
-    }}
-    .header-logos {{
-        display: flex;
-        align-items: center;
-        gap: 15px;
-    }}
-    .header-logos img {{
-        max-height: 50px;
-        vertical-align: middle;
-    }}
-    .header-text {{
-        text-align: right;
-    }}
-    .header h1 {{
-        margin: 0;
-        font-size: 24px;
-        font-weight: 600;
-    }}
-    .header p {{
-        margin: 5px 0 0 0;
-        font-size: 14px;
-        color: #d7e7f5;
-    }}
-    .content {{
-        padding: 30px;
-    }}
-    .metadata {{
-        background-color: #f5f8fb;
-        padding: 15px;
-        border-radius: 8px;
-        margin-bottom: 25px;
-        font-size: 14px;
-        border-left: 4px solid #2EA9DE;
-    }}
-    .metadata-row {{
-        margin: 8px 0;
-    }}
-    .metadata-label {{
-        font-weight: 600;
-        color: #0B4877;
-        display: inline-block;
-        min-width: 140px;
-    }}
-    .count-badge {{
-        display: inline-block;
-        background-color: #2EA9DE;
-        color: white;
-        padding: 4px 12px;
-        border-radius: 12px;
-        font-size: 14px;
-        font-weight: 600;
-    }}
-    table {{
-        width: 100%;
-        border-collapse: collapse;
-        margin: 20px 0;
-        font-size: 14px;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-    }}
-    th {{
-        background-color: #0B4877;
-        color: white;
-        text-align: left;
-        padding: 12px;
-        font-weight: 600;
-    }}
-    td {{
-        padding: 10px 12px;
-        border-bottom: 1px solid #e0e6ed;
-    }}
-    tr:nth-child(even) {{
-        background-color: #f5f8fb;
-    }}
-    tr:hover {{
-        background-color: #eef5fc;
-    }}
-    a {{
-        color: #2EA9DE;
-        text-decoration: none;
-    }}
-    a:hover {{
-        text-decoration: underline;
-    }}
-    .footer {{
-        font-size: 12px;
-        color: #888;
-        text-align: center;
-        padding: 20px;
-        border-top: 1px solid #eee;
-        background-color: #f9fafc;
-    }}
-    .no-data {{
-        text-align: center;
-        padding: 40px;
-        color: #666;
-        font-size: 16px;
-    }}
-    @media only screen and (max-width: 600px) {{
-        .header {{
-            flex-direction: column;
-            text-align: center;
-        }}
-        .header-text {{
-            text-align: center;
-            margin-top: 15px;
-        }}
-        table {{
-            font-size: 12px;
-        }}
-        th, td {{
-            padding: 8px;
-        }}
-    }}
-</style>
-</head>
-<body>
-<div class="container">
-    <div class="header">
-        <div class="header-logos">
-            {logos_html}
-        </div>
-        <div class="header-text">
-            <h1>{alert_title}</h1>
-            {f'<p>{vessel_name}</p>' if vessel_name else ''}
-            <p>{run_time.strftime('%A, %d %B %Y • %H:%M %Z')}</p>
-        </div>
-    </div>
-    
-    <div class="content">
-"""
-
-        if df.empty:
-            html += """
-        <div class="no-data">
-            <p><strong>No records found for the current query.</strong></p>
-        </div>
-"""
+        empty = df.empty if frame is None else frame.empty
+        if empty:
+            content = template.html_empty.render()
         else:
-            # Add metadata section
-            html += f"""
-        <div class="metadata">
-            <div class="metadata-row">
-                <span class="metadata-label">Report Generated:</span>
-                {run_time.strftime('%A, %B %d, %Y at %H:%M %Z')}
-            </div>
-            <div class="metadata-row">
-                <span class="metadata-label">Schedule Frequency:</span>
-                {duration(config.schedule_frequency_hours)}
-            </div>
-            <div class="metadata-row">
-                <span class="metadata-label">Records Found:</span>
-                <span class="count-badge">{len(df)}</span>
-            </div>
-        </div>
-"""
+            if frame is None:
+                frame = DisplayFrame.from_dataframe(df, metadata)
 
-            # Determine which columns to display
-            display_columns = metadata.get('display_columns', list(df.columns))
-            # Filter to only columns that exist in the dataframe
-            display_columns = [col for col in display_columns if col in df.columns]
+            # A job cut to the message budget shows its first rows; the count is of all rows
+            note = overflow_note(metadata, len(df))
+            summary = template.html_summary.render(
+                generated_at=run_time.strftime('%A, %B %d, %Y at %H:%M %Z'),
+                frequency=duration(config.schedule_frequency_hours),
+                count=note.get('total', str(len(df)))
+            )
+            if note:
+                summary += template.html_overflow.render(**{k: escape(v) for k, v in note.items()})
+            table = template.html_table.iter_render(
+                header_cells=''.join(markup.header_open + escape(header) + markup.header_close for header in frame.headers),
+                rows=self._iter_rows(frame, chunk_rows)
+            )
+            content = chain((summary,), table)
+        
+        # Only the dynamic slots are filled; head, CSS and footer are precompiled (per mode)
+        yield from template.html_page.iter_render(
+            logos=self._build_logos_html(config),
+            alert_title=escape(alert_title),
+            vessel_line=f'<p>{escape(vessel_name)}</p>' if vessel_name else '',
+            run_time=run_time.strftime('%A, %d %B %Y • %H:%M %Z'),
+            content=content,
+            company_name=escape(company_name)
+        )
+    
+    def _iter_rows(self, frame: DisplayFrame, chunk_rows: int) -> Iterator[str]:
+        """
+        Render the table body rows, one join per chunk of chunk_rows rows.
 
-            # Build table
-            html += """
-        <table>
-            <thead>
-                <tr>
-"""
-            # Add column headers (only for display columns)
-            for col in display_columns:
-                display_name = col.replace('_', ' ').title()
-                html += f"                    <th>{display_name}</th>\n"
-
-            html += """                </tr>
-            </thead>
-            <tbody>
-"""
+        Each chunk's cells come stringified column-wise from the DisplayFrame
+        (None/NaN as empty string), are HTML-escaped per column and assembled
+        once, avoiding per-row Series creation and repeated string
+        concatenation. Only one chunk of cell strings exists at a time.
 
-            # Add data rows (only display columns)
-            for idx, row in df.iterrows():
-                html += "                <tr>\n"
-                for col in display_columns:
-                    value = row[col]
-                    # Format None/NaN as empty string
-                    if pd.isna(value):
-                        display_value = ""
-                    else:
-                        display_value = str(value)
-
-                    html += f"                    <td>{display_value}</td>\n"
-                html += "                </tr>\n"
-
-            html += """            </tbody>
-        </table>
-"""
+        Args:
+            frame: DisplayFrame of the job's data
+            chunk_rows: Rows per chunk (0 = all rows in one chunk)
+
+        Yields:
+            HTML for consecutive runs of <tr> rows
+        """
+        markup = self._markup
+        if not frame.columns:
+            yield (markup.row_open + markup.row_close) * len(frame)
+            return
 
-        # Footer
-        html += f"""
-    </div>
+        step = chunk_rows or max(len(frame), 1)
+        for start in range(0, len(frame), step):
+            columns = frame.column_values(na_rep='', start=start, stop=start + step)
+            cell_columns = [
+                [markup.cell_open + value + markup.cell_close for value in values]
+                for values in self._escape_columns(columns)
+            ]
+            yield ''.join(
+                markup.row_open + ''.join(cells) + markup.row_close
+                for cells in zip(*cell_columns)
+            )
     
-    <div class="footer">
-        <p>This is an automated notification from {company_name}.</p>
-        <p>If you have questions, please contact your system administrator.</p>
-    </div>
-</div>
-</body>
-</html>
-"""
-        
-        return html
+    def _escape_columns(self, columns: List[List[str]]) -> List[List[str]]:
+        """
+        HTML-escape cell strings column by column.
+
+        Each column is joined once; columns without special characters (the
+        usual case) are returned untouched. Repeated-value columns
+        (department, category) escape each distinct value once via a
+        process-wide cache. Other columns are escaped as one joined string
+        and split back, so the replacements run in C rather than per cell.
+
+        Args:
+            columns: One list of cell strings per column
+
+        Returns:
+            Escaped cell strings, equal to html.escape() of every cell
+        """
+        escaped = []
+        for values in columns:
+            joined = _CELL_SEPARATOR.join(values)
+            if not any(char in joined for char, _ in _HTML_ESCAPES):
+                escaped.append(values)
+                continue
+
+            distinct = set(values)
+            if len(distinct) <= len(values) * _CATEGORICAL_RATIO:
+                lookup = {value: _escape_cached(value) for value in distinct}
+                escaped.append([lookup[value] for value in values])
+                continue
+
+            parts = escape(joined).split(_CELL_SEPARATOR)
+            if len(parts) != len(values):
+                # A cell contained the separator itself
+                parts = [escape(value) for value in values]
+            escaped.append(parts)
+        return escaped
     
     def _build_logos_html(self, config: 'AlertConfig') -> str:
         """
@@ -300,12 +261,12 @@ class HTMLFormatter:
         Returns:
             HTML string with img tags for available logos
         """
-        logos_html = ""
+        logos = []
         
         for company_name, logo_path in config.company_logos.items():
             if logo_path.exists():
                 # CID format matches what EmailSender uses
                 cid = f"{company_name}_logo"
-                logos_html += f'<img src="cid:{cid}" alt="{company_name} logo">\n            '
+                logos.append(f'<img src="cid:{cid}" alt="{company_name} logo">')
         
-        return logos_html.strip()
+        return self._markup.logo_separator.join(logos)
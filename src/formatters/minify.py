@@ -0,0 +1,167 @@
+#src/formatters/minify.py
+"""
+Compile-time minification of HTML email templates.
+
+Produces the 'compact' variant of a template's sources, once, when the
+template is registered:
+- :hover/:focus/:active rules and @media blocks (ignored by most mail
+  clients) are dropped
+- rules on a single class (.header, .metadata, ...) are inlined as style
+  attributes on the elements in the static markup that carry the class,
+  which is also what clients without <style> support need
+- the remaining rules (tag and descendant selectors, which also style
+  rows rendered per message) stay in a minified <style> block
+- line breaks between tags are removed and other whitespace collapsed
+
+Inlined declarations take precedence over the rules left in <style>, so
+templates meant for compact mode should not rely on a tag or descendant
+rule overriding a class rule. Whitespace is collapsed everywhere, so
+sections must not contain <pre> blocks.
+"""
+import re
+from typing import Dict, List, Tuple
+
+# Pseudo-classes that only apply to interaction; mail clients rarely support them
+_DEAD_PSEUDO_CLASSES = (':hover', ':focus', ':active')
+
+# At-rules dropped from compact CSS (nested blocks)
+_DEAD_AT_RULES = ('@media',)
+
+# HTML sections whose markup is minified (text sections are left alone)
+HTML_SECTIONS = ('html_page', 'html_empty', 'html_summary', 'html_table', 'html_overflow')
+
+_CLASS_SELECTOR = re.compile(r'\.([\w-]+)')
+_TAG_WITH_CLASS = re.compile(r'<(\w+)([^<>]*?)\sclass="([^"]*)"([^<>]*)>')
+_STYLE_ATTRIBUTE = re.compile(r'\sstyle="([^"]*)"')
+_EMPTY_STYLE_BLOCK = re.compile(r'<style>\s*\{\{\s*css\s*\}\}\s*</style>')
+
+
+def minify_css(css: str) -> str:
+    """
+    Strip comments and insignificant whitespace from a stylesheet.
+
+    Args:
+        css: Stylesheet text
+
+    Returns:
+        Equivalent stylesheet without comments, indentation or trailing semicolons
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def split_rules(css: str) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Split a minified stylesheet into top-level rules and at-rule blocks.
+
+    Args:
+        css: Output of minify_css()
+
+    Returns:
+        ([(selector list, declarations), ...], [at-rule text, ...]), in source order
+    """
+    rules, at_rules = [], []
+    position = 0
+    while position < len(css):
+        open_brace = css.find('{', position)
+        if open_brace < 0:
+            break
+        prelude = css[position:open_brace]
+        depth, end = 1, open_brace + 1
+        while end < len(css) and depth:
+            depth += {'{': 1, '}': -1}.get(css[end], 0)
+            end += 1
+        if prelude.startswith('@'):
+            at_rules.append(css[position:end])
+        else:
+            rules.append((prelude, css[open_brace + 1:end - 1]))
+        position = end
+    return rules, at_rules
+
+
+def compact_sources(sources: Dict[str, str]) -> Dict[str, str]:
+    """
+    Build the compact variant of a template's section sources.
+
+    Args:
+        sources: Source text for every template section (css included)
+
+    Returns:
+        Sources with dead CSS removed, class rules inlined into the HTML
+        sections and all HTML minified; text sections are unchanged
+    """
+    rules, at_rules = split_rules(minify_css(sources['css']))
+
+    class_rules: List[Tuple[str, str]] = []  # (class name, declarations), in source order
+    kept: List[str] = []
+    for selectors, declarations in rules:
+        for selector in selectors.split(','):
+            if any(pseudo in selector for pseudo in _DEAD_PSEUDO_CLASSES):
+                continue
+            if _CLASS_SELECTOR.fullmatch(selector):
+                class_rules.append((selector[1:], declarations))
+            else:
+                kept.append(f"{selector}{{{declarations}}}")
+    kept += [rule for rule in at_rules if not rule.startswith(_DEAD_AT_RULES)]
+    css = ''.join(kept)
+
+    # Classes still used by a kept selector (e.g. '.header h1') stay on their elements
+    referenced = set(_CLASS_SELECTOR.findall(css))
+
+    compacted = dict(sources, css=css)
+    for section in HTML_SECTIONS:
+        markup = _inline_classes(sources[section], class_rules, referenced)
+        if not css:
+            markup = _EMPTY_STYLE_BLOCK.sub('', markup)
+        compacted[section] = minify_html(markup)
+    return compacted
+
+
+def minify_html(markup: str) -> str:
+    """
+    Remove line breaks between tags and collapse all other whitespace.
+
+    Args:
+        markup: HTML (may contain {{ slot }} markers)
+
+    Returns:
+        Minified HTML; any other whitespace run (e.g. a line break between
+        text and a tag) becomes one space, as a browser would render it
+    """
+    markup = re.sub(r'>\s*\n\s*<', '><', markup)
+    return re.sub(r'\s+', ' ', markup).strip()
+
+
+def _inline_classes(markup: str, class_rules: List[Tuple[str, str]], referenced: set) -> str:
+    """
+    Add each element's class declarations to its style attribute.
+
+    Args:
+        markup: HTML section source
+        class_rules: (class name, declarations) pairs in stylesheet order
+        referenced: Classes that must stay on the element
+
+    Returns:
+        Markup with style attributes (an existing style attribute wins)
+    """
+    def inline(match: re.Match) -> str:
+        tag, before, classes, after = match.groups()
+        names = classes.split()
+        declarations = [decl for name, decl in class_rules if name in names]
+        if not declarations:
+            return match.group(0)
+
+        style = ';'.join(declarations).replace('&', '&amp;').replace('"', '&quot;')
+        attributes = before + after
+        existing = _STYLE_ATTRIBUTE.search(attributes)
+        if existing:
+            style += ';' + existing.group(1)
+            attributes = attributes[:existing.start()] + attributes[existing.end():]
+
+        kept_classes = ' '.join(name for name in names if name in referenced)
+        class_attribute = f' class="{kept_classes}"' if kept_classes else ''
+        return f'<{tag}{attributes}{class_attribute} style="{style}">'
+
+    return _TAG_WITH_CLASS.sub(inline, markup)
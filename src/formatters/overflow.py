@@ -0,0 +1,193 @@
+#src/formatters/overflow.py
+"""
+Size budgets for notification emails.
+
+A vessel with a huge update (e.g. after a bulk import) would otherwise get
+every row in one table, producing multi-megabyte emails that clients clip
+and relays reject. Jobs over the row or byte budget are rendered with
+their first rows and a note; the full list travels as a gzipped CSV
+attachment, written column-wise in chunks into a spooled temporary file.
+"""
+import csv
+import gzip
+import io
+import re
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, Union
+import pandas as pd
+import logging
+
+from src.formatters.cells import column_strings
+
+logger = logging.getLogger(__name__)
+
+# Rows converted and written per chunk when building a CSV attachment
+_CSV_CHUNK_ROWS = 5000
+# Compressed attachments up to this size stay in memory; larger ones spill to disk
+_SPOOL_MAX_BYTES = 1 << 20
+# Bytes handed out per read of a file-backed attachment
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class Attachment:
+    """
+    A file attached to a notification.
+
+    Attributes:
+        filename: File name shown to recipients
+        content: File bytes, or a binary file (e.g. a spooled temporary
+            file) read in chunks when the message is sent
+        mime_type: MIME type, e.g. 'application/gzip'
+    """
+    filename: str
+    content: Union[bytes, BinaryIO]
+    mime_type: str = 'application/gzip'
+    # Channels read the same attachment concurrently; each read seeks first
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """
+        Yield the file content in chunks, from the start.
+
+        Safe to call from several threads at once (e.g. email and file sink).
+
+        Yields:
+            Consecutive byte chunks of the file
+        """
+        if isinstance(self.content, bytes):
+            yield self.content
+            return
+
+        position = 0
+        while True:
+            with self._lock:
+                self.content.seek(position)
+                chunk = self.content.read(_READ_CHUNK_BYTES)
+            if not chunk:
+                return
+            position += len(chunk)
+            yield chunk
+
+    def read(self) -> bytes:
+        """Return the whole file content (for senders that need it in one piece)."""
+        return b''.join(self.iter_bytes())
+
+
+@dataclass(frozen=True)
+class MessageBudget:
+    """
+    Row and byte limits for one email body (0 = unlimited).
+
+    Attributes:
+        max_rows: Most rows shown in a body
+        max_bytes: Most bytes of plain-text plus HTML body
+    """
+    max_rows: int = 0
+    max_bytes: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rows > 0 or self.max_bytes > 0
+
+    def row_limit(self, rows: int) -> int:
+        """Rows to show for a job with the given number of rows."""
+        return min(rows, self.max_rows) if self.max_rows > 0 else rows
+
+    def body_size(self, plain_text: str, html_content: str) -> int:
+        """Encoded size of both bodies in bytes."""
+        return len(plain_text.encode('utf-8')) + len(html_content.encode('utf-8'))
+
+    def fits(self, plain_text: str, html_content: str) -> bool:
+        """Whether rendered bodies are within the byte limit."""
+        return self.max_bytes <= 0 or self.body_size(plain_text, html_content) <= self.max_bytes
+
+    def shrink(self, shown: int, size: int) -> int:
+        """
+        Rows to try next for a body of size bytes showing shown rows.
+
+        Scales rows down in proportion to the overshoot, with some headroom
+        for the fixed layout; always shows at least one row fewer (and at
+        least one row).
+
+        Args:
+            shown: Rows in the oversized body
+            size: Its body_size()
+
+        Returns:
+            Row count for the next render
+        """
+        scaled = int(shown * self.max_bytes / size * 0.9)
+        return max(1, min(shown - 1, scaled))
+
+
+def attachment_filename(metadata: Dict) -> str:
+    """
+    File name for a job's CSV attachment, from its vessel name or title.
+
+    Args:
+        metadata: Job metadata
+
+    Returns:
+        e.g. 'TEST_VESSEL_1.csv.gz'
+    """
+    label = metadata.get('vessel_name') or metadata.get('alert_title') or 'records'
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_') or 'records'
+    return f"{slug[:60]}.csv.gz"
+
+
+def csv_attachment(data: pd.DataFrame, metadata: Dict, filename: str = '') -> Attachment:
+    """
+    Write a job's display columns to a gzipped CSV attachment.
+
+    Cells are stringified column-wise a chunk of rows at a time (as the
+    formatters show them, missing values empty) and streamed through the
+    compressor into a spooled temporary file, so large jobs hold neither
+    the CSV text nor the compressed file in memory.
+
+    Args:
+        data: Full job DataFrame
+        metadata: Job metadata (display_columns selects and orders columns)
+        filename: Attachment name (default: attachment_filename(metadata))
+
+    Returns:
+        Attachment backed by the spooled, compressed CSV
+    """
+    columns = [col for col in metadata.get('display_columns', list(data.columns)) if col in data.columns]
+
+    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES, mode='w+b')
+    # mtime=0 keeps the output reproducible for identical data
+    with gzip.GzipFile(fileobj=spool, mode='wb', mtime=0) as compressed:
+        with io.TextIOWrapper(compressed, encoding='utf-8', newline='') as text:
+            writer = csv.writer(text)
+            writer.writerow([col.replace('_', ' ').title() for col in columns])
+            for start in range(0, len(data), _CSV_CHUNK_ROWS):
+                chunk = data.iloc[start:start + _CSV_CHUNK_ROWS]
+                writer.writerows(zip(*column_strings(chunk, columns, na_rep='')))
+
+    return Attachment(filename=filename or attachment_filename(metadata), content=spool)
+
+
+def overflow_note(metadata: Dict, shown: int) -> Dict[str, str]:
+    """
+    Slot values for a template's overflow section, or {} if nothing was cut.
+
+    Args:
+        metadata: Job metadata (total_records and attachment_name are set
+            by the render stage when a job was truncated)
+        shown: Rows in the rendered body
+
+    Returns:
+        Dict with shown, total and filename, empty when all rows are shown
+    """
+    total = metadata.get('total_records', shown)
+    if total <= shown:
+        return {}
+    return {
+        'shown': str(shown),
+        'total': str(total),
+        'filename': metadata.get('attachment_name') or attachment_filename(metadata),
+    }
+
@@ -0,0 +1,223 @@
+#src/formatters/render_cache.py
+"""
+Content-addressed cache of rendered email bodies.
+
+Jobs with identical display data, metadata, template version and (for
+templates that show it) run timestamp render to identical bodies (e.g. dry-run redirects of the same
+vessel, or a digest re-rendered after a failed send in the same run), so
+their (plain_text, html_content) pair is served from a bounded in-memory
+LRU, optionally backed by JSON files on disk.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+import pandas as pd
+import logging
+
+from src.formatters.cells import display_values
+from src.formatters.templates import get_template
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: pd.DataFrame, metadata: Mapping) -> str:
+    """
+    Stable hash of a job's displayed content.
+
+    Display values are hashed column-wise with pandas (as the formatters
+    see them), together with the row labels and the metadata.
+
+    Args:
+        data: Job DataFrame
+        metadata: Job metadata (display_columns, titles, template, ...)
+
+    Returns:
+        Hex digest
+    """
+    columns = [col for col in metadata.get('display_columns', list(data.columns)) if col in data.columns]
+    values = display_values(data, columns)
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'metadata': dict(metadata),
+        'columns': columns,
+        'shape': [len(data), len(columns)],
+        'empty': data.empty,
+    }, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(pd.util.hash_array(data.index.to_numpy()).tobytes())
+    if values.size:
+        digest.update(pd.util.hash_array(values.ravel(order='F')).tobytes())
+    return digest.hexdigest()
+
+
+def render_key(
+    data: pd.DataFrame,
+    metadata: Mapping,
+    run_time: datetime,
+    context_fingerprint: str = '',
+    content: str = ''
+) -> str:
+    """
+    Stable hash of everything that determines a job's rendered bodies.
+
+    Combines the job's content hash with the template's version, the
+    render settings and, if the template shows it, the run timestamp as
+    shown in the bodies (minute precision). Templates without a run
+    timestamp get the same key in every run, so the disk layer serves
+    them across scheduled runs and restarts.
+
+    Args:
+        data: Job DataFrame
+        metadata: Job metadata (display_columns, titles, template, ...)
+        run_time: Timestamp of this run
+        context_fingerprint: Identifies formatters and render settings
+        content: Precomputed content_hash(data, metadata) (e.g. NotificationJob.content_hash)
+
+    Returns:
+        Hex digest usable as a cache key
+    """
+    template = get_template(metadata.get('template'))
+    return hashlib.sha256(json.dumps({
+        'content': content or content_hash(data, metadata),
+        'context': context_fingerprint,
+        'template': template.version,
+        'run_time': run_time.strftime('%Y-%m-%d %H:%M %Z') if template.shows_run_time else '',
+    }, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Bounded LRU of rendered (plain_text, html_content) pairs.
+
+    Thread-safe. With cache_dir set, entries are also written to disk so
+    they survive restarts; disk entries beyond max_disk_entries are pruned
+    oldest first.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[Path] = None, max_disk_entries: int = 2048):
+        """
+        Initialize render cache.
+
+        Args:
+            max_entries: Entries kept in memory
+            cache_dir: Optional directory for the on-disk layer
+            max_disk_entries: Entries kept on disk
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: 'OrderedDict[str, Tuple[str, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """
+        Look up rendered bodies.
+
+        Args:
+            key: Key from render_key()
+
+        Returns:
+            (plain_text, html_content), or None on a miss
+        """
+        with self._lock:
+            bodies = self._entries.get(key)
+            if bodies is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return bodies
+
+        bodies = self._read_disk(key)
+
+        with self._lock:
+            if bodies is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, bodies)
+        return bodies
+
+    def put(self, key: str, plain_text: str, html_content: str) -> None:
+        """
+        Store rendered bodies.
+
+        Args:
+            key: Key from render_key()
+            plain_text: Rendered plain-text body
+            html_content: Rendered HTML body
+        """
+        with self._lock:
+            self._store(key, (plain_text, html_content))
+        self._write_disk(key, plain_text, html_content)
+
+    def record_hits(self, count: int) -> None:
+        """
+        Count lookups served without a get() (repeats of a key within one batch).
+
+        Args:
+            count: Number of extra hits
+        """
+        with self._lock:
+            self.hits += count
+
+    def _store(self, key: str, bodies: Tuple[str, str]) -> None:
+        self._entries[key] = bodies
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[str, str]]:
+        if self.cache_dir is None:
+            return None
+
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry['plain_text'], entry['html_content']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable render cache entry {path}: {e}")
+            return None
+
+    def _write_disk(self, key: str, plain_text: str, html_content: str) -> None:
+        if self.cache_dir is None:
+            return
+
+        try:
+            temp_fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp', text=True)
+            with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
+                json.dump({'plain_text': plain_text, 'html_content': html_content}, f, ensure_ascii=False)
+            os.replace(temp_path, self.cache_dir / f"{key}.json")
+            self._prune_disk()
+        except OSError as e:
+            logger.warning(f"Failed to write render cache entry {key}: {e}")
+
+    def _prune_disk(self) -> None:
+        entries = list(self.cache_dir.glob('*.json'))
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda path: path.stat().st_mtime)
+        for path in entries[:len(entries) - self.max_disk_entries]:
+            path.unlink(missing_ok=True)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served from the cache (0.0 when unused)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,540 @@
+#src/formatters/templates.py
+"""
+Precompiled email templates.
+
+Layouts are parsed once per process into static chunks and named slots,
+so rendering only joins the cached static text (head, CSS, footer) with
+the few values that change per message (title, vessel, timestamps, counts,
+rows). Alert types can register their own templates, or override single
+sections of the default one, and select them via metadata['template'].
+
+Slot syntax is {{ name }}. Static slots (e.g. css) are substituted when the
+template is compiled; the remaining slots are filled on every render.
+
+Every template is compiled a second time in compact form (minified markup,
+class styles inlined, dead CSS rules dropped; see src.formatters.minify),
+used by HTMLFormatter(mode='compact').
+"""
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from src.formatters.minify import compact_sources
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SLOT_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class CompiledTemplate:
+    """
+    A layout split into static chunks and slot names.
+
+    render() is a single join over the precomputed chunk list; the source
+    is never re-parsed.
+    """
+
+    def __init__(self, source: str, static: Optional[Dict[str, str]] = None):
+        """
+        Parse and precompile a layout.
+
+        Args:
+            source: Layout text with {{ slot }} markers
+            static: Slot values fixed at compile time (e.g. {'css': ...})
+        """
+        static = static or {}
+        self.source = source
+
+        parts: List[Tuple[bool, str]] = []  # (is_slot, text-or-slot-name)
+        position = 0
+        for match in _SLOT_PATTERN.finditer(source):
+            parts.append((False, source[position:match.start()]))
+            name = match.group(1)
+            if name in static:
+                parts.append((False, static[name]))
+            else:
+                parts.append((True, name))
+            position = match.end()
+        parts.append((False, source[position:]))
+
+        # Merge adjacent static text so the head/CSS becomes a single chunk
+        self._chunks: List[str] = []
+        self._slot_positions: List[Tuple[int, str]] = []
+        pending = ''
+        for is_slot, text in parts:
+            if is_slot:
+                self._chunks.append(pending)
+                pending = ''
+                self._slot_positions.append((len(self._chunks), text))
+                self._chunks.append('')
+            else:
+                pending += text
+        self._chunks.append(pending)
+
+        self.slots = tuple(dict.fromkeys(name for _, name in self._slot_positions))
+
+    def render(self, **values: str) -> str:
+        """
+        Fill the dynamic slots.
+
+        Args:
+            **values: String value for every slot in self.slots
+
+        Returns:
+            Rendered text
+
+        Raises:
+            ValueError: If a slot value is missing
+        """
+        missing = [name for name in self.slots if name not in values]
+        if missing:
+            raise ValueError(f"Missing template slot(s): {', '.join(missing)}")
+
+        chunks = list(self._chunks)
+        for position, name in self._slot_positions:
+            chunks[position] = values[name]
+        return ''.join(chunks)
+
+    def iter_render(self, **values: Union[str, Iterable[str]]) -> Iterator[str]:
+        """
+        Fill the dynamic slots, yielding the output in chunks.
+
+        Joining the chunks gives exactly what render() returns. A slot value
+        may also be an iterable of strings (e.g. table rows produced a batch
+        at a time), which is streamed in place.
+
+        Args:
+            **values: String or iterable of strings for every slot in self.slots
+
+        Yields:
+            Static chunks and slot values, in order
+
+        Raises:
+            ValueError: If a slot value is missing
+        """
+        missing = [name for name in self.slots if name not in values]
+        if missing:
+            raise ValueError(f"Missing template slot(s): {', '.join(missing)}")
+
+        slot_names = dict(self._slot_positions)
+        for position, chunk in enumerate(self._chunks):
+            name = slot_names.get(position)
+            if name is None:
+                if chunk:
+                    yield chunk
+            elif isinstance(values[name], str):
+                yield values[name]
+            else:
+                yield from values[name]
+
+
+@dataclass(frozen=True)
+class EmailTemplate:
+    """
+    Compiled HTML and plain-text layouts for one kind of email.
+
+    HTML sections:
+        html_page:    whole document; slots logos, alert_title, vessel_line,
+                      run_time, content, company_name (css is static)
+        html_empty:   body shown when there are no rows
+        html_summary: report metadata block; slots generated_at, frequency, count
+        html_table:   results table; slots header_cells, rows
+        html_overflow: note when only the first rows are shown; slots shown, total, filename
+    Text sections:
+        text_page:    slots alert_title, vessel_line, run_time, content, company_name
+        text_empty:   body shown when there are no rows
+        text_summary: line before the records; slot count
+        text_overflow: note when only the first rows are shown; slots shown, total, filename
+
+    version is a hash of the sources, so re-registering a changed template
+    invalidates cached renders. shows_run_time tells whether any section
+    renders the run timestamp (RUN_TIME_SLOTS), which cached renders must
+    then also be keyed by. compact is the same template compiled from
+    compact_sources() (None on the compact variant itself).
+    """
+    name: str
+    html_page: CompiledTemplate
+    html_empty: CompiledTemplate
+    html_summary: CompiledTemplate
+    html_table: CompiledTemplate
+    html_overflow: CompiledTemplate
+    text_page: CompiledTemplate
+    text_empty: CompiledTemplate
+    text_summary: CompiledTemplate
+    text_overflow: CompiledTemplate
+    sources: Dict[str, str]
+    version: str
+    compact: Optional['EmailTemplate'] = None
+
+    @property
+    def shows_run_time(self) -> bool:
+        """True if any section (of this or the compact variant) fills a run timestamp slot."""
+        sections = [getattr(self, section) for section in SECTIONS if section != 'css']
+        if any(RUN_TIME_SLOTS.intersection(section.slots) for section in sections):
+            return True
+        return self.compact is not None and self.compact.shows_run_time
+
+
+SECTIONS = (
+    'css', 'html_page', 'html_empty', 'html_summary', 'html_table', 'html_overflow',
+    'text_page', 'text_empty', 'text_summary', 'text_overflow',
+)
+
+# Slots the formatters fill from the run timestamp
+RUN_TIME_SLOTS = frozenset({'run_time', 'generated_at'})
+
+_registry: Dict[str, EmailTemplate] = {}
+_registry_lock = threading.Lock()
+
+
+def compile_template(name: str, sources: Dict[str, str]) -> EmailTemplate:
+    """
+    Compile a full set of section sources into an EmailTemplate, and its compact variant.
+
+    Args:
+        name: Template name
+        sources: Source text for every entry in SECTIONS
+
+    Returns:
+        Compiled EmailTemplate
+
+    Raises:
+        ValueError: If a section is missing
+    """
+    missing = [section for section in SECTIONS if section not in sources]
+    if missing:
+        raise ValueError(f"Template '{name}' is missing section(s): {', '.join(missing)}")
+
+    template = _compile_sections(name, sources)
+    return replace(template, compact=_compile_sections(name, compact_sources(sources)))
+
+
+def _compile_sections(name: str, sources: Dict[str, str]) -> EmailTemplate:
+    """Compile every section of a complete source set (no compact variant)."""
+    static = {'css': sources['css']}
+    return EmailTemplate(
+        name=name,
+        sources=dict(sources),
+        version=hashlib.sha256(json.dumps(sources, sort_keys=True).encode('utf-8')).hexdigest()[:16],
+        **{section: CompiledTemplate(sources[section], static) for section in SECTIONS if section != 'css'}
+    )
+
+
+def register_template(name: str, base: str = 'default', **sections: str) -> EmailTemplate:
+    """
+    Compile and register a template, inheriting unspecified sections from base.
+
+    Example:
+        register_template('hot_works', css=HOT_WORKS_CSS, html_summary=HOT_WORKS_SUMMARY)
+
+    Args:
+        name: Name used in metadata['template']
+        base: Registered template to inherit sections from
+        **sections: Section sources to override (see SECTIONS)
+
+    Returns:
+        The compiled, registered EmailTemplate
+
+    Raises:
+        ValueError: If base is unknown or a section name is invalid
+    """
+    unknown = [section for section in sections if section not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown template section(s): {', '.join(unknown)}")
+
+    if base in _registry:
+        sources = {**_registry[base].sources, **sections}
+    elif name == base:
+        sources = sections  # registering a root template
+    else:
+        raise ValueError(f"Unknown base template '{base}'. Registered: {', '.join(sorted(_registry))}")
+
+    template = compile_template(name, sources)
+
+    with _registry_lock:
+        if name in _registry:
+            logger.info(f"Replacing email template '{name}'")
+        _registry[name] = template
+    return template
+
+
+def get_template(name: Optional[str] = None) -> EmailTemplate:
+    """
+    Look up a registered template.
+
+    Args:
+        name: Template name (None = 'default')
+
+    Returns:
+        Compiled EmailTemplate
+
+    Raises:
+        ValueError: If no template is registered under name
+    """
+    name = name or 'default'
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError(f"Unknown email template '{name}'. Registered: {', '.join(sorted(_registry))}") from None
+
+
+def registered_templates() -> List[str]:
+    """Return the names of all registered templates."""
+    return sorted(_registry)
+
+
+# ----------------------------------------------------------------------------
+# Default layout
+# ----------------------------------------------------------------------------
+
+DEFAULT_CSS = """    body {
+        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial, sans-serif;
+        background-color: #f9fafc;
+        color: #333;
+        line-height: 1.6;
+        margin: 0;
+        padding: 0;
+    }
+    .container {
+        max-width: 900px;
+        margin: 30px auto;
+        background: #ffffff;
+        border-radius: 12px;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
+        overflow: hidden;
+    }
+    .header {
+        background-color: #0B4877;
+        color: white;
+        padding: 20px 30px;
+        display: flex;
+        align-items: center;
+        justify-content: space-between;
+        flex-wrap: wrap;
+    }
+    .header-logos {
+        display: flex;
+        align-items: center;
+        gap: 15px;
+    }
+    .header-logos img {
+        max-height: 50px;
+        vertical-align: middle;
+    }
+    .header-text {
+        text-align: right;
+    }
+    .header h1 {
+        margin: 0;
+        font-size: 24px;
+        font-weight: 600;
+    }
+    .header p {
+        margin: 5px 0 0 0;
+        font-size: 14px;
+        color: #d7e7f5;
+    }
+    .content {
+        padding: 30px;
+    }
+    .metadata {
+        background-color: #f5f8fb;
+        padding: 15px;
+        border-radius: 8px;
+        margin-bottom: 25px;
+        font-size: 14px;
+        border-left: 4px solid #2EA9DE;
+    }
+    .metadata-row {
+        margin: 8px 0;
+    }
+    .metadata-label {
+        font-weight: 600;
+        color: #0B4877;
+        display: inline-block;
+        min-width: 140px;
+    }
+    .count-badge {
+        display: inline-block;
+        background-color: #2EA9DE;
+        color: white;
+        padding: 4px 12px;
+        border-radius: 12px;
+        font-size: 14px;
+        font-weight: 600;
+    }
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 20px 0;
+        font-size: 14px;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+    }
+    th {
+        background-color: #0B4877;
+        color: white;
+        text-align: left;
+        padding: 12px;
+        font-weight: 600;
+    }
+    td {
+        padding: 10px 12px;
+        border-bottom: 1px solid #e0e6ed;
+    }
+    tr:nth-child(even) {
+        background-color: #f5f8fb;
+    }
+    tr:hover {
+        background-color: #eef5fc;
+    }
+    a {
+        color: #2EA9DE;
+        text-decoration: none;
+    }
+    a:hover {
+        text-decoration: underline;
+    }
+    .footer {
+        font-size: 12px;
+        color: #888;
+        text-align: center;
+        padding: 20px;
+        border-top: 1px solid #eee;
+        background-color: #f9fafc;
+    }
+    .no-data {
+        text-align: center;
+        padding: 40px;
+        color: #666;
+        font-size: 16px;
+    }
+    @media only screen and (max-width: 600px) {
+        .header {
+            flex-direction: column;
+            text-align: center;
+        }
+        .header-text {
+            text-align: center;
+            margin-top: 15px;
+        }
+        table {
+            font-size: 12px;
+        }
+        th, td {
+            padding: 8px;
+        }
+    }"""
+
+DEFAULT_HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<style>
+{{css}}
+</style>
+</head>
+<body>
+<div class="container">
+    <div class="header">
+        <div class="header-logos">
+            {{logos}}
+        </div>
+        <div class="header-text">
+            <h1>{{alert_title}}</h1>
+            {{vessel_line}}
+            <p>{{run_time}}</p>
+        </div>
+    </div>
+    
+    <div class="content">
+{{content}}
+    </div>
+    
+    <div class="footer">
+        <p>This is an automated notification from {{company_name}}.</p>
+        <p>If you have questions, please contact your system administrator.</p>
+    </div>
+</div>
+</body>
+</html>
+"""
+
+DEFAULT_HTML_EMPTY = """
+        <div class="no-data">
+            <p><strong>No records found for the current query.</strong></p>
+        </div>
+"""
+
+DEFAULT_HTML_SUMMARY = """
+        <div class="metadata">
+            <div class="metadata-row">
+                <span class="metadata-label">Report Generated:</span>
+                {{generated_at}}
+            </div>
+            <div class="metadata-row">
+                <span class="metadata-label">Schedule Frequency:</span>
+                {{frequency}}
+            </div>
+            <div class="metadata-row">
+                <span class="metadata-label">Records Found:</span>
+                <span class="count-badge">{{count}}</span>
+            </div>
+        </div>
+"""
+
+DEFAULT_HTML_TABLE = """
+        <table>
+            <thead>
+                <tr>
+{{header_cells}}                </tr>
+            </thead>
+            <tbody>
+{{rows}}            </tbody>
+        </table>
+"""
+
+DEFAULT_HTML_OVERFLOW = """
+        <div class="metadata">
+            <div class="metadata-row">
+                <span class="metadata-label">Showing:</span>
+                first {{shown}} of {{total}} records. The full list is attached as {{filename}}.
+            </div>
+        </div>
+"""
+
+_TEXT_SEPARATOR = "=" * 70
+
+DEFAULT_TEXT_PAGE = f"""{_TEXT_SEPARATOR}
+{{{{alert_title}}}}
+{{{{vessel_line}}}}{{{{run_time}}}}
+{_TEXT_SEPARATOR}
+
+{{{{content}}}}{_TEXT_SEPARATOR}
+This is an automated notification from {{{{company_name}}}}.
+If you have questions, please contact your system administrator.
+{_TEXT_SEPARATOR}
+"""
+
+DEFAULT_TEXT_EMPTY = "No records found for the current query.\n"
+
+DEFAULT_TEXT_SUMMARY = "Found {{count}} record(s):\n\n"
+
+DEFAULT_TEXT_OVERFLOW = "Showing the first {{shown}} of {{total}} records; the full list is attached as {{filename}}.\n\n"
+
+register_template(
+    'default',
+    css=DEFAULT_CSS,
+    html_page=DEFAULT_HTML_PAGE,
+    html_empty=DEFAULT_HTML_EMPTY,
+    html_summary=DEFAULT_HTML_SUMMARY,
+    html_table=DEFAULT_HTML_TABLE,
+    html_overflow=DEFAULT_HTML_OVERFLOW,
+    text_page=DEFAULT_TEXT_PAGE,
+    text_empty=DEFAULT_TEXT_EMPTY,
+    text_summary=DEFAULT_TEXT_SUMMARY,
+    text_overflow=DEFAULT_TEXT_OVERFLOW,
+)
@@ -4,26 +4,59 @@ Plain text email formatter.
 
 Generates simple, readable plain text emails as fallback
 for HTML emails or for email clients that don't support HTML.
+
+Two layouts are available: 'records' (a labelled block per row) and
+'table' (a compact fixed-width table, typically a fraction of the size).
 """
-from typing import Dict, Optional
+import io
+import textwrap
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import pandas as pd
 from datetime import datetime
+from src.formatters.display_frame import STREAM_CHUNK_ROWS, DisplayFrame
+from src.formatters.overflow import overflow_note
+from src.formatters.templates import get_template
 import logging
 
 logger = logging.getLogger(__name__)
 
+TEXT_LAYOUTS = ('records', 'table')
+
+# Gap between table columns
+_COLUMN_GAP = "  "
+
 
 class TextFormatter:
     """
     Generates plain text email content.
     """
+
+    def __init__(self, layout: str = 'records', wrap_columns: Iterable[str] = ('comments',), wrap_width: int = 40):
+        """
+        Initialize text formatter.
+
+        Args:
+            layout: 'records' (block per row) or 'table' (fixed-width columns)
+            wrap_columns: Columns whose long values wrap onto extra lines in the table layout
+            wrap_width: Widest line of a wrapped column
+
+        Raises:
+            ValueError: If layout is unknown
+        """
+        if layout not in TEXT_LAYOUTS:
+            raise ValueError(f"Unknown text layout '{layout}'. Expected one of: {', '.join(TEXT_LAYOUTS)}")
+        self.layout = layout
+        self.wrap_columns = frozenset(wrap_columns)
+        self.wrap_width = wrap_width
     
     def format(
         self,
         df: pd.DataFrame,
         run_time: datetime,
         config: 'AlertConfig',
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        frame: Optional[DisplayFrame] = None
     ) -> str:
         """
         Generate plain text email content from DataFrame.
@@ -32,11 +65,40 @@ class TextFormatter:
             df: DataFrame with data to display
             run_time: Timestamp of this alert run
             config: AlertConfig instance for accessing settings
-            metadata: Optional metadata (e.g., vessel_name, alert_title)
+            metadata: Optional metadata (e.g., vessel_name, alert_title, template)
+            frame: Prebuilt DisplayFrame of df (shared with the HTML formatter)
             
         Returns:
             Plain text string for email body
         """
+        return ''.join(self.iter_format(df, run_time, config, metadata, frame, chunk_rows=0))
+
+    def iter_format(
+        self,
+        df: pd.DataFrame,
+        run_time: datetime,
+        config: 'AlertConfig',
+        metadata: Optional[Dict] = None,
+        frame: Optional[DisplayFrame] = None,
+        chunk_rows: int = STREAM_CHUNK_ROWS
+    ) -> Iterator[str]:
+        """
+        Generate the plain text body in chunks, for streaming it into a message.
+
+        Records (or table lines) are rendered chunk_rows at a time as the
+        output is consumed. Joined, the chunks equal format().
+
+        Args:
+            df: DataFrame with data to display
+            run_time: Timestamp of this alert run
+            config: AlertConfig instance for accessing settings
+            metadata: Optional metadata (e.g., vessel_name, alert_title, template)
+            frame: Prebuilt DisplayFrame of df (shared with the HTML formatter)
+            chunk_rows: Rows per chunk (0 = all rows in one chunk)
+
+        Yields:
+            Consecutive pieces of the plain text body
+        """
         if metadata is None:
             metadata = {}
         
@@ -45,48 +107,144 @@ class TextFormatter:
         vessel_name = metadata.get('vessel_name', '')
         company_name = metadata.get('company_name', 'Company')
         
-        # Build header
-        separator = "=" * 70
-        text = f"{separator}\n"
-        text += f"{alert_title}\n"
-        if vessel_name:
-            text += f"{vessel_name}\n"
-        text += f"{run_time.strftime('%A, %B %d, %Y at %H:%M %Z')}\n"
-        text += f"{separator}\n\n"
+        template = get_template(metadata.get('template'))
         
-        if df.empty:
-            text += "No records found for the current query.\n"
+        empty = df.empty if frame is None else frame.empty
+        if empty:
+            content = template.text_empty.render()
         else:
-            text += f"Found {len(df)} record(s):\n\n"
-
-            # Determine which columns to display
-            display_columns = metadata.get('display_columns', list(df.columns))
-            # Filter to only columns that exist in the dataframe
-            display_columns = [col for col in display_columns if col in df.columns]
-
-            # Add each record
-            for idx, row in df.iterrows():
-                text += f"Record {idx + 1}:\n"
-                text += "-" * 70 + "\n"
-
-                for col in display_columns:
-                    value = row[col]
-                    # Format None/NaN as empty string
-                    if pd.isna(value):
-                        display_value = "(empty)"
-                    else:
-                        display_value = str(value)
-
-                    # Format column name
-                    col_display = col.replace('_', ' ').title()
-                    text += f"  {col_display}: {display_value}\n"
-
-                text += "\n"
-        
-        # Footer
-        text += f"{separator}\n"
-        text += f"This is an automated notification from {company_name}.\n"
-        text += "If you have questions, please contact your system administrator.\n"
-        text += f"{separator}\n"
+            if frame is None:
+                frame = DisplayFrame.from_dataframe(df, metadata)
+
+            # A job cut to the message budget shows its first rows; the count is of all rows
+            note = overflow_note(metadata, len(df))
+            summary = template.text_summary.render(count=note.get('total', str(len(df))))
+            if note:
+                summary += template.text_overflow.render(**note)
+            if self.layout == 'table':
+                rows = self._iter_table(frame, chunk_rows)
+            else:
+                rows = self._iter_records(frame, chunk_rows)
+            content = chain((summary,), rows)
         
-        return text
+        # Only the dynamic slots are filled; header rules and footer are precompiled
+        yield from template.text_page.iter_render(
+            alert_title=alert_title,
+            vessel_line=f"{vessel_name}\n" if vessel_name else '',
+            run_time=run_time.strftime('%A, %B %d, %Y at %H:%M %Z'),
+            content=content,
+            company_name=company_name
+        )
+    
+    def _iter_records(self, frame: DisplayFrame, chunk_rows: int) -> Iterator[str]:
+        """
+        Render one block per record, one join per chunk of chunk_rows records.
+
+        Each chunk's lines are built from that chunk's cell strings only, so
+        streaming holds one chunk of records at a time.
+
+        Args:
+            frame: DisplayFrame of the job's data (None/NaN shown as "(empty)")
+            chunk_rows: Records per chunk (0 = all records in one chunk)
+
+        Yields:
+            Text for consecutive runs of numbered record blocks
+        """
+        rule = "-" * 70 + "\n"
+
+        step = chunk_rows or max(len(frame), 1)
+        for start in range(0, len(frame), step):
+            stop = start + step
+            labels = frame.index[start:stop]
+            line_columns = [
+                [f"  {header}: {value}\n" for value in values]
+                for header, values in zip(frame.headers, frame.column_values("(empty)", start, stop))
+            ]
+            rows = zip(*line_columns) if line_columns else [()] * len(labels)
+            yield ''.join(
+                f"Record {idx + 1}:\n" + rule + ''.join(lines) + "\n"
+                for idx, lines in zip(labels, rows)
+            )
+
+    def _iter_table(self, frame: DisplayFrame, chunk_rows: int) -> Iterator[str]:
+        """
+        Render the rows as a fixed-width table, chunk_rows rows at a time.
+
+        Column widths need every row, so a streamed table takes two passes
+        over the chunks: one measuring the cells, one writing them. Long
+        values of wrap_columns continue on extra lines within their column.
+        Lines are written to a buffer, which is emptied after every chunk.
+
+        Args:
+            frame: DisplayFrame of the job's data (None/NaN shown blank)
+            chunk_rows: Rows per chunk (0 = all rows in one chunk)
+
+        Yields:
+            Header and rule, then the lines of consecutive runs of rows
+        """
+        if not frame.columns:
+            return
+
+        step = chunk_rows or max(len(frame), 1)
+        ranges = [(start, start + step) for start in range(0, len(frame), step)]
+
+        widths = [len(header) for header in frame.headers]
+        cells = None
+        for start, stop in ranges:
+            cells = self._table_cells(frame, start, stop)
+            columns, continuations = cells
+            for pos, values in enumerate(columns):
+                widths[pos] = max(widths[pos], max(map(len, values), default=0))
+            for extra in continuations.values():
+                for pos, lines in extra.items():
+                    widths[pos] = max(widths[pos], max(map(len, lines), default=0))
+        line = _COLUMN_GAP.join(f"{{:<{width}}}" for width in widths)
+
+        buffer = io.StringIO()
+        buffer.write(line.format(*frame.headers).rstrip() + "\n")
+        buffer.write(_COLUMN_GAP.join("-" * width for width in widths) + "\n")
+        blank = [''] * len(widths)
+        for start, stop in ranges:
+            # A single chunk is written from the cells already measured
+            columns, continuations = cells if len(ranges) == 1 else self._table_cells(frame, start, stop)
+            for row, row_cells in enumerate(zip(*columns)):
+                buffer.write(line.format(*row_cells).rstrip() + "\n")
+                extra = continuations.get(row)
+                if extra:
+                    for depth in range(max(map(len, extra.values()))):
+                        wrapped = list(blank)
+                        for pos, lines in extra.items():
+                            if depth < len(lines):
+                                wrapped[pos] = lines[depth]
+                        buffer.write(line.format(*wrapped).rstrip() + "\n")
+            if chunk_rows and stop < len(frame):
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        buffer.write("\n")
+        yield buffer.getvalue()
+
+    def _table_cells(self, frame: DisplayFrame, start: int, stop: int) -> Tuple[List[List[str]], Dict[int, Dict[int, List[str]]]]:
+        """
+        Cell strings of a range of rows, with long values of wrap_columns wrapped.
+
+        Args:
+            frame: DisplayFrame of the job's data
+            start: First row
+            stop: Row after the last
+
+        Returns:
+            (columns, continuations): one list of first-line cell strings per
+            column, and row offset -> column position -> continuation lines
+        """
+        columns = frame.column_values('', start, stop)
+        continuations: Dict[int, Dict[int, List[str]]] = {}
+        for pos, (column, values) in enumerate(zip(frame.columns, columns)):
+            if column not in self.wrap_columns:
+                continue
+            for row, value in enumerate(values):
+                if len(value) > self.wrap_width or '\n' in value:
+                    lines = textwrap.wrap(value, self.wrap_width) or ['']
+                    values[row] = lines[0]
+                    continuations.setdefault(row, {})[pos] = lines[1:]
+        return columns, continuations
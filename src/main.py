@@ -9,28 +9,22 @@ Usage:
     python -m src.main                    # Run continuously with scheduling
     python -m src.main --run-once         # Run once and exit
     python -m src.main --dry-run          # Test mode (no emails sent)
+    python -m src.main --send-digest      # Send queued digests now and exit
 """
 import sys
 import logging
 from logging.handlers import RotatingFileHandler
 import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-# Import core components
+# Import configuration only: components, formatters and alerts (pandas,
+# SQLAlchemy, requests, ...) are imported when they are initialised, so
+# --help and configuration errors return without loading them
 from src.core.config import AlertConfig
-from src.core.scheduler import AlertScheduler
-from src.core.tracking import EventTracker
 
-# Import notification handlers
-from src.notifications.email_sender import EmailSender
-from src.notifications.teams_sender import TeamsSender
-
-# Import formatters
-from src.formatters.html_formatter import HTMLFormatter
-from src.formatters.text_formatter import TextFormatter
-
-# Import alert implementations
-from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+if TYPE_CHECKING:
+    from src.core.scheduler import AlertScheduler
 
 
 def setup_logging(config: AlertConfig) -> logging.Logger:
@@ -72,8 +66,20 @@ def setup_logging(config: AlertConfig) -> logging.Logger:
 def initialize_components(config: AlertConfig) -> AlertConfig:
     """Initialize and inject runtime components into config."""
     
+    from src.core.tracking import EventTracker
+    from src.core.outbox import DigestOutbox
+    from src.notifications.email_sender import EmailSender
+    from src.notifications.channels import ChannelRegistry
+    from src.formatters.html_formatter import HTMLFormatter
+    from src.formatters.text_formatter import TextFormatter
+    from src import db_utils
+
     logger = logging.getLogger(__name__)
-    
+
+    # Load database settings (SSH tunnel and connection) from the environment
+    db_utils.init_db()
+    logger.info("[OK] Database settings loaded")
+
     # Initialize event tracker
     config.tracker = EventTracker(
         tracking_file=config.sent_events_file,
@@ -81,6 +87,14 @@ def initialize_components(config: AlertConfig) -> AlertConfig:
         timezone=config.timezone
     )
     logger.info(f"[OK] Event tracker initialised")
+
+    # Initialize digest outbox (CC recipients receive scheduled summaries)
+    if config.digest_mode:
+        config.outbox = DigestOutbox(
+            outbox_file=config.digest_outbox_file,
+            timezone=config.timezone
+        )
+        logger.info(f"[OK] Digest outbox initialised (digests at {', '.join(config.digest_times)})")
     
     # Initialize email sender
     # Determine if EmailSender should block sends
@@ -103,43 +117,72 @@ def initialize_components(config: AlertConfig) -> AlertConfig:
         smtp_user=config.smtp_user,
         smtp_pass=config.smtp_pass,
         company_logos=config.company_logos,
-        dry_run=block_emails
+        dry_run=block_emails,
+        use_tls=config.smtp_use_tls
     )
     
     logger.info(log_msg)
+
+    # Initialize Teams sender (one pooled session for the process lifetime)
+    if config.enable_teams_alerts:
+        if config.teams_webhook_url:
+            from src.notifications.teams_sender import TeamsSender
+            config.teams_sender = TeamsSender(
+                webhook_url=config.teams_webhook_url,
+                max_payload_bytes=config.teams_max_payload_bytes,
+                max_retry_wait=config.teams_max_retry_wait_seconds,
+                dry_run=config.dry_run
+            )
+            logger.info("[OK] Teams sender initialised")
+        else:
+            logger.warning("ENABLE_TEAMS_ALERTS=True but TEAMS_WEBHOOK_URL is empty - Teams alerts disabled")
+            config.enable_teams_alerts = False
+
+    # Register notification channels (fan-out targets for every alert)
+    config.channel_registry = ChannelRegistry.from_config(config)
+    channel_names = ', '.join(c.name for c in config.channel_registry.channels) or 'none'
+    logger.info(f"[OK] Notification channels: {channel_names}")
     
     # Initialize formatters
-    config.html_formatter = HTMLFormatter()
-    config.text_formatter = TextFormatter()
+    config.html_formatter = HTMLFormatter(mode=config.html_mode)
+    config.text_formatter = TextFormatter(layout=config.text_layout)
     logger.info(f"[OK] Formatters initialized")
+
+    # Initialize render cache (identical payloads are rendered once)
+    if config.render_cache_size > 0:
+        from src.formatters.render_cache import RenderCache
+        config.render_cache = RenderCache(
+            max_entries=config.render_cache_size,
+            cache_dir=config.render_cache_dir
+        )
+        location = f"memory + {config.render_cache_dir}" if config.render_cache_dir else "memory"
+        logger.info(f"[OK] Render cache initialised ({config.render_cache_size} entries, {location})")
     
     return config
 
 
-def register_alerts(scheduler: AlertScheduler, config: AlertConfig) -> None:
+def register_alerts(scheduler: 'AlertScheduler', config: AlertConfig) -> None:
     """
     Register all alert implementations with the scheduler.
     
     To add a new alert type:
     1. Create a new class inheriting from BaseAlert
-    2. Import it at the top of this file
-    3. Instantiate and register it here
+    2. Add it to ALERT_REGISTRY in src/alerts/__init__.py
     
     Args:
         scheduler: AlertScheduler instance
         config: AlertConfig instance
     """
+    from src.alerts import ALERT_REGISTRY, load_alert
+
     logger = logging.getLogger(__name__)
-    
-    # Register Vessel Documents Alert
-    vessel_docs_alert = VesselDocumentsAlert(config)
-    scheduler.register_alert(vessel_docs_alert.run)
-    logger.info("[OK] Registered VesselDocumentsAlert")
-    
-    # Future alerts can be registered here:
-    # hot_works_alert = HotWorksAlert(config)
-    # scheduler.register_alert(hot_works_alert.run)
-    # logger.info("[OK] Registered HotWorksAlert")
+
+    for name in ALERT_REGISTRY:
+        alert = load_alert(name)(config)
+        scheduler.register_alert(alert.run)
+        if config.digest_mode:
+            scheduler.register_digest(alert.send_digest)
+        logger.info(f"[OK] Registered {name}")
 
 
 def main():
@@ -158,6 +201,11 @@ def main():
         action='store_true',
         help='Run once and exit (no scheduling) - overrides RUN_ONCE env var'
     )
+    parser.add_argument(
+        '--send-digest',
+        action='store_true',
+        help='Send all queued digests now and exit (requires DIGEST_MODE=True)'
+    )
     args = parser.parse_args()
 
     # Load runtime modes from .env (can be overridden by CLI flags)
@@ -193,6 +241,7 @@ def main():
                 # Keep email alerts enabled but redirect recipients
                 config.enable_teams_alerts = False
                 config.enable_special_teams_email = False
+                config.enable_webhook_alerts = False
             else:
                 # Dry-run without emails (original behavior)
                 logger.info("=" * 70)
@@ -201,21 +250,31 @@ def main():
                 config.enable_email_alerts = False
                 config.enable_teams_alerts = False
                 config.enable_special_teams_email = False
+                config.enable_webhook_alerts = False
         
         # Initialize components
         config = initialize_components(config)
         
         # Create scheduler
+        from src.core.scheduler import AlertScheduler
         scheduler = AlertScheduler(
             frequency_hours=config.schedule_frequency_hours,
-            timezone=config.timezone
+            timezone=config.timezone,
+            digest_times=config.digest_times if config.digest_mode else None,
+            max_concurrency=config.alert_concurrency,
+            alert_timeout=config.alert_timeout_seconds or None
         )
         
         # Register all alerts
         register_alerts(scheduler, config)
         
         # Run based on mode
-        if run_once_mode:
+        if args.send_digest:
+            if not config.digest_mode:
+                logger.warning("--send-digest ignored: DIGEST_MODE is not enabled")
+            else:
+                scheduler.run_digests()
+        elif run_once_mode:
             scheduler.run_once()
         else:
             scheduler.run_continuous()
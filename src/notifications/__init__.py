@@ -1,6 +1,25 @@
-#src/notifications/__init__.py
 """Notification handlers for alerts."""
-from .email_sender import EmailSender
-from .teams_sender import TeamsSender
+from src.utils.lazy import lazy_exports
 
-__all__ = ['EmailSender', 'TeamsSender']
+__all__ = [
+    'EmailSender',
+    'TeamsSender',
+    'NotificationChannel',
+    'ChannelRegistry',
+    'EmailChannel',
+    'TeamsChannel',
+    'WebhookChannel',
+    'FileSinkChannel',
+]
+
+# Imported on first use (see src.utils.lazy)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'EmailSender': '.email_sender',
+    'TeamsSender': '.teams_sender',
+    'NotificationChannel': '.channels',
+    'ChannelRegistry': '.channels',
+    'EmailChannel': '.channels',
+    'TeamsChannel': '.channels',
+    'WebhookChannel': '.channels',
+    'FileSinkChannel': '.channels',
+})
@@ -0,0 +1,535 @@
+#src/notifications/channels.py
+"""
+Pluggable notification channels.
+
+A channel delivers rendered notifications to one destination (email,
+Teams, a generic webhook, files on disk). ChannelRegistry fans each
+run's notifications out to every registered channel concurrently, so a
+slow or failing channel never delays or breaks another. Each channel
+has its own concurrency limit and tracking namespace.
+"""
+import json
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bounds of ChannelResult.summary(), which goes into health files and exceptions
+MAX_SUMMARY_ERRORS = 3
+MAX_SUMMARY_CHARS = 500
+
+
+@dataclass
+class RenderedNotification:
+    """
+    A notification job after rendering, ready for any channel.
+
+    Attributes:
+        subject: Subject line (without dry-run decoration)
+        plain_text: Plain text body
+        html_content: HTML body
+        recipients: Primary recipients
+        cc_recipients: CC recipients
+        data: DataFrame the notification was rendered from
+        metadata: Job metadata (vessel_name, display_columns, ...)
+        tracking_keys: Tracking keys of every row in data
+        attachments: Files sent with the email (e.g. the full list as CSV when
+            the body only shows the first rows)
+        stream: For large notifications rendered at send time: returns fresh
+            (plain text chunks, HTML chunks) iterators; plain_text and
+            html_content are empty then
+    """
+    subject: str
+    plain_text: str
+    html_content: str
+    recipients: List[str]
+    cc_recipients: List[str]
+    data: pd.DataFrame
+    metadata: Dict
+    tracking_keys: List[str] = field(default_factory=list)
+    attachments: List['Attachment'] = field(default_factory=list)
+    stream: Optional[Callable[[], Tuple[Iterable[str], Iterable[str]]]] = None
+
+    def iter_bodies(self) -> Tuple[Iterable[str], Iterable[str]]:
+        """(plain text, HTML) body chunks, streamed or already rendered."""
+        if self.stream is not None:
+            return self.stream()
+        return [self.plain_text], [self.html_content]
+
+
+@dataclass
+class ChannelResult:
+    """Outcome of delivering a batch of notifications through one channel."""
+    channel: str
+    sent_keys: Set[str] = field(default_factory=set)
+    delivered: int = 0
+    failed: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        """
+        One bounded line describing this channel's failures.
+
+        Gives the failure count and the first few distinct errors, so a run
+        where hundreds of notifications failed still fits the health file.
+
+        Returns:
+            e.g. "[email] 120 failed: Subject A: relay down; ... (+2 more errors)"
+        """
+        distinct = list(dict.fromkeys(self.errors))
+        text = f"[{self.channel}] {self.failed} failed"
+        if distinct:
+            text += ': ' + '; '.join(distinct[:MAX_SUMMARY_ERRORS])
+            if len(distinct) > MAX_SUMMARY_ERRORS:
+                text += f" (+{len(distinct) - MAX_SUMMARY_ERRORS} more errors)"
+        if len(text) > MAX_SUMMARY_CHARS:
+            text = text[:MAX_SUMMARY_CHARS - 3] + '...'
+        return text
+
+
+class NotificationChannel(ABC):
+    """
+    Base class for notification channels.
+
+    Attributes:
+        name: Unique channel name used in logs and the registry
+        tracking_namespace: Prefix for tracking keys ('' = bare keys, used by email
+            so existing tracking files stay valid)
+        max_concurrency: Max notifications this channel delivers in parallel
+    """
+
+    def __init__(self, name: str, tracking_namespace: Optional[str] = None, max_concurrency: int = 1):
+        self.name = name
+        self.tracking_namespace = name if tracking_namespace is None else tracking_namespace
+        self.max_concurrency = max(1, max_concurrency)
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def tracking_key(self, key: str) -> str:
+        """Namespace a row tracking key for this channel."""
+        return f"{self.tracking_namespace}:{key}" if self.tracking_namespace else key
+
+    @abstractmethod
+    def deliver(self, notifications: List[RenderedNotification]) -> ChannelResult:
+        """
+        Deliver notifications through this channel.
+
+        Implementations must not raise for individual message failures;
+        record them in the returned ChannelResult instead.
+
+        Args:
+            notifications: Notifications not yet sent on this channel
+
+        Returns:
+            ChannelResult with the (un-namespaced) tracking keys delivered
+        """
+        pass
+
+
+class PerMessageChannel(NotificationChannel):
+    """
+    Channel that sends each notification independently.
+
+    Subclasses implement send_one(); deliver() runs it with up to
+    max_concurrency notifications in flight and isolates failures.
+    """
+
+    @abstractmethod
+    def send_one(self, notification: RenderedNotification) -> None:
+        """Send a single notification, raising on failure."""
+        pass
+
+    def deliver(self, notifications: List[RenderedNotification]) -> ChannelResult:
+        result = ChannelResult(channel=self.name)
+
+        def attempt(notification: RenderedNotification):
+            try:
+                self.send_one(notification)
+                return notification, None
+            except Exception as e:
+                return notification, e
+
+        if self.max_concurrency == 1 or len(notifications) == 1:
+            outcomes = map(attempt, notifications)
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=f"{self.name}-send")
+            outcomes = list(pool.map(attempt, notifications))
+            pool.shutdown()
+
+        failed_keys: Set[str] = set()
+        for notification, error in outcomes:
+            if error is None:
+                result.delivered += 1
+                result.sent_keys.update(notification.tracking_keys)
+            else:
+                result.failed += 1
+                result.errors.append(f"{notification.subject}: {error}")
+                failed_keys.update(notification.tracking_keys)
+                self.logger.error(f"[{self.name}] Failed to send '{notification.subject}': {error}")
+
+        # A row carried by several notifications (e.g. a vessel email and its
+        # CC digest) is only sent once every one of them was delivered
+        result.sent_keys -= failed_keys
+        return result
+
+
+class EmailChannel(PerMessageChannel):
+    """
+    Email delivery through EmailSender.
+
+    Applies dry-run redirection: when dry_run_email is set every message
+    goes there instead, with the original recipients in the subject.
+    """
+
+    def __init__(
+        self,
+        sender: 'EmailSender',
+        dry_run_email: str = '',
+        name: str = 'email',
+        tracking_namespace: str = '',
+        max_concurrency: int = 1
+    ):
+        super().__init__(name, tracking_namespace, max_concurrency)
+        self.sender = sender
+        self.dry_run_email = dry_run_email
+
+    def address(self, notification: RenderedNotification) -> tuple:
+        """Return (subject, recipients, cc_recipients) for a notification."""
+        if self.dry_run_email:
+            subject = f"[DRY-RUN] {notification.subject} (Original: {', '.join(notification.recipients)})"
+            self.logger.info(f"[DRY-RUN-EMAIL] Redirecting to: {self.dry_run_email}")
+            self.logger.info(f"[DRY-RUN-EMAIL] Original recipients: {', '.join(notification.recipients)}")
+            if notification.cc_recipients:
+                self.logger.info(f"[DRY-RUN-EMAIL] Original CC: {', '.join(notification.cc_recipients)}")
+            return subject, [self.dry_run_email], []
+
+        return notification.subject, notification.recipients, notification.cc_recipients
+
+    def send_one(self, notification: RenderedNotification) -> None:
+        subject, recipients, cc_recipients = self.address(notification)
+        if notification.stream is not None:
+            text_chunks, html_chunks = notification.stream()
+            self.sender.send_streaming(
+                subject=subject,
+                text_chunks=text_chunks,
+                html_chunks=html_chunks,
+                recipients=recipients,
+                cc_recipients=cc_recipients,
+                attachments=notification.attachments
+            )
+            self.logger.info(f"[OK] [{self.name}] '{subject}' sent (streamed)")
+            return
+
+        self.sender.send(
+            subject=subject,
+            plain_text=notification.plain_text,
+            html_content=notification.html_content,
+            recipients=recipients,
+            cc_recipients=cc_recipients,
+            attachments=notification.attachments
+        )
+        self.logger.info(f"[OK] [{self.name}] '{subject}' sent")
+
+
+class SpecialTeamsEmailChannel(EmailChannel):
+    """
+    Copy of every email sent to a Teams channel's email address.
+
+    Original recipients are dropped; the address receives one message
+    per notification with no CC.
+    """
+
+    def __init__(self, sender: 'EmailSender', address: str, max_concurrency: int = 1):
+        super().__init__(sender, name='teams_email', tracking_namespace='teams_email', max_concurrency=max_concurrency)
+        self.special_address = address
+
+    def address(self, notification: RenderedNotification) -> tuple:
+        return notification.subject, [self.special_address], []
+
+
+class TeamsChannel(NotificationChannel):
+    """
+    Teams delivery through TeamsSender.
+
+    All notifications are packed into as few Adaptive Cards as the
+    sender's payload limit allows, so this channel is one POST per run
+    in the common case rather than one per vessel.
+    """
+
+    def __init__(self, sender: 'TeamsSender', name: str = 'teams', tracking_namespace: str = 'teams'):
+        super().__init__(name, tracking_namespace, max_concurrency=1)
+        self.sender = sender
+
+    def deliver(self, notifications: List[RenderedNotification]) -> ChannelResult:
+        result = ChannelResult(channel=self.name)
+        if not notifications:
+            return result
+
+        title = notifications[0].metadata.get('alert_title', 'Alert Notification')
+        updates = [self.build_update(n) for n in notifications]
+
+        try:
+            delivered_keys = set(self.sender.send_updates(title, updates))
+        except Exception as e:
+            # TeamsDeliveryError carries the keys of the cards posted before the failure
+            delivered_keys = set(getattr(e, 'delivered_keys', []))
+            result.errors.append(str(e))
+            self.logger.error(f"[{self.name}] Failed to send Teams notifications: {e}")
+        else:
+            result.sent_keys.update(delivered_keys)
+            result.delivered = len(notifications)
+            return result
+
+        failed_keys: Set[str] = set()
+        for notification in notifications:
+            if notification.tracking_keys and set(notification.tracking_keys) <= delivered_keys:
+                result.delivered += 1
+            else:
+                result.failed += 1
+                failed_keys.update(notification.tracking_keys)
+
+        # As in PerMessageChannel, a row shared with an undelivered notification stays unsent
+        result.sent_keys.update(delivered_keys - failed_keys)
+        return result
+
+    @staticmethod
+    def build_update(notification: RenderedNotification) -> 'TeamsUpdate':
+        """
+        Convert one rendered notification into a compact Teams card section.
+
+        Args:
+            notification: Rendered notification
+
+        Returns:
+            TeamsUpdate for TeamsSender.send_updates()
+        """
+        from src.notifications.teams_sender import TeamsUpdate
+
+        data, metadata = notification.data, notification.metadata
+        display_columns = [c for c in metadata.get('display_columns', list(data.columns)) if c in data.columns]
+        rows = data[display_columns].astype(object).where(data[display_columns].notna(), '').astype(str)
+
+        return TeamsUpdate(
+            title=metadata.get('vessel_name', '') or metadata.get('alert_title', ''),
+            subtitle=metadata.get('company_name', ''),
+            columns=[c.replace('_', ' ').title() for c in display_columns],
+            rows=rows.values.tolist(),
+            tracking_keys=list(notification.tracking_keys)
+        )
+
+
+class WebhookChannel(PerMessageChannel):
+    """
+    Generic JSON webhook: one POST per notification over a pooled session.
+
+    Payload: subject, recipients, cc_recipients, metadata and the
+    display rows as a list of objects.
+    """
+
+    def __init__(self, url: str, name: str = 'webhook', max_concurrency: int = 4, timeout: float = 30):
+        super().__init__(name, name, max_concurrency)
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def send_one(self, notification: RenderedNotification) -> None:
+        metadata = notification.metadata
+        display_columns = [c for c in metadata.get('display_columns', list(notification.data.columns))
+                           if c in notification.data.columns]
+        rows = notification.data[display_columns]
+        payload = {
+            'subject': notification.subject,
+            'recipients': notification.recipients,
+            'cc_recipients': notification.cc_recipients,
+            'metadata': {k: v for k, v in metadata.items() if isinstance(v, (str, int, float, bool, list))},
+            'rows': json.loads(rows.to_json(orient='records', date_format='iso')),
+        }
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class FileSinkChannel(PerMessageChannel):
+    """
+    Writes each notification to disk (HTML, text, attachments and a JSON header).
+
+    Useful as an audit trail and for inspecting output in dry-run mode,
+    where files are written but no rows are marked as sent.
+    """
+
+    def __init__(self, directory: Path, name: str = 'file', dry_run: bool = False):
+        super().__init__(name, name, max_concurrency=1)
+        self.directory = Path(directory)
+        self.dry_run = dry_run
+
+    def deliver(self, notifications: List[RenderedNotification]) -> ChannelResult:
+        result = super().deliver(notifications)
+        if self.dry_run and result.sent_keys:
+            self.logger.info(
+                f"[DRY-RUN] [{self.name}] Would mark {len(result.sent_keys)} event(s) as sent "
+                f"(tracking disabled in dry-run)"
+            )
+            result.sent_keys = set()
+        return result
+
+    def send_one(self, notification: RenderedNotification) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', notification.metadata.get('vessel_name', '') or notification.subject).strip('_')
+        base = self.directory / f"{stamp}_{slug[:60]}"
+
+        text_chunks, html_chunks = notification.iter_bodies()
+        with open(base.with_suffix('.txt'), 'w', encoding='utf-8') as f:
+            f.writelines(text_chunks)
+        with open(base.with_suffix('.html'), 'w', encoding='utf-8') as f:
+            f.writelines(html_chunks)
+        for attachment in notification.attachments:
+            with open(self.directory / f"{base.name}_{attachment.filename}", 'wb') as f:
+                f.writelines(attachment.iter_bytes())
+        base.with_suffix('.json').write_text(json.dumps({
+            'subject': notification.subject,
+            'recipients': notification.recipients,
+            'cc_recipients': notification.cc_recipients,
+            'tracking_keys': notification.tracking_keys,
+            'attachments': [attachment.filename for attachment in notification.attachments],
+        }, indent=2), encoding='utf-8')
+
+
+class ChannelRegistry:
+    """
+    Registry of enabled notification channels.
+
+    Usage:
+        registry = ChannelRegistry.from_config(config)
+        registry.register(MyChannel(...))
+        results = registry.dispatch(notifications, tracker.is_sent)
+    """
+
+    def __init__(self):
+        self._channels: Dict[str, NotificationChannel] = {}
+
+    def register(self, channel: NotificationChannel) -> None:
+        """Register a channel (replacing any channel with the same name)."""
+        self._channels[channel.name] = channel
+        logger.info(f"Registered notification channel: {channel.name}")
+
+    def unregister(self, name: str) -> None:
+        """Remove a channel by name (no-op if absent)."""
+        self._channels.pop(name, None)
+
+    def get(self, name: str) -> Optional[NotificationChannel]:
+        return self._channels.get(name)
+
+    @property
+    def channels(self) -> List[NotificationChannel]:
+        return list(self._channels.values())
+
+    @property
+    def tracking_namespaces(self) -> List[str]:
+        return [c.tracking_namespace for c in self._channels.values()]
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._channels
+
+    def dispatch(
+        self,
+        notifications: List[RenderedNotification],
+        is_sent: Optional[Callable[[str], bool]] = None
+    ) -> List[ChannelResult]:
+        """
+        Fan notifications out to every channel concurrently.
+
+        Each channel only receives notifications with at least one row not
+        yet sent in its own tracking namespace. A channel that raises is
+        recorded as failed; other channels are unaffected.
+
+        Args:
+            notifications: Rendered notifications for this run
+            is_sent: Lookup for namespaced tracking keys (e.g. tracker.is_sent)
+
+        Returns:
+            One ChannelResult per channel, in registration order
+        """
+        if not self._channels:
+            return []
+
+        def run_channel(channel: NotificationChannel) -> ChannelResult:
+            pending = notifications
+            if is_sent is not None:
+                pending = [
+                    n for n in notifications
+                    if not n.tracking_keys or not all(is_sent(channel.tracking_key(k)) for k in n.tracking_keys)
+                ]
+            skipped = len(notifications) - len(pending)
+
+            try:
+                result = channel.deliver(pending) if pending else ChannelResult(channel=channel.name)
+            except Exception as e:
+                logger.exception(f"Channel '{channel.name}' failed: {e}")
+                result = ChannelResult(channel=channel.name, failed=len(pending), errors=[str(e)])
+
+            result.skipped = skipped
+            logger.info(
+                f"[{channel.name}] delivered={result.delivered} failed={result.failed} skipped={result.skipped}"
+            )
+            return result
+
+        channels = self.channels
+        if len(channels) == 1:
+            return [run_channel(channels[0])]
+
+        with ThreadPoolExecutor(max_workers=len(channels), thread_name_prefix='channel') as pool:
+            return list(pool.map(run_channel, channels))
+
+    @classmethod
+    def from_config(cls, config: 'AlertConfig') -> 'ChannelRegistry':
+        """
+        Build the registry from feature flags and injected senders.
+
+        Args:
+            config: AlertConfig with runtime senders injected
+
+        Returns:
+            ChannelRegistry with every enabled channel registered
+        """
+        registry = cls()
+
+        if config.enable_email_alerts and config.email_sender is not None:
+            registry.register(EmailChannel(
+                config.email_sender,
+                dry_run_email=config.dry_run_email if config.dry_run else '',
+                max_concurrency=config.email_max_concurrency
+            ))
+
+        if config.enable_special_teams_email and config.special_teams_email and config.email_sender is not None:
+            registry.register(SpecialTeamsEmailChannel(
+                config.email_sender,
+                config.special_teams_email,
+                max_concurrency=config.email_max_concurrency
+            ))
+
+        if config.enable_teams_alerts and config.teams_sender is not None:
+            registry.register(TeamsChannel(config.teams_sender))
+
+        if config.enable_webhook_alerts and config.webhook_url:
+            registry.register(WebhookChannel(config.webhook_url, max_concurrency=config.webhook_max_concurrency))
+
+        if config.enable_file_sink:
+            registry.register(FileSinkChannel(config.file_sink_dir, dry_run=config.dry_run))
+
+        return registry
@@ -3,16 +3,21 @@
 Email notification handler with company-specific routing.
 
 Handles SMTP connection, email composition with HTML/text alternatives,
-and embedded logo attachments.
+embedded logos and file attachments. Large messages can be streamed
+into the SMTP DATA command (or a spool file) as their bodies are rendered.
 """
 import smtplib
+from contextlib import contextmanager
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
-from typing import List, Optional, Dict
+from email.mime.application import MIMEApplication
+from typing import Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
 import logging
 
+from src.notifications.mime_stream import DEFAULT_BUFFER_SIZE, InlineImage, write_message
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +33,8 @@ class EmailSender:
         smtp_user: str,
         smtp_pass: str,
         company_logos: Dict[str, Path],
-        dry_run: bool = False
+        dry_run: bool = False,
+        use_tls: bool = True
     ):
         """
         Initialize email sender.
@@ -40,6 +46,7 @@ class EmailSender:
             smtp_pass: SMTP password
             company_logos: Dict mapping company name to logo file path
             dry_run: If True, will not actually send emails (safety check)
+            use_tls: If False, skip STARTTLS on non-SSL ports (local relays / test sinks only)
         """
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
@@ -47,6 +54,7 @@ class EmailSender:
         self.smtp_pass = smtp_pass
         self.company_logos = company_logos
         self.dry_run = dry_run
+        self.use_tls = use_tls
 
     def send(
         self,
@@ -54,7 +62,8 @@ class EmailSender:
         plain_text: str,
         html_content: str,
         recipients: List[str],
-        cc_recipients: Optional[List[str]] = None
+        cc_recipients: Optional[List[str]] = None,
+        attachments: Optional[List['Attachment']] = None
     ) -> None:
         """
         Send email with both plain text and HTML versions.
@@ -65,6 +74,7 @@ class EmailSender:
             html_content: HTML version of email body
             recipients: List of primary recipient email addresses
             cc_recipients: Optional list of CC recipient email addresses
+            attachments: Optional files to attach (e.g. the full list as gzipped CSV)
 
         Raises:
             ValueError: If no recipients provided
@@ -84,8 +94,13 @@ class EmailSender:
         if cc_recipients is None:
             cc_recipients = []
 
-        # Create multipart message
-        msg = MIMEMultipart('related')
+        # Create multipart message (wrapped in multipart/mixed when files are attached)
+        related = MIMEMultipart('related')
+        if attachments:
+            msg = MIMEMultipart('mixed')
+            msg.attach(related)
+        else:
+            msg = related
         msg['Subject'] = subject
         msg['From'] = self.smtp_user
         msg['To'] = ', '.join(recipients)
@@ -94,7 +109,7 @@ class EmailSender:
 
         # Create alternative part for text and HTML
         msg_alternative = MIMEMultipart('alternative')
-        msg.attach(msg_alternative)
+        related.attach(msg_alternative)
 
         # Attach plain text version
         part_text = MIMEText(plain_text, 'plain', 'utf-8')
@@ -114,36 +129,204 @@ class EmailSender:
                 cid = f"{company_name}_logo"
                 img.add_header('Content-ID', f'<{cid}>')
                 img.add_header('Content-Disposition', 'inline', filename=filename)
-                msg.attach(img)
+                related.attach(img)
+
+        # Attach files (e.g. the full record list when the body is truncated)
+        for attachment in attachments or []:
+            part = MIMEApplication(attachment.read(), _subtype=attachment.mime_type.split('/', 1)[1])
+            part.add_header('Content-Disposition', 'attachment', filename=attachment.filename)
+            msg.attach(part)
 
         # Send email
         try:
-            if self.smtp_port == 465:
-                # SSL connection
-                with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30) as smtp:
-                    smtp.login(self.smtp_user, self.smtp_pass)
-                    smtp.send_message(msg)
-            else:
-                # STARTTLS connection (ports 587/25)
-                with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as smtp:
-                    smtp.ehlo()
-                    smtp.starttls()
-                    smtp.ehlo()
-                    smtp.login(self.smtp_user, self.smtp_pass)
-                    smtp.send_message(msg)
-
-            total_recipients = len(recipients) + len(cc_recipients)
-            cc_info = f" (including {len(cc_recipients)} CC)" if cc_recipients else ""
-            logger.info(
-                f"[OK] Email sent successfully to {total_recipients} recipient(s){cc_info}: "
-                f"To: {', '.join(recipients)}"
-                f"{f' | CC: {', '.join(cc_recipients)}' if cc_recipients else ''}"
+            with self._connect() as smtp:
+                smtp.send_message(msg)
+
+            self._log_sent(recipients, cc_recipients)
+
+        except Exception as e:
+            logger.exception(f"[EXC] Failed to send email: {e}")
+            raise
+
+    def send_streaming(
+        self,
+        subject: str,
+        text_chunks: Iterable[str],
+        html_chunks: Iterable[str],
+        recipients: List[str],
+        cc_recipients: Optional[List[str]] = None,
+        attachments: Optional[List['Attachment']] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE
+    ) -> None:
+        """
+        Send an email whose bodies are produced in chunks, writing the MIME
+        message straight into the SMTP DATA stream.
+
+        The message has the same structure as send(); only about buffer_size
+        bytes of it are held at a time, so very large notifications do not
+        need the full bodies, a MIME tree and a serialised copy in memory.
+
+        Args:
+            subject: Email subject line
+            text_chunks: Plain text body pieces (e.g. TextFormatter.iter_format())
+            html_chunks: HTML body pieces (e.g. HTMLFormatter.iter_format())
+            recipients: List of primary recipient email addresses
+            cc_recipients: Optional list of CC recipient email addresses
+            attachments: Optional files to attach
+            buffer_size: Bytes written to the socket at a time
+
+        Raises:
+            ValueError: If no recipients provided
+            RuntimeError: If called in dry-run mode
+            smtplib.SMTPException: If email sending fails
+        """
+        if self.dry_run:
+            raise RuntimeError(
+                "[XXX] SAFETY CHECK FAILED: EmailSender.send_streaming() called in dry-run mode! "
+                "This should never happen. Emails will NOT be sent."
             )
 
+        if not recipients:
+            raise ValueError("No recipients provided")
+
+        cc_recipients = cc_recipients or []
+        headers = self._headers(subject, recipients, cc_recipients)
+
+        try:
+            with self._connect() as smtp:
+                smtp.ehlo_or_helo_if_needed()
+                code, response = smtp.mail(self.smtp_user)
+                if code != 250:
+                    smtp.rset()
+                    raise smtplib.SMTPSenderRefused(code, response, self.smtp_user)
+
+                refused = {}
+                for address in recipients + cc_recipients:
+                    code, response = smtp.rcpt(address)
+                    if code not in (250, 251):
+                        refused[address] = (code, response)
+                if len(refused) == len(recipients) + len(cc_recipients):
+                    smtp.rset()
+                    raise smtplib.SMTPRecipientsRefused(refused)
+
+                code, response = smtp.docmd('DATA')
+                if code != 354:
+                    smtp.rset()
+                    raise smtplib.SMTPDataError(code, response)
+
+                def write(block: bytes) -> None:
+                    # Blocks always start at a line start; dot-stuff per RFC 5321
+                    if block.startswith(b'.'):
+                        block = b'.' + block
+                    smtp.send(block.replace(b'\r\n.', b'\r\n..'))
+
+                try:
+                    size = write_message(
+                        write, headers, text_chunks, html_chunks,
+                        self._inline_images(), attachments or [], buffer_size
+                    )
+                except Exception:
+                    # Abandon the half-written DATA; the server discards it on disconnect
+                    smtp.close()
+                    raise
+                smtp.send(b'.\r\n')
+                code, response = smtp.getreply()
+                if code != 250:
+                    raise smtplib.SMTPDataError(code, response)
+
+            if refused:
+                logger.warning(f"Recipients refused: {', '.join(refused)}")
+            self._log_sent(recipients, cc_recipients, f" (streamed, {size / 1024:.0f} KB)")
+
         except Exception as e:
             logger.exception(f"[EXC] Failed to send email: {e}")
             raise
 
+    def spool(
+        self,
+        path: Path,
+        subject: str,
+        text_chunks: Iterable[str],
+        html_chunks: Iterable[str],
+        recipients: List[str],
+        cc_recipients: Optional[List[str]] = None,
+        attachments: Optional[List['Attachment']] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE
+    ) -> int:
+        """
+        Write the message send_streaming() would send to a spool (.eml) file.
+
+        Works in dry-run mode; nothing is sent.
+
+        Args:
+            path: File to write (replaced if it exists)
+            subject: Email subject line
+            text_chunks: Plain text body pieces
+            html_chunks: HTML body pieces
+            recipients: Primary recipient email addresses
+            cc_recipients: Optional CC recipient email addresses
+            attachments: Optional files to attach
+            buffer_size: Bytes written to the file at a time
+
+        Returns:
+            Bytes written
+        """
+        headers = self._headers(subject, recipients, cc_recipients or [])
+        with open(path, 'wb') as f:
+            return write_message(
+                f.write, headers, text_chunks, html_chunks,
+                self._inline_images(), attachments or [], buffer_size
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[smtplib.SMTP]:
+        """Open an authenticated SMTP connection (SSL, STARTTLS or plain)."""
+        if self.smtp_port == 465:
+            # SSL connection
+            with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30) as smtp:
+                smtp.login(self.smtp_user, self.smtp_pass)
+                yield smtp
+        elif self.use_tls:
+            # STARTTLS connection (ports 587/25)
+            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as smtp:
+                smtp.ehlo()
+                smtp.starttls()
+                smtp.ehlo()
+                smtp.login(self.smtp_user, self.smtp_pass)
+                yield smtp
+        else:
+            # Plain connection (local relay or SMTP sink)
+            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as smtp:
+                smtp.ehlo()
+                if self.smtp_user and smtp.has_extn('auth'):
+                    smtp.login(self.smtp_user, self.smtp_pass)
+                yield smtp
+
+    def _headers(self, subject: str, recipients: List[str], cc_recipients: List[str]) -> List[tuple]:
+        """Top-level headers for a streamed message (same as send() sets)."""
+        headers = [('Subject', subject), ('From', self.smtp_user), ('To', ', '.join(recipients))]
+        if cc_recipients:
+            headers.append(('Cc', ', '.join(cc_recipients)))
+        return headers
+
+    def _inline_images(self) -> List[InlineImage]:
+        """Company logos as inline images (CID <company_name>_logo)."""
+        images = []
+        for company_name, logo_path in self.company_logos.items():
+            logo_data, mime_type, filename = self._load_logo(logo_path)
+            if logo_data:
+                images.append(InlineImage(f"{company_name}_logo", filename, mime_type, logo_data))
+        return images
+
+    def _log_sent(self, recipients: List[str], cc_recipients: List[str], detail: str = '') -> None:
+        total_recipients = len(recipients) + len(cc_recipients)
+        cc_info = f" (including {len(cc_recipients)} CC)" if cc_recipients else ""
+        logger.info(
+            f"[OK] Email sent successfully to {total_recipients} recipient(s){cc_info}{detail}: "
+            f"To: {', '.join(recipients)}"
+            f"{f' | CC: {', '.join(cc_recipients)}' if cc_recipients else ''}"
+        )
+
     def _load_logo(self, logo_path: Path) -> tuple:
         """
         Load logo file for email attachment.
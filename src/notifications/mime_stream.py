@@ -0,0 +1,200 @@
+#src/notifications/mime_stream.py
+"""
+Incremental MIME message writer.
+
+Writes a notification email (plain-text and HTML alternatives, inline
+logos, file attachments) to a binary sink while its bodies are still
+being produced. Each part is base64-encoded a chunk at a time and output
+goes through a fixed-size buffer, so a large message never exists as
+whole body strings, a MIMEMultipart tree and a serialised copy at once.
+
+The sink is any callable taking bytes: a socket inside an SMTP DATA
+command (see EmailSender.send_streaming) or a spool file's write().
+"""
+import base64
+import secrets
+from dataclasses import dataclass
+from email.header import Header
+from typing import Callable, Iterable, Sequence, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Raw bytes per 76-character base64 line (what the email package emits)
+_LINE_BYTES = 57
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class InlineImage:
+    """An image referenced from the HTML body as cid:<content_id>."""
+    content_id: str
+    filename: str
+    mime_type: str
+    content: bytes
+
+
+class MIMEStreamWriter:
+    """
+    Buffered, line-oriented writer for one MIME message.
+
+    Output is only handed to the sink in whole CRLF-terminated lines, in
+    blocks of about buffer_size bytes.
+    """
+
+    def __init__(self, write: Callable[[bytes], object], buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Initialize writer.
+
+        Args:
+            write: Sink receiving blocks of encoded message bytes
+            buffer_size: Bytes collected before each write
+        """
+        self._write = write
+        self.buffer_size = buffer_size
+        self.bytes_written = 0
+        self._buffer = bytearray()
+
+    def line(self, text: str = '') -> None:
+        """Write one ASCII line (CRLF appended)."""
+        self._buffer += text.encode('ascii') + b'\r\n'
+        self._maybe_flush()
+
+    def header(self, name: str, value: str) -> None:
+        """
+        Write a header, RFC 2047-encoding non-ASCII values and folding long ones.
+
+        Args:
+            name: Header name
+            value: Header value
+        """
+        charset = None if value.isascii() else 'utf-8'
+        encoded = Header(value, charset, header_name=name).encode(linesep='\r\n')
+        self.line(f"{name}: {encoded}")
+
+    def base64_body(self, chunks: Iterable[Union[str, bytes]]) -> None:
+        """
+        Write a part body as base64, encoding chunks as they arrive.
+
+        Text chunks are UTF-8 encoded. Only whole 57-byte groups are encoded
+        at a time; the remainder waits for the next chunk.
+
+        Args:
+            chunks: Body pieces, in order
+        """
+        pending = b''
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            pending += chunk
+            usable = len(pending) - len(pending) % _LINE_BYTES
+            if usable:
+                self._encode(pending[:usable])
+                pending = pending[usable:]
+        if pending:
+            self._encode(pending)
+
+    def flush(self) -> None:
+        """Hand any buffered bytes to the sink."""
+        if self._buffer:
+            self._write(bytes(self._buffer))
+            self.bytes_written += len(self._buffer)
+            self._buffer.clear()
+
+    def _encode(self, data: bytes) -> None:
+        # encodebytes emits 76-character lines ending in \n; large inputs go
+        # in blocks so the buffer stays near buffer_size
+        block = max(_LINE_BYTES, self.buffer_size // 4 * 3 // _LINE_BYTES * _LINE_BYTES)
+        for start in range(0, len(data), block):
+            self._buffer += base64.encodebytes(data[start:start + block]).replace(b'\n', b'\r\n')
+            self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+
+def write_message(
+    write: Callable[[bytes], object],
+    headers: Sequence[tuple],
+    text_chunks: Iterable[str],
+    html_chunks: Iterable[str],
+    inline_images: Sequence[InlineImage] = (),
+    attachments: Sequence['Attachment'] = (),
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> int:
+    """
+    Stream a complete notification email into a sink.
+
+    Structure matches EmailSender.send(): multipart/related holding a
+    multipart/alternative (text, then HTML) and the inline images, wrapped
+    in multipart/mixed with the attachments when there are any. The text
+    body is consumed completely before the HTML body is started.
+
+    Args:
+        write: Sink for encoded message bytes (socket or file write)
+        headers: (name, value) pairs for the top-level headers (Subject, From, To, ...)
+        text_chunks: Plain text body pieces
+        html_chunks: HTML body pieces
+        inline_images: Images referenced by cid: from the HTML
+        attachments: Files attached to the message
+        buffer_size: Bytes collected before each write
+
+    Returns:
+        Total bytes written
+    """
+    writer = MIMEStreamWriter(write, buffer_size)
+
+    for name, value in headers:
+        writer.header(name, value)
+    writer.line('MIME-Version: 1.0')
+
+    mixed = _boundary() if attachments else None
+    if mixed:
+        writer.line(f'Content-Type: multipart/mixed; boundary="{mixed}"')
+        writer.line()
+        writer.line(f'--{mixed}')
+
+    related, alternative = _boundary(), _boundary()
+    writer.line(f'Content-Type: multipart/related; boundary="{related}"')
+    writer.line()
+
+    writer.line(f'--{related}')
+    writer.line(f'Content-Type: multipart/alternative; boundary="{alternative}"')
+    writer.line()
+    for subtype, chunks in (('plain', text_chunks), ('html', html_chunks)):
+        writer.line(f'--{alternative}')
+        writer.line(f'Content-Type: text/{subtype}; charset="utf-8"')
+        writer.line('Content-Transfer-Encoding: base64')
+        writer.line()
+        writer.base64_body(chunks)
+    writer.line(f'--{alternative}--')
+
+    for image in inline_images:
+        writer.line(f'--{related}')
+        writer.line(f'Content-Type: {image.mime_type}')
+        writer.line('Content-Transfer-Encoding: base64')
+        writer.line(f'Content-ID: <{image.content_id}>')
+        writer.header('Content-Disposition', f'inline; filename="{image.filename}"')
+        writer.line()
+        writer.base64_body([image.content])
+    writer.line(f'--{related}--')
+
+    if mixed:
+        for attachment in attachments:
+            writer.line(f'--{mixed}')
+            writer.line(f'Content-Type: {attachment.mime_type}')
+            writer.line('Content-Transfer-Encoding: base64')
+            writer.header('Content-Disposition', f'attachment; filename="{attachment.filename}"')
+            writer.line()
+            writer.base64_body(attachment.iter_bytes())
+        writer.line(f'--{mixed}--')
+
+    writer.flush()
+    return writer.bytes_written
+
+
+def _boundary() -> str:
+    # Boundary lines start with '--', which never occurs in base64 bodies or headers
+    return f"==============={secrets.token_hex(12)}=="
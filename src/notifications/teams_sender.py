@@ -1,39 +1,338 @@
 #src/notifications/teams_sender.py
 """
-Microsoft Teams notification handler (stub for future implementation).
+Microsoft Teams notification handler.
 
-This is a placeholder for future Teams integration.
+Posts Adaptive Cards to a Teams incoming webhook (or Workflows webhook)
+over a single pooled keep-alive HTTP session. Many vessel updates are
+packed into one card up to the webhook payload limit, and 429 / 5xx
+responses are retried honouring Retry-After (up to a maximum wait).
 """
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+import requests
+from requests.adapters import HTTPAdapter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Teams rejects webhook payloads above ~28 KB; keep headroom for the envelope
+DEFAULT_MAX_PAYLOAD_BYTES = 25_000
+
+
+class TeamsDeliveryError(RuntimeError):
+    """
+    Raised when a card fails after earlier cards of the same call were posted.
+
+    Attributes:
+        delivered_keys: Tracking keys of the updates posted before the failure
+    """
+
+    def __init__(self, message: str, delivered_keys: List[str]):
+        super().__init__(message)
+        self.delivered_keys = delivered_keys
+
+
+@dataclass
+class TeamsUpdate:
+    """
+    One logical update (e.g. one vessel's documents) to show in a card.
+
+    Attributes:
+        title: Heading for this update (e.g. vessel name)
+        rows: Display rows, each a sequence of already-formatted cell strings
+        columns: Column titles matching each row
+        subtitle: Optional secondary line (e.g. company name)
+        tracking_keys: Keys delivered when this update is posted
+    """
+    title: str
+    rows: List[Sequence[str]]
+    columns: List[str]
+    subtitle: str = ''
+    tracking_keys: List[str] = field(default_factory=list)
+
 
 class TeamsSender:
     """
     Handles Microsoft Teams webhook notifications.
-    
-    Currently a stub - to be implemented in future.
     """
-    
-    def __init__(self, webhook_url: str):
+
+    def __init__(
+        self,
+        webhook_url: str,
+        max_payload_bytes: int = DEFAULT_MAX_PAYLOAD_BYTES,
+        max_retries: int = 3,
+        timeout: float = 30,
+        min_interval_seconds: float = 0.25,
+        max_retry_wait: float = 60,
+        dry_run: bool = False
+    ):
         """
         Initialize Teams sender.
-        
+
         Args:
             webhook_url: Microsoft Teams webhook URL
+            max_payload_bytes: Upper bound on a single card's JSON payload
+            max_retries: Retries on 429 / 5xx / connection errors
+            timeout: Per-request timeout in seconds
+            min_interval_seconds: Minimum spacing between POSTs (client-side throttle)
+            max_retry_wait: Longest wait (seconds) before a retry; a card whose
+                Retry-After asks for more fails instead of stalling the run
+            dry_run: If True, will not actually post (safety check)
         """
         self.webhook_url = webhook_url
-        logger.info("TeamsSender initialized (stub - not yet implemented)")
-    
-    def send(self, title: str, message: str, data: dict) -> None:
+        self.max_payload_bytes = max_payload_bytes
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.min_interval_seconds = min_interval_seconds
+        self.max_retry_wait = max_retry_wait
+        self.dry_run = dry_run
+
+        # One keep-alive session for the lifetime of the sender
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+        self._throttle_lock = threading.Lock()
+        self._last_post = 0.0
+
+        logger.info("TeamsSender initialized")
+
+    def send(self, title: str, message: str, data: Optional[dict] = None) -> None:
         """
-        Send message to Teams channel (not yet implemented).
-        
+        Send a single free-form message card.
+
         Args:
             title: Message title
             message: Message body
-            data: Additional data to include
+            data: Optional key/value facts to include
+        """
+        body = [
+            self._text_block(title, size='Large', weight='Bolder'),
+            self._text_block(message),
+        ]
+        if data:
+            body.append({
+                'type': 'FactSet',
+                'facts': [{'title': str(k), 'value': str(v)} for k, v in data.items()]
+            })
+        self._post(self._envelope(body))
+
+    def send_updates(self, title: str, updates: List[TeamsUpdate]) -> List[str]:
+        """
+        Post many updates batched into as few cards as the payload limit allows.
+
+        Cards are posted in order and posting stops at the first failure.
+
+        Args:
+            title: Card heading shared by every batch
+            updates: Updates to deliver
+
+        Returns:
+            Tracking keys of all updates whose card was delivered
+
+        Raises:
+            RuntimeError: If called in dry-run mode
+            TeamsDeliveryError: If a card is rejected after all retries; carries
+                the tracking keys of the cards posted before it
+        """
+        if not updates:
+            return []
+
+        cards = self.build_cards(title, updates)
+        delivered: List[str] = []
+
+        for idx, (payload, keys) in enumerate(cards, 1):
+            try:
+                self._post(payload)
+            except requests.RequestException as e:
+                logger.error(f"Teams card {idx}/{len(cards)} failed; {idx - 1} card(s) posted before it")
+                raise TeamsDeliveryError(f"Teams card {idx}/{len(cards)} failed: {e}", delivered) from e
+            delivered.extend(keys)
+            logger.info(f"[OK] Teams card {idx}/{len(cards)} posted")
+
+        logger.info(f"[OK] {len(updates)} update(s) delivered to Teams in {len(cards)} card(s)")
+        return delivered
+
+    def build_cards(self, title: str, updates: List[TeamsUpdate]) -> List[tuple]:
+        """
+        Pack updates into card payloads no larger than max_payload_bytes.
+
+        Updates that do not fit a card on their own are split by rows
+        into continuation sections.
+
+        Args:
+            title: Card heading
+            updates: Updates to pack
+
+        Returns:
+            List of (payload_dict, tracking_keys) tuples
+        """
+        header = [self._text_block(title, size='Large', weight='Bolder')]
+        base_size = self._size(self._envelope(header))
+        budget = self.max_payload_bytes - base_size
+
+        cards: List[tuple] = []
+        sections: List[Dict[str, Any]] = []
+        keys: List[str] = []
+        used = 0
+
+        def flush():
+            nonlocal sections, keys, used
+            if sections:
+                cards.append((self._envelope(header + sections), keys))
+            sections, keys, used = [], [], 0
+
+        for update in updates:
+            for section, section_keys in self._split_update(update, budget):
+                size = self._size(section) + 1  # separating comma
+                if used + size > budget:
+                    flush()
+                sections.append(section)
+                keys.extend(section_keys)
+                used += size
+
+        flush()
+        return cards
+
+    def close(self) -> None:
+        """Close the pooled HTTP session."""
+        self.session.close()
+
+    def _split_update(self, update: TeamsUpdate, budget: int) -> List[tuple]:
+        """Return the update as a list of (section, keys) pieces, each within budget."""
+        section = self._section(update, update.rows)
+        if self._size(section) <= budget or len(update.rows) <= 1:
+            return [(section, update.tracking_keys)]
+
+        pieces = []
+        rows: List[Sequence[str]] = []
+        for row in update.rows:
+            candidate = self._section(update, rows + [row], continued=bool(pieces))
+            if rows and self._size(candidate) > budget:
+                pieces.append(self._section(update, rows, continued=bool(pieces)))
+                rows = [row]
+            else:
+                rows.append(row)
+        pieces.append(self._section(update, rows, continued=bool(pieces)))
+
+        # Keys are only complete once every piece is posted; attach them to the last
+        return [(piece, []) for piece in pieces[:-1]] + [(pieces[-1], update.tracking_keys)]
+
+    def _section(self, update: TeamsUpdate, rows: List[Sequence[str]], continued: bool = False) -> Dict[str, Any]:
+        heading = f"{update.title} (cont.)" if continued else update.title
+        items = [self._text_block(heading, weight='Bolder', size='Medium')]
+        if update.subtitle:
+            items.append(self._text_block(update.subtitle, isSubtle=True, spacing='None'))
+        if update.columns:
+            items.append(self._text_block(' · '.join(update.columns), isSubtle=True, size='Small'))
+        for row in rows:
+            items.append(self._text_block(' · '.join(str(v) for v in row if v != ''), spacing='Small'))
+
+        return {'type': 'Container', 'separator': True, 'items': items}
+
+    @staticmethod
+    def _text_block(text: str, **props) -> Dict[str, Any]:
+        return {'type': 'TextBlock', 'text': text, 'wrap': True, **props}
+
+    @staticmethod
+    def _envelope(body: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            'type': 'message',
+            'attachments': [{
+                'contentType': 'application/vnd.microsoft.card.adaptive',
+                'contentUrl': None,
+                'content': {
+                    '$schema': 'http://adaptivecards.io/schemas/adaptive-card.json',
+                    'type': 'AdaptiveCard',
+                    'version': '1.4',
+                    'msteams': {'width': 'Full'},
+                    'body': body,
+                },
+            }],
+        }
+
+    @staticmethod
+    def _size(obj: Any) -> int:
+        return len(json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+    def _post(self, payload: Dict[str, Any]) -> None:
         """
-        logger.warning("Teams notifications not yet implemented - skipping")
-        pass
+        POST a payload, retrying on 429 / 5xx / connection errors.
+
+        Raises:
+            RuntimeError: If called in dry-run mode
+            requests.HTTPError: If the webhook rejects the payload, or asks for
+                a retry later than max_retry_wait
+        """
+        # SAFETY CHECK: Prevent accidental posts in dry-run mode
+        if self.dry_run:
+            raise RuntimeError(
+                "[XXX] SAFETY CHECK FAILED: TeamsSender called in dry-run mode! "
+                "This should never happen. Messages will NOT be posted."
+            )
+
+        body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        attempt = 0
+
+        while True:
+            self._throttle()
+            try:
+                response = self.session.post(self.webhook_url, data=body, timeout=self.timeout)
+            except requests.ConnectionError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(2 ** attempt, self.max_retry_wait)
+                logger.warning(f"Teams webhook connection error ({e}); retrying in {delay}s")
+            else:
+                # Legacy connectors answer 200 with an error string when throttled
+                throttled = response.status_code == 429 or (
+                    response.ok and 'HTTP error 429' in response.text
+                )
+                if response.ok and not throttled:
+                    return
+                if not throttled and response.status_code < 500:
+                    response.raise_for_status()
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+                    raise requests.HTTPError(f"Teams webhook throttled: {response.text[:200]}", response=response)
+
+                delay = self._retry_after(response, default=2 ** attempt)
+                if delay > self.max_retry_wait:
+                    raise requests.HTTPError(
+                        f"Teams webhook asked to retry after {delay:.0f}s "
+                        f"(more than {self.max_retry_wait:g}s)", response=response
+                    )
+                logger.warning(f"Teams webhook returned {response.status_code}; retrying in {delay:.1f}s")
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _throttle(self) -> None:
+        with self._throttle_lock:
+            wait = self._last_post + self.min_interval_seconds - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_post = time.monotonic()
+
+    @staticmethod
+    def _retry_after(response: requests.Response, default: float) -> float:
+        """Parse Retry-After (seconds or HTTP date), falling back to default."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return default
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return default
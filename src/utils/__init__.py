@@ -1,6 +1,11 @@
-#src/utils/__init__.py
 """Utility functions for alert system."""
-from .validation import validate_dataframe_columns
-from .image_utils import load_logo
+from .lazy import lazy_exports
 
-__all__ = ['validate_dataframe_columns', 'load_logo']
+__all__ = ['validate_dataframe_columns', 'load_logo', 'group_slices', 'lazy_exports']
+
+# Imported on first use (see src.utils.lazy)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'validate_dataframe_columns': '.validation',
+    'load_logo': '.image_utils',
+    'group_slices': '.grouping',
+})
@@ -0,0 +1,126 @@
+#src/utils/datetimes.py
+"""
+Vectorized timestamp normalisation and deferred date formatting.
+
+Timestamps are normalised once to int64 UTC epochs (nanoseconds; naive
+values are UTC, missing values are NaT), so window filters are a single
+integer comparison over the column. Only the kept rows are converted to
+the local timezone, and they stay datetimes: format_datetimes() turns
+them into display strings when a job is prepared for rendering, for the
+rows actually being sent, formatting each distinct value once.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Mapping, Optional
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+import logging
+
+logger = logging.getLogger(__name__)
+
+# strftime formats numpy renders natively: format -> (datetime64 unit, date/time separator)
+_ISO_FORMATS = {
+    '%Y-%m-%d': ('D', None),
+    '%Y-%m-%d %H:%M': ('m', ' '),
+    '%Y-%m-%d %H:%M:%S': ('s', ' '),
+    '%Y-%m-%dT%H:%M:%S': ('s', 'T'),
+}
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    """Timezone object for a name, created once per name."""
+    return ZoneInfo(name)
+
+
+def utc_epochs(values: pd.Series) -> np.ndarray:
+    """
+    Normalise timestamps to UTC epoch nanoseconds.
+
+    Args:
+        values: datetime64 (naive = UTC, or timezone-aware), datetimes or
+            parseable strings
+
+    Returns:
+        int64 array; missing values are NaT's integer (below every timestamp)
+    """
+    return pd.to_datetime(values, utc=True).array.as_unit('ns').asi8
+
+
+def epoch(moment: datetime) -> int:
+    """UTC epoch nanoseconds of a datetime (naive = UTC), comparable with utc_epochs()."""
+    return pd.Timestamp(moment).as_unit('ns').value
+
+
+def localize(epochs: np.ndarray, timezone: str, index: Optional[pd.Index] = None) -> pd.Series:
+    """
+    Turn UTC epochs back into timezone-aware datetimes.
+
+    Args:
+        epochs: int64 array from utc_epochs()
+        timezone: Local timezone name
+        index: Index of the resulting Series
+
+    Returns:
+        datetime64[ns, timezone] Series
+    """
+    stamps = pd.to_datetime(epochs, unit='ns', utc=True).tz_convert(get_zone(timezone))
+    return pd.Series(stamps.array, index=index)
+
+
+def format_values(values: pd.Series, date_format: str) -> np.ndarray:
+    """
+    Format a datetime column as strings, formatting each distinct value once.
+
+    Args:
+        values: datetime64 Series
+        date_format: strftime format
+
+    Returns:
+        Object array of strings ('' for NaT), in row order
+    """
+    codes, uniques = pd.factorize(values)
+    # Code -1 (NaT) picks the trailing ''
+    strings = np.append(_strftime(uniques, date_format), '')
+    return strings[codes]
+
+
+def _strftime(stamps: pd.DatetimeIndex, date_format: str) -> np.ndarray:
+    """DatetimeIndex.strftime(), rendered by numpy for the common ISO formats."""
+    iso = _ISO_FORMATS.get(date_format)
+    if iso is None:
+        return stamps.strftime(date_format).to_numpy(dtype=object)
+
+    unit, separator = iso
+    # Local wall-clock time, truncated to the format's precision as strftime does
+    wall = stamps.tz_localize(None) if stamps.tz is not None else stamps
+    strings = np.datetime_as_string(wall.to_numpy().astype(f'M8[{unit}]'), unit=unit)
+    if separator not in (None, 'T'):
+        strings = np.char.replace(strings, 'T', separator)
+    return strings.astype(object)
+
+
+def format_datetimes(df: pd.DataFrame, formats: Mapping[str, str]) -> pd.DataFrame:
+    """
+    Format datetime columns for display.
+
+    Columns that are missing or already hold strings (e.g. rows formatted by
+    the small-run or Polars paths) are left alone.
+
+    Args:
+        df: DataFrame to format (not modified)
+        formats: Column -> strftime format
+
+    Returns:
+        New DataFrame with those columns as strings, or df itself if none
+        needed formatting
+    """
+    columns = {
+        column: date_format for column, date_format in formats.items()
+        if column in df.columns and is_datetime64_any_dtype(df[column].dtype)
+    }
+    if not columns:
+        return df
+    return df.assign(**{column: format_values(df[column], date_format) for column, date_format in columns.items()})
@@ -0,0 +1,49 @@
+#src/utils/grouping.py
+"""
+DataFrame grouping utilities.
+
+Splits a frame into per-group pieces without a copy per group: rows are
+reordered once so every group is a contiguous block, and each group is a
+slice (view) of that single reordered frame.
+"""
+from typing import Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def group_slices(df: pd.DataFrame, by: List[str]) -> Iterator[Tuple[tuple, pd.DataFrame]]:
+    """
+    Iterate over groups as slices of one shared frame.
+
+    Groups come in order of first appearance (unsorted), keys are grouped as
+    categoricals (only observed combinations), and rows with a missing key
+    are left out, as in df.groupby(by). Within a group, rows keep their
+    order and index labels.
+
+    The slices share memory with each other; treat them as read-only.
+
+    Args:
+        df: DataFrame to split
+        by: Columns to group by
+
+    Yields:
+        (key tuple, group rows) per group
+    """
+    if df.empty:
+        return
+
+    keys = [df[column].astype('category') for column in by]
+    group_numbers = df.groupby(keys, sort=False, observed=True).ngroup()
+
+    present = np.flatnonzero(group_numbers.notna().to_numpy())  # NaN for rows with a missing key
+    codes = group_numbers.to_numpy()[present].astype(np.intp)
+    order = present[np.argsort(codes, kind='stable')]
+    ordered = df.take(order)
+
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(codes))))
+    group_keys = ordered[by].iloc[bounds[:-1]].itertuples(index=False, name=None)
+    for key, start, stop in zip(group_keys, bounds[:-1], bounds[1:]):
+        yield key, ordered.iloc[start:stop]
@@ -0,0 +1,39 @@
+#src/utils/lazy.py
+"""
+Lazy package exports.
+
+Package __init__ modules re-export their public names through
+lazy_exports(), so importing one submodule (e.g. src.core.config) does not
+import every sibling module and its dependencies (pandas, SQLAlchemy,
+requests). A name's module is imported on first access and the value is
+then cached on the package.
+"""
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build a package's module-level __getattr__ and __dir__ (PEP 562).
+
+    Args:
+        package: The package's __name__
+        exports: Exported name -> module defining it (absolute, or relative
+            to the package, e.g. '.base_alert')
+
+    Returns:
+        (__getattr__, __dir__) to assign in the package's __init__
+    """
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
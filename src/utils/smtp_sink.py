@@ -0,0 +1,285 @@
+#src/utils/smtp_sink.py
+"""
+Local SMTP stand-in server for tests and benchmarks.
+
+Accepts, counts and optionally stores messages without relaying them
+anywhere. Latency and 4xx/5xx replies can be injected to exercise
+sender retry and error handling without touching the real relay.
+"""
+import random
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SinkMessage:
+    """A single message accepted by the sink."""
+    mail_from: str
+    rcpt_tos: List[str]
+    data: bytes
+    received_at: float = field(default_factory=time.time)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal SMTP protocol handler (RFC 5321 subset).
+
+    Supports EHLO/HELO, AUTH PLAIN/LOGIN (any credentials accepted),
+    MAIL, RCPT, DATA, RSET, NOOP and QUIT. STARTTLS is not offered.
+    """
+
+    server: '_SinkServer'
+
+    def _reply(self, code: int, text: str) -> None:
+        self.wfile.write(f"{code} {text}\r\n".encode('ascii'))
+
+    def _readline(self) -> Optional[str]:
+        line = self.rfile.readline(65536)
+        if not line:
+            return None
+        return line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+    def _reset(self) -> None:
+        self.mail_from = None
+        self.rcpt_tos = []
+
+    def handle(self) -> None:
+        sink = self.server.sink
+        self._reset()
+        self._reply(220, 'smtp-sink ESMTP ready')
+
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+
+            verb, _, arg = line.partition(' ')
+            verb = verb.upper()
+
+            if verb == 'EHLO':
+                self.wfile.write(
+                    b"250-smtp-sink\r\n"
+                    b"250-8BITMIME\r\n"
+                    b"250-AUTH PLAIN LOGIN\r\n"
+                    b"250 SIZE 52428800\r\n"
+                )
+            elif verb == 'HELO':
+                self._reply(250, 'smtp-sink')
+            elif verb == 'AUTH':
+                self._handle_auth(arg)
+            elif verb == 'MAIL':
+                if self._injected_error('MAIL'):
+                    continue
+                self.mail_from = arg.partition(':')[2].strip().split(' ')[0].strip('<>')
+                self.rcpt_tos = []
+                self._reply(250, 'OK')
+            elif verb == 'RCPT':
+                if self.mail_from is None:
+                    self._reply(503, 'Need MAIL before RCPT')
+                    continue
+                if self._injected_error('RCPT'):
+                    continue
+                self.rcpt_tos.append(arg.partition(':')[2].strip().strip('<>'))
+                self._reply(250, 'OK')
+            elif verb == 'DATA':
+                if not self.rcpt_tos:
+                    self._reply(503, 'Need RCPT before DATA')
+                    continue
+                self._reply(354, 'End data with <CR><LF>.<CR><LF>')
+                data = self._read_data()
+                if data is None:
+                    return
+                if sink.latency_seconds:
+                    time.sleep(sink.latency_seconds)
+                if not self._injected_error('DATA'):
+                    sink._accept(SinkMessage(self.mail_from, list(self.rcpt_tos), data))
+                    self._reply(250, 'OK: queued')
+                self._reset()
+            elif verb == 'RSET':
+                self._reset()
+                self._reply(250, 'OK')
+            elif verb == 'NOOP':
+                self._reply(250, 'OK')
+            elif verb == 'QUIT':
+                self._reply(221, 'Bye')
+                return
+            else:
+                self._reply(502, 'Command not implemented')
+
+    def _handle_auth(self, arg: str) -> None:
+        mechanism, _, initial = arg.partition(' ')
+        mechanism = mechanism.upper()
+
+        if mechanism == 'PLAIN':
+            if not initial:
+                self.wfile.write(b"334 \r\n")
+                self._readline()
+        elif mechanism == 'LOGIN':
+            if not initial:
+                self.wfile.write(b"334 VXNlcm5hbWU6\r\n")
+                self._readline()
+            self.wfile.write(b"334 UGFzc3dvcmQ6\r\n")
+            self._readline()
+        else:
+            self._reply(504, 'Unrecognized authentication type')
+            return
+
+        self._reply(235, 'Authentication successful')
+
+    def _read_data(self) -> Optional[bytes]:
+        chunks = []
+        while True:
+            line = self.rfile.readline(1 << 20)
+            if not line:
+                return None
+            if line in (b".\r\n", b".\n"):
+                return b''.join(chunks)
+            if line.startswith(b'..'):
+                line = line[1:]
+            chunks.append(line)
+
+    def _injected_error(self, stage: str) -> bool:
+        error = self.server.sink._next_error(stage)
+        if error is None:
+            return False
+        self._reply(*error)
+        return True
+
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, sink: 'SMTPSink'):
+        self.sink = sink
+        super().__init__(address, _SMTPHandler)
+
+
+class SMTPSink:
+    """
+    Threaded local SMTP server that swallows messages.
+
+    Usage:
+        with SMTPSink() as sink:
+            sender = EmailSender(sink.host, sink.port, ..., use_tls=False)
+            ...
+            assert sink.message_count == 3
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        store_messages: bool = True,
+        latency_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        error_code: int = 451,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize SMTP sink.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 = pick a free port)
+            store_messages: Keep accepted message bodies in memory
+            latency_seconds: Delay applied before replying to each DATA
+            error_rate: Fraction (0-1) of DATA commands answered with error_code
+            error_code: SMTP reply code used for random errors (4xx or 5xx)
+            seed: Random seed for reproducible error injection
+        """
+        self.store_messages = store_messages
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.error_code = error_code
+
+        self.messages: List[SinkMessage] = []
+        self.message_count = 0
+        self.bytes_received = 0
+        self.errors_injected = 0
+
+        self._random = random.Random(seed)
+        self._queued_errors: List[Tuple[str, int, str]] = []
+        self._lock = threading.Lock()
+        self._server = _SinkServer((host, port), self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> 'SMTPSink':
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+            name='smtp-sink', daemon=True
+        )
+        self._thread.start()
+        logger.debug(f"SMTP sink listening on {self.host}:{self.port}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'SMTPSink':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def fail_next(self, code: int = 451, message: str = 'Temporary failure', stage: str = 'DATA', count: int = 1) -> None:
+        """
+        Answer the next `count` commands at `stage` with an error reply.
+
+        Args:
+            code: SMTP reply code (e.g. 421, 451, 550, 554)
+            message: Reply text
+            stage: 'MAIL', 'RCPT' or 'DATA'
+            count: Number of commands to fail
+        """
+        with self._lock:
+            self._queued_errors.extend([(stage.upper(), code, message)] * count)
+
+    def reset(self) -> None:
+        """Clear stored messages, counters and queued errors."""
+        with self._lock:
+            self.messages.clear()
+            self.message_count = 0
+            self.bytes_received = 0
+            self.errors_injected = 0
+            self._queued_errors.clear()
+
+    def _next_error(self, stage: str) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            for idx, (queued_stage, code, message) in enumerate(self._queued_errors):
+                if queued_stage == stage:
+                    del self._queued_errors[idx]
+                    self.errors_injected += 1
+                    return code, message
+
+            if stage == 'DATA' and self.error_rate and self._random.random() < self.error_rate:
+                self.errors_injected += 1
+                return self.error_code, 'Injected failure'
+
+        return None
+
+    def _accept(self, message: SinkMessage) -> None:
+        with self._lock:
+            self.message_count += 1
+            self.bytes_received += len(message.data)
+            if self.store_messages:
+                self.messages.append(message)
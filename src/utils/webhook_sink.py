@@ -0,0 +1,160 @@
+"""
+Local HTTP webhook stand-in for tests and benchmarks.
+
+Accepts JSON POSTs the way a Teams (or generic) webhook would, records
+them, and can inject latency and 429 / 5xx responses with Retry-After.
+Keep-alive is supported so callers can verify connection reuse.
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WebhookRequest:
+    """A single request received by the sink."""
+    path: str
+    body: bytes
+    received_at: float = field(default_factory=time.time)
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    server: '_SinkServer'
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.sink._connection_opened()
+
+    def do_POST(self) -> None:
+        sink = self.server.sink
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        if sink.latency_seconds:
+            time.sleep(sink.latency_seconds)
+
+        status, retry_after = sink._next_response()
+        if status < 300:
+            sink._accept(WebhookRequest(self.path, body))
+            payload = b'1'
+        else:
+            payload = f'HTTP error {status}'.encode('ascii')
+
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        logger.debug("webhook-sink: " + format % args)
+
+
+class _SinkServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, sink: 'WebhookSink'):
+        self.sink = sink
+        super().__init__(address, _WebhookHandler)
+
+
+class WebhookSink:
+    """
+    Threaded local HTTP server that records webhook POSTs.
+
+    Usage:
+        with WebhookSink() as sink:
+            sender = TeamsSender(sink.url)
+            ...
+            assert sink.request_count == 1
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_seconds: float = 0.0):
+        """
+        Initialize webhook sink.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 = pick a free port)
+            latency_seconds: Delay applied before every response
+        """
+        self.latency_seconds = latency_seconds
+        self.requests: List[WebhookRequest] = []
+        self.connections_opened = 0
+        self.errors_injected = 0
+
+        self._queued: List[Tuple[int, Optional[float]]] = []
+        self._lock = threading.Lock()
+        self._server = _SinkServer((host, port), self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/webhook"
+
+    @property
+    def request_count(self) -> int:
+        return len(self.requests)
+
+    def start(self) -> 'WebhookSink':
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+            name='webhook-sink', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'WebhookSink':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def fail_next(self, status: int = 429, retry_after: Optional[float] = None, count: int = 1) -> None:
+        """
+        Answer the next `count` POSTs with an error status.
+
+        Args:
+            status: HTTP status (e.g. 429, 500, 503, 400)
+            retry_after: Optional Retry-After header value in seconds
+            count: Number of requests to fail
+        """
+        with self._lock:
+            self._queued.extend([(status, retry_after)] * count)
+
+    def _next_response(self) -> Tuple[int, Optional[float]]:
+        with self._lock:
+            if self._queued:
+                self.errors_injected += 1
+                return self._queued.pop(0)
+        return 200, None
+
+    def _accept(self, request: WebhookRequest) -> None:
+        with self._lock:
+            self.requests.append(request)
+
+    def _connection_opened(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
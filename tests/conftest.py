@@ -5,15 +5,18 @@ Shared pytest fixtures for all tests.
 import pytest
 import pandas as pd
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import tempfile
 import json
 from unittest.mock import Mock, MagicMock
 
 from src.core.config import AlertConfig
 from src.core.tracking import EventTracker
+from src.core.records import RecordSet
 from src.core.scheduler import AlertScheduler
 from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+from src.utils.smtp_sink import SMTPSink
+from src.utils.webhook_sink import WebhookSink
 
 
 @pytest.fixture
@@ -137,6 +140,56 @@ def mock_event_tracker(temp_dir):
     return tracker
 
 
+@pytest.fixture
+def db_records():
+    """Rows as the database driver returns them (naive UTC timestamps, dates, NULLs)."""
+    now = datetime.now(timezone.utc).replace(microsecond=0, tzinfo=None)
+    columns = (
+        'vessel_id', 'vessel', 'vsl_email', 'department_id', 'department_name', 'document_id',
+        'document_name', 'document_category', 'updated_at', 'expiration_date', 'comments'
+    )
+    return RecordSet(columns, [
+        (1, 'TEST VESSEL 1', 'vessel1@vsl.company1.test', 1, 'Technical', 101, 'Certificate A', 'Safety',
+         now - timedelta(hours=1), date(2030, 1, 31), 'Comment 1'),
+        (2, 'TEST VESSEL 2', 'vessel2@vsl.company1.test', 1, 'Technical', 201, 'Certificate C', 'Technical',
+         now - timedelta(hours=3), date(2031, 6, 1), ''),
+        (1, 'TEST VESSEL 1', 'vessel1@vsl.company1.test', 2, 'HSSQE', 102, 'Certificate B', 'Safety',
+         now - timedelta(hours=2), None, None),
+        (3, 'TEST VESSEL 3', 'vessel3@vsl.company1.test', 2, 'Operations', 301, 'Certificate D', 'Safety',
+         now - timedelta(days=30), None, 'Too old'),
+    ])
+
+
+@pytest.fixture
+def records_alert(mock_config, mock_event_tracker, db_records):
+    """Alert whose database returns db_records, with real formatters and a mock sender."""
+    from src.formatters.html_formatter import HTMLFormatter
+    from src.formatters.text_formatter import TextFormatter
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    mock_config.small_run_max_rows = 0
+
+    alert = VesselDocumentsAlert(mock_config)
+    alert.fetch_records = MagicMock(side_effect=lambda: RecordSet(db_records.columns, list(db_records.rows)))
+    alert.fetch_data = MagicMock(side_effect=lambda: db_records.to_frame())
+    return alert
+
+
+@pytest.fixture
+def sent_emails():
+    """Return a helper that pops the send() kwargs recorded for an alert."""
+    def take(alert, clear_tracker=True):
+        calls = [c.kwargs for c in alert.config.email_sender.send.call_args_list]
+        alert.config.email_sender.send.reset_mock()
+        if clear_tracker:
+            alert.config.tracker.clear()
+        return calls
+    return take
+
+
 @pytest.fixture
 def mock_db_connection():
     """Mock database connection context manager."""
@@ -148,3 +201,17 @@ def mock_db_connection():
         return mock_conn
     
     return mock_get_db_connection, mock_cursor
+
+
+@pytest.fixture
+def smtp_sink():
+    """Run a local SMTP sink for the duration of a test."""
+    with SMTPSink() as sink:
+        yield sink
+
+
+@pytest.fixture
+def webhook_sink():
+    """Run a local HTTP webhook sink for the duration of a test."""
+    with WebhookSink() as sink:
+        yield sink
@@ -0,0 +1,271 @@
+"""
+Tests for notification channels and the channel registry.
+"""
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+import pandas as pd
+import pytest
+
+from src.notifications.channels import (
+    ChannelRegistry,
+    ChannelResult,
+    EmailChannel,
+    FileSinkChannel,
+    NotificationChannel,
+    PerMessageChannel,
+    RenderedNotification,
+    TeamsChannel,
+    WebhookChannel,
+)
+
+
+def _notification(n, keys=None):
+    data = pd.DataFrame({'document_name': [f'Doc {n}'], 'updated_at': ['2025-01-01 10:00:00']})
+    return RenderedNotification(
+        subject=f'Subject {n}',
+        plain_text='text',
+        html_content='<p>html</p>',
+        recipients=[f'vessel{n}@test.com'],
+        cc_recipients=['cc@test.com'],
+        data=data,
+        metadata={'vessel_name': f'VESSEL {n}', 'display_columns': ['document_name', 'updated_at']},
+        tracking_keys=keys if keys is not None else [f'key_{n}']
+    )
+
+
+class SlowChannel(PerMessageChannel):
+    def __init__(self, name, delay, max_concurrency=1):
+        super().__init__(name, max_concurrency=max_concurrency)
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def send_one(self, notification):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+
+
+class BrokenChannel(NotificationChannel):
+    def deliver(self, notifications):
+        raise ConnectionError('channel down')
+
+
+def test_registry_from_config_registers_email_only_by_default(mock_config, mock_email_sender):
+    """Test that only the email channel is enabled with default flags."""
+    mock_config.email_sender = mock_email_sender
+
+    registry = ChannelRegistry.from_config(mock_config)
+
+    assert [c.name for c in registry.channels] == ['email']
+    assert registry.tracking_namespaces == ['']
+
+
+def test_registry_from_config_registers_enabled_channels(mock_config, mock_email_sender, temp_dir):
+    """Test that feature flags add Teams, webhook, file and special Teams email channels."""
+    mock_config.email_sender = mock_email_sender
+    mock_config.enable_teams_alerts = True
+    mock_config.teams_sender = MagicMock()
+    mock_config.enable_special_teams_email = True
+    mock_config.special_teams_email = 'channel@teams.test'
+    mock_config.enable_webhook_alerts = True
+    mock_config.webhook_url = 'http://127.0.0.1:9/hook'
+    mock_config.enable_file_sink = True
+
+    registry = ChannelRegistry.from_config(mock_config)
+
+    assert {c.name for c in registry.channels} == {'email', 'teams_email', 'teams', 'webhook', 'file'}
+
+
+def test_dispatch_runs_channels_concurrently():
+    """Test that one slow channel does not serialise the others."""
+    registry = ChannelRegistry()
+    registry.register(SlowChannel('a', delay=0.3))
+    registry.register(SlowChannel('b', delay=0.3))
+    registry.register(SlowChannel('c', delay=0.3))
+
+    start = time.monotonic()
+    results = registry.dispatch([_notification(1)])
+
+    assert time.monotonic() - start < 0.6
+    assert [r.delivered for r in results] == [1, 1, 1]
+
+
+def test_per_message_channel_respects_concurrency_limit():
+    """Test that a channel never exceeds its max_concurrency."""
+    channel = SlowChannel('email', delay=0.05, max_concurrency=3)
+
+    result = channel.deliver([_notification(n) for n in range(12)])
+
+    assert result.delivered == 12
+    assert channel.peak <= 3
+    assert channel.peak > 1
+
+
+def test_dispatch_isolates_channel_failures():
+    """Test that a raising channel is recorded as failed without affecting others."""
+    registry = ChannelRegistry()
+    registry.register(BrokenChannel('broken'))
+    registry.register(SlowChannel('ok', delay=0))
+
+    broken, ok = registry.dispatch([_notification(1), _notification(2)])
+
+    assert broken.failed == 2 and broken.delivered == 0
+    assert 'channel down' in broken.errors[0]
+    assert ok.delivered == 2
+    assert ok.sent_keys == {'key_1', 'key_2'}
+
+
+def test_dispatch_skips_notifications_already_sent_on_channel():
+    """Test that each channel only receives rows unsent in its own namespace."""
+    registry = ChannelRegistry()
+    registry.register(SlowChannel('email', delay=0))
+    registry.register(SlowChannel('file', delay=0))
+    sent = {'email:key_1'}
+
+    email, file_sink = registry.dispatch([_notification(1), _notification(2)], is_sent=sent.__contains__)
+
+    assert email.delivered == 1 and email.skipped == 1
+    assert file_sink.delivered == 2 and file_sink.skipped == 0
+
+
+def test_email_channel_redirects_in_dry_run(mock_email_sender):
+    """Test that EmailChannel sends to dry_run_email with original recipients in subject."""
+    channel = EmailChannel(mock_email_sender, dry_run_email='dryrun@test.com')
+
+    channel.deliver([_notification(1)])
+
+    kwargs = mock_email_sender.send.call_args.kwargs
+    assert kwargs['recipients'] == ['dryrun@test.com']
+    assert kwargs['cc_recipients'] == []
+    assert kwargs['subject'].startswith('[DRY-RUN] Subject 1 (Original: vessel1@test.com)')
+
+
+def test_webhook_channel_posts_rows(webhook_sink):
+    """Test that WebhookChannel posts subject and display rows as JSON."""
+    channel = WebhookChannel(webhook_sink.url)
+
+    result = channel.deliver([_notification(1)])
+
+    assert result.delivered == 1
+    payload = webhook_sink.requests[0].json()
+    assert payload['subject'] == 'Subject 1'
+    assert payload['rows'] == [{'document_name': 'Doc 1', 'updated_at': '2025-01-01 10:00:00'}]
+
+
+def test_file_sink_channel_writes_files(temp_dir):
+    """Test that FileSinkChannel writes HTML, text and JSON per notification, tracking only outside dry-run."""
+    channel = FileSinkChannel(temp_dir / 'outbox')
+    dry_run_channel = FileSinkChannel(temp_dir / 'dry_run', dry_run=True)
+
+    assert channel.deliver([_notification(1)]).sent_keys == {'key_1'}
+    result = dry_run_channel.deliver([_notification(1)])
+
+    for directory in ('outbox', 'dry_run'):
+        suffixes = sorted(p.suffix for p in (temp_dir / directory).iterdir())
+        assert suffixes == ['.html', '.json', '.txt']
+    assert result.delivered == 1 and result.sent_keys == set()
+
+
+def test_alert_tracks_each_channel_in_its_own_namespace(mock_config, sample_dataframe, mock_event_tracker, mock_email_sender):
+    """Test that a new channel still delivers rows already emailed, then both stop resending."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = mock_email_sender
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+    mock_config.html_formatter.format.return_value = '<html>Test</html>'
+    mock_config.text_formatter.format.return_value = 'Test'
+
+    alert = VesselDocumentsAlert(mock_config)
+    df = alert.filter_data(sample_dataframe)
+    keys = {alert.get_tracking_key(row) for _, row in df.iterrows()}
+    mock_event_tracker.mark_as_sent(keys, datetime.now())
+
+    # Email already sent everything; the newly enabled file sink has not
+    mock_config.enable_file_sink = True
+    df_unsent = mock_event_tracker.filter_unsent_events(
+        df, alert.get_tracking_key, namespaces=alert._get_channel_registry().tracking_namespaces
+    )
+    assert len(df_unsent) == 4
+
+    alert._send_notifications(alert.route_notifications(df_unsent), datetime.now())
+
+    assert mock_email_sender.send.call_count == 0
+    assert len(list(mock_config.file_sink_dir.glob('*.html'))) == 3
+    assert all(mock_event_tracker.is_sent(f'file:{k}') for k in keys)
+
+
+def test_alert_raises_when_every_channel_fails(mock_config, sample_dataframe, mock_event_tracker):
+    """Test that total delivery failure surfaces as an error."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.email_sender.send.side_effect = ConnectionError('relay down')
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = alert.route_notifications(alert.filter_data(sample_dataframe))
+
+    with pytest.raises(RuntimeError, match='All notification channels failed'):
+        alert._send_notifications(jobs, datetime.now())
+
+    assert len(mock_event_tracker.sent_events) == 0
+
+
+def test_partial_channel_failure_reports_warn(mock_config, sample_dataframe, mock_event_tracker):
+    """Test that a run where only some channels delivered writes WARN, and the registry is built once."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.email_sender.send.side_effect = ConnectionError('relay down')
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+    mock_config.html_formatter.format.return_value = '<html>Test</html>'
+    mock_config.text_formatter.format.return_value = 'Test'
+    mock_config.enable_file_sink = True
+
+    alert = VesselDocumentsAlert(mock_config)
+    alert._write_health_status = MagicMock()
+    jobs = [alert._prepare_job(job) for job in alert.route_notifications(alert.filter_data(sample_dataframe))]
+
+    assert alert._deliver(jobs, datetime.now())
+    assert alert._get_channel_registry() is mock_config.channel_registry
+    status, _, error_msg = alert._write_health_status.call_args.args
+    assert status == 'WARN' and 'relay down' in error_msg
+    assert alert.run_metrics['failed_notifications'] == len(jobs)
+
+
+def test_teams_channel_marks_cards_posted_before_a_failure():
+    """Test that notifications in cards posted before a failing card are marked sent."""
+    from src.notifications.teams_sender import TeamsDeliveryError
+
+    sender = MagicMock()
+    sender.send_updates.side_effect = TeamsDeliveryError('card 2/2 failed', ['key_0', 'key_1'])
+    notifications = [_notification(n) for n in range(3)]
+
+    result = TeamsChannel(sender).deliver(notifications)
+
+    assert result.sent_keys == {'key_0', 'key_1'}
+    assert (result.delivered, result.failed) == (2, 1)
+    assert result.errors == ['card 2/2 failed']
+
+
+def test_channel_result_summary_is_bounded():
+    """Test that hundreds of failures summarise to one short line per channel."""
+    result = ChannelResult(channel='email', failed=300, errors=[f'Subject {n}: relay down' for n in range(300)])
+
+    summary = result.summary()
+    assert summary.startswith('[email] 300 failed: Subject 0: relay down; Subject 1')
+    assert '(+297 more errors)' in summary
+    assert len(ChannelResult(channel='email', failed=1, errors=['x' * 5000]).summary()) == 500
@@ -0,0 +1,108 @@
+"""
+Tests for recipient-level consolidation of notification jobs.
+"""
+from unittest.mock import MagicMock
+from src.core.consolidation import consolidate_jobs
+
+
+def test_consolidation_merges_shared_cc_into_one_digest(mock_config, sample_dataframe):
+    """Test that 3 vessel jobs sharing a CC list yield 3 vessel emails + 1 digest."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = alert.route_notifications(sample_dataframe)
+
+    consolidated = consolidate_jobs(jobs, label_column='vessel')
+
+    assert len(consolidated) == 4
+    vessel_jobs = [j for j in consolidated if not j['metadata'].get('digest')]
+    digests = [j for j in consolidated if j['metadata'].get('digest')]
+
+    assert len(vessel_jobs) == 3
+    assert all(j['cc_recipients'] == [] for j in vessel_jobs)
+    assert len(digests) == 1
+
+    digest = digests[0]
+    assert set(digest['recipients']) == set(jobs[0]['cc_recipients'])
+    assert len(digest['data']) == 4
+    assert digest['metadata']['display_columns'][0] == 'vessel'
+    assert digest['metadata']['vessels'] == ['TEST VESSEL 1', 'TEST VESSEL 2', 'TEST VESSEL 3']
+
+
+def test_consolidation_keeps_unique_cc_lists_unchanged(mock_config, sample_dataframe):
+    """Test that jobs with a CC set nobody else shares are left as they are."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.department_specific_cc_recipients_filter = True
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = alert.route_notifications(sample_dataframe)
+
+    consolidated = consolidate_jobs(jobs, label_column='vessel')
+
+    # Vessels 1 (Technical+HSSQE), 2 (Technical), 3 (Operations) all have different CC sets
+    assert consolidated == jobs
+
+
+def test_consolidation_does_not_mutate_input_jobs(mock_config, sample_dataframe):
+    """Test that original jobs keep their CC lists."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = alert.route_notifications(sample_dataframe)
+
+    consolidate_jobs(jobs, label_column='vessel')
+
+    assert all(len(j['cc_recipients']) == 5 for j in jobs)
+
+
+def test_alert_sends_digest_when_consolidation_enabled(mock_config, sample_dataframe, mock_event_tracker):
+    """Test end-to-end that CC recipients get one digest with its own subject."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+    from datetime import datetime
+
+    mock_config.consolidate_cc_recipients = True
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.email_sender.send = MagicMock()
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+    mock_config.email_max_concurrency = 1
+
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = consolidate_jobs(alert.route_notifications(alert.filter_data(sample_dataframe)), alert.digest_label_column)
+    alert._send_notifications(jobs, datetime.now())
+
+    calls = [c.kwargs for c in mock_config.email_sender.send.call_args_list]
+    assert len(calls) == 4
+    digest_calls = [c for c in calls if 'Digest' in c['subject']]
+    assert len(digest_calls) == 1
+    assert digest_calls[0]['subject'] == 'AlertDev | 3 VESSELS | Vessel Document Updates Digest'
+    assert 'internal@test.com' in digest_calls[0]['recipients']
+    assert all(c['cc_recipients'] == [] for c in calls)
+
+
+def test_rows_stay_unsent_until_vessel_email_and_digest_are_delivered(mock_config, sample_dataframe, mock_event_tracker):
+    """Test that a failed vessel email keeps its rows unsent even though the digest carrying them went out."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+    from datetime import datetime
+
+    mock_config.tracker = mock_event_tracker
+
+    def send(**kwargs):
+        if 'TEST VESSEL 1 ' in kwargs['subject']:
+            raise ConnectionError('mailbox full')
+
+    mock_config.email_sender = MagicMock()
+    mock_config.email_sender.send.side_effect = send
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+
+    alert = VesselDocumentsAlert(mock_config)
+    df = alert.filter_data(sample_dataframe)
+    jobs = consolidate_jobs(alert.route_notifications(df), alert.digest_label_column)
+    alert._send_notifications(jobs, datetime.now())
+
+    vessel_1_keys = {alert.get_tracking_key(row) for _, row in df[df['vessel'] == 'TEST VESSEL 1'].iterrows()}
+    other_keys = {alert.get_tracking_key(row) for _, row in df[df['vessel'] != 'TEST VESSEL 1'].iterrows()}
+    assert not any(mock_event_tracker.is_sent(key) for key in vessel_1_keys)
+    assert all(mock_event_tracker.is_sent(key) for key in other_keys)
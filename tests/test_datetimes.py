@@ -0,0 +1,65 @@
+"""
+Tests for vectorized timestamp normalisation and deferred formatting.
+"""
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from src.core.engines import StageSpec, filter_frame
+from src.utils.datetimes import epoch, format_datetimes, format_values, get_zone, utc_epochs
+
+
+SPEC = StageSpec(
+    group_by=('vessel',),
+    tracking_key='doc_{document_id}',
+    timestamp_column='updated_at',
+    lookback_days=2,
+    date_formats={'expiration_date': '%Y-%m-%d'}
+)
+
+
+def test_filter_keeps_datetimes_and_leaves_source_untouched():
+    """Test the epoch filter matches the parse-compare-strftime result once formatted."""
+    now = datetime.now(ZoneInfo('UTC')).replace(microsecond=0, tzinfo=None)
+    df = pd.DataFrame({
+        'vessel': ['A', 'A', 'B', 'C'],
+        'document_id': [1, 2, 3, 4],
+        'updated_at': [now - timedelta(hours=1), now - timedelta(days=3), pd.NaT, now - timedelta(days=1)],
+        'expiration_date': [date(2030, 1, 31), None, None, '2031-06-01'],
+    }, index=[10, 11, 12, 13])
+    source = df.copy()
+    cutoff = datetime.now(tz=ZoneInfo('Europe/Athens')) - timedelta(days=2)
+
+    filtered = filter_frame(df, SPEC, 'Europe/Athens', cutoff)
+
+    pd.testing.assert_frame_equal(df, source)
+    assert filtered.index.tolist() == [10, 13]
+    assert str(filtered['updated_at'].dt.tz) == 'Europe/Athens'
+
+    shown = format_datetimes(filtered, SPEC.display_formats)
+    local = pd.to_datetime(source['updated_at']).dt.tz_localize('UTC').dt.tz_convert('Europe/Athens')
+    assert shown['updated_at'].tolist() == local[[10, 13]].dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+    assert shown['expiration_date'].tolist() == ['2030-01-31', '2031-06-01']
+    # Already formatted frames are returned as they are
+    assert format_datetimes(shown, SPEC.display_formats) is shown
+
+
+def test_format_values_matches_strftime():
+    """Test the numpy-rendered ISO formats and the strftime fallback against pandas."""
+    stamps = pd.Series(pd.to_datetime(
+        [0, -86_400_000_000_123, 1_700_000_000_999_999_999, None, 1_700_000_000_999_999_999], unit='ns', utc=True
+    )).dt.tz_convert('America/St_Johns')
+
+    for date_format in ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%d/%m/%Y %Hh'):
+        expected = stamps.dt.strftime(date_format).fillna('').tolist()
+        assert format_values(stamps, date_format).tolist() == expected
+
+
+def test_epochs_and_zone_cache():
+    """Test naive values count as UTC and timezone objects are reused."""
+    naive = pd.Series([datetime(2025, 1, 1, 12), None])
+    aware = pd.Series([datetime(2025, 1, 1, 14, tzinfo=ZoneInfo('Europe/Athens')), None])
+
+    assert utc_epochs(naive)[0] == utc_epochs(aware)[0] == epoch(datetime(2025, 1, 1, 12))
+    assert utc_epochs(naive)[1] == np.iinfo(np.int64).min
+    assert get_zone('Europe/Athens') is get_zone('Europe/Athens')
@@ -0,0 +1,121 @@
+"""
+Tests for scheduled digest mode (outbox queueing and digest sending).
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+from src.core.outbox import DigestOutbox
+from src.core.scheduler import AlertScheduler
+
+
+@pytest.fixture
+def digest_config(mock_config, mock_event_tracker, temp_dir):
+    """Config with digest mode on and mocked senders/formatters."""
+    mock_config.digest_mode = True
+    mock_config.outbox = DigestOutbox(temp_dir / 'digest_outbox.json', 'Europe/Athens')
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+    mock_config.email_max_concurrency = 1
+    return mock_config
+
+
+def test_outbox_dedupes_rows_per_recipient_set(temp_dir):
+    """Test that a row is queued only once for the same recipients."""
+    outbox = DigestOutbox(temp_dir / 'outbox.json', 'Europe/Athens')
+    metadata = {'vessel_name': 'V1', 'display_columns': ['a']}
+
+    assert outbox.add('Alert', ['b@x', 'a@x'], [{'a': 1}, {'a': 2}], ['k1', 'k2'], metadata) == 2
+    assert outbox.add('Alert', ['a@x', 'b@x'], [{'a': 2}, {'a': 3}], ['k2', 'k3'], metadata) == 1
+    assert outbox.add('Alert', ['c@x'], [{'a': 1}], ['k1'], metadata) == 1
+
+    # Persisted and reloaded
+    reloaded = DigestOutbox(temp_dir / 'outbox.json', 'Europe/Athens')
+    assert len(reloaded) == 3
+    assert reloaded.pending('Alert')[0]['recipients'] == ['a@x', 'b@x']
+
+
+def test_run_queues_cc_rows_and_sends_vessel_emails_without_cc(digest_config, sample_dataframe):
+    """Test that vessels are emailed immediately while CC rows wait for the digest."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    alert = VesselDocumentsAlert(digest_config)
+    alert.fetch_data = MagicMock(return_value=sample_dataframe)
+    alert.run()
+
+    calls = [c.kwargs for c in digest_config.email_sender.send.call_args_list]
+    assert len(calls) == 3
+    assert all(not c['cc_recipients'] for c in calls)
+    assert sum(len(item['rows']) for item in digest_config.outbox.pending()) == 4
+
+
+def test_send_digest_sends_one_summary_and_clears_outbox(digest_config, sample_dataframe):
+    """Test that queued rows are sent as one digest per recipient set."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    alert = VesselDocumentsAlert(digest_config)
+    alert.fetch_data = MagicMock(return_value=sample_dataframe)
+    alert.run()
+    digest_config.email_sender.send.reset_mock()
+
+    assert alert.send_digest() is True
+
+    calls = [c.kwargs for c in digest_config.email_sender.send.call_args_list]
+    assert len(calls) == 1
+    assert calls[0]['subject'] == 'AlertDev | 3 VESSELS | Vessel Document Updates Digest'
+    assert len(digest_config.outbox) == 0
+
+    # Nothing left to send
+    assert alert.send_digest() is False
+
+
+def test_send_digest_keeps_items_when_delivery_fails(digest_config, sample_dataframe):
+    """Test that a failed digest stays queued for the next digest time."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    alert = VesselDocumentsAlert(digest_config)
+    alert.fetch_data = MagicMock(return_value=sample_dataframe)
+    alert.run()
+    queued = len(digest_config.outbox)
+
+    digest_config.email_sender.send.side_effect = RuntimeError("SMTP down")
+    assert alert.send_digest() is False
+    assert len(digest_config.outbox) == queued
+
+
+def test_rows_delivered_in_a_digest_are_not_queued_again(digest_config, sample_dataframe):
+    """Test that rows routed again after their digest went out (failed vessel email) are not re-queued."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    alert = VesselDocumentsAlert(digest_config)
+    alert.fetch_data = MagicMock(return_value=sample_dataframe)
+    digest_config.email_sender.send.side_effect = RuntimeError("SMTP down")
+    alert.run()
+    digest_config.email_sender.send.side_effect = None
+    assert alert.send_digest() is True
+    keys = [alert.get_tracking_key(row) for _, row in alert.filter_data(sample_dataframe).iterrows()]
+    assert all(digest_config.tracker.is_sent(DigestOutbox.tracking_key(key)) for key in keys)
+
+    # Vessel emails are retried; the CC rows already went out in the digest
+    digest_config.email_sender.send.reset_mock()
+    alert.run()
+    assert digest_config.email_sender.send.call_count == 3
+    assert len(digest_config.outbox) == 0
+
+
+def test_scheduler_next_digest_time():
+    """Test that the next digest slot is the earliest configured time after now."""
+    scheduler = AlertScheduler(frequency_hours=1, timezone='Europe/Athens', digest_times=['08:00', '18:00'])
+    scheduler.register_digest(lambda: None)
+    tz = ZoneInfo('Europe/Athens')
+
+    assert scheduler._next_digest_time(datetime(2024, 1, 1, 12, 0, tzinfo=tz)) == datetime(2024, 1, 1, 18, 0, tzinfo=tz)
+    assert scheduler._next_digest_time(datetime(2024, 1, 1, 18, 0, tzinfo=tz)) == datetime(2024, 1, 2, 8, 0, tzinfo=tz)
+
+
+def test_scheduler_without_digests_has_no_digest_time():
+    """Test that no digest slot is scheduled when nothing is registered."""
+    scheduler = AlertScheduler(frequency_hours=1, timezone='Europe/Athens', digest_times=['18:00'])
+    assert scheduler._next_digest_time(datetime.now(tz=ZoneInfo('Europe/Athens'))) is None
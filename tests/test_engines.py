@@ -0,0 +1,93 @@
+"""
+Tests for the data engines behind SpecAlert.stage_spec() (DATA_ENGINE, SMALL_RUN_MAX_ROWS).
+"""
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock
+from src.core.base_alert import BaseAlert, SpecAlert
+from src.core.engines import _polars_template
+from src.core.records import RecordSet
+
+
+@pytest.mark.parametrize('engine', ['rows', 'polars'])
+def test_engine_sends_same_emails_as_pandas(records_alert, sent_emails, engine):
+    """Test that each engine filters, tracks, routes and renders like the pandas path."""
+    if engine == 'polars':
+        pytest.importorskip('polars')
+
+    records_alert.config.data_engine = 'pandas'
+    records_alert.run()
+    expected = sent_emails(records_alert)
+    assert records_alert.fetch_records.call_count == 0
+
+    if engine == 'rows':
+        records_alert.config.small_run_max_rows = 10
+    else:
+        records_alert.config.data_engine = engine
+    records_alert.run()
+    assert records_alert.fetch_records.call_count == 1
+    if engine == 'rows':
+        assert records_alert.run_metrics['small_run'] == 1
+
+    assert len(expected) == 2
+    assert sent_emails(records_alert, clear_tracker=False) == expected
+
+    # Rows tracked by this engine are skipped by it and by the pandas path
+    records_alert.run()
+    records_alert.config.data_engine = 'pandas'
+    records_alert.config.small_run_max_rows = 0
+    records_alert.run()
+    assert records_alert.config.email_sender.send.call_count == 0
+
+
+def test_polars_engine_converts_fetch_data(records_alert, sent_emails):
+    """Test alerts without fetch_records() run on Polars from their DataFrame."""
+    pytest.importorskip('polars')
+
+    records_alert.fetch_records = MagicMock(return_value=None)
+    records_alert.config.data_engine = 'polars'
+    records_alert.run()
+
+    assert records_alert.fetch_data.call_count == 1
+    sent = sent_emails(records_alert)
+    assert len(sent) == 2
+    assert 'Record 3' in sent[0]['plain_text']
+
+
+def test_stage_spec_defaults(records_alert, db_records, mock_config):
+    """Test the spec-driven tracking key, template conversion and engine validation."""
+    row = next(RecordSet.from_frame(db_records.to_frame()).mappings())
+    assert records_alert.get_tracking_key(row) == 'vessel_1_doc_101'
+    with pytest.raises(KeyError):
+        records_alert.get_tracking_key({'vessel_id': 1})
+
+    assert _polars_template('v_{vessel_id}_{{x}}') == ('v_{}_{{x}}', ['vessel_id'])
+
+    mock_config.data_engine = 'spark'
+    with pytest.raises(ValueError, match='DATA_ENGINE'):
+        mock_config.validate()
+
+
+def test_incomplete_alerts_fail_at_instantiation(mock_config):
+    """Test that missing stage methods raise TypeError when the alert is created, not mid-run."""
+    class Common:
+        def fetch_data(self) -> pd.DataFrame:
+            return pd.DataFrame()
+
+        def get_subject_line(self, data, metadata):
+            return ''
+
+        def get_required_columns(self):
+            return []
+
+    class WithoutStages(Common, BaseAlert):
+        pass
+
+    class WithoutGroupJob(Common, SpecAlert, BaseAlert):
+        def stage_spec(self):
+            return None
+
+    with pytest.raises(TypeError, match='filter_data'):
+        WithoutStages(mock_config)
+    with pytest.raises(TypeError, match='build_group_job'):
+        WithoutGroupJob(mock_config)
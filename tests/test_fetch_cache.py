@@ -0,0 +1,87 @@
+"""
+Tests for the cycle-scoped fetch cache shared by alerts.
+"""
+import threading
+import time
+from unittest.mock import MagicMock
+from src.core.fetch_cache import FetchCache, current_cache, fetch_cycle
+from src.core.records import RecordSet
+
+
+def test_alerts_in_one_cycle_query_once(mock_config, mock_event_tracker, sample_dataframe):
+    """Test that two alerts in one scheduler cycle share one query and leave it unmodified."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+    from src.core.scheduler import AlertScheduler
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+    original = sample_dataframe.copy()
+
+    alerts = [VesselDocumentsAlert(mock_config), VesselDocumentsAlert(mock_config)]
+    scheduler = AlertScheduler(frequency_hours=1, timezone='Europe/Athens')
+    for alert in alerts:
+        alert._query_frame = MagicMock(return_value=sample_dataframe)
+        scheduler.register_alert(alert.run)
+
+    scheduler.run_once()
+    assert alerts[0]._query_frame.call_count + alerts[1]._query_frame.call_count == 1
+    assert alerts[1].run_metrics['fetch_cache_hits'] == 1
+    assert sample_dataframe.equals(original)
+    assert mock_config.email_sender.send.call_count > 0
+
+    # Each cycle queries again; outside a cycle every call does
+    scheduler.run_once()
+    assert alerts[0]._query_frame.call_count == 2
+    alerts[1].fetch_data()
+    assert alerts[1]._query_frame.call_count == 1
+    assert current_cache() is None
+
+
+def test_cache_keys_and_conversions(sample_dataframe):
+    """Test parameter keys and that rows and frames of one query come from one load."""
+    cache = FetchCache()
+    assert FetchCache.key('q.sql', {'a': 1, 'b': 2}) == FetchCache.key('q.sql', {'b': 2, 'a': 1})
+    assert FetchCache.key('q.sql', {'a': 1}) != FetchCache.key('q.sql', {'a': 2})
+
+    key = FetchCache.key('q.sql')
+    load = MagicMock(return_value=RecordSet(('id', 'name'), [(1, 'x'), (2, None)]))
+    records, cached = cache.records(key, load)
+    assert not cached
+    records.rows.append((3, 'y'))
+
+    frame, cached = cache.frame(key, MagicMock(side_effect=AssertionError('queried twice')))
+    assert cached
+    assert frame['id'].tolist() == [1, 2]
+    frame['id'] = [0, 0]
+    assert cache.frame(key, load)[0]['id'].tolist() == [1, 2]
+    assert (cache.queries, cache.hits, load.call_count) == (1, 2, 1)
+
+    frame_key = FetchCache.key('frame.sql')
+    cache.frame(frame_key, lambda: sample_dataframe)
+    assert len(cache.records(frame_key, load)[0]) == len(sample_dataframe)
+
+
+def test_concurrent_requests_share_one_query():
+    """Test that alerts asking at the same time wait for a single query."""
+    calls = []
+
+    def slow_load():
+        calls.append(1)
+        time.sleep(0.05)
+        return RecordSet(('id',), [(1,)])
+
+    with fetch_cycle() as cache:
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.records(FetchCache.key('q.sql'), slow_load)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(calls) == 1
+    assert sorted(cached for _, cached in results) == [False, True, True, True]
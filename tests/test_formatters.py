@@ -104,6 +104,46 @@ def test_html_formatter_no_links_when_disabled(mock_config, sample_dataframe):
 '''
 
 
+def test_formatters_output_matches_row_by_row_reference(mock_config, sample_dataframe):
+    """Test that column-wise rendering is byte-identical to the iterrows() implementation."""
+    from benchmarks.render_benchmark import LegacyHTMLFormatter, LegacyTextFormatter, build_documents, DISPLAY_COLUMNS
+    from src.formatters.display_frame import DisplayFrame
+    import pandas as pd
+
+    run_time = datetime.now()
+    raw = sample_dataframe.copy()  # datetimes, NaT, ints and empty strings
+    numeric = pd.DataFrame({'a': [1, 2, None], 'b': [0.5, float('nan'), 3]})  # iterrows() upcasts to float
+
+    cases = [
+        (raw, {'alert_title': 'Raw'}),
+        (build_documents(50), {'alert_title': 'Docs', 'display_columns': DISPLAY_COLUMNS}),
+        (numeric, {'alert_title': 'Numeric'}),
+        (raw, {'alert_title': 'No columns', 'display_columns': []}),
+    ]
+    for df, metadata in cases:
+        frame = DisplayFrame.from_dataframe(df, metadata)
+        for legacy, current in [(LegacyHTMLFormatter(), HTMLFormatter()), (LegacyTextFormatter(), TextFormatter())]:
+            expected = legacy.format(df, run_time, mock_config, metadata)
+            assert current.format(df, run_time, mock_config, metadata) == expected
+            assert current.format(df, run_time, mock_config, metadata, frame=frame) == expected
+
+
+def test_display_frame_normalises_columns_once(sample_dataframe):
+    """Test that the shared display frame selects, stringifies and titles columns."""
+    from src.formatters.display_frame import DisplayFrame
+
+    frame = DisplayFrame.from_dataframe(
+        sample_dataframe, {'display_columns': ['document_name', 'expiration_date', 'not_a_column']}
+    )
+
+    assert frame.columns == ['document_name', 'expiration_date']
+    assert frame.headers == ['Document Name', 'Expiration Date']
+    assert len(frame) == 4
+    assert frame.cells[0] == ['Certificate A', 'Certificate B', 'Certificate C', 'Certificate D']
+    assert frame.cells[1][3] is None
+    assert frame.column_values(na_rep='-')[1][3] == '-'
+
+
 def test_text_formatter_generates_plain_text(mock_config, sample_dataframe):
     """Test that text formatter generates plain text."""
     formatter = TextFormatter()
@@ -136,3 +176,154 @@ def test_text_formatter_handles_empty_dataframe(mock_config):
     text = formatter.format(empty_df, run_time, mock_config, metadata)
 
     assert 'No records' in text or 'no records' in text.lower()
+
+
+def test_text_formatter_table_layout_aligns_and_wraps(mock_config):
+    """Test that the table layout pads columns to width and wraps long comments."""
+    import pandas as pd
+
+    df = pd.DataFrame({
+        'document_name': ['Cert A', 'Certificate B'],
+        'expiration_date': [None, '2026-01-01'],
+        'comments': ['short', 'needs wrapping because this comment is long'],
+    })
+    metadata = {'alert_title': 'Test', 'display_columns': list(df.columns)}
+
+    text = TextFormatter(layout='table', wrap_width=20).format(df, datetime.now(), mock_config, metadata)
+    lines = text.splitlines()
+    header = lines.index('Document Name  Expiration Date  Comments')
+
+    assert lines[header + 1] == '-------------  ---------------  --------------------'
+    assert lines[header + 2] == 'Cert A                          short'
+    assert lines[header + 3] == 'Certificate B  2026-01-01       needs wrapping'
+    assert lines[header + 4] == '                                because this comment'
+    assert lines[header + 5] == '                                is long'
+    assert 'Record 1:' not in text
+
+
+def test_text_formatter_table_layout_is_smaller(mock_config, sample_dataframe):
+    """Test that the table layout carries the same cells in less text."""
+    metadata = {'alert_title': 'Test', 'display_columns': ['department_name', 'document_name', 'comments']}
+
+    records = TextFormatter().format(sample_dataframe, datetime.now(), mock_config, metadata)
+    table = TextFormatter(layout='table').format(sample_dataframe, datetime.now(), mock_config, metadata)
+
+    assert all(name in table for name in sample_dataframe['document_name'])
+    assert len(table) < len(records)
+
+    with pytest.raises(ValueError, match="Unknown text layout"):
+        TextFormatter(layout='grid')
+
+
+def test_registered_template_overrides_only_given_sections(mock_config, sample_dataframe):
+    """Test that a custom template inherits unspecified sections from the default."""
+    from src.formatters.templates import register_template
+
+    register_template(
+        'test_custom',
+        css='    body { color: red; }',
+        text_summary='{{count}} change(s):\n\n'
+    )
+    metadata = {'alert_title': 'Custom', 'template': 'test_custom'}
+
+    html = HTMLFormatter().format(sample_dataframe, datetime.now(), mock_config, metadata)
+    text = TextFormatter().format(sample_dataframe, datetime.now(), mock_config, metadata)
+
+    assert 'body { color: red; }' in html
+    assert 'border-collapse' not in html
+    assert 'Certificate A' in html
+    assert '4 change(s):' in text
+    assert 'This is an automated notification' in text
+
+
+def test_unknown_template_raises(mock_config, sample_dataframe):
+    """Test that selecting an unregistered template fails loudly."""
+    with pytest.raises(ValueError, match="Unknown email template"):
+        HTMLFormatter().format(sample_dataframe, datetime.now(), mock_config, {'template': 'missing'})
+
+
+def test_compiled_template_caches_static_chunks():
+    """Test that static text (including static slots) is merged once at compile time."""
+    from src.formatters.templates import CompiledTemplate
+
+    template = CompiledTemplate("<style>{{css}}</style><h1>{{ title }}</h1>", static={'css': 'p{}'})
+
+    assert template.slots == ('title',)
+    assert template._chunks[0] == '<style>p{}</style><h1>'
+    assert template.render(title='Hi') == '<style>p{}</style><h1>Hi</h1>'
+    with pytest.raises(ValueError, match="Missing template slot"):
+        template.render()
+
+
+def test_html_formatter_escapes_cell_values(mock_config):
+    """Test that user-supplied values cannot break the HTML layout."""
+    import pandas as pd
+
+    df = pd.DataFrame({
+        'document_name': ['Cert <A>', 'Cert "B"', "O'Brien & Co", 'Plain'],
+        'document_category': ['P&I', 'P&I', 'P&I', 'Safety'],  # categorical path
+        'comments': ['<script>x</script>', None, 'a & b', 'ok'],
+    })
+    metadata = {'alert_title': 'Fire & Safety', 'vessel_name': 'M/V <TEST>'}
+
+    html = HTMLFormatter().format(df, datetime.now(), mock_config, metadata)
+
+    assert '<script>' not in html
+    assert '<td>&lt;script&gt;x&lt;/script&gt;</td>' in html
+    assert '<td>Cert &lt;A&gt;</td>' in html
+    assert '<td>O&#x27;Brien &amp; Co</td>' in html
+    assert html.count('<td>P&amp;I</td>') == 3
+    assert '<h1>Fire &amp; Safety</h1>' in html
+    assert '<p>M/V &lt;TEST&gt;</p>' in html
+
+
+def test_html_escape_columns_matches_html_escape():
+    """Test that column-wise escaping equals html.escape on every cell."""
+    from html import escape
+
+    columns = [
+        ['a & b', '<x>', '"q"', "'s'", 'plain'],     # joined-string path
+        ['P&I', 'P&I', 'P&I', 'P&I', 'Class'],       # categorical cache path
+        ['no', 'specials', 'here', 'at', 'all'],    # untouched
+        ['sep\x00<', 'x', 'y', 'z', 'w'],            # separator collision fallback
+    ]
+
+    assert HTMLFormatter()._escape_columns(columns) == [[escape(v) for v in col] for col in columns]
+
+
+def test_html_formatter_compact_mode_inlines_and_minifies(mock_config, sample_dataframe):
+    """Test that compact mode drops dead rules, inlines class styles and keeps the content."""
+    metadata = {'alert_title': 'Test', 'vessel_name': 'TEST VESSEL', 'display_columns': ['document_name', 'comments']}
+
+    standard = HTMLFormatter().format(sample_dataframe, datetime.now(), mock_config, metadata)
+    compact = HTMLFormatter(mode='compact').format(sample_dataframe, datetime.now(), mock_config, metadata)
+
+    assert len(compact) < len(standard) * 0.6
+    assert ':hover' not in compact and '@media' not in compact
+    assert '\n' not in compact
+    assert '<div style="padding:30px">' in compact  # .content inlined, class dropped
+    assert '<div class="header" style="background-color:#0B4877;' in compact  # still used by '.header h1'
+    assert 'td{padding:10px 12px;border-bottom:1px solid #e0e6ed}' in compact
+    assert '<tr><td>Certificate A</td><td>Comment 1</td></tr>' in compact
+
+    with pytest.raises(ValueError, match="Unknown HTML mode"):
+        HTMLFormatter(mode='tiny')
+
+
+def test_compact_sources_for_custom_template():
+    """Test inlining with multiple classes and existing style attributes, and removal of an empty style block."""
+    from src.formatters.minify import compact_sources
+
+    sources = {
+        'css': '/* note */ .a { color: red; }\n .b:hover { color: blue; }\n .b { margin: 0; }\n'
+               '@media (max-width: 600px) { .a { color: green; } }',
+        'html_page': '<style>\n{{css}}\n</style>\n<div class="b a" style="top: 1px">\n  <p>{{content}}</p>\n</div>\n',
+        'html_empty': '', 'html_summary': '', 'html_table': '', 'html_overflow': '',
+        'text_page': 'text\n  page\n',
+    }
+
+    compacted = compact_sources(sources)
+
+    assert compacted['css'] == ''
+    assert compacted['html_page'] == '<div style="color:red;margin:0;top: 1px"><p>{{content}}</p></div>'
+    assert compacted['text_page'] == 'text\n  page\n'
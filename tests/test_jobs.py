@@ -0,0 +1,74 @@
+"""
+Tests for the NotificationJob model.
+"""
+import pickle
+from datetime import datetime
+import pytest
+from src.core.jobs import JobMetadata, NotificationJob
+
+
+def test_coerce_job_dict_keeps_mapping_access(sample_dataframe):
+    """Test that a job dictionary converts to a NotificationJob that still reads like one."""
+    job_dict = {
+        'recipients': ['vessel1@company1.test'],
+        'data': sample_dataframe,
+        'metadata': {'vessel_name': 'TEST VESSEL 1', 'display_columns': ['document_name', 'missing'], 'custom': 1},
+    }
+    job = NotificationJob.coerce(job_dict)
+
+    assert NotificationJob.coerce(job) is job
+    assert job['recipients'] == ['vessel1@company1.test']
+    assert job['cc_recipients'] == []
+    assert job.get('data') is sample_dataframe
+    assert set(job) == {'recipients', 'cc_recipients', 'data', 'metadata'}
+    assert job.display_columns == ['document_name']
+
+    assert dict(job.metadata) == {'vessel_name': 'TEST VESSEL 1', 'display_columns': ['document_name', 'missing'], 'custom': 1}
+    assert job.metadata.get('alert_title', 'Alert Notification') == 'Alert Notification'
+    with pytest.raises(KeyError):
+        job['tracking_keys']
+
+    with pytest.raises(AttributeError):
+        job.metadata.unknown = 1  # slotted
+
+
+def test_job_derived_values_survive_copies_and_pickling(sample_dataframe):
+    """Test that with_cc() keeps the content hash and jobs pickle for process pools."""
+    job = NotificationJob(
+        recipients=['vessel1@company1.test'],
+        data=sample_dataframe,
+        metadata=JobMetadata(vessel_name='TEST VESSEL 1'),
+        cc_recipients=['cc@company1.test']
+    )
+    content = job.content_hash
+    moved = job.with_cc([])
+
+    assert moved.cc_recipients == [] and job.cc_recipients == ['cc@company1.test']
+    assert moved._content_hash == content
+    assert job.with_metadata(template='other').content_hash != content
+
+    restored = pickle.loads(pickle.dumps(job))
+    assert dict(restored.metadata) == dict(job.metadata)
+    assert restored.content_hash == content
+
+
+def test_alert_prepares_tracking_keys_once(mock_config, sample_dataframe, monkeypatch):
+    """Test that tracking keys are computed once per job and reused when rendering."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+    from src.formatters.html_formatter import HTMLFormatter
+    from src.formatters.text_formatter import TextFormatter
+
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    alert = VesselDocumentsAlert(mock_config)
+    calls = []
+    original = alert.get_tracking_key
+    monkeypatch.setattr(alert, 'get_tracking_key', lambda row: calls.append(1) or original(row))
+
+    jobs = [alert._prepare_job(job) for job in alert.route_notifications(sample_dataframe)]
+    assert all(isinstance(job, NotificationJob) for job in jobs)
+    assert sum(len(job.tracking_keys) for job in jobs) == len(sample_dataframe) == len(calls)
+
+    rendered = alert._render_notifications(jobs, run_time=datetime.now())
+    assert [n.tracking_keys for n in rendered] == [job.tracking_keys for job in jobs]
+    assert len(calls) == len(sample_dataframe)
@@ -0,0 +1,150 @@
+"""
+Tests for message size budgets and CSV attachment overflow.
+"""
+import csv
+import gzip
+import io
+import pytest
+import pandas as pd
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+from src.core.rendering import RenderContext, RenderTask, render_within_budget
+from src.formatters.html_formatter import HTMLFormatter
+from src.formatters.overflow import Attachment, MessageBudget, csv_attachment
+from src.formatters.text_formatter import TextFormatter
+from src.notifications.email_sender import EmailSender
+
+
+METADATA = {
+    'alert_title': 'Vessel Document Updates',
+    'vessel_name': 'BULK VESSEL',
+    'display_columns': ['document_name', 'expiration_date'],
+}
+
+
+def _bulk_frame(rows):
+    return pd.DataFrame({
+        'document_id': range(rows),
+        'document_name': [f"Certificate {i}, rev \"A\"" for i in range(rows)],
+        'expiration_date': [None if i % 3 == 0 else f"2026-0{1 + i % 9}-01" for i in range(rows)],
+    })
+
+
+@pytest.fixture
+def render_context(mock_config):
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    return RenderContext.from_config(mock_config)
+
+
+def test_csv_attachment_holds_every_row(monkeypatch):
+    """Test that the gzipped CSV has all display rows, written in chunks."""
+    import src.formatters.overflow as overflow
+
+    monkeypatch.setattr(overflow, '_CSV_CHUNK_ROWS', 4)
+    df = _bulk_frame(10)
+
+    attachment = csv_attachment(df, METADATA)
+    rows = list(csv.reader(io.StringIO(gzip.decompress(attachment.read()).decode('utf-8'))))
+
+    assert attachment.filename == 'BULK_VESSEL.csv.gz'
+    assert attachment.mime_type == 'application/gzip'
+    assert rows[0] == ['Document Name', 'Expiration Date']
+    assert len(rows) == 11
+    assert rows[1] == ['Certificate 0, rev "A"', '']
+    assert rows[9] == ['Certificate 8, rev "A"', '2026-09-01']
+    # Reproducible for identical data
+    assert csv_attachment(df, METADATA).read() == attachment.read()
+
+
+def test_large_csv_attachment_spills_to_disk_and_reads_concurrently(monkeypatch):
+    """Test that big attachments are spooled to a file and read in chunks by several channels."""
+    from concurrent.futures import ThreadPoolExecutor
+    import src.formatters.overflow as overflow
+
+    monkeypatch.setattr(overflow, '_SPOOL_MAX_BYTES', 1024)
+    monkeypatch.setattr(overflow, '_READ_CHUNK_BYTES', 512)
+    attachment = csv_attachment(_bulk_frame(5000), METADATA)
+
+    assert attachment.content._rolled
+    chunks = list(attachment.iter_bytes())
+    assert len(chunks) > 1 and all(len(chunk) <= 512 for chunk in chunks)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        copies = list(pool.map(lambda _: attachment.read(), range(8)))
+    assert all(copy == b''.join(chunks) for copy in copies)
+    assert gzip.decompress(copies[0]).decode('utf-8').count('\n') == 5001
+
+
+def test_row_budget_shows_first_rows_with_note(render_context):
+    """Test that jobs over the row limit render their first rows and a note."""
+    task = RenderTask(subject='s', data=_bulk_frame(30), metadata=METADATA)
+
+    bodies, rendered, _ = render_within_budget([task], datetime.now(), render_context, MessageBudget(max_rows=10))
+    _, plain_text, html_content = bodies[0]
+
+    assert len(rendered[0].data) == 10
+    assert rendered[0].metadata['total_records'] == 30
+    assert html_content.count('<tr>') == 11  # header + 10 rows
+    assert '<span class="count-badge">30</span>' in html_content
+    assert 'first 10 of 30 records. The full list is attached as BULK_VESSEL.csv.gz' in html_content
+    assert 'Found 30 record(s)' in plain_text
+    assert 'Showing the first 10 of 30 records' in plain_text
+    assert 'Record 11:' not in plain_text
+
+
+def test_byte_budget_bounds_body_size(render_context):
+    """Test that oversized bodies are re-rendered with fewer rows until they fit."""
+    small = RenderTask(subject='small', data=_bulk_frame(3), metadata=METADATA)
+    large = RenderTask(subject='large', data=_bulk_frame(2000), metadata=METADATA)
+    budget = MessageBudget(max_rows=0, max_bytes=40_000)
+
+    bodies, rendered, _ = render_within_budget([small, large], datetime.now(), render_context, budget)
+
+    assert rendered[0] is small
+    assert 1 < len(rendered[1].data) < 2000
+    assert all(budget.fits(text, html) for _, text, html in bodies)
+
+
+def test_truncated_jobs_are_sent_with_attachment(mock_config, mock_event_tracker):
+    """Test that the alert attaches the full list and keeps every row for other channels."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    mock_config.max_rows_per_message = 5
+
+    alert = VesselDocumentsAlert(mock_config)
+    job = {'recipients': ['v@vsl.company1.test'], 'cc_recipients': [], 'data': _bulk_frame(12), 'metadata': METADATA}
+    notification = alert._render_notification(job, datetime.now(tz=ZoneInfo('Europe/Athens')), track=False)
+
+    assert len(notification.data) == 12
+    assert [a.filename for a in notification.attachments] == ['BULK_VESSEL.csv.gz']
+    assert gzip.decompress(notification.attachments[0].read()).decode('utf-8').count('\n') == 13
+
+
+@patch('smtplib.SMTP_SSL')
+def test_email_sender_adds_file_attachments(mock_smtp):
+    """Test that attachments go in a multipart/mixed message after the body."""
+    mock_server = MagicMock()
+    mock_smtp.return_value.__enter__.return_value = mock_server
+    sender = EmailSender('smtp.test.com', 465, 'test@test.com', 'password', company_logos={})
+
+    sender.send(
+        subject='Test',
+        plain_text='Test',
+        html_content='<html>Test</html>',
+        recipients=['to@test.com'],
+        attachments=[Attachment('list.csv.gz', gzip.compress(b'a,b\n'))]
+    )
+
+    msg = mock_server.send_message.call_args[0][0]
+    parts = msg.get_payload()
+    assert msg.get_content_type() == 'multipart/mixed'
+    assert parts[0].get_content_type() == 'multipart/related'
+    assert parts[1].get_content_type() == 'application/gzip'
+    assert parts[1].get_filename() == 'list.csv.gz'
+    assert gzip.decompress(parts[1].get_payload(decode=True)) == b'a,b\n'
@@ -0,0 +1,151 @@
+"""
+Tests for the content-addressed render cache.
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+from src.core.rendering import RenderContext, RenderTask, render_all
+from src.formatters.html_formatter import HTMLFormatter
+from src.formatters.render_cache import RenderCache, render_key
+from src.formatters.text_formatter import TextFormatter
+
+RUN_TIME = datetime(2025, 1, 1, 12, 0, tzinfo=ZoneInfo('Europe/Athens'))
+METADATA = {'alert_title': 'Vessel Document Updates', 'display_columns': ['document_name', 'comments']}
+
+
+def test_cache_is_bounded_lru():
+    """Test that the least recently used entry is evicted and counters add up."""
+    cache = RenderCache(max_entries=2)
+    cache.put('a', 'ta', 'ha')
+    cache.put('b', 'tb', 'hb')
+    assert cache.get('a') == ('ta', 'ha')  # a is now most recent
+    cache.put('c', 'tc', 'hc')
+
+    assert cache.get('b') is None
+    assert cache.get('c') == ('tc', 'hc')
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_rate == pytest.approx(2 / 3)
+
+
+def test_disk_layer_survives_restart(temp_dir):
+    """Test that entries written to cache_dir are served by a new cache instance."""
+    RenderCache(cache_dir=temp_dir / 'render_cache').put('k', 'text', '<html/>')
+
+    cache = RenderCache(cache_dir=temp_dir / 'render_cache')
+
+    assert cache.get('k') == ('text', '<html/>')
+    assert cache.hits == 1
+
+
+def test_disk_layer_is_bounded(temp_dir):
+    """Test that old disk entries are pruned beyond max_disk_entries."""
+    cache = RenderCache(cache_dir=temp_dir / 'rc', max_disk_entries=3)
+    for i in range(5):
+        cache.put(f"k{i}", 't', 'h')
+
+    assert len(list((temp_dir / 'rc').glob('*.json'))) == 3
+
+
+def test_render_key_depends_on_content_only(sample_dataframe):
+    """Test that equal payloads share a key and any visible change alters it."""
+    from src.formatters.templates import register_template
+
+    key = render_key(sample_dataframe, METADATA, RUN_TIME)
+
+    assert render_key(sample_dataframe.copy(), dict(METADATA), RUN_TIME) == key
+    # Columns that are not displayed do not matter
+    assert render_key(sample_dataframe.assign(vessel_id=99), METADATA, RUN_TIME) == key
+
+    changed = sample_dataframe.copy()
+    changed.loc[0, 'comments'] = 'Different'
+    assert render_key(changed, METADATA, RUN_TIME) != key
+    assert render_key(sample_dataframe, {**METADATA, 'vessel_name': 'X'}, RUN_TIME) != key
+    assert render_key(sample_dataframe, METADATA, RUN_TIME.replace(minute=1)) != key
+
+    register_template('cache_test', text_summary='v1 {{count}}\n')
+    v1 = render_key(sample_dataframe, {**METADATA, 'template': 'cache_test'}, RUN_TIME)
+    register_template('cache_test', text_summary='v2 {{count}}\n')
+    assert render_key(sample_dataframe, {**METADATA, 'template': 'cache_test'}, RUN_TIME) != v1
+
+
+def test_render_key_ignores_run_time_when_template_does_not_show_it(sample_dataframe):
+    """Test that templates without a run timestamp share keys across runs (disk layer hits)."""
+    from src.formatters.templates import get_template, register_template
+
+    template = register_template(
+        'timeless_test',
+        html_page='<html>{{logos}}{{alert_title}}{{vessel_line}}{{content}}{{company_name}}</html>',
+        html_summary='<p>{{frequency}} {{count}}</p>',
+        text_page='{{alert_title}}\n{{vessel_line}}{{content}}{{company_name}}',
+    )
+    assert get_template().shows_run_time
+    assert not template.shows_run_time
+
+    metadata = {**METADATA, 'template': 'timeless_test'}
+    next_day = RUN_TIME.replace(day=2, hour=18)
+    assert render_key(sample_dataframe, metadata, next_day) == render_key(sample_dataframe, metadata, RUN_TIME)
+    assert render_key(sample_dataframe, METADATA, next_day) != render_key(sample_dataframe, METADATA, RUN_TIME)
+
+
+def test_cache_hit_skips_rendering(mock_config, sample_dataframe):
+    """Test that cached payloads are not rendered again."""
+    mock_config.html_formatter = MagicMock(wraps=HTMLFormatter())
+    mock_config.text_formatter = MagicMock(wraps=TextFormatter())
+    context = RenderContext.from_config(mock_config)
+    cache = RenderCache()
+    tasks = [RenderTask(subject=f"S{i}", data=sample_dataframe, metadata=METADATA) for i in range(3)]
+
+    first, _ = render_all(tasks, RUN_TIME, context, cache=cache)
+    second, lookups = render_all(tasks, RUN_TIME, context, cache=cache)
+
+    # Identical payloads: rendered once, then served from the cache
+    assert mock_config.html_formatter.format.call_count == 1
+    assert mock_config.text_formatter.format.call_count == 1
+    assert first == second
+    assert [subject for subject, _, _ in second] == ['S0', 'S1', 'S2']
+    assert (cache.hits, cache.misses) == (5, 1)
+    assert lookups == (3, 0)
+
+
+def test_alert_reports_render_cache_hit_rate(mock_config, sample_dataframe, mock_event_tracker):
+    """Test that hit rates end up in the alert's run metrics."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    mock_config.email_max_concurrency = 1
+    mock_config.render_cache = RenderCache()
+
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = alert.route_notifications(alert.filter_data(sample_dataframe))
+    alert._send_notifications(jobs, RUN_TIME)
+    alert._send_notifications(jobs, RUN_TIME)
+
+    assert alert.run_metrics['render_cache_hits'] == 3
+    assert alert.run_metrics['render_cache_misses'] == 3
+    assert alert.run_metrics['render_cache_hit_rate'] == 0.5
+
+
+def test_run_metrics_ignore_other_alerts_lookups(mock_config, sample_dataframe, mock_event_tracker):
+    """Test that lookups by alerts sharing the cache concurrently do not leak into an alert's metrics."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    class SharedCache(RenderCache):
+        def get(self, key):
+            self.record_hits(10)  # another alert's hits, counted while this one renders
+            return super().get(key)
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    mock_config.render_cache = SharedCache()
+
+    alert = VesselDocumentsAlert(mock_config)
+    alert._send_notifications(alert.route_notifications(alert.filter_data(sample_dataframe)), RUN_TIME)
+
+    assert (alert.run_metrics['render_cache_hits'], alert.run_metrics['render_cache_misses']) == (0, 3)
@@ -0,0 +1,107 @@
+"""
+Tests for the notification render stage (serial and process pool).
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+from src.core.rendering import RenderContext, RenderTask, compact_task, render_all
+from src.formatters.html_formatter import HTMLFormatter
+from src.formatters.text_formatter import TextFormatter
+
+
+def _tasks(sample_dataframe, count):
+    metadata = {
+        'alert_title': 'Vessel Document Updates',
+        'display_columns': ['department_name', 'document_name', 'expiration_date', 'comments'],
+    }
+    return [
+        RenderTask(subject=f"Subject {i}", data=sample_dataframe.iloc[: 1 + i % 4], metadata={**metadata, 'vessel_name': f"V{i}"})
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def render_context(mock_config):
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    return RenderContext.from_config(mock_config)
+
+
+def test_parallel_rendering_matches_serial_in_order(render_context, sample_dataframe, caplog):
+    """Test that the process pool returns the same bodies, in task order, from non-forked workers."""
+    tasks = _tasks(sample_dataframe, 6)
+    run_time = datetime.now(tz=ZoneInfo('Europe/Athens'))
+
+    serial, _ = render_all(tasks, run_time, render_context, workers=1)
+    with caplog.at_level('INFO', logger='src.core.rendering'):
+        parallel, _ = render_all(tasks, run_time, render_context, workers=2, min_batch=2)
+
+    assert 'on 2 worker processes (forkserver)' in caplog.text or 'on 2 worker processes (spawn)' in caplog.text
+    assert 'Rendering serially' not in caplog.text
+    assert parallel == serial
+    assert [subject for subject, _, _ in parallel] == [f"Subject {i}" for i in range(6)]
+    assert 'V5' in parallel[5][2]
+
+
+def test_small_batches_render_serially(render_context, sample_dataframe, monkeypatch):
+    """Test that batches below min_batch never start a pool."""
+    import src.core.rendering as rendering
+
+    monkeypatch.setattr(rendering, '_render_parallel', MagicMock(side_effect=AssertionError("pool used")))
+
+    results, _ = render_all(_tasks(sample_dataframe, 3), datetime.now(), render_context, workers=4, min_batch=20)
+
+    assert len(results) == 3
+
+
+def test_unpicklable_formatters_fall_back_to_serial(mock_config, sample_dataframe):
+    """Test that rendering still works when the pool cannot be used."""
+    mock_config.html_formatter = MagicMock()
+    mock_config.html_formatter.format.return_value = '<html/>'
+    mock_config.text_formatter = MagicMock()
+    mock_config.text_formatter.format.return_value = 'text'
+    context = RenderContext.from_config(mock_config)
+
+    results, _ = render_all(_tasks(sample_dataframe, 4), datetime.now(), context, workers=2, min_batch=1)
+
+    assert results == [(f"Subject {i}", 'text', '<html/>') for i in range(4)]
+
+
+def test_compact_task_ships_display_values_only():
+    """Test that workers get only display columns, rendered as from the full frame."""
+    import pandas as pd
+    from src.formatters.display_frame import DisplayFrame
+
+    df = pd.DataFrame({'document_id': [1, 2], 'count': [3, 4], 'ratio': [0.5, None], 'name': ['a', 'b']})
+    metadata = {'display_columns': ['count', 'ratio']}
+
+    task = compact_task(RenderTask(subject='s', data=df, metadata=metadata))
+    frame = DisplayFrame.from_values(task.values, task.columns, task.index, empty=task.empty)
+
+    assert task.columns == ['count', 'ratio']
+    assert task.values.shape == (2, 2)
+    # In the full (object) frame the int column renders as '3', not '3.0'
+    assert frame.cells == [['3', '4'], ['0.5', None]]
+    assert frame.cells == DisplayFrame.from_dataframe(df, metadata).cells
+
+
+def test_send_notifications_uses_render_workers(mock_config, sample_dataframe, mock_event_tracker):
+    """Test that large batches go through the pool and produce one email per job."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    mock_config.email_max_concurrency = 1
+    mock_config.render_workers = 2
+    mock_config.render_min_batch = 2
+
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = alert.route_notifications(alert.filter_data(sample_dataframe))
+    alert._send_notifications(jobs, datetime.now(tz=ZoneInfo('Europe/Athens')))
+
+    calls = [c.kwargs for c in mock_config.email_sender.send.call_args_list]
+    assert len(calls) == 3
+    assert all('<!DOCTYPE html>' in c['html_content'] for c in calls)
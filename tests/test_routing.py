@@ -0,0 +1,106 @@
+"""
+Tests for the department-to-CC routing matrix.
+"""
+import itertools
+import pytest
+from src.core.routing import DepartmentCCMatrix
+
+
+COMPANY_CC = [
+    'technical@company1.test', 'tech.lead@company1.test', 'operations@company1.test',
+    'safety@company1.test', 'marine@company1.test', 'hse@company1.test', ' Ops@company1.test',
+]
+DEPARTMENTS = ['Technical', 'Operations', 'HSSQE', 'Marine', 'Crewing', 'T']
+
+
+def _legacy_filter(cc_list, department_names, internal):
+    """The original nested-loop matching, for comparison."""
+    matched = []
+    for email in cc_list:
+        username = email.strip().split('@')[0].lower()
+        for dept_name in department_names:
+            if username[:2] == dept_name.lower()[:2] or (username == 'safety' and dept_name.upper() == 'HSSQE'):
+                matched.append(email)
+                break
+    return set(matched + internal)
+
+
+def test_matrix_matches_legacy_rules_for_every_department_set():
+    """Test that the default rules give the same CC sets as the old per-vessel loop."""
+    internal = ['internal@test.com']
+    matrix = DepartmentCCMatrix([COMPANY_CC], internal, aliases={'HSSQE': ['safety']})
+
+    for size in range(len(DEPARTMENTS) + 1):
+        for departments in itertools.combinations(DEPARTMENTS, size):
+            assert set(matrix.resolve(COMPANY_CC, departments)) == _legacy_filter(COMPANY_CC, departments, internal)
+
+
+def test_matrix_uses_configured_rules_and_memoizes(mock_config):
+    """Test that prefix length and aliases come from config, and repeated department sets are reused."""
+    mock_config.department_specific_cc_recipients_filter = True
+    mock_config.department_cc_prefix_length = 4
+    mock_config.department_cc_aliases = {'HSSQE': ['safety', 'hse']}
+    mock_config.internal_recipients = []
+    mock_config.email_routing = {'company1.test': {'cc': COMPANY_CC}}
+
+    matrix = DepartmentCCMatrix.from_config(mock_config)
+
+    assert matrix.resolve(COMPANY_CC, ['Technical']) == ['tech.lead@company1.test', 'technical@company1.test']
+    assert matrix.resolve(COMPANY_CC, ['HSSQE', 'Operations']) == [
+        'hse@company1.test', 'operations@company1.test', 'safety@company1.test'  # 'ops' is too short now
+    ]
+    matrix.resolve(COMPANY_CC, ['Operations', 'HSSQE'])
+    assert len(matrix._resolved) == 2
+    assert len(matrix._companies) == 1
+
+    mock_config.department_specific_cc_recipients_filter = False
+    assert set(DepartmentCCMatrix.from_config(mock_config).resolve(COMPANY_CC, ['Marine'])) == set(COMPANY_CC)
+
+
+def test_config_parses_department_aliases(monkeypatch):
+    """Test DEPARTMENT_CC_ALIASES parsing and its default."""
+    from src.core.config import AlertConfig
+
+    monkeypatch.setenv('DEPARTMENT_CC_ALIASES', 'HSSQE:safety, HSSQE:hse ,Marine:nav')
+    assert AlertConfig._parse_department_aliases('DEPARTMENT_CC_ALIASES') == {
+        'HSSQE': ['safety', 'hse'], 'Marine': ['nav']
+    }
+
+    monkeypatch.delenv('DEPARTMENT_CC_ALIASES')
+    assert AlertConfig._parse_department_aliases('DEPARTMENT_CC_ALIASES', default='HSSQE:safety') == {'HSSQE': ['safety']}
+
+    monkeypatch.setenv('DEPARTMENT_CC_ALIASES', 'safety')
+    with pytest.raises(ValueError, match="expected DEPARTMENT:username"):
+        AlertConfig._parse_department_aliases('DEPARTMENT_CC_ALIASES')
+
+
+def test_domain_resolver_matches_most_specific_suffix(mock_config):
+    """Test company and CC lookup by domain suffix, with the default outside configured domains."""
+    from src.core.routing import DomainResolver
+
+    mock_config.default_company_name = 'Default Co'
+    mock_config.email_routing = {
+        'Company1.test': {'company_name': 'Company One', 'cc': ['a@company1.test']},
+        'fleet.company1.test': {'company_name': 'Company One Fleet', 'cc': ['b@company1.test']},
+        'company2.test': {'cc': ['c@company2.test']},
+    }
+    resolver = DomainResolver.from_config(mock_config)
+
+    route = resolver.resolve('vessel1@VSL.company1.test')
+    assert (route.company_name, route.cc) == ('Company One', ('a@company1.test',))
+    assert resolver.resolve('vessel2@x.fleet.company1.test').company_name == 'Company One Fleet'
+    assert resolver.resolve('vessel3@company2.test').company_name == 'Default Co'
+    assert resolver.resolve('company1.test@othercompany1.test') is resolver.default
+    assert resolver.resolve('vessel1@VSL.company1.test') is route
+    assert len(resolver._resolved) == 4
+
+
+def test_alert_routes_company_name_from_config(mock_config, sample_dataframe):
+    """Test that vessel jobs take their company name and CC list from the routing config."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.email_routing['company1.test']['company_name'] = 'Company One S.A.'
+    jobs = VesselDocumentsAlert(mock_config).route_notifications(sample_dataframe)
+
+    assert {job['metadata']['company_name'] for job in jobs} == {'Company One S.A.'}
+    assert all('technical@company1.test' in job['cc_recipients'] for job in jobs)
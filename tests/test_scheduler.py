@@ -71,3 +71,124 @@ def test_scheduler_shutdown_signal():
     scheduler.shutdown_event.set()
     
     assert scheduler.shutdown_event.is_set()
+
+
+def test_scheduler_runs_alerts_concurrently():
+    """Test that a concurrent cycle takes as long as its slowest alert and shares the fetch cache."""
+    from src.core.fetch_cache import current_cache
+
+    scheduler = AlertScheduler(frequency_hours=24, timezone='Europe/Athens', max_concurrency=3)
+    caches = []
+
+    def slow_alert():
+        caches.append(current_cache())
+        time.sleep(0.3)
+
+    failing_alert = Mock(side_effect=Exception("Test error"))
+    for runner in (slow_alert, slow_alert, failing_alert):
+        scheduler.register_alert(runner)
+
+    started = time.monotonic()
+    scheduler.run_once()
+
+    assert time.monotonic() - started < 0.8
+    assert scheduler.last_outcomes == ['ok', 'ok', 'error']
+    assert caches[0] is not None and caches[0] is caches[1]
+
+
+def test_scheduler_abandons_alert_after_timeout():
+    """Test that a stuck alert frees its slot and is not restarted while still running."""
+    import threading
+
+    release = threading.Event()
+    stuck_alert = Mock(side_effect=lambda: release.wait(5))
+    next_alert = Mock()
+
+    scheduler = AlertScheduler(frequency_hours=24, timezone='Europe/Athens', alert_timeout=0.2)
+    scheduler.register_alert(stuck_alert)
+    scheduler.register_alert(next_alert)
+
+    scheduler.run_once()
+    assert scheduler.last_outcomes == ['timeout', 'ok']
+
+    scheduler.run_once()
+    assert scheduler.last_outcomes == ['skipped', 'ok']
+    assert stuck_alert.call_count == 1
+
+    release.set()
+    time.sleep(0.1)
+    scheduler.run_once()
+    assert scheduler.last_outcomes == ['ok', 'ok']
+    assert stuck_alert.call_count == 2
+
+
+def test_scheduler_shutdown_stops_queued_alerts():
+    """Test that shutdown lets running alerts finish but starts no queued ones."""
+    scheduler = AlertScheduler(frequency_hours=24, timezone='Europe/Athens', max_concurrency=1, alert_timeout=5)
+    first_alert = Mock(side_effect=lambda: time.sleep(0.2) or scheduler.shutdown_event.set())
+    queued_alert = Mock()
+    scheduler.register_alert(first_alert)
+    scheduler.register_alert(queued_alert)
+
+    scheduler.run_once()
+
+    first_alert.assert_called_once()
+    queued_alert.assert_not_called()
+    assert scheduler.last_outcomes == ['ok', 'not started']
+
+
+def test_concurrent_alerts_keep_separate_health_files(mock_config, temp_dir, monkeypatch, capsys):
+    """Test that each alert type writes its own health file and one ERROR makes the container unhealthy."""
+    import importlib.util
+    from datetime import datetime
+    from pathlib import Path
+    from src.core import base_alert
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    class OtherAlert(VesselDocumentsAlert):
+        pass
+
+    monkeypatch.setattr(base_alert, 'HEALTH_DIR', temp_dir / 'health')
+    now = datetime.now().astimezone()
+    VesselDocumentsAlert(mock_config)._write_health_status('OK', now)
+    OtherAlert(mock_config)._write_health_status('ERROR', now, 'query failed')
+
+    assert sorted(p.name for p in (temp_dir / 'health').iterdir()) == ['OtherAlert.txt', 'VesselDocumentsAlert.txt']
+
+    spec = importlib.util.spec_from_file_location(
+        'healthcheck', Path(__file__).parent.parent / 'scripts' / 'healthcheck.py'
+    )
+    healthcheck = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(healthcheck)
+    monkeypatch.setattr(healthcheck, 'HEALTH_DIR', temp_dir / 'health')
+    monkeypatch.setenv('SCHEDULE_FREQUENCY_HOURS', '1')
+
+    with pytest.raises(SystemExit) as exit_info:
+        healthcheck.main()
+    assert exit_info.value.code == 1
+    output = capsys.readouterr()
+    assert 'VesselDocumentsAlert: Healthy' in output.out
+    assert 'OtherAlert: Health status is ERROR (recent): query failed' in output.err
+
+
+def test_abandoned_alert_does_not_block_process_exit():
+    """Test that --run-once exits after a timeout even though the stuck alert is still running."""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    script = (
+        "import time\n"
+        "from src.core.scheduler import AlertScheduler\n"
+        "scheduler = AlertScheduler(frequency_hours=24, timezone='Europe/Athens', alert_timeout=0.2)\n"
+        "scheduler.register_alert(lambda: time.sleep(60))\n"
+        "scheduler.run_once()\n"
+        "print(scheduler.last_outcomes)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=Path(__file__).parent.parent,
+        capture_output=True, text=True, timeout=30
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "['timeout']" in result.stdout
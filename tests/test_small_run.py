@@ -0,0 +1,37 @@
+"""
+Tests for the row-based small-run pipeline (SMALL_RUN_MAX_ROWS).
+"""
+from src.core.records import RecordSet
+
+
+def test_large_run_continues_on_dataframe_path(records_alert, sent_emails):
+    """Test that results over the threshold are converted once instead of queried twice."""
+    records_alert.config.small_run_max_rows = 3
+    records_alert.run()
+
+    assert records_alert.fetch_records.call_count == 1
+    assert records_alert.fetch_data.call_count == 0
+    assert 'small_run' not in records_alert.run_metrics
+    assert len(sent_emails(records_alert)) == 2
+
+    # Already-sent rows are skipped on the row-based path too
+    records_alert.config.small_run_max_rows = 10
+    records_alert.run()
+    records_alert.config.email_sender.send.reset_mock()
+    records_alert.run()
+    assert records_alert.config.email_sender.send.call_count == 0
+
+
+def test_record_set_groups_like_dataframe(db_records):
+    """Test grouping order, missing keys, row labels and the DataFrame conversion."""
+    records = RecordSet(db_records.columns, db_records.rows + [(4, None, 'x@y', 1, None, 401, 'E', 'S', None, None, None)])
+
+    groups = records.group_by(['vessel', 'vsl_email'])
+    assert [key[0] for key in groups] == ['TEST VESSEL 1', 'TEST VESSEL 2', 'TEST VESSEL 3']
+    assert len(groups[('TEST VESSEL 1', 'vessel1@vsl.company1.test')]) == 2
+    assert groups[('TEST VESSEL 3', 'vessel3@vsl.company1.test')].to_frame().index.tolist() == [3]
+
+    frame = records.to_frame()
+    assert list(frame.columns) == list(db_records.columns)
+    assert frame['vessel_id'].dtype == 'int64'
+    assert RecordSet(db_records.columns, []).to_frame().empty
@@ -0,0 +1,81 @@
+"""
+Tests for the local SMTP sink and the delivery benchmark.
+"""
+import smtplib
+import pytest
+from src.notifications.email_sender import EmailSender
+
+
+def _sender(sink):
+    return EmailSender(
+        smtp_host=sink.host,
+        smtp_port=sink.port,
+        smtp_user='test@test.com',
+        smtp_pass='password',
+        company_logos={},
+        use_tls=False
+    )
+
+
+def test_sink_accepts_and_stores_messages(smtp_sink):
+    """Test that messages sent through EmailSender land in the sink."""
+    _sender(smtp_sink).send(
+        subject='Sink Test',
+        plain_text='Body',
+        html_content='<p>Body</p>',
+        recipients=['to@test.com'],
+        cc_recipients=['cc@test.com']
+    )
+
+    assert smtp_sink.message_count == 1
+    message = smtp_sink.messages[0]
+    assert message.mail_from == 'test@test.com'
+    assert set(message.rcpt_tos) == {'to@test.com', 'cc@test.com'}
+    assert b'Subject: Sink Test' in message.data
+    assert smtp_sink.bytes_received == len(message.data)
+
+
+def test_sink_injects_transient_error(smtp_sink):
+    """Test that a queued 4xx reply surfaces as an SMTP exception, then clears."""
+    smtp_sink.fail_next(code=451, message='Try again later')
+    sender = _sender(smtp_sink)
+
+    with pytest.raises(smtplib.SMTPDataError) as exc_info:
+        sender.send(subject='x', plain_text='x', html_content='x', recipients=['to@test.com'])
+    assert exc_info.value.smtp_code == 451
+
+    sender.send(subject='x', plain_text='x', html_content='x', recipients=['to@test.com'])
+    assert smtp_sink.message_count == 1
+    assert smtp_sink.errors_injected == 1
+
+
+def test_sink_injects_permanent_recipient_error(smtp_sink):
+    """Test that a 5xx at RCPT stage rejects the recipient."""
+    smtp_sink.fail_next(code=550, message='No such user', stage='RCPT')
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        _sender(smtp_sink).send(subject='x', plain_text='x', html_content='x', recipients=['to@test.com'])
+
+    assert smtp_sink.message_count == 0
+
+
+def test_sink_does_not_store_when_disabled(smtp_sink):
+    """Test that store_messages=False only counts messages."""
+    smtp_sink.store_messages = False
+
+    _sender(smtp_sink).send(subject='x', plain_text='x', html_content='x', recipients=['to@test.com'])
+
+    assert smtp_sink.message_count == 1
+    assert smtp_sink.messages == []
+
+
+@pytest.mark.slow
+def test_delivery_benchmark_small_fleet(smtp_sink):
+    """Test the end-to-end benchmark against a 10-vessel fleet."""
+    from benchmarks.delivery_benchmark import run_benchmark
+
+    result = run_benchmark(10, smtp_sink, docs_per_vessel=2)
+
+    assert result.messages == 10
+    assert result.bytes_per_message > 0
+    assert result.p99_ms >= result.p50_ms > 0
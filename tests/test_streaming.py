@@ -0,0 +1,209 @@
+"""
+Tests for streamed rendering and MIME writing.
+"""
+import email
+import pytest
+import pandas as pd
+from datetime import datetime
+from email import policy
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+from src.formatters.html_formatter import HTMLFormatter
+from src.formatters.overflow import Attachment
+from src.formatters.text_formatter import TextFormatter
+from src.notifications.email_sender import EmailSender
+from src.notifications.mime_stream import write_message
+
+
+METADATA = {
+    'alert_title': 'Vessel Document Updates',
+    'vessel_name': 'STREAM VESSEL',
+    'display_columns': ['document_name', 'expiration_date', 'comments'],
+}
+
+
+def _documents(rows):
+    return pd.DataFrame({
+        'document_id': range(rows),
+        'document_name': [f"Certificate {i} <rev> & co" for i in range(rows)],
+        'expiration_date': [None if i % 4 == 0 else '2026-05-01' for i in range(rows)],
+        'comments': [f"Ελληνικά σχόλια {i} " * (1 + i % 5) for i in range(rows)],
+    })
+
+
+def _parse(raw: bytes):
+    return email.message_from_bytes(raw, policy=policy.default)
+
+
+def _bodies(message):
+    return (
+        message.get_body(('plain',)).get_content(),
+        message.get_body(('html',)).get_content(),
+    )
+
+
+def _sender(sink):
+    return EmailSender(sink.host, sink.port, 'test@test.com', 'password', company_logos={}, use_tls=False)
+
+
+def test_iter_format_chunks_join_to_format(mock_config):
+    """Test that streamed bodies are identical to the rendered ones, in every layout."""
+    df = _documents(23)
+    run_time = datetime.now()
+
+    for formatter in (HTMLFormatter(), TextFormatter(), TextFormatter(layout='table', wrap_width=30)):
+        chunks = list(formatter.iter_format(df, run_time, mock_config, METADATA, chunk_rows=5))
+        assert ''.join(chunks) == formatter.format(df, run_time, mock_config, METADATA)
+        assert len(chunks) > 5
+
+
+@pytest.mark.parametrize('formatter', [HTMLFormatter(), TextFormatter(), TextFormatter(layout='table', wrap_columns=())])
+def test_iter_format_memory_does_not_grow_with_rows(mock_config, formatter):
+    """Test that streaming a 10x larger job peaks at about the same memory (one chunk of rows)."""
+    import tracemalloc
+
+    def peak(rows):
+        df = _documents(rows)
+        tracemalloc.start()
+        for _ in formatter.iter_format(df, datetime.now(), mock_config, METADATA, chunk_rows=200):
+            pass
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+
+    assert peak(10_000) < 1.5 * peak(1_000)
+
+
+def test_write_message_uses_bounded_writes():
+    """Test that the writer emits a valid message in blocks of about buffer_size bytes."""
+    text = [f"line {i}\n" for i in range(5000)]
+    html = [f"<p>ünïcode {i}</p>\n" for i in range(5000)]
+    blocks = []
+
+    size = write_message(
+        blocks.append,
+        [('Subject', 'Größe test'), ('From', 'a@test.com'), ('To', 'b@test.com')],
+        iter(text), iter(html),
+        attachments=[Attachment('list.csv.gz', b'\x1f\x8b' + bytes(range(256)) * 300)],
+        buffer_size=4096
+    )
+
+    assert size == sum(map(len, blocks))
+    assert len(blocks) > 20
+    assert max(map(len, blocks)) < 4096 + 80 * 60
+    message = _parse(b''.join(blocks))
+    assert message['Subject'] == 'Größe test'
+    assert message.get_content_type() == 'multipart/mixed'
+    assert _bodies(message) == (''.join(text), ''.join(html))
+    attachment = next(message.iter_attachments())
+    assert attachment.get_filename() == 'list.csv.gz'
+    assert attachment.get_content() == b'\x1f\x8b' + bytes(range(256)) * 300
+
+
+def test_send_streaming_delivers_through_smtp(smtp_sink, mock_config):
+    """Test that a streamed message arrives intact, with the same structure as send()."""
+    df = _documents(40)
+    run_time = datetime.now()
+    text = TextFormatter().format(df, run_time, mock_config, METADATA)
+    html = HTMLFormatter().format(df, run_time, mock_config, METADATA)
+
+    _sender(smtp_sink).send_streaming(
+        subject='Streamed',
+        text_chunks=TextFormatter().iter_format(df, run_time, mock_config, METADATA, chunk_rows=7),
+        html_chunks=HTMLFormatter().iter_format(df, run_time, mock_config, METADATA, chunk_rows=7),
+        recipients=['to@test.com'],
+        cc_recipients=['cc@test.com'],
+        buffer_size=1024
+    )
+
+    assert smtp_sink.message_count == 1
+    received = smtp_sink.messages[0]
+    assert set(received.rcpt_tos) == {'to@test.com', 'cc@test.com'}
+    message = _parse(received.data)
+    assert message['Subject'] == 'Streamed'
+    assert message['Cc'] == 'cc@test.com'
+    assert message.get_content_type() == 'multipart/related'
+    assert _bodies(message) == (text, html)
+
+
+def test_failed_stream_abandons_message(smtp_sink):
+    """Test that a body error mid-DATA drops the message instead of sending a partial one."""
+    def broken_body():
+        yield "start\n" * 1000
+        raise RuntimeError("render failed")
+
+    sender = _sender(smtp_sink)
+    with pytest.raises(RuntimeError, match="render failed"):
+        sender.send_streaming('x', broken_body(), ['<p/>'], ['to@test.com'], buffer_size=512)
+
+    sender.send_streaming('ok', ['text'], ['<p>html</p>'], ['to@test.com'])
+    assert smtp_sink.message_count == 1
+    assert _parse(smtp_sink.messages[0].data)['Subject'] == 'ok'
+
+
+def test_spool_writes_eml(temp_dir):
+    """Test that the same message can be spooled to a file in dry-run mode."""
+    sender = EmailSender('smtp.test.com', 465, 'test@test.com', 'password', company_logos={}, dry_run=True)
+    path = temp_dir / 'message.eml'
+
+    size = sender.spool(path, 'Spooled', ['text'], ['<p>html</p>'], ['to@test.com'])
+
+    assert path.stat().st_size == size
+    assert _bodies(_parse(path.read_bytes())) == ('text', '<p>html</p>')
+
+
+def test_large_jobs_are_streamed_at_send_time(mock_config, mock_event_tracker):
+    """Test that jobs over STREAM_MIN_ROWS skip up-front rendering and use send_streaming."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    mock_config.email_max_concurrency = 1
+    mock_config.stream_min_rows = 10
+
+    alert = VesselDocumentsAlert(mock_config)
+    run_time = datetime.now(tz=ZoneInfo('Europe/Athens'))
+    jobs = [
+        {'recipients': ['big@test.com'], 'cc_recipients': [], 'data': _documents(12), 'metadata': METADATA},
+        {'recipients': ['small@test.com'], 'cc_recipients': [], 'data': _documents(3), 'metadata': METADATA},
+    ]
+    big, small = alert._render_notifications(jobs, run_time, track=False)
+
+    assert big.stream is not None and big.html_content == ''
+    assert small.stream is None and small.html_content
+
+    alert._get_channel_registry().dispatch([big, small])
+
+    streamed = mock_config.email_sender.send_streaming.call_args.kwargs
+    assert streamed['recipients'] == ['big@test.com']
+    assert ''.join(streamed['html_chunks']) == HTMLFormatter().format(_documents(12), run_time, mock_config, METADATA)
+    assert mock_config.email_sender.send.call_args.kwargs['recipients'] == ['small@test.com']
+
+
+def test_streamed_jobs_skip_the_row_budget(mock_config, mock_event_tracker):
+    """Test that jobs streamed at send time carry every row, without truncation or attachment."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = HTMLFormatter()
+    mock_config.text_formatter = TextFormatter()
+    mock_config.email_max_concurrency = 1
+    mock_config.max_rows_per_message = 5
+    mock_config.stream_min_rows = 10
+
+    alert = VesselDocumentsAlert(mock_config)
+    run_time = datetime.now(tz=ZoneInfo('Europe/Athens'))
+    jobs = [
+        {'recipients': ['big@test.com'], 'cc_recipients': [], 'data': _documents(12), 'metadata': METADATA},
+        {'recipients': ['mid@test.com'], 'cc_recipients': [], 'data': _documents(8), 'metadata': METADATA},
+    ]
+    big, mid = alert._render_notifications(jobs, run_time, track=False)
+
+    assert big.stream is not None and not big.attachments
+    assert mid.stream is None and mid.attachments
+
+    html = ''.join(big.stream()[1])
+    assert html == HTMLFormatter().format(_documents(12), run_time, mock_config, METADATA)
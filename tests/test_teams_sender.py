@@ -0,0 +1,172 @@
+"""
+Tests for Teams webhook notifications.
+"""
+import json
+import time
+from datetime import datetime
+import pytest
+import requests
+from src.notifications.teams_sender import TeamsDeliveryError, TeamsSender, TeamsUpdate
+
+
+def _update(n, rows=3):
+    return TeamsUpdate(
+        title=f'VESSEL {n}',
+        subtitle='Test Company',
+        columns=['Document Name', 'Updated At'],
+        rows=[[f'Certificate {n}-{r}', '2025-01-01 10:00:00'] for r in range(rows)],
+        tracking_keys=[f'vessel_{n}_doc_{r}' for r in range(rows)]
+    )
+
+
+def _sender(sink, **kwargs):
+    kwargs.setdefault('min_interval_seconds', 0)
+    return TeamsSender(sink.url, **kwargs)
+
+
+def test_teams_sender_posts_adaptive_card(webhook_sink):
+    """Test that send() posts a valid Adaptive Card envelope."""
+    _sender(webhook_sink).send('Title', 'Hello', {'Vessel': 'TEST'})
+
+    assert webhook_sink.request_count == 1
+    payload = webhook_sink.requests[0].json()
+    card = payload['attachments'][0]
+    assert card['contentType'] == 'application/vnd.microsoft.card.adaptive'
+    assert card['content']['type'] == 'AdaptiveCard'
+
+
+def test_teams_sender_batches_updates_into_one_card(webhook_sink):
+    """Test that many small updates are packed into a single POST."""
+    delivered = _sender(webhook_sink).send_updates('Vessel Document Updates', [_update(n) for n in range(20)])
+
+    assert webhook_sink.request_count == 1
+    assert len(delivered) == 60
+    body = json.dumps(webhook_sink.requests[0].json())
+    assert 'VESSEL 0' in body and 'VESSEL 19' in body
+
+
+def test_teams_sender_respects_payload_limit(webhook_sink):
+    """Test that batches are split so no card exceeds max_payload_bytes."""
+    sender = _sender(webhook_sink, max_payload_bytes=3000)
+    delivered = sender.send_updates('Updates', [_update(n) for n in range(20)])
+
+    assert webhook_sink.request_count > 1
+    assert all(len(r.body) <= 3000 for r in webhook_sink.requests)
+    assert len(delivered) == 60
+
+
+def test_teams_sender_splits_oversized_update(webhook_sink):
+    """Test that a single update larger than the limit is split into continuation sections."""
+    sender = _sender(webhook_sink, max_payload_bytes=2500)
+    delivered = sender.send_updates('Updates', [_update(1, rows=60)])
+
+    assert webhook_sink.request_count > 1
+    assert all(len(r.body) <= 2500 for r in webhook_sink.requests)
+    assert '(cont.)' in webhook_sink.requests[-1].body.decode()
+    assert len(delivered) == 60
+
+
+def test_teams_sender_reuses_connection(webhook_sink):
+    """Test that consecutive posts share one keep-alive connection."""
+    sender = _sender(webhook_sink)
+    for _ in range(5):
+        sender.send('Title', 'Hello')
+
+    assert webhook_sink.request_count == 5
+    assert webhook_sink.connections_opened == 1
+
+
+def test_teams_sender_honours_retry_after(webhook_sink):
+    """Test that a 429 is retried after the Retry-After delay."""
+    webhook_sink.fail_next(status=429, retry_after=0.2)
+
+    start = time.monotonic()
+    _sender(webhook_sink).send('Title', 'Hello')
+
+    assert time.monotonic() - start >= 0.2
+    assert webhook_sink.request_count == 1
+    assert webhook_sink.errors_injected == 1
+
+
+def test_teams_sender_gives_up_after_max_retries(webhook_sink):
+    """Test that persistent 503s raise after max_retries."""
+    webhook_sink.fail_next(status=503, retry_after=0, count=10)
+
+    with pytest.raises(requests.HTTPError):
+        _sender(webhook_sink, max_retries=2).send('Title', 'Hello')
+
+    assert webhook_sink.errors_injected == 3
+
+
+def test_teams_sender_fails_card_when_retry_after_exceeds_max(webhook_sink):
+    """Test that a Retry-After longer than max_retry_wait fails instead of sleeping."""
+    webhook_sink.fail_next(status=429, retry_after=3600)
+
+    start = time.monotonic()
+    with pytest.raises(requests.HTTPError, match='retry after 3600s'):
+        _sender(webhook_sink, max_retry_wait=5).send('Title', 'Hello')
+
+    assert time.monotonic() - start < 5
+    assert webhook_sink.request_count == 0
+
+
+def test_teams_sender_keeps_keys_of_cards_posted_before_a_failure(webhook_sink):
+    """Test that a failing card reports the keys of the cards already posted."""
+    sender = _sender(webhook_sink, max_payload_bytes=3000)
+    post = sender._post
+    posted = []
+
+    def fail_second_card(payload):
+        if len(posted) == 1:
+            webhook_sink.fail_next(status=400)
+        posted.append(payload)
+        post(payload)
+
+    sender._post = fail_second_card
+    with pytest.raises(TeamsDeliveryError) as error:
+        sender.send_updates('Updates', [_update(n) for n in range(20)])
+
+    assert webhook_sink.request_count == 1
+    assert len(posted) == 2
+    assert error.value.delivered_keys
+    assert error.value.delivered_keys == sender.build_cards('Updates', [_update(n) for n in range(20)])[0][1]
+
+
+def test_teams_sender_does_not_retry_client_errors(webhook_sink):
+    """Test that a 400 fails immediately."""
+    webhook_sink.fail_next(status=400, count=5)
+
+    with pytest.raises(requests.HTTPError):
+        _sender(webhook_sink).send('Title', 'Hello')
+
+    assert webhook_sink.errors_injected == 1
+
+
+def test_teams_sender_blocks_in_dry_run_mode(webhook_sink):
+    """Test that TeamsSender refuses to post in dry-run mode."""
+    with pytest.raises(RuntimeError, match="SAFETY CHECK FAILED"):
+        _sender(webhook_sink, dry_run=True).send('Title', 'Hello')
+
+    assert webhook_sink.request_count == 0
+
+
+def test_alert_sends_one_teams_card_per_run(mock_config, sample_dataframe, mock_event_tracker, webhook_sink):
+    """Test that BaseAlert batches every vessel job into one Teams card."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+    from unittest.mock import MagicMock
+
+    mock_config.tracker = mock_event_tracker
+    mock_config.email_sender = MagicMock()
+    mock_config.html_formatter = MagicMock()
+    mock_config.text_formatter = MagicMock()
+    mock_config.enable_teams_alerts = True
+    mock_config.teams_sender = _sender(webhook_sink)
+
+    alert = VesselDocumentsAlert(mock_config)
+    jobs = alert.route_notifications(alert.filter_data(sample_dataframe))
+    alert._send_notifications(jobs, datetime.now())
+
+    assert mock_config.email_sender.send.call_count == 3
+    assert webhook_sink.request_count == 1
+    body = webhook_sink.requests[0].body.decode()
+    assert 'TEST VESSEL 1' in body and 'TEST VESSEL 3' in body
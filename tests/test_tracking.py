@@ -119,3 +119,22 @@ def test_tracker_keeps_all_events_with_no_reminder_frequency(temp_dir):
     tracker2 = EventTracker(tracking_file, None, 'Europe/Athens')
 
     assert 'very_old_event' in tracker2.sent_events
+
+
+def test_tracker_marks_events_from_several_threads(mock_event_tracker, temp_dir):
+    """Test that concurrent alerts sharing one tracker lose no keys and keep the file valid."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.core.tracking import EventTracker
+
+    def mark(worker):
+        for batch in range(20):
+            mock_event_tracker.mark_as_sent({f"w{worker}_b{batch}_{i}" for i in range(5)}, datetime.now())
+            mock_event_tracker.sent_keys(['', 'teams'])
+            mock_event_tracker.is_sent(f"w{worker}_b0_0")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(mark, range(8)))
+
+    assert len(mock_event_tracker.sent_events) == 8 * 20 * 5
+    reloaded = EventTracker(temp_dir / 'test_tracking.json', None, 'Europe/Athens')
+    assert reloaded.sent_events == mock_event_tracker.sent_events
@@ -342,3 +342,36 @@ def test_alert_includes_department_in_display_columns(mock_config, sample_datafr
         assert 'department_name' in display_columns
         # Should be first column
         assert display_columns[0] == 'department_name'
+
+
+def test_group_slices_matches_groupby_without_copies():
+    """Test that vessel groups equal groupby() groups, in first-appearance order, as slices of one frame."""
+    import numpy as np
+    from src.utils.grouping import group_slices
+
+    df = pd.DataFrame({
+        'vessel': ['B', 'A', 'B', None, 'A', 'C'],
+        'vsl_email': ['b@x', 'a@x', 'b@x', 'n@x', 'a@x', 'c@x'],
+        'document_id': [1, 2, 3, 4, 5, 6],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+    groups = list(group_slices(df, ['vessel', 'vsl_email']))
+
+    assert [key for key, _ in groups] == [('B', 'b@x'), ('A', 'a@x'), ('C', 'c@x')]
+    for key, rows in groups:
+        pd.testing.assert_frame_equal(rows, df.groupby(['vessel', 'vsl_email']).get_group(key))
+    first, second = (rows['document_id'].to_numpy() for _, rows in groups[:2])
+    assert np.shares_memory(first.base, second.base)
+    assert list(group_slices(df.iloc[:0], ['vessel', 'vsl_email'])) == []
+
+
+def test_alert_jobs_follow_data_order(mock_config, sample_dataframe):
+    """Test that vessel jobs come in order of first appearance, with their rows unchanged."""
+    from src.alerts.vessel_documents_alert import VesselDocumentsAlert
+
+    reordered = sample_dataframe.iloc[[3, 0, 2, 1]]
+    jobs = VesselDocumentsAlert(mock_config).route_notifications(reordered)
+
+    assert [job['metadata']['vessel_name'] for job in jobs] == ['TEST VESSEL 3', 'TEST VESSEL 1', 'TEST VESSEL 2']
+    assert jobs[1]['data'].index.tolist() == [0, 1]
+    assert jobs[1]['metadata']['departments'] == ['Technical', 'HSSQE']